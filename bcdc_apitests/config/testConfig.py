@@ -6,6 +6,9 @@ easily by helper functions
 '''
 
 import getpass
+import hashlib
+import os
+import re
 
 # first three initials of the current test user, using this to keep
 # test objects unique allowing multiple dev's to work on test developemnt
@@ -24,27 +27,81 @@ BCDC_TMP_USER_PASSWORD = 'BCDC_TMP_USER_PASSWORD'
 # all test objects created in ckan should have this prefix appended to them
 TEST_PREFIX = "zzztest"
 
+# optional id for the run, added to the test object names so concurrent runs
+# by the same user (ie two OpenShift jobs that both run as 'oc') don't share
+# objects
+BCDC_RUN_ID = 'BCDC_RUN_ID'
+# set by pytest-xdist in each of the worker processes, ie gw0
+XDIST_WORKER = 'PYTEST_XDIST_WORKER'
+# used in the namespace when there is no run id / xdist worker
+NAMESPACE_NO_RUN_ID = 'local'
+NAMESPACE_NO_WORKER = 'main'
+# the maximum length of each part of the namespace, longer parts are cut
+# and end with a hash of the whole part
+NAMESPACE_PART_LENGTH = 12
+NAMESPACE_HASH_LENGTH = 4
+
+
+def get_namespace(test_user, run_id=None, worker_id=None):
+    '''
+    :param test_user: the test user letters
+    :param run_id: the id of the run, see BCDC_RUN_ID
+    :param worker_id: the id of the pytest-xdist worker
+    :return: the part of the test object names that keeps them unique between
+        testers, runs and workers, ie abc_local_main or abc_job-42_gw1.  Every
+        namespace has the same three parts, and the parts never contain an
+        underscore, so the names of one namespace never start with the
+        names of another one.  Parts longer than NAMESPACE_PART_LENGTH are
+        shortened to their start and a hash of the whole part, so
+        nightly-build-101 and nightly-build-102 stay apart.
+    '''
+    parts = [test_user, run_id or NAMESPACE_NO_RUN_ID,
+             worker_id or NAMESPACE_NO_WORKER]
+    return '_'.join(get_namespace_part(part) for part in parts)
+
+
+def get_namespace_part(part):
+    '''
+    :param part: the test user, run id or worker id
+    :return: the part with only lower case letters, digits and dashes, and
+        at most NAMESPACE_PART_LENGTH characters long
+    '''
+    name = re.sub('[^a-z0-9-]', '-', part.lower())
+    if len(name) <= NAMESPACE_PART_LENGTH:
+        return name
+    part_hash = hashlib.sha1(part.encode('utf8')).hexdigest()[:NAMESPACE_HASH_LENGTH]
+    return f'{name[:NAMESPACE_PART_LENGTH - NAMESPACE_HASH_LENGTH - 1]}-{part_hash}'
+
+
+TEST_NAMESPACE = get_namespace(TEST_USER, os.environ.get(BCDC_RUN_ID),
+                               os.environ.get(XDIST_WORKER))
+
 # The directory where the various .json files that contain test data
 # are located
 TEST_DATA_DIRECTORY = "test_data"
 TEST_PARAMETERS_FILE = 'testParams.json'
 TEST_USER_CONFIG = "userConfig.json"
 TEST_CKAN_CORE_SCHEMA_DEF = 'ckan_core_schema.json'
+# the output of scheming_dataset_schema_show, used when the end point can't
+# be reached
+TEST_SCHEMING_DEF = 'data_schema.json'
+# bundled word list used to populate random strings, see words.readme.md
+TEST_WORDS_FILE = 'words.txt'
 
 # test org name
-TEST_ORGANIZATION = '{0}_{1}_testorg'.format(TEST_PREFIX, TEST_USER)
+TEST_ORGANIZATION = '{0}_{1}_testorg'.format(TEST_PREFIX, TEST_NAMESPACE)
 
 # test group name
-TEST_GROUP = '{0}_{1}_testgroup'.format(TEST_PREFIX, TEST_USER)
+TEST_GROUP = '{0}_{1}_testgroup'.format(TEST_PREFIX, TEST_NAMESPACE)
 
 # test package name
-TEST_PACKAGE = '{0}_{1}_testpkg'.format(TEST_PREFIX, TEST_USER)
+TEST_PACKAGE = '{0}_{1}_testpkg'.format(TEST_PREFIX, TEST_NAMESPACE)
 
 # test package title
-TEST_PACKAGE_TITLE = '{0} {1} testpkg title'.format(TEST_PREFIX, TEST_USER)
+TEST_PACKAGE_TITLE = '{0} {1} testpkg title'.format(TEST_PREFIX, TEST_NAMESPACE)
 
 # test resource name
-TEST_RESOURCE = '{0}_{1}_testresource'.format(TEST_PREFIX, TEST_USER)
+TEST_RESOURCE = '{0}_{1}_testresource'.format(TEST_PREFIX, TEST_NAMESPACE)
 
 # path to the rest api
 BCDC_REST_DIR = "/api/3/action"
@@ -54,19 +111,23 @@ BCDC_ROLE_LOOKUP = {'member': ['view', 'viewer', 'looker']}
 
 # user configuration, contains all the informaiton necessary to create these
 # new users.
-TEST_ADMIN_USER = '{0}_{1}_admin'.format(TEST_PREFIX, TEST_USER)
-TEST_EDITOR_USER = '{0}_{1}_editor'.format(TEST_PREFIX, TEST_USER)
-TEST_VIEWER_USER = '{0}_{1}_viewer'.format(TEST_PREFIX, TEST_USER)
+TEST_ADMIN_USER = '{0}_{1}_admin'.format(TEST_PREFIX, TEST_NAMESPACE)
+TEST_EDITOR_USER = '{0}_{1}_editor'.format(TEST_PREFIX, TEST_NAMESPACE)
+TEST_VIEWER_USER = '{0}_{1}_viewer'.format(TEST_PREFIX, TEST_NAMESPACE)
+
+# the users for each run / worker get their own email address
+TEST_EMAIL_SUFFIX = '' if TEST_NAMESPACE == get_namespace(TEST_USER) else \
+    '+' + TEST_NAMESPACE
 
 # default test passwords will need to be retrieved as a secret
 USER_CONFIG = {TEST_EDITOR_USER:
-               {'email': 'test_editor@gov.bc.ca',
+               {'email': f'test_editor{TEST_EMAIL_SUFFIX}@gov.bc.ca',
                 'role': 'editor'},
                TEST_VIEWER_USER:
-               {'email': 'test_viewer@gov.bc.ca',
+               {'email': f'test_viewer{TEST_EMAIL_SUFFIX}@gov.bc.ca',
                 'role': 'member'},
                TEST_ADMIN_USER:
-               {'email': 'test_admin@gov.bc.ca',
+               {'email': f'test_admin{TEST_EMAIL_SUFFIX}@gov.bc.ca',
                 'role': 'admin'},
                }
 
@@ -85,3 +146,62 @@ DF_OPTS = ['orgs', 'groups', 'packages', 'resources', 'users', 'other', 'cache',
 # api keys from
 BCDC_API_KEY = 'BCDC_API_KEY'
 BCDC_URL = 'BCDC_URL'
+
+# env vars that control the dynamic data cache, set BCDC_CACHE_PERSIST to true
+# to keep the cache between test runs.  The max env vars control when the least
+# recently used cache files are evicted.
+BCDC_CACHE_PERSIST = 'BCDC_CACHE_PERSIST'
+BCDC_CACHE_MAX_BYTES = 'BCDC_CACHE_MAX_BYTES'
+BCDC_CACHE_MAX_BYTES_DEFAULT = 100 * 1024 * 1024
+BCDC_CACHE_MAX_FILES = 'BCDC_CACHE_MAX_FILES'
+BCDC_CACHE_MAX_FILES_DEFAULT = 1000
+
+# env var with the seed used to generate the dynamic data, set it (or use the
+# --bcdc-seed option) to the seed in a test id to replay the exact data
+BCDC_SEED = 'BCDC_SEED'
+
+# env var used to pick the json codec: json, orjson or auto (the default, uses
+# orjson when it is installed)
+BCDC_JSON_CODEC = 'BCDC_JSON_CODEC'
+
+# env vars for the http connection pool shared by all the calls made to ckan.
+# POOL_SIZE is the max number of connections kept open to the ckan host,
+# TIMEOUT is the number of seconds to wait for a response.
+BCDC_HTTP_POOL_SIZE = 'BCDC_HTTP_POOL_SIZE'
+BCDC_HTTP_POOL_SIZE_DEFAULT = 10
+BCDC_HTTP_TIMEOUT = 'BCDC_HTTP_TIMEOUT'
+BCDC_HTTP_TIMEOUT_DEFAULT = 60
+
+# env vars for the retry policy used for all calls to ckan, see
+# helpers/retry_policy.py.  BUDGET is the total number of retries allowed for
+# the session, the breaker opens after BREAKER_THRESHOLD consecutive failures
+# and allows a trial call after BREAKER_RESET seconds.
+BCDC_RETRY_MAX_ATTEMPTS = 'BCDC_RETRY_MAX_ATTEMPTS'
+BCDC_RETRY_MAX_ATTEMPTS_DEFAULT = 4
+BCDC_RETRY_BACKOFF = 'BCDC_RETRY_BACKOFF'
+BCDC_RETRY_BACKOFF_DEFAULT = 0.5
+BCDC_RETRY_BUDGET = 'BCDC_RETRY_BUDGET'
+BCDC_RETRY_BUDGET_DEFAULT = 100
+BCDC_RETRY_BREAKER_THRESHOLD = 'BCDC_RETRY_BREAKER_THRESHOLD'
+BCDC_RETRY_BREAKER_THRESHOLD_DEFAULT = 5
+BCDC_RETRY_BREAKER_RESET = 'BCDC_RETRY_BREAKER_RESET'
+BCDC_RETRY_BREAKER_RESET_DEFAULT = 30.0
+
+# env var with the number of session setup steps (creating the test group,
+# users and org) that can run at the same time, see helpers/bootstrap.py
+BCDC_BOOTSTRAP_WORKERS = 'BCDC_BOOTSTRAP_WORKERS'
+BCDC_BOOTSTRAP_WORKERS_DEFAULT = 8
+
+# env vars for the scheming definitions kept on disk between runs, see
+# helpers/scheming_cache.py.  TTL is the number of seconds a saved copy is used
+# without asking ckan, 0 to always revalidate it so a new deploy of the schema
+# is picked up, TIMEOUT is the number of seconds to wait for the end point
+# before using a saved copy, or the one in test_data.
+BCDC_SCHEMING_TTL = 'BCDC_SCHEMING_TTL'
+BCDC_SCHEMING_TTL_DEFAULT = 0
+BCDC_SCHEMING_TIMEOUT = 'BCDC_SCHEMING_TIMEOUT'
+BCDC_SCHEMING_TIMEOUT_DEFAULT = 10
+
+# env var with the path to write the ckan action latency metrics to, in the
+# prometheus textfile (OpenMetrics) format, same as --bcdc-metrics-file
+BCDC_METRICS_FILE = 'BCDC_METRICS_FILE'
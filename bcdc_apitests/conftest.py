@@ -7,6 +7,8 @@ Created on May 28, 2019
 # tests so need to import globally here.
 
 import logging
+import os
+import random
 
 import ckanapi
 import pytest
@@ -18,13 +20,19 @@ from bcdc_apitests.fixtures.users import *
 from bcdc_apitests.fixtures.orgs import *
 from bcdc_apitests.fixtures.groups import *
 from bcdc_apitests.fixtures.ckan import *
+from bcdc_apitests.fixtures.bootstrap import *
 from bcdc_apitests.fixtures.setup_fixtures import *
 from bcdc_apitests.fixtures.arguements import *
 from bcdc_apitests.fixtures.dynamic_data import *
 from bcdc_apitests.fixtures.scheming import *
 import bcdc_apitests.helpers.read_test_config as helper
 import bcdc_apitests.config.testConfig as DF_OPTS
+import bcdc_apitests.config.testConfig as testConfig
 import bcdc_apitests.helpers.bcdc_dynamic_data_population
+import bcdc_apitests.helpers.cassette as cassette_helper
+import bcdc_apitests.helpers.ckan_metrics as ckan_metrics_helper
+import bcdc_apitests.helpers.ckan_session as ckan_session_helper
+import bcdc_apitests.helpers.fake_ckan as fake_ckan_helper
 
 LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +43,183 @@ def pytest_addoption(parser):
     parser.addoption(
         "--df", action="store", default=None, help=helpstr
     )
+    parser.addoption(
+        "--bcdc-persist-cache", action="store_true", default=False,
+        help='keep the dynamic data cache between test runs, same as setting ' +
+             f'the env var {testConfig.BCDC_CACHE_PERSIST}'
+    )
+    parser.addoption(
+        "--bcdc-seed", action="store", type=int, default=None,
+        help='seed used to generate the dynamic test data, use the seed from ' +
+             'a test id to replay the exact data used by that test.  Can also ' +
+             f'be set with the env var {testConfig.BCDC_SEED}'
+    )
+    parser.addoption(
+        "--bcdc-fake-ckan", action="store_true", default=False,
+        help='run the tests against an in memory fake ckan instance instead ' +
+             f'of the instance in {testConfig.BCDC_URL}, no network required'
+    )
+    parser.addoption(
+        "--bcdc-record", action="store", default=None, metavar='CASSETTE',
+        help='record all the calls made to ckan during the run to the ' +
+             'cassette file'
+    )
+    parser.addoption(
+        "--bcdc-replay", action="store", default=None, metavar='CASSETTE',
+        help='play back the calls recorded with --bcdc-record instead of ' +
+             'calling ckan, the data seed from the recording is used'
+    )
+    parser.addoption(
+        "--bcdc-metrics-file", action="store", default=None, metavar='PATH',
+        help='write the latency of the ckan action calls to a prometheus ' +
+             'textfile, can also be set with the env var ' +
+             f'{testConfig.BCDC_METRICS_FILE}'
+    )
+    parser.addoption(
+        "--bcdc-sweep", action="store_true", default=False,
+        help='remove the packages, orgs, groups and users left behind by ' +
+             'earlier runs for the test namespace before the session setup'
+    )
+
+
+def is_xdist_controller(config):
+    '''
+    :return: True in the process that hands the tests out to the pytest-xdist
+        workers, it doesn't run any tests itself
+    '''
+    return bool(getattr(config.option, 'numprocesses', None)) and \
+        not os.environ.get(testConfig.XDIST_WORKER)
+
+
+def delete_data_caches():
+    '''
+    removes the dynamic data caches, unless they are persistent.  With -n the
+    workers share the cache dir so only the controller removes it, before the
+    workers start and after they are done.
+    '''
+    bcdc_apitests.helpers.bcdc_dynamic_data_population.DataCache('dummy').delete_all_caches()
+
+
+def pytest_configure(config):
+    if config.getoption("--bcdc-persist-cache", default=False):
+        bcdc_apitests.helpers.bcdc_dynamic_data_population.DataCache.persistent = True
+    if is_xdist_controller(config):
+        delete_data_caches()
+
+    cassette = None
+    record_path = config.getoption("--bcdc-record", default=None)
+    replay_path = config.getoption("--bcdc-replay", default=None)
+    if record_path and replay_path:
+        raise pytest.UsageError('--bcdc-record and --bcdc-replay can not be used together')
+    if record_path and getattr(config.option, 'numprocesses', None):
+        # every worker and the controller would write the same file
+        raise pytest.UsageError('--bcdc-record can not be used with -n, record in a ' +
+                                'single process')
+    if record_path:
+        cassette = cassette_helper.Cassette(record_path, cassette_helper.MODE_RECORD)
+    elif replay_path:
+        cassette = cassette_helper.Cassette(replay_path, cassette_helper.MODE_REPLAY)
+        # nothing is sent to ckan, the url and key only have to exist
+        if cassette.ckan_url:
+            os.environ.setdefault(testConfig.BCDC_URL, cassette.ckan_url)
+            os.environ.setdefault(testConfig.BCDC_API_KEY, 'replay')
+    ckan_session_helper.set_cassette(cassette)
+
+    # the seed is put into the env so any worker processes use the same seed
+    seed = config.getoption("--bcdc-seed", default=None)
+    if cassette is not None and cassette.replaying:
+        seed = cassette.seed
+    if seed is None and os.environ.get(testConfig.BCDC_SEED):
+        try:
+            seed = int(os.environ[testConfig.BCDC_SEED])
+        except ValueError:
+            msg = f'the env var {testConfig.BCDC_SEED} must be an integer, ' + \
+                  'ie the number after "seed" in a test id, not: ' + \
+                  f'{os.environ[testConfig.BCDC_SEED]!r}'
+            raise pytest.UsageError(msg)
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    os.environ[testConfig.BCDC_SEED] = str(seed)
+    config.bcdc_seed = seed
+    if cassette is not None:
+        cassette.seed = seed
+    LOGGER.info(f"dynamic data seed: {seed}")
+
+
+def pytest_report_header(config):
+    return f'bcdc data seed: {config.bcdc_seed} (replay with --bcdc-seed {config.bcdc_seed})'
+
+
+def pytest_terminal_summary(terminalreporter):
+    '''
+    reports how many requests were made to ckan, how many of them re-used
+    an open connection, how many were retried, and how many setup reads came
+    from the object cache.
+    '''
+    for stats in ckan_session_helper.get_all_stats():
+        terminalreporter.write_sep('-', f"http connections: {stats['url']}")
+        terminalreporter.write_line(
+            f"requests: {stats['requests']}, connections opened: " +
+            f"{stats['connections']}, connections re-used: {stats['reused']}, " +
+            f"pool size: {stats['pool_size']}")
+        terminalreporter.write_line(
+            f"retries: {stats['retries']}, retry budget left: " +
+            f"{stats['retry_budget_left']}, circuit breaker trips: " +
+            f"{stats['breaker_trips']}")
+        if 'cache_hits' in stats:
+            terminalreporter.write_line(
+                f"object cache hits: {stats['cache_hits']}, misses: " +
+                f"{stats['cache_misses']}, invalidations: " +
+                f"{stats['cache_invalidations']}")
+    cassette = ckan_session_helper.get_cassette()
+    if cassette is not None:
+        stats = cassette.get_stats()
+        terminalreporter.write_sep('-', f"cassette: {stats['path']}")
+        terminalreporter.write_line(
+            f"mode: {stats['mode']}, request keys: {stats['keys']}, " +
+            f"replayed: {stats['replayed']}, not in cassette: {stats['misses']}")
+
+    actions = ckan_metrics_helper.get_metrics().get_report()['actions']
+    if actions:
+        terminalreporter.write_sep('-', 'slowest ckan actions (seconds)')
+        slowest = sorted(actions.items(), key=lambda item: item[1]['p95'],
+                         reverse=True)[:10]
+        for action, summary in slowest:
+            terminalreporter.write_line(
+                f"{action}: calls: {summary['count']}, p50: {summary['p50']:.3f}, " +
+                f"p95: {summary['p95']:.3f}, p99: {summary['p99']:.3f}, " +
+                f"retries: {summary['retries']}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_modifyreport(json_report):
+    '''
+    adds the http connection stats to the report written by pytest-json
+    '''
+    json_report['http_sessions'] = ckan_session_helper.get_all_stats()
+    json_report['ckan_actions'] = ckan_metrics_helper.get_metrics().get_report()
+
+
+def pytest_unconfigure(config):
+    if is_xdist_controller(config):
+        delete_data_caches()
+    metrics_file = config.getoption("--bcdc-metrics-file", default=None) or \
+        os.environ.get(testConfig.BCDC_METRICS_FILE)
+    metrics = ckan_metrics_helper.get_metrics()
+    # the xdist controller makes no calls, each worker writes its own file
+    if metrics_file and metrics.stats:
+        worker = os.environ.get('PYTEST_XDIST_WORKER')
+        if worker:
+            base, ext = os.path.splitext(metrics_file)
+            metrics_file = f'{base}.{worker}{ext}'
+        # the worker label keeps the series in the worker files apart
+        metrics.write_textfile(metrics_file, worker)
+    cassette = ckan_session_helper.get_cassette()
+    if cassette is not None and not cassette.replaying:
+        cassette.save()
+    ckan_session_helper.set_cassette(None)
+    ckan_session_helper.close_sessions()
+    fake_ckan_helper.stop_server()
 
 
 def pytest_generate_tests(metafunc):
@@ -71,8 +256,9 @@ def pytest_generate_tests(metafunc):
     else:
         if 'conf_fixture' in metafunc.fixturenames:
             flat_test_params = test_params.get_flattened()
-            test_config_list = flat_test_params.get_test_config_as_list()
-            test_config_ids = flat_test_params.get_test_config_ids()
+            seed = metafunc.config.bcdc_seed
+            test_config_list = flat_test_params.get_test_config_as_list(seed=seed)
+            test_config_ids = flat_test_params.get_test_config_ids(seed=seed)
             metafunc.parametrize("conf_fixture",
                                  test_config_list,
                                  ids=test_config_ids,
@@ -93,8 +279,12 @@ def session_setup_teardown_mod(user_setup_fixture):
     '''
     LOGGER.debug("called the session start up")
 
-    # at startup and tear down make sure the cache dir is empty
-    cache = bcdc_apitests.helpers.bcdc_dynamic_data_population.DataCache('dummy')
-    cache.delete_all_caches()
+    # at startup and tear down make sure the cache dir is empty, unless the
+    # cache is persistent in which case it is left for the next run.  The
+    # pytest-xdist workers leave it to the controller, see delete_data_caches()
+    worker = os.environ.get(testConfig.XDIST_WORKER)
+    if not worker:
+        delete_data_caches()
     yield
-    cache.delete_all_caches()
+    if not worker:
+        delete_data_caches()
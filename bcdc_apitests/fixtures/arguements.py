@@ -31,6 +31,16 @@ def df(request, test_disable_teardown_opts):
     return opt
 
 
+@pytest.fixture(scope="session")
+def bcdc_seed(request):
+    '''
+    --bcdc-seed: the seed used to generate the dynamic data for the session.
+         If the option isn't provided a seed is generated, it is shown in the
+         report header and in the test ids.
+    '''
+    return request.config.bcdc_seed
+
+
 @pytest.fixture(scope="session")
 def cancel_package_teardown(df):
     cancel_teardown_opts = ['packages', 'ALL', None]
@@ -0,0 +1,93 @@
+'''
+Created on Oct. 18, 2026
+
+The session setup, ie the test group, the test users and the test org with
+the users as members, run as a DAG by helpers/bootstrap.py.  The group, each
+of the users and the org lookup don't depend on each other so they are run
+concurrently, the org is created / updated once the lookup and the users are
+complete.
+
+The session fixtures group_setup_fixture, user_setup_fixture and
+org_setup_fixture provide the results of the bootstrap and do the teardown.
+When a step fails those fixtures never run, so the steps that completed are
+torn down by the bootstrap before the error is raised.
+
+With the --bcdc-sweep option the objects left behind by earlier runs for the
+TEST_NAMESPACE are removed before the bootstrap, see helpers/sweeper.py
+'''
+import logging
+
+import pytest
+
+from bcdc_apitests.fixtures.groups import group_delete, group_setup
+from bcdc_apitests.fixtures.orgs import org_lookup, org_purge_if_exists, org_setup
+from bcdc_apitests.fixtures.users import user_delete, user_setup
+from bcdc_apitests.helpers.bootstrap import Bootstrap
+from bcdc_apitests.helpers.sweeper import Sweeper, format_report
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture(scope='session')
+def sweep_fixture(request, remote_api_super_admin_auth):
+    '''
+    removes the objects left behind by earlier runs when the --bcdc-sweep
+    option is set
+
+    :param remote_api_super_admin_auth: remote ckanapi object with auth header
+    :return: the sweep report, see Sweeper.sweep(), None if the objects were
+        not swept
+    '''
+    report = None
+    if request.config.getoption('--bcdc-sweep', default=False):
+        report = Sweeper(remote_api_super_admin_auth).sweep()
+        LOGGER.info(format_report(report))
+    yield report
+
+
+@pytest.fixture(scope='session')
+def session_bootstrap(remote_api_super_admin_auth, test_roles,
+                      temp_user_password, session_test_group_data,
+                      session_test_org_data, cancel_group_teardown,
+                      cancel_user_teardown, cancel_org_teardown,
+                      sweep_fixture):  # pylint: disable=unused-argument
+    '''
+    :param remote_api_super_admin_auth: remote ckanapi object with auth header
+    :param test_roles: the config for the test users
+    :param temp_user_password: the password for users that get created
+    :param session_test_group_data: data to use when creating the group
+    :param session_test_org_data: data to use when creating the org
+    :param cancel_group_teardown: True to keep the group if the bootstrap fails
+    :param cancel_user_teardown: True to keep the users if the bootstrap fails
+    :param cancel_org_teardown: True to keep the org if the bootstrap fails
+    :param sweep_fixture: makes sure the sweep is done before the setup
+    :return: dictionary with the results of the bootstrap steps, the keys are
+        'group', 'org' and 'user:<user name>' for each of the users
+    '''
+    def get_teardown(cancel, delete):
+        if cancel:
+            return None
+        return lambda data: delete(remote_api_super_admin_auth, data['name'])
+
+    bootstrap = Bootstrap()
+    bootstrap.add('group', group_setup,
+                  args=[remote_api_super_admin_auth, session_test_group_data],
+                  teardown=get_teardown(cancel_group_teardown, group_delete))
+    user_steps = []
+    for user in test_roles:
+        user_step = f'user:{user}'
+        bootstrap.add(user_step, user_setup,
+                      args=[remote_api_super_admin_auth, user, test_roles[user],
+                            temp_user_password],
+                      teardown=get_teardown(cancel_user_teardown, user_delete))
+        user_steps.append(user_step)
+    bootstrap.add('org_lookup', org_lookup,
+                  args=[remote_api_super_admin_auth,
+                        session_test_org_data['name']])
+    bootstrap.add('org', org_setup,
+                  args=[remote_api_super_admin_auth, session_test_org_data],
+                  deps=['org_lookup'] + user_steps,
+                  teardown=get_teardown(cancel_org_teardown, org_purge_if_exists))
+    yield bootstrap.run()
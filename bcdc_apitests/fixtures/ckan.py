@@ -4,31 +4,42 @@ Created on May 29, 2019
 @author: KJNETHER
 '''
 import pytest
-import ckanapi
 
 #from .load_config import ckan_url, ckan_apitoken
 from bcdc_apitests.fixtures.load_config import ckan_superadmin_apitoken
+import bcdc_apitests.helpers.ckan_session as ckan_session_helper
 
 # pylint: disable=redefined-outer-name
 
 
 @pytest.fixture(scope="session")
-def remote_api_super_admin_auth(ckan_url, ckan_superadmin_apitoken):
+def ckan_session(ckan_url):
+    '''
+    :return: the pooled http session for the ckan instance, shared by all the
+             tests and the RemoteCKAN objects.  Pass the users auth header with
+             each request.
+    :rtype: bcdc_apitests.helpers.ckan_session.CKANSession
+    '''
+    yield ckan_session_helper.get_session(ckan_url)
+
+
+@pytest.fixture(scope="session")
+def remote_api_super_admin_auth(ckan_session, ckan_superadmin_apitoken):
     '''
     :return: a remote ckan object with super admin privs that has been
              authenticated with an api key
     :rtype: ckanapi.RemoteCKAN
     '''
-    rmt_api = ckanapi.RemoteCKAN(ckan_url, ckan_superadmin_apitoken)
+    rmt_api = ckan_session.get_remote_api(ckan_superadmin_apitoken)
     yield rmt_api
 
 
 @pytest.fixture
-def remote_api_auth(ckan_url, ckan_apitoken):
+def remote_api_auth(ckan_session, ckan_apitoken):
     '''
     :return: a remote ckan object with the api token that corresponds with the
              user that was configured by the test parameterization
     :rtype: ckanapi.RemoteCKAN
     '''
-    rmt_api = ckanapi.RemoteCKAN(ckan_url, ckan_apitoken)
+    rmt_api = ckan_session.get_remote_api(ckan_apitoken)
     yield rmt_api
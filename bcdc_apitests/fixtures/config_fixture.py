@@ -22,6 +22,14 @@ def test_user():
     return TEST_USER
 
 
+@pytest.fixture(scope='session')
+def test_namespace():
+    '''
+    :return: the part of the test object names that keeps them unique between
+        testers, runs and pytest-xdist workers, see TEST_NAMESPACE
+    '''
+    return TEST_NAMESPACE
+
 
 @pytest.fixture
 def test_prefix():
@@ -12,7 +12,6 @@ import os.path
 
 import pytest
 
-import bcdc_apitests.helpers.bcdc_dataset_schema as bcdc_dataset_schema
 import bcdc_apitests.helpers.bcdc_dynamic_data_population as bcdc_dynamic_data_population
 import bcdc_apitests.config.testConfig as testConfig
 
@@ -23,8 +22,8 @@ LOGGER = logging.getLogger(__name__)
 
 @pytest.fixture
 def populate_bcdc_dataset(org_create_if_not_exists_fixture, test_package_name,
-                          get_scheming, test_package_title,
-                          cancel_cache_teardown):
+                          scheming_dataset_fields, test_package_title,
+                          cancel_cache_teardown, bcdc_seed):
     '''
        * org_create_if_not_exists_fixture - verifies that the org exists
             and makes org id available
@@ -41,18 +40,15 @@ def populate_bcdc_dataset(org_create_if_not_exists_fixture, test_package_name,
     * need to add the switch required to disable teardown
     '''
 
-    # generate a dataset and then cache it.
-    ds_schema = bcdc_dataset_schema.BCDCDataset(dataset_type='dataset_fields',
-                           struct=get_scheming)
-
-    # get the scheming data defs
-    LOGGER.debug(f'scheming data: {get_scheming}')
+    # generate a dataset and then cache it, the schema object is shared by
+    # the session
     org_id = org_create_if_not_exists_fixture['id']
     overrides = {'owner_org': org_id,
                  'name': test_package_name,
                  'title': test_package_title}
 
-    dataset_populator = bcdc_dynamic_data_population.DataPopulation(ds_schema, 'dataset_fields')
+    dataset_populator = bcdc_dynamic_data_population.DataPopulation(
+        scheming_dataset_fields, 'dataset_fields', seed=bcdc_seed)
     bcdc_dataset = dataset_populator.populate_randomized(overrides=overrides)
 
     yield bcdc_dataset
@@ -71,51 +67,42 @@ def populate_bcdc_dataset_single(populate_bcdc_dataset):
     single json dataset instead of an iterable containing datasets.
     '''
     LOGGER.debug(f"populate_bcdc_dataset type: {type(populate_bcdc_dataset)}")
-    # iterator = iter(populate_bcdc_dataset)
-    try:
-        dataset = next(populate_bcdc_dataset)
-    except StopIteration:
-        populate_bcdc_dataset.reset()
-        dataset = next(populate_bcdc_dataset)
+    dataset = populate_bcdc_dataset[0]
     LOGGER.debug(f"Dataset Retrieved from iterator: {dataset}")
     yield dataset
 
 
 @pytest.fixture
-def bcdc_dataset_populator(get_scheming):
+def bcdc_dataset_populator(scheming_dataset_fields, bcdc_seed):
     '''
-    :param get_scheming: the scheming definitions retrieved from the scheming
-        end point.
+    :param scheming_dataset_fields: the schema for the package fields from the
+        scheming end point.
+    :param bcdc_seed: the seed used to generate the data
 
     Test generates a DataPopulation object and returns it.  Individual tests
     will then receive method names through parameterization that belong to the
     object returned by this fixture.  They will call those methods to retrieve
     the data to be used for various tests.
     '''
-    dataset_schema = bcdc_dataset_schema.BCDCDataset(
-        dataset_type='dataset_fields', struct=get_scheming)
-
     dataset_populator = bcdc_dynamic_data_population.DataPopulation(
-        dataset_schema, 'dataset_fields')
+        scheming_dataset_fields, 'dataset_fields', seed=bcdc_seed)
     yield dataset_populator
     
     
 @pytest.fixture
-def bcdc_resource_populator(get_scheming):
+def bcdc_resource_populator(scheming_resource_fields, bcdc_seed):
     '''
-    :param get_scheming: the scheming definitions retrieved from the scheming
-        end point.
+    :param scheming_resource_fields: the schema for the resource fields from
+        the scheming end point.
+    :param bcdc_seed: the seed used to generate the data
 
     Test generates a DataPopulation object and returns it.  Individual tests
     will then receive method names through parameterization that belong to the
     object returned by this fixture.  They will call those methods to retrieve
     the data to be used for various tests.
     '''
-    dataset_schema = bcdc_dataset_schema.BCDCDataset(
-        dataset_type='resource_fields', struct=get_scheming)
-
     dataset_populator = bcdc_dynamic_data_population.DataPopulation(
-        dataset_schema, 'resource_fields')
+        scheming_resource_fields, 'resource_fields', seed=bcdc_seed)
     yield dataset_populator
 
 
@@ -146,14 +133,8 @@ def populate_resource(get_scheming, package_create_if_not_exists,
 @pytest.fixture
 def populate_resource_single(populate_resource, remote_api_super_admin_auth):
     LOGGER.debug(f"resource type: {type(populate_resource)}")
-    # iterator = iter(populate_bcdc_dataset)
-
     #pkg = remote_api_super_admin_auth.action.package_show(id=testConfig.TEST_PACKAGE)
 
-    try:
-        resource = next(populate_resource)
-    except StopIteration:
-        populate_resource.reset()
-        resource = next(populate_resource)
+    resource = populate_resource[0]
     LOGGER.debug(f"Resource Retrieved from iterator: {resource}")
     yield resource
@@ -10,6 +10,9 @@ import logging
 import ckanapi
 import pytest
 
+import bcdc_apitests.helpers.object_cache as object_cache
+import bcdc_apitests.helpers.state_index as state_index
+
 LOGGER = logging.getLogger(__name__)
 # pylint: disable=redefined-outer-name, logging-fstring-interpolation
 
@@ -44,23 +47,35 @@ def group_purge(remote_api, test_group):
     remote_api.action.group_purge(id=test_group)
 
 
-def group_exists(remote_api, test_group):
+def group_probe(remote_api, test_group):
     '''
     :param remote_api: a remote ckan object with authorization key.
-    :type remote_api: ckanapi.RemoteCKAN
-    :param test_group: the name of the test group who's existence
-        is to be determined
+    :param test_group: the name or id of the group
+    :return: the group data, None if the group doesn't exist
     '''
-    group_exists = False
+    group_data = None
     try:
         group_data = remote_api.action.group_show(id=test_group)
         LOGGER.debug("group found and show: %s", group_data)
-        if group_data['name'] == test_group:
-            group_exists = True
     except ckanapi.errors.NotFound as err:
         LOGGER.debug("err: %s %s", type(err), err)
+    return group_data
+
+
+def group_exists(remote_api, test_group):
+    '''
+    The answer comes from the state index for the session when there is one,
+    see helpers/state_index.py
 
-    return group_exists
+    :param remote_api: a remote ckan object with authorization key.
+    :type remote_api: ckanapi.RemoteCKAN
+    :param test_group: the name of the test group who's existence
+        is to be determined
+    '''
+    group_data = state_index.lookup(
+        remote_api, state_index.KIND_GROUP, test_group,
+        lambda: group_probe(remote_api, test_group))
+    return group_data is not None and group_data['name'] == test_group
 
 
 def group_create_if_not_exists(remote_api, test_group, test_group_data):
@@ -74,7 +89,7 @@ def group_create_if_not_exists(remote_api, test_group, test_group_data):
     '''
     exists = group_exists(remote_api, test_group)
     if exists:
-        group_data = remote_api.action.group_show(id=test_group)
+        group_data = object_cache.show(remote_api, 'group_show', test_group)
     else:
         group_data = remote_api.action.group_create(**test_group_data)
         LOGGER.debug("group_return: %s", group_data)
@@ -104,6 +119,31 @@ def group_un_delete(remote_api, test_group):
     ret_val = remote_api.action.group_patch(**update_val)
     LOGGER.debug("ret_val: %s", ret_val)
 
+
+def group_setup(remote_api, test_group_data):
+    '''
+    creates the session test group if it doesn't exist.  Run as a step of the
+    session bootstrap, see fixtures/bootstrap.py
+
+    :param remote_api: ckanapi remote with authentication
+    :param test_group_data: data to use when creating the group
+    :return: the group data
+    '''
+    # was getting errors if this was not explicity set.
+    test_group_data['is_organization'] = False
+    test_group_data['type'] = "group"
+
+    LOGGER.debug("Setup group: %s", test_group_data['name'])
+    LOGGER.debug(f"group session data: {test_group_data}")
+    if not group_exists(remote_api, test_group_data['name']):
+        group_data = remote_api.action.group_create(**test_group_data)
+        LOGGER.debug("group_data from create: %s", group_data)
+    else:
+        group_data = object_cache.show(remote_api, 'group_show',
+                                       test_group_data['name'])
+        LOGGER.debug("group_data from show: %s", group_data)
+    return group_data
+
 # --------------------- Fixtures ----------------------
 
 
@@ -146,8 +186,8 @@ def group_create_if_not_exists_fixture(remote_api_super_admin_auth,
     LOGGER.debug("test_group_data: %s", test_group_data)
     LOGGER.debug("group_exists_fixture: %s", group_exists_fixture)
     if group_exists_fixture:
-        group_data = remote_api_super_admin_auth.action.group_show(
-            id=test_group)
+        group_data = object_cache.show(remote_api_super_admin_auth, 'group_show',
+                                       test_group)
         LOGGER.debug("group_data retrieved: %s", group_data)
     else:
         try:
@@ -216,35 +256,19 @@ def group_teardown_fixture(remote_api_super_admin_auth, test_group, cancel_group
 
 
 @pytest.fixture(scope='session')
-def group_setup_fixture(remote_api_super_admin_auth, test_session_group,
-                        group_exists_fixture, session_test_group_data,
-                        cancel_group_teardown):
+def group_setup_fixture(session_bootstrap, remote_api_super_admin_auth,
+                        test_session_group, cancel_group_teardown):
     '''
-    at start of tests will test to see if the required test group
-    exists.  if it does not it gets created.  At conclusion of testing
-    will clean it up with a delete.
+    at start of tests the session bootstrap will test to see if the required
+    test group exists.  if it does not it gets created.  At conclusion of
+    testing will clean it up with a delete.
 
+    :param session_bootstrap: the results of the session bootstrap steps
     :param remote_api_super_admin_auth: remote ckanapi object with auth header
     :param test_session_group: the name of the group to be used for the
         test
-    :param group_exists_fixture: does the group used for testing exist
-    :param session_test_group_data: data to use when creating the group
     '''
-    # was getting errors if this was not explicity set.
-    session_test_group_data['is_organization'] = False
-    session_test_group_data['type'] = "group"
-
-    LOGGER.debug("Setup group: %s", test_session_group)
-    LOGGER.debug(f"group session data: {session_test_group_data}")
-    group_data = None
-    if not group_exists_fixture:
-        group_data = remote_api_super_admin_auth.action.group_create(
-            **session_test_group_data)
-        LOGGER.debug("group_data from create: %s", group_data)
-    else:
-        group_data = remote_api_super_admin_auth.action.group_show(
-            id=session_test_group_data['name'])
-        LOGGER.debug("group_data from show: %s", group_data)
+    group_data = session_bootstrap['group']
     yield group_data
 
     if not cancel_group_teardown:
@@ -11,6 +11,8 @@ import logging
 import os.path
 import pkgutil
 import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.ckan_metrics as ckan_metrics
+import bcdc_apitests.helpers.fake_ckan as fake_ckan_helper
 
 import pytest
 import secrets
@@ -45,12 +47,29 @@ def import_dbcsecrets():  # @DontTrace
 
 
 @pytest.fixture(scope="session")
-def secret_file():
+def fake_ckan(request):
+    '''
+    when the tests are run with --bcdc-fake-ckan starts an in memory fake ckan
+    instance on a local port, the ckan url and super admin api token fixtures
+    then point to it instead of BCDC_URL / BCDC_API_KEY.
+
+    :return: the running fake ckan server, or None when the option isn't set
+    :rtype: bcdc_apitests.helpers.fake_ckan.FakeCKANServer
+    '''
+    server = None
+    if request.config.getoption("--bcdc-fake-ckan", default=False):
+        # the server is stopped in pytest_unconfigure
+        server = fake_ckan_helper.get_server()
+    yield server
+
+
+@pytest.fixture(scope="session")
+def secret_file(fake_ckan):
     '''
     :return: full path to the secret file that arms the tests
     '''
     scrt_file = None
-    if testConfig.BCDC_URL not in os.environ:
+    if testConfig.BCDC_URL not in os.environ and fake_ckan is None:
 
         scrt_file = os.path.join(os.path.dirname(__file__), '..', '..', 'secrets',
                                  'secrets.json')
@@ -71,7 +90,7 @@ def env():
 
 
 @pytest.fixture(scope="session")
-def ckan_host(secret_file, env, import_dbcsecrets):
+def ckan_host(secret_file, env, import_dbcsecrets, fake_ckan):
     '''
     gets the host for the given env
     '''
@@ -88,7 +107,9 @@ def ckan_host(secret_file, env, import_dbcsecrets):
                  (('DBCSecrets' in dir()) and
                   'GetSecrets' in dir(DBCSecrets)))
     LOGGER.debug('import_dbcsecrets: %s', import_dbcsecrets)
-    if testConfig.BCDC_URL in os.environ:
+    if fake_ckan is not None:
+        host = None
+    elif testConfig.BCDC_URL in os.environ:
         host = None
         LOGGER.info(f"Env Var BCDC_URL is set: {os.environ[testConfig.BCDC_URL]}",)
     elif 'GetSecrets' in dir(DBCSecrets):
@@ -108,13 +129,15 @@ def ckan_host(secret_file, env, import_dbcsecrets):
 
 
 @pytest.fixture(scope="session")
-def ckan_url(ckan_host):
+def ckan_url(ckan_host, fake_ckan):
     '''
     returns ckan url for the env
     '''
     # for now hard coding the env to DLV, could be TST, PRD
     # env = 'DLV'
-    if testConfig.BCDC_URL in os.environ:
+    if fake_ckan is not None:
+        url = fake_ckan.url
+    elif testConfig.BCDC_URL in os.environ:
         url = os.environ[testConfig.BCDC_URL]
     else:
         url = 'https://{0}'.format(ckan_host)
@@ -122,12 +145,14 @@ def ckan_url(ckan_host):
 
 
 @pytest.fixture(scope="session")
-def ckan_superadmin_apitoken(secret_file, env, import_dbcsecrets):
+def ckan_superadmin_apitoken(secret_file, env, import_dbcsecrets, fake_ckan):
     '''
     Gets the ckan superadmin api token.  Will use this token to generate other
     users.
     '''
-    if testConfig.BCDC_API_KEY in os.environ:
+    if fake_ckan is not None:
+        token = fake_ckan.ckan.sysadmin_apikey
+    elif testConfig.BCDC_API_KEY in os.environ:
         token = os.environ[testConfig.BCDC_API_KEY]
     elif 'GetSecrets' in dir(DBCSecrets):
         LOGGER.debug("GetSecrets module exists, secrets file: %s", secret_file)
@@ -141,6 +166,7 @@ def ckan_superadmin_apitoken(secret_file, env, import_dbcsecrets):
         msg = 'unable to retrieve secrets either using the environment variable ' + \
               f'{testConfig.BCDC_API_KEY} or from the secrets file {secret_file}'
         raise SecretsNotFound(msg)
+    ckan_metrics.get_metrics().set_role(token, ckan_metrics.ROLE_SYSADMIN)
     yield token
 
 
@@ -208,6 +234,7 @@ def ckan_apitoken_session(user_data_fixture_session):
     # the property test_users from the testParams.json file.
     # they are keywords: admin, editor, viewer
     apitoken = user_data_fixture_session['apikey']
+    set_user_role(user_data_fixture_session)
     # for now to make work just continue to use super admin
     # api tokens
     yield apitoken
@@ -223,11 +250,24 @@ def ckan_apitoken(user_data_fixture):
     # the property test_users from the testParams.json file.
     # they are keywords: admin, editor, viewer
     apitoken = user_data_fixture['apikey']
+    set_user_role(user_data_fixture)
     # for now to make work just continue to use super admin
     # api tokens
     yield apitoken
 
 
+def set_user_role(user_data):
+    '''
+    registers the api key of a test user so the calls made with it are
+    recorded in the metrics with the role of the user
+
+    :param user_data: the user data returned by user_show
+    '''
+    user_config = testConfig.USER_CONFIG.get(user_data.get('name'), {})
+    ckan_metrics.get_metrics().set_role(
+        user_data.get('apikey'), user_config.get('role', ckan_metrics.ROLE_UNKNOWN))
+
+
 @pytest.fixture(scope="session")
 def ckan_auth_header_session(ckan_apitoken):
     api_headers = {'X-CKAN-API-KEY': ckan_apitoken,
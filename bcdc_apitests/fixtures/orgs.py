@@ -10,6 +10,9 @@ import logging
 import ckanapi
 import pytest
 
+import bcdc_apitests.helpers.object_cache as object_cache
+import bcdc_apitests.helpers.state_index as state_index
+
 LOGGER = logging.getLogger(__name__)
 # pylint: disable=redefined-outer-name
 
@@ -48,23 +51,35 @@ def org_purge(remote_api, test_organization):
         remote_api.action.organization_purge(id=test_organization)
 
 
-def org_exists(remote_api, test_organization):
+def org_probe(remote_api, test_organization):
     '''
     :param remote_api: a remote ckan object with authorization key.
-    :type remote_api: ckanapi.RemoteCKAN
-    :param test_organization: the name of the test organization who's existence
-        is to be determined
+    :param test_organization: the name or id of the organization
+    :return: the org data, None if the org doesn't exist
     '''
-    org_exists = False
+    org_data = None
     try:
         org_data = remote_api.action.organization_show(id=test_organization)
         LOGGER.debug("org found and show: %s", org_data)
-        if org_data['name'] == test_organization:
-            org_exists = True
     except ckanapi.errors.NotFound as err:
         LOGGER.debug("err: %s %s", type(err), err)
+    return org_data
 
-    return org_exists
+
+def org_exists(remote_api, test_organization):
+    '''
+    The answer comes from the state index for the session when there is one,
+    see helpers/state_index.py
+
+    :param remote_api: a remote ckan object with authorization key.
+    :type remote_api: ckanapi.RemoteCKAN
+    :param test_organization: the name of the test organization who's existence
+        is to be determined
+    '''
+    org_data = state_index.lookup(
+        remote_api, state_index.KIND_ORGANIZATION, test_organization,
+        lambda: org_probe(remote_api, test_organization))
+    return org_data is not None and org_data['name'] == test_organization
 
 
 def org_create_if_not_exists(remote_api, test_organization, test_org_data):
@@ -78,7 +93,7 @@ def org_create_if_not_exists(remote_api, test_organization, test_org_data):
     '''
     exists = org_exists(remote_api, test_organization)
     if exists:
-        org_data = remote_api.action.organization_show(id=test_organization)
+        org_data = object_cache.show(remote_api, 'organization_show', test_organization)
     else:
         org_data = remote_api.action.organization_create(**test_org_data)
         LOGGER.debug("org_return: %s", org_data)
@@ -144,6 +159,54 @@ def org_add_users(remote_api, org, users):
     LOGGER.debug("ret_val: %s", ret_val)
 
 
+def org_lookup(remote_api, test_organization):
+    '''
+    Run as a step of the session bootstrap, see fixtures/bootstrap.py
+
+    :param remote_api: a remote ckan object with authorization key.
+    :param test_organization: the name of the session test organization
+    :return: the org data if the org exists, otherwise None
+    '''
+    org_data = None
+    if org_exists(remote_api, test_organization):
+        org_data = object_cache.show(remote_api, 'organization_show', test_organization)
+        LOGGER.debug("org_data from show: %s", org_data)
+    return org_data
+
+
+def org_setup(remote_api, test_org_data, org_data, *users):
+    '''
+    creates the session test org if it doesn't exist, makes sure it is active
+    and that the test users are members.  Run as a step of the session
+    bootstrap once the org lookup and the users are complete.
+
+    :param remote_api: a remote ckan object with authorization key.
+    :param test_org_data: data to use when creating the org
+    :param org_data: the existing org data, None if the org doesn't exist
+    :param users: the users to add to the org, dicts with the keys capacity
+        and name
+    :return: the org data
+    '''
+    users = list(users)
+    test_org_data['users'] = users
+    LOGGER.debug(f"session_test_org_data: {test_org_data}")
+    LOGGER.debug(f"users to add to org: {users}")
+
+    LOGGER.debug("Setup Org: %s", test_org_data['name'])
+    if org_data is None:
+        org_data = remote_api.action.organization_create(**test_org_data)
+        LOGGER.debug("org_data from create: %s", org_data)
+
+    # if org is not active make it active
+    if org_data['state'] != 'active':
+        org_un_delete(remote_api, org_data['id'])
+
+    # next need to verify that the users are part of the org
+    if not users_in_org(org_data, users):
+        org_add_users(remote_api, org_data, users)
+    return org_data
+
+
 @pytest.fixture
 def org_create_fixture(remote_api_super_admin_auth, test_org_data, user_setup_fixture):
     '''
@@ -187,8 +250,8 @@ def org_create_if_not_exists_fixture(remote_api_super_admin_auth,
     LOGGER.debug("org_exists_fixture: %s", org_exists_fixture)
 
     if org_exists_fixture:
-        org_data = remote_api_super_admin_auth.action.organization_show(
-            id=test_organization)
+        org_data = object_cache.show(remote_api_super_admin_auth,
+                                     'organization_show', test_organization)
         LOGGER.debug("org_data retrieved: %s", org_data)
     else:
         try:
@@ -239,7 +302,8 @@ def org_id_fixture(remote_api_super_admin_auth, test_organization):
     '''
     LOGGER.debug("get id of org: %s", test_organization)
 
-    org_data = remote_api_super_admin_auth.action.organization_show(id=test_organization)
+    org_data = object_cache.show(remote_api_super_admin_auth, 'organization_show',
+                                 test_organization)
 
     # get org id
     org_id = org_data['id']
@@ -265,43 +329,22 @@ def org_teardown_fixture(remote_api_super_admin_auth, test_organization,
 
 
 @pytest.fixture(scope="session", autouse=True)
-def org_setup_fixture(remote_api_super_admin_auth, test_session_organization,
-                      org_exists_fixture, session_test_org_data,
-                      cancel_org_teardown, user_setup_fixture):
+def org_setup_fixture(session_bootstrap, remote_api_super_admin_auth,
+                      test_session_organization, cancel_org_teardown,
+                      user_setup_fixture):
     '''
-    at start of tests will test to see if the required test org
-    exists.  if it does not it gets created.  At conclusion of testing
-    will clean it up with a delete.
+    at start of tests the session bootstrap will test to see if the required
+    test org exists.  if it does not it gets created and the test users are
+    added to it.  At conclusion of testing will clean it up with a delete.
 
+    :param session_bootstrap: the results of the session bootstrap steps
     :param remote_api_super_admin_auth: remote ckanapi object with auth header
     :param test_session_organization: the name of the org to be used for the
         test
-    :param org_exists_fixture: does the org used for testing exist
-    :param session_test_org_data: data to use when creating the org
+    :param user_setup_fixture: the test users, requested so the users are
+        deleted after the org
     '''
-    session_test_org_data['users'] = user_setup_fixture
-    LOGGER.debug(f"session_test_org_data: {session_test_org_data}")
-    LOGGER.debug(f"users to add to org: {user_setup_fixture}")
-
-    LOGGER.debug("Setup Org: %s", test_session_organization)
-    org_data = None
-    if not org_exists_fixture:
-        org_data = remote_api_super_admin_auth.action.organization_create(
-            **session_test_org_data)
-        LOGGER.debug("org_data from create: %s", org_data)
-    else:
-        org_data = remote_api_super_admin_auth.action.organization_show(
-            id=session_test_org_data['name'])
-        LOGGER.debug("org_data from show: %s", org_data)
-
-    # if org is not active make it active
-    if org_data['state'] != 'active':
-        org_un_delete(remote_api_super_admin_auth, org_data['id'])
-
-    # next need to verify that the users are part of the org
-    if not users_in_org(org_data, user_setup_fixture):
-        org_add_users(remote_api_super_admin_auth, org_data, user_setup_fixture)
-
+    org_data = session_bootstrap['org']
     yield org_data
 
     if not cancel_org_teardown:
@@ -15,6 +15,8 @@ from .config_fixture import test_package_name
 from bcdc_apitests.fixtures.dynamic_data import populate_bcdc_dataset
 
 import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.object_cache as object_cache
+import bcdc_apitests.helpers.state_index as state_index
 
 LOGGER = logging.getLogger(__name__)
 # pylint: disable=redefined-outer-name, logging-fstring-interpolation
@@ -62,11 +64,12 @@ def set_package_active(remote_api, pkg_name):
     If the package with the given name exists and it has a state=deleted
     '''
     if package_exists(remote_api, pkg_name, 'ANY'):
-        pkg_data = remote_api.action.package_show(id=pkg_name)
+        pkg_data = object_cache.show(remote_api, 'package_show', pkg_name)
         LOGGER.debug("update package...")
         # update for the owner org
         # test org name
-        org_data = remote_api.action.organization_show(id=testConfig.TEST_ORGANIZATION)
+        org_data = object_cache.show(remote_api, 'organization_show',
+                                     testConfig.TEST_ORGANIZATION)
         org_id = org_data['id']
         LOGGER.debug(f"pkg_data: {pkg_data}")
         if pkg_data['state'] != 'active' or pkg_data['owner_org'] != org_id:
@@ -77,8 +80,32 @@ def set_package_active(remote_api, pkg_name):
             remote_api.action.package_update(**pkg_data)
 
 
+def package_probe(remote_api, package_name):
+    '''
+    :param remote_api: ckanapi, remote api object
+    :param package_name: the package name or id
+    :return: the package data, None if the package doesn't exist, or a dict
+        with the keys name and invalid if ckan fails to show the package
+    '''
+    try:
+        pkg_data = remote_api.action.package_show(id=package_name)
+        LOGGER.debug("package show: %s", pkg_data)
+    except ckanapi.errors.NotFound as err:
+        LOGGER.debug("err: %s %s", type(err), err)
+        pkg_data = None
+    except ckanapi.errors.CKANAPIError as err:
+        LOGGER.debug("err: %s %s", type(err), err)
+        # assume we have a ghost package so yes say exists
+        LOGGER.debug("error assuming package exists and is invalid: %s", package_name)
+        pkg_data = {'name': package_name, 'invalid': True}
+    return pkg_data
+
+
 def package_exists(remote_api, package_name, pkgtype='ANY'):
     '''
+    The answer comes from the state index for the session when there is one,
+    see helpers/state_index.py
+
     :param remote_api: ckanapi, remote api object that is to be used to determine
                        if the package exists.
     :type remote_api: ckanapi.RemoteCKAN
@@ -98,21 +125,11 @@ def package_exists(remote_api, package_name, pkgtype='ANY'):
         msg = msg.format(','.join(domain))
         raise ValueError(msg)
 
-    pkg_exists = False
-    exists_pkg_type = 'VALID'
-    try:
-        pkg_data = remote_api.action.package_show(id=package_name)
-        LOGGER.debug("package show: %s", pkg_data)
-        if pkg_data['name'] == package_name:
-            pkg_exists = True
-    except ckanapi.errors.NotFound as err:
-        LOGGER.debug("err: %s %s", type(err), err)
-    except ckanapi.errors.CKANAPIError as err:
-        LOGGER.debug("err: %s %s", type(err), err)
-        # assume we have a ghost package so yes say exists
-        LOGGER.debug("error assuming package exists and is invalid: %s", package_name)
-        pkg_exists = True
-        exists_pkg_type = 'INVALID'
+    pkg_data = state_index.lookup(
+        remote_api, state_index.KIND_PACKAGE, package_name,
+        lambda: package_probe(remote_api, package_name))
+    pkg_exists = pkg_data is not None and pkg_data['name'] == package_name
+    exists_pkg_type = 'INVALID' if pkg_exists and pkg_data.get('invalid') else 'VALID'
 
     # now determine if the package was found whether we are searching for
     # a particular package type, ie valid / invalid
@@ -175,8 +192,8 @@ def package_create_if_not_exists(remote_api_super_admin_auth,
 
     if test_valid_package_exists:
         LOGGER.debug("Package exists, loading the data...")
-        pkg_data = remote_api_super_admin_auth.action.package_show(
-            id=test_package_name)
+        pkg_data = object_cache.show(remote_api_super_admin_auth, 'package_show',
+                                     test_package_name)
     else:
         LOGGER.debug("Package does not exist, creating it...")
 
@@ -198,7 +215,8 @@ def package_create_if_not_exists(remote_api_super_admin_auth,
 @pytest.fixture
 def set_package_state_active(remote_api_super_admin_auth, populate_bcdc_dataset_single):
     LOGGER.debug(f"package name: {populate_bcdc_dataset_single['name']}")
-    pckg_shw_data = remote_api_super_admin_auth.action.package_show(id=populate_bcdc_dataset_single['name'])
+    pckg_shw_data = object_cache.show(remote_api_super_admin_auth, 'package_show',
+                                      populate_bcdc_dataset_single['name'])
     if pckg_shw_data['state'] != 'active':
         LOGGER.debug(f"package: {populate_bcdc_dataset_single['name']} state is  {populate_bcdc_dataset_single['state']}")
 
@@ -264,7 +282,8 @@ def get_test_package(remote_api_super_admin_auth, test_package_name):
     pkg_data = None
     LOGGER.debug("getting package: %s", test_package_name)
     try:
-        pkg_data = remote_api_super_admin_auth.action.package_show(id=test_package_name)
+        pkg_data = object_cache.show(remote_api_super_admin_auth, 'package_show',
+                                     test_package_name)
     except ckanapi.errors.CKANAPIError as err:
         LOGGER.debug("err: %s %s", type(err), err)
     yield pkg_data
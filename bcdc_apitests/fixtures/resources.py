@@ -11,6 +11,9 @@ import pytest
 import ckanapi
 # from bcdc_apitests.fixtures.ckan import remote_api_super_admin_auth
 import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.object_cache as object_cache
+import bcdc_apitests.helpers.state_index as state_index
+from bcdc_apitests.fixtures.packages import package_probe
 
 LOGGER = logging.getLogger(__name__)
 
@@ -19,24 +22,24 @@ LOGGER = logging.getLogger(__name__)
 # --------------------- Supporting Functions ----------------------
 
 
-def resource_exists(remote_api, resource_name,
-                    resource_id):
+def resource_exists(remote_api, resource_name, pkg_id):
     '''
+    The answer comes from the state index for the session when there is one,
+    see helpers/state_index.py
+
     :param remote_api: ckanapi, remote api object that is to be used to determine
-                       if the package exists.
-    :param test_resource_name:
-    :param resource_get_id_fixture:
+                       if the resource exists.
+    :param resource_name: the name of the resource
+    :param pkg_id: the package id or package name that the resource should be
+        a part of.
     '''
-
+    pkg_data = state_index.lookup(remote_api, state_index.KIND_PACKAGE, pkg_id,
+                                  lambda: package_probe(remote_api, pkg_id))
+    LOGGER.debug("package for the resource: %s", pkg_data)
     res_exists = False
-    try:
-        res_data = remote_api.action.package_show(id=resource_id)
-        LOGGER.debug("resource show: %s", res_data)
-        if res_data['name'] == resource_name:
-            res_exists = True
-    except ckanapi.errors.NotFound as err:
-        LOGGER.debug("err: %s %s", type(err), err)
-
+    if pkg_data is not None and not pkg_data.get('invalid'):
+        res_exists = any(rsrc['name'] == resource_name
+                         for rsrc in pkg_data.get('resources') or [])
     return res_exists
 
 
@@ -47,7 +50,7 @@ def get_resource(remote_api, resource_name, pkg_id):
     :param pkg_id: the package id or package name that the resource should be
         a part of.
     '''
-    pkg_data = remote_api.action.package_show(id=pkg_id)
+    pkg_data = object_cache.show(remote_api, 'package_show', pkg_id)
     res_data = None
     if 'resources' in pkg_data:
         for rsrc in pkg_data['resources']:
@@ -9,23 +9,43 @@ schema.
 
 import pytest
 import logging
-import requests
+
+import bcdc_apitests.helpers.scheming_cache as scheming_cache
 
 LOGGER = logging.getLogger(__name__)
 
+# pylint: disable=logging-fstring-interpolation
+
 
-@pytest.fixture
-def get_scheming(ckan_auth_header, ckan_url, ckan_rest_dir):
+@pytest.fixture(scope='session')
+def get_scheming(ckan_url, ckan_session):
     '''
     end point
 
     https://cadi.data.gov.bc.ca/api/3/action/scheming_dataset_schema_show?type=bcdc_dataset
+
+    fetched once per session, and kept on disk between sessions, see
+    helpers/scheming_cache.py.  The struct is shared, don't modify it.
+    '''
+    LOGGER.debug(f'getting the scheming for: {ckan_url}')
+    yield scheming_cache.get_scheming(ckan_session, ckan_url)
+
+
+@pytest.fixture(scope='session')
+def scheming_dataset_fields(get_scheming):
+    '''
+    :return: the schema object for the package fields, shared by all the
+        tests so it can't be changed
+    :rtype: bcdc_apitests.helpers.bcdc_dataset_schema.BCDCDataset
+    '''
+    yield scheming_cache.get_dataset(get_scheming, 'dataset_fields')
+
+
+@pytest.fixture(scope='session')
+def scheming_resource_fields(get_scheming):
+    '''
+    :return: the schema object for the resource fields, shared by all the
+        tests so it can't be changed
+    :rtype: bcdc_apitests.helpers.bcdc_dataset_schema.BCDCDataset
     '''
-    api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'scheming_dataset_schema_show')
-    params = {'type': 'bcdc_dataset'}
-    LOGGER.debug(f'api call for scheming: {api_call}')
-
-    resp = requests.get(api_call, params=params)
-    resp_data = resp.json()
-    resp_result = resp_data['result']
-    yield resp_result
+    yield scheming_cache.get_dataset(get_scheming, 'resource_fields')
@@ -7,11 +7,13 @@ Code used to boot users.
 '''
 
 import logging
-import time
 
 import ckanapi
 import pytest
 
+import bcdc_apitests.helpers.object_cache as object_cache
+import bcdc_apitests.helpers.state_index as state_index
+
 # from bcdc_apitests.fixtures.ckan import remote_api_super_admin_auth
 # from bcdc_apitests.fixtures.config_fixture import test_roles
 
@@ -24,33 +26,38 @@ LOGGER = logging.getLogger(__name__)
 # pylint: disable=redefined-outer-name
 
 
-def get_user_data(remote_api, user, retry=0):
+def get_user_data(remote_api, user):
     '''
     :param remote_api: a ckanapi RemoteAPI object with super admin authentication
     :param user: the name fo the user that we are looking for
-    :param retry:  the number of times to retry before fail, implemented this
-        because the api was being flaky and failing on the first attempt
 
-    using the remote_api gets the data associated with a specific user
+    using the remote_api gets the data associated with a specific user.  CKAN
+    randomly fails with 500 every so often if you hit it too hard, those
+    failures are retried by the session the remote_api uses.
     '''
     usr_data = {}
     try:
         LOGGER.debug("looking for the user: %s", user)
-        usr_data = remote_api.action.user_show(id=user)
+        usr_data = object_cache.show(remote_api, 'user_show', user)
         LOGGER.debug("usr_data: %s", usr_data)
     except ckanapi.errors.NotFound as err:
         LOGGER.debug("err: %s %s", type(err), err)
-    except ckanapi.errors.CKANAPIError:
-        # seems like CKAN randomly fails with 500 every so often if you hit it
-        # too hard.  This is an attempt to overcome that.
-        retry += 1
-        time.sleep(2)
-        if retry == 3:
-            raise
-        get_user_data(remote_api, user, retry)
     return usr_data
 
 
+def get_user_state(remote_api_admin_auth, user):
+    '''
+    :param remote_api_admin_auth: a ckanapi RemoteAPI object with super admin
+        authentication
+    :param user: the name fo the user that we are looking for
+    :return: the user data from the state index for the session, or from
+        get_user_data() if there isn't one, None if the user doesn't exist
+    '''
+    return state_index.lookup(
+        remote_api_admin_auth, state_index.KIND_USER, user,
+        lambda: get_user_data(remote_api_admin_auth, user) or None)
+
+
 def check_if_user_exist(remote_api_admin_auth, user):
     '''
     :param remote_api: a ckanapi RemoteAPI object with super admin authentication
@@ -58,9 +65,9 @@ def check_if_user_exist(remote_api_admin_auth, user):
     :return: a boolean indicating if the "user" exists.
     '''
     usr_exists = False
-    usr_data = get_user_data(remote_api_admin_auth, user)
+    usr_data = get_user_state(remote_api_admin_auth, user)
     LOGGER.debug("usr_data: %s", usr_data)
-    if ('name' in usr_data) and usr_data['name'] == user:
+    if usr_data and usr_data['name'] == user:
         usr_exists = True
     return usr_exists
 
@@ -72,8 +79,8 @@ def check_if_user_active(remote_api_admin_auth, user):
     :return: boolean indicating if the user exists and is active
     '''
     usr_active = True
-    usr_data = get_user_data(remote_api_admin_auth, user)
-    if usr_data['state'] == "deleted":
+    usr_data = get_user_state(remote_api_admin_auth, user)
+    if not usr_data or usr_data['state'] == "deleted":
         usr_active = False
     return usr_active
 
@@ -103,45 +110,57 @@ def assign_user_role(remote_api_admin_auth, user, org_id, role):
     LOGGER.debug("setting test user role: %s", resp)
 
 
+def user_setup(remote_api_admin_auth, user, user_config, password):
+    '''
+    makes sure the test user exists and is active, creating it if it doesn't
+    exist.  Run as a step of the session bootstrap, see
+    fixtures/bootstrap.py
+
+    :param remote_api_admin_auth: a ckanapi.RemoteAPI object with authorization
+    :param user: the name of the test user
+    :param user_config: the config for the user from USER_CONFIG, ie a dict
+        with the keys email and role
+    :param password: the password to use if the user gets created
+    :return: the user as it should be added to the test org, ie a dict with
+        the keys capacity and name
+    '''
+    email = user_config['email']
+    role = user_config['role']
+    LOGGER.debug("user name: %s", user)
+    LOGGER.debug("user role: %s", role)
+
+    exists = check_if_user_exist(remote_api_admin_auth, user)
+    if exists:
+        active = check_if_user_active(remote_api_admin_auth, user)
+        if not active:
+            LOGGER.debug("user %s not active", user)
+            usr_data = remote_api_admin_auth.action.user_update(
+                id=user, state='active', email=email)
+            LOGGER.debug("user found and changed state to: %s",
+                         usr_data['state'])
+    else:
+        LOGGER.debug("attempting to create new user: %s", user)
+        usr_data = remote_api_admin_auth.action.user_create(
+            name=user, email=email,
+            password=password)
+        LOGGER.debug("created user: %s", str(usr_data))
+    return {"capacity": role, "name": user}
+
+
 @pytest.fixture(scope="session")
-def user_setup_fixture(group_setup_fixture, remote_api_super_admin_auth,
-                       test_roles, temp_user_password,
+def user_setup_fixture(group_setup_fixture, session_bootstrap,
+                       remote_api_super_admin_auth, test_roles,
                        cancel_user_teardown):
     '''
-    Used in session setup and tear down.  Creates the 3 test users that are
-    used by tests.
-    
-    This fixture is required for the org fixture org_setup_fixture.. This code
-    runs first then the orgs are configured, where the users are made part 
-    of the test org
+    Used in session setup and tear down.  Provides the 3 test users that are
+    used by tests, the users are created by the session bootstrap at the same
+    time as the test group and org.
+
+    This fixture is required for the org fixture org_setup_fixture.. the
+    users get deleted after the org has been cleaned up.
     '''
-    # removed fixture dep org_setup_fixture
     users = test_roles.keys()
-    user_names = []
-    users_for_org = []
-    for user in users:
-        email = test_roles[user]['email']
-        exists = check_if_user_exist(remote_api_super_admin_auth, user)
-        role = test_roles[user]['role']
-        users_for_org.append({"capacity": role, "name": user})
-
-        LOGGER.debug("user name: %s", user)
-        LOGGER.debug("user role: %s", role)
-
-        if exists:
-            active = check_if_user_active(remote_api_super_admin_auth, user)
-            if not active:
-                LOGGER.debug("user %s not active", user)
-                usr_data = remote_api_super_admin_auth.action.user_update(
-                    id=user, state='active', email=email)
-                LOGGER.debug("user found and changed state to: %s",
-                             usr_data['state'])
-        else:
-            LOGGER.debug("attempting to create new user: %s", user)
-            usr_data = remote_api_super_admin_auth.action.user_create(
-                name=user, email=email,
-                password=temp_user_password)
-            LOGGER.debug("created user: %s", str(usr_data))
+    users_for_org = [session_bootstrap[f'user:{user}'] for user in users]
     yield users_for_org
     if not cancel_user_teardown:
         for user in users:
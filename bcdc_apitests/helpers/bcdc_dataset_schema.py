@@ -29,6 +29,9 @@ Things to think about:
 # TODO: modify so that extent populates with a lat long values.  Will do this for
 #       any fields names that satisfy regular expression *latitude* *longitude*
 
+import collections
+import functools
+import hashlib
 import json
 import logging
 import os
@@ -41,23 +44,60 @@ import bcdc_apitests.helpers.file_utils as file_utils
 LOGGER = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def load_ckan_core_schema():
+    '''
+    The ckan scheming definition for the core ckan fields does not exist.
+    The test suite has one defined in the 'test_data' directory.  This
+    function will calculate the path to that file, open it, read the json
+    into a python data structure, and return that data structure.
+
+    The file is only read once per process, the same struct is returned to all
+    callers so it should not be modified.
+    '''
+    fu = file_utils.FileUtils()
+    data_dir = fu.get_test_data_dir()
+    schema_file = testConfig.TEST_CKAN_CORE_SCHEMA_DEF
+    schema_file_full_path = os.path.join(data_dir, schema_file)
+    LOGGER.debug(f"reading the ckan core schema: {schema_file_full_path}")
+
+    with open(schema_file_full_path, 'r') as fh:
+        return json.load(fh)
+
+
 class Fields():
     '''
     abstraction of fields in general that can be used with both 'dataset_fields'
     and 'resource_fields'
 
     expects the data structure that is passed to the constructor to be a list
+
+    Fields are stored in an ordered dictionary keyed by field name, so lookups
+    by name don't need to scan the fields.  Iterating over the object returns a
+    new iterator each time, so nested iteration is safe.
+
+    Once freeze() is called the fields and the filter can't be changed, so the
+    object can be shared, ie by all the tests in a session.
     '''
 
     def __init__(self, struct):
         self.struct = struct
-        self.all_flds = []
+        self.fields_index = collections.OrderedDict()
         # filtered_list if populated will be used for iterators.  If its set to
-        # none then iterators will use all_flds
+        # none then iterators will use all the fields
         self.filtered_list = None
-        self.itercnt = 0
+        self.filtered_index = None
+        self.fingerprint = None
+        self.frozen = False
         self.__parse_flds()
 
+    @property
+    def all_flds(self):
+        '''
+        :return: a list of all the field objects, ignores any filters
+        '''
+        return list(self.fields_index.values())
+
     def set_field_type_filter(self, property_name=None, property_value=None):
         '''
         This method can be used to set a filter.  The filter will restrict the
@@ -73,58 +113,109 @@ class Fields():
 
         If called twice will perform an Or condition for previous calls to the
         filter, ie included in set if condition1 or condition2 are met.
-
-        Haven't needed and yet so haven't implemented.
         '''
+        self.check_frozen()
         if property_name is None:
             self.filtered_list = None
+            self.filtered_index = None
         else:
-            if self.filtered_list is None:
-                self.filtered_list = []
-            for fld in self:
+            filtered_index = collections.OrderedDict()
+            if self.filtered_index is not None:
+                filtered_index.update(self.filtered_index)
+            for fld in self.fields_index.values():
                 val = fld.get_value(property_name)
                 if (val is not None) and val == property_value:
-                    self.filtered_list.append(fld)
+                    filtered_index[fld.field_name] = fld
+            self.filtered_index = filtered_index
+            self.filtered_list = list(filtered_index.values())
+
+    def freeze(self):
+        '''
+        stops the fields and the filter from being changed, see check_frozen()
+
+        :return: this object
+        '''
+        self.frozen = True
+        return self
+
+    def check_frozen(self):
+        '''
+        raises a TypeError if the object has been frozen
+        '''
+        if self.frozen:
+            msg = f'the fields of {type(self).__name__} are shared and can ' + \
+                  'not be changed, create a new object instead'
+            raise TypeError(msg)
 
     def __parse_flds(self):
         '''
-        Reads the json struct and uses it to create a list of individual
-        Field objects stored in the property all_flds
+        Reads the json struct and uses it to create the individual field objects
         '''
-        self.all_flds = []
         for fld_data in self.struct:
-            fld = Field(fld_data)
-            self.all_flds.append(fld)
-        self.current_list = None
+            self.add_field(self.create_field(fld_data))
 
-    def __iter__(self):
+    def create_field(self, fld_data):  # pylint: disable=no-self-use
         '''
-        implement iterator
+        :param fld_data: the definition of a single field from the struct
+        :return: the field object that wraps the definition, subclasses override
+            this to use their own field classes.
         '''
-        self.itercnt = 0
-        return self
+        return Field(fld_data)
 
-    def __next__(self):
+    def get_index(self):
+        '''
+        :return: the dictionary of field name to field objects that iteration
+            and lookups use, if a filter is defined only includes the fields
+            that satisfy the filter.
+        '''
+        if self.filtered_index is not None:
+            return self.filtered_index
+        return self.fields_index
+
+    def __iter__(self):
         '''
-        Iterator:
         If a filter is defined then iterate over the filtered list,
-        otherwise iterate over all_flds
+        otherwise iterate over all the fields
         '''
-        iter_list = self.all_flds
-        if self.filtered_list is not None:
-            iter_list = self.filtered_list
-        if self.itercnt >= len(iter_list):
-            raise StopIteration
+        return iter(list(self.get_index().values()))
 
-        return_value = iter_list[self.itercnt]
-        self.itercnt += 1
-        return return_value
+    def __len__(self):
+        return len(self.get_index())
+
+    def __contains__(self, field_name):
+        return field_name in self.get_index()
+
+    def add_field(self, field):
+        '''
+        checks to see if a field already exists, if it does it gets removed
+        and replaced with the new one, otherwise the field is added
+        '''
+        self.check_frozen()
+        self.fields_index.pop(field.field_name, None)
+        self.fields_index[field.field_name] = field
+        self.fingerprint = None
+
+    def remove_field(self, field):
+        '''
+        if the field exists it is removed
+        '''
+        self.check_frozen()
+        removed = self.fields_index.pop(field.field_name, None) is not None
+        if removed:
+            self.fingerprint = None
+        return removed
 
-    def reset(self):
+    def get_fingerprint(self):
         '''
-        resets the iterator
+        :return: a hash of the field definitions, if the definitions change
+            so does the fingerprint.  Used to identify data that was generated
+            from a particular version of a schema.
         '''
-        self.itercnt = 0
+        if self.fingerprint is None:
+            fld_structs = [fld.fld for fld in self.fields_index.values()]
+            fld_str = json.dumps(fld_structs, sort_keys=True, default=str)
+            self.fingerprint = hashlib.sha256(fld_str.encode('utf8')).hexdigest()
+        return self.fingerprint
 
 
 class CKANCorePackage(Fields):
@@ -154,46 +245,20 @@ class CKANCorePackage(Fields):
             struct = self.__get_ckan_core_schema(dataset_type)
         LOGGER.debug(f"CKANCorePackage core struct: {struct}")
         Fields.__init__(self, struct)
-        self.all_flds = []
-        self.__parse_flds()
-        LOGGER.debug(f"CKANCoreFields: self.all_flds: {self.all_flds}")
+        LOGGER.debug(f"CKANCoreFields: {list(self.fields_index)}")
 
     def __get_ckan_core_schema(self, data_type):
         '''
-        The ckan scheming definition for the core ckan fields does not exist.
-        The test suite has one defined in the 'test_data' directory.  This
-        method will calculate the path to that file, open it, read the json
-        into a python data structure, and return that data structure
-        '''
-        fu = file_utils.FileUtils()
-        data_dir = fu.get_test_data_dir()
-        schema_file = testConfig.TEST_CKAN_CORE_SCHEMA_DEF
-        schema_file_full_path = os.path.join(data_dir, schema_file)
-
-        fh = open(schema_file_full_path, 'r')
-        schematext = fh.read()
-        fh.close()
-        data_struct = json.loads(schematext)
-        # if isinstance(data_struct, list):
-        #    return_value = data_struct
+        :return: the core ckan field definitions for the data_type, see
+            load_ckan_core_schema()
+        '''
+        data_struct = load_ckan_core_schema()
         if data_type in data_struct:
             return_value = data_struct[data_type]
         else:
             return_value = []
         return return_value
 
-    def __parse_flds(self):
-        '''
-        dumps fields into two lists one for required the other optional
-        '''
-        self.all_flds = []
-        for fld_data in self.struct:
-            fld = CKANCoreField(fld_data)
-            # if fld.is_required():
-            self.add_field(fld)
-            # self.all_flds.append(fld)
-        self.current_list = None
-
     def get_presets(self, start_list=None):
         '''
         Used to validate the expected values in the presets with what the tests
@@ -216,23 +281,26 @@ class CKANCorePackage(Fields):
                 preset.extend(self.get_presets(fld['subfields']))
         return list(set(preset))
 
+    def create_field(self, fld_data):
+        '''
+        :return: a CKANCoreField for the field definition
+        '''
+        return CKANCoreField(fld_data)
+
     def get_field_names(self):
         '''
         :return: a list of the field names that are defined for this schema.  Does
                  not include subfields
         '''
-        fld_names = []
-        for fld in self:
-            fld_names.append(fld.field_name)
-        return fld_names
+        return list(self.get_index())
 
     def field_exists(self, field):
-        exists = False
-        for fld in self:
-            if fld.field_name == field.field_name:
-                exists = True
-                break
-        return exists
+        '''
+        :param field: a field object
+        :return: boolean depending on whether the schema includes a field with
+            the same name
+        '''
+        return field.field_name in self.get_index()
 
     def field_name_exists(self, field_name):
         '''
@@ -240,48 +308,14 @@ class CKANCorePackage(Fields):
         :return: boolean depending on whether the schema includes a definition
             for the input field_name
         '''
-        field_names = self.get_field_names()
-        ret_val = False
-        if field_name in field_names:
-            ret_val = True
-        return ret_val
-
-    def remove_field(self, field):
-        '''
-        if the field exists it is removed
-        '''
-        removed = False
-        fldcnt = 0
-        for fld in self.all_flds:
-            if fld.field_name == field.field_name:
-                removed = True
-                break
-            fldcnt += 1
-        if removed:
-            del self.all_flds[fldcnt]
-        return removed
-
-    def add_field(self, field):
-        '''
-        checks to see if a field already exists, if it does it gets removed
-        and replaced with the new one, otherwise the field is added
-        '''
-        was_removed = self.remove_field(field)
-        LOGGER.debug(f"removed the field?: {was_removed}")
-        self.all_flds.append(field)
+        return field_name in self.get_index()
 
     def get_field(self, field_name):
         '''
         :return: a field object for the field that corresponds with the field
                  name provided... returns None if the field does not exist.
         '''
-        field = None
-        for fld in self:
-            LOGGER.debug(f'field name: {fld.field_name}')
-            if fld.field_name == field_name:
-                field = fld
-                break
-        return field
+        return self.get_index().get(field_name)
 
 
 class BCDCDataset(CKANCorePackage):
@@ -297,20 +331,12 @@ class BCDCDataset(CKANCorePackage):
 
     def __parse_flds(self):
         '''
-        dumps fields into two lists one for required the other optional
+        adds the bcdc fields to the core ckan fields, replacing any core fields
+        with the same name
         '''
-        # self.all_flds = []
-        for fld in self.all_flds:
-            LOGGER.debug(f"existing field: {fld.field_name}")
-        LOGGER.debug(f'struct: {self.struct}')
         LOGGER.debug(f'self.dataset_type: {self.dataset_type}')
         for fld_data in self.struct[self.dataset_type]:
-            LOGGER.debug(f"fld_data: {fld_data}")
-            fld = BCDCDatasetField(fld_data)
-            LOGGER.debug(f"adding fields {fld.field_name}.")
-            # if fld.is_required():
-            # self.all_flds.append(fld)
-            self.add_field(fld)
+            self.add_field(BCDCDatasetField(fld_data))
 
 
 class Field():
@@ -318,28 +344,24 @@ class Field():
     Simple implemenation of a field.  Does not contain individual
     field implemenation.
     '''
+    __slots__ = ('fld', 'field_name')
 
     def __init__(self, fld):
         self.fld = fld
+        self.field_name = fld.get('field_name')
 
     def has_fld(self, property_name):
         '''
         :return: true or false if the field has this property
         '''
-        has_fld = False
-        if property_name in self.fld:
-            has_fld = True
-        return has_fld
+        return property_name in self.fld
 
     def fld_is_true(self, fld_name):
         '''
         Identifies if the field exists AND is set to True
         :param fld_name: input field name
         '''
-        fld_true = False
-        if (self.has_fld(fld_name)) and self.fld[fld_name]:
-            fld_true = True
-        return fld_true
+        return bool(self.fld.get(fld_name))
 
     def get_value(self, property_name):
         '''
@@ -347,10 +369,7 @@ class Field():
             property_name.  If the property_name is not defined for this field
             then returns None.
         '''
-        val = None
-        if self.has_fld(property_name):
-            val = self.fld[property_name]
-        return val
+        return self.fld.get(property_name)
 
     def __str__(self):
         '''
@@ -358,8 +377,6 @@ class Field():
         '''
         outlist = []
         for i in self.fld:
-            # LOGGER.debug(f"i: {i}")
-            # LOGGER.debug(f"i: {self.fld[i]}")
             outlist.append(f'{i} : {self.fld[i]}')
         outstr = ', '.join(outlist)
         return outstr
@@ -369,93 +386,58 @@ class CKANCoreField(Field):
     '''
     reads the core ckan fields, this class can then be inherited by the bcdc_dataset
     schema.
+
+    The properties that are used when generating data are parsed once when the
+    field is created.  The choices and subfields objects are created the first
+    time they are accessed and then re-used.
+
+    :ivar field_name: the field name
+    :ivar required: is the field required
+    :ivar preset: the value for the property preset, if it is not defined it
+        will be set to the default preset value defined in the class.
+    :ivar has_choices: does the field have a choices property
+    :ivar has_subfields: does the field have a subfields property
+    :ivar choices_helper: the contents of the choices_helper field
+    :ivar conditional_field: the value of the conditional_field for this field
+    :ivar conditional_values: the value of the conditional_values for this field
     '''
+    __slots__ = ('required', 'preset', 'has_choices', 'has_subfields',
+                 'choices_helper', 'conditional_field', 'conditional_values',
+                 'choices_obj', 'subfields_obj')
+    default_preset = 'string'
 
     def __init__(self, fld):
         Field.__init__(self, fld)
-        self.default_preset = 'string'
-
-    @property
-    def required(self):
-        '''
-        making required a property
-        '''
-        return self.fld_is_true('required')
-
-    @property
-    def has_choices(self):
-        '''
-        creating a property for has_choices, used to determine if
-        the field has a choices property.
-        '''
-        return self.has_fld('choices')
-
-    @property
-    def field_name(self):
-        '''
-        :return: the field name
-        '''
-        return self.fld['field_name']
+        self.required = bool(fld.get('required'))
+        self.preset = fld.get('preset') or self.default_preset
+        self.has_choices = 'choices' in fld
+        self.has_subfields = 'subfields' in fld
+        self.choices_helper = fld.get('choices_helper')
+        self.conditional_field = fld.get('conditional_field')
+        self.conditional_values = fld.get('conditional_values')
+        self.choices_obj = None
+        self.subfields_obj = None
 
     @property
     def choices(self):
         '''
-        :return: a Fields object with the choice options
+        :return: a Choices object with the choice options, None if the field
+            doesn't have choices
         '''
-        retval = None
-        if self.has_choices:
-            retval = Choices(self.fld['choices'])
-        return retval
-
-    @property
-    def has_subfields(self):
-        '''
-        :return: the value for subfields if it exists, otherwise None
-        '''
-        return self.has_fld('subfields')
+        if self.choices_obj is None and self.has_choices:
+            self.choices_obj = Choices(self.fld['choices'])
+        return self.choices_obj
 
     @property
     def subfields(self):
         '''
         :return: a 'Fields' object with the contents of the subfields
         '''
-        # return BCDCDataset(self.fld['subfields'], dataset_type='subfields')
-        LOGGER.debug(f"processing subfields: {self.fld['subfields']}")
-        struct = {}
-        struct['subfields'] = self.fld['subfields']
-        return BCDCDataset(struct, dataset_type='subfields')
-
-    @property
-    def preset(self):
-        '''
-        :return: the value for the property preset, if it is not defined it will
-                 be set to the default preset value defined in the class.
-        '''
-        preset_value = self.get_value('preset')
-        if not preset_value:
-            preset_value = self.default_preset
-        return preset_value
-
-    @property
-    def choices_helper(self):
-        '''
-        :return: the contents of the choices_helper field
-        '''
-        return self.get_value('choices_helper')
-
-    @property
-    def conditional_field(self):
-        '''
-        :return: the value of the conditional_field for this field
-        '''
-        return self.get_value('conditional_field')
-
-    @property
-    def conditional_values(self):
-        '''
-        :return: the value of the conditional_values for this field
-        '''
-        return self.get_value('conditional_values')
+        if self.subfields_obj is None:
+            struct = {}
+            struct['subfields'] = self.fld['subfields']
+            self.subfields_obj = BCDCDataset(struct, dataset_type='subfields')
+        return self.subfields_obj
 
 
 class BCDCDatasetField(CKANCoreField):
@@ -463,9 +445,7 @@ class BCDCDatasetField(CKANCoreField):
     a wrapper for individual field objects.  Provides quick access to properties
     of the field
     '''
-
-    def __init__(self, fld):
-        CKANCoreField.__init__(self, fld)
+    __slots__ = ()
 
 
 class Choices():
@@ -476,6 +456,7 @@ class Choices():
     def __init__(self, choice_struct):
         self.choice_struct = choice_struct
         self.choices = []
+        self.value_list = []
         self.__parse()
         LOGGER.debug(f"choices data: {choice_struct}")
 
@@ -485,20 +466,17 @@ class Choices():
         class.
         '''
         for choice_data in self.choice_struct:
-            self.choices.append(Choice(choice_data))
+            choice = Choice(choice_data)
+            self.choices.append(choice)
+            self.value_list.append(choice.value)
 
     @property
     def values(self):
         '''
         :return: a list of the possible values for this choice field, other
-            words the domain.
+            words the domain.  The list is shared, don't modify it.
         '''
-        LOGGER.debug("values called")
-        value_list = []
-        for choice in self.choices:
-
-            value_list.append(choice.value)
-        return value_list
+        return self.value_list
 
     def __len__(self):
         '''
@@ -511,15 +489,12 @@ class Choice(Field):
     '''
     a wrapper class for individual choices that make up
     Choices objects
+
+    :ivar value: the value for this choice
     '''
+    __slots__ = ('choice_data', 'value')
 
     def __init__(self, choice_data):
         Field.__init__(self, choice_data)
         self.choice_data = choice_data
-
-    @property
-    def value(self):
-        '''
-        :return: the value for this choice
-        '''
-        return self.get_value('value')
+        self.value = choice_data.get('value')
@@ -9,23 +9,43 @@ scheming rules provided via the bcdc scheming extension.
 This module will use the scheming data to return actual data that will be used
 in the testing.
 '''
+import array
+import collections
+import collections.abc
 import datetime
+import glob
+import hashlib
+import heapq
 import inspect
 import json
 import logging
+import multiprocessing
 import os.path
 import random
 import re
 import shutil
-
-import randomwordgenerator.randomwordgenerator
+import sys
+import tempfile
+import weakref
 
 import bcdc_apitests.config.testConfig as testConfig
 # import bcdc_apitests.helpers.data_config as data_config
+import bcdc_apitests.helpers.data_mutation as data_mutation
+import bcdc_apitests.helpers.json_codec as json_codec
 from bcdc_apitests.helpers.file_utils import FileUtils
+import bcdc_apitests.helpers.word_source as word_source
 
 LOGGER = logging.getLogger(__name__)
-WORDS = []
+
+# number of datasets generated at a time by populate_parallel
+DEFAULT_CHUNK_SIZE = 1000
+# number of chunks populate_parallel has in flight for each worker
+PENDING_CHUNKS_PER_WORKER = 2
+
+# random dates are picked from the DATE_RANGE_DAYS before this date.  A fixed
+# date rather than today, so a seed generates the same data on any day.
+DATE_EPOCH = datetime.date(2026, 1, 1)
+DATE_RANGE_DAYS = 365 * 10
 
 # pylint: disable=logging-fstring-interpolation, logging-not-lazy
 
@@ -59,14 +79,28 @@ class DataPopulation():
 
     Randomized data generated by this class is also cached to allow for re-use
     of the same data in different tests.  Current behaviour is always use
-    the cached version of data if it exists.  Cache files are defined based
-    on the method names that generate them.
+    the cached version of data if it exists.  Cache files are named using the
+    method that generated them and a hash of the schema, overrides, seed and
+    TEST_NAMESPACE, so a change to any of those results in new data being
+    generated.  The session seed is random unless it is set with --bcdc-seed,
+    so a persistent cache is only re-used by later runs with the same seed.
     '''
 
-    def __init__(self, fields_schema, data_type):
+    def __init__(self, fields_schema, data_type, seed=None):
+        '''
+        :param fields_schema: the schema to generate data for
+        :type fields_schema: bcdc_apitests.helpers.bcdc_dataset_schema.BCDCDataset
+        :param data_type: dataset_fields or resource_fields
+        :param seed: when provided the data is generated using a random number
+            generator initialized with this seed, so the same seed will always
+            generate the same data.
+        '''
         self.schema = fields_schema
         self.data_type = data_type
-        self.pop_resource = DataPopulationResource(fields_schema)
+        self.seed = seed
+        LOGGER.debug(f"{data_type} population seed: {seed}")
+        rng = random.Random(seed) if seed is not None else None
+        self.pop_resource = DataPopulationResource(fields_schema, rng)
         self.fields_schema = fields_schema
 
         # calculate cache file
@@ -76,6 +110,22 @@ class DataPopulation():
         # this property can be set to disable cache usage
         self.disable_cache = False
 
+    def get_cache(self, method_name, overrides=None):
+        '''
+        :param method_name: the name of the method that is generating the data
+        :param overrides: the overrides used to generate the data
+        :return: the DataCache for data generated by the method with these
+            overrides, for the schema and seed used by this object.  The
+            generated names embed the TEST_NAMESPACE, so it is part of the key
+            and xdist workers sharing the cache dir don't get each other's data
+        :rtype: DataCache
+        '''
+        cache_key = DataCache.get_cache_key(
+            schema=self.fields_schema.get_fingerprint(),
+            data_type=self.data_type, method=method_name, overrides=overrides,
+            seed=self.seed, namespace=testConfig.TEST_NAMESPACE)
+        return DataCache(f'{method_name}_{self.data_type}.json', cache_key)
+
     def populate_randomized(self, overrides=None):
         '''
         Returns a single dataset, fields are all randomly populated, fields will
@@ -96,8 +146,8 @@ class DataPopulation():
         # method names are members of this class.  This method is an example
         # of a method that can be referenced in the test config file
         # 'testParams.json'
-        file_name = f'{inspect.currentframe().f_code.co_name}_{self.data_type}.json'
-        self.cache = DataCache(file_name)
+        self.cache = self.get_cache(inspect.currentframe().f_code.co_name,
+                                    overrides)
 
         data_iterable = None
         if self.cache.cache_exists() and not self.disable_cache:
@@ -108,7 +158,6 @@ class DataPopulation():
             dataset = self.pop_resource.populate_all(overrides=overrides)
             data_iterable = DataSetIterator(dataset)
             self.cache.write_cache_data(data_iterable)
-        LOGGER.debug(f"iterable: {data_iterable}")
         return data_iterable
 
     def populate_required_fields_failure(self, overrides=None):
@@ -119,24 +168,59 @@ class DataPopulation():
         :rtype: DataSetIterator
         '''
         # TODO: could add a metaclass that does the caching automatically
-        file_name = f'{inspect.currentframe().f_code.co_name}.json'
-        self.cache = DataCache(file_name)
+        method_name = inspect.currentframe().f_code.co_name
+        base = self.get_base_dataset(method_name, overrides)
+        engine = self.get_mutation_engine(base, method_name)
+        variants = engine.get_variants([data_mutation.DROP_REQUIRED])
+        return DataSetIterator(variants)
+
+    def populate_invalid_pairwise(self, overrides=None):
+        '''
+        :return: an iterable of invalid datasets, covering every pair of
+            mutations (missing required fields, wrong types, values outside of
+            the domain, violated conditionals) for every pair of fields.  See
+            data_mutation.MutationEngine.
+        :rtype: DataSetIterator
+        '''
+        method_name = inspect.currentframe().f_code.co_name
+        base = self.get_base_dataset(method_name, overrides)
+        engine = self.get_mutation_engine(base, method_name)
+        variants = engine.get_variants(strategy=data_mutation.STRATEGY_PAIRWISE)
+        return DataSetIterator(variants)
 
-        core_data = self.pop_resource.populate_all(overrides=overrides)
+    def get_mutation_engine(self, base, method_name):
+        '''
+        :param base: the valid dataset the variants are derived from
+        :param method_name: the name of the method requesting the variants
+        :return: the mutation engine for the base dataset.  Its random number
+            generator is seeded from the seed of this object and the method,
+            so a seed replays the same variants whether or not the base
+            dataset came from the cache.
+        :rtype: data_mutation.MutationEngine
+        '''
+        rng = random.Random(f'{self.seed}-{method_name}') \
+            if self.seed is not None else random.Random()
+        return data_mutation.MutationEngine(self.schema, base, rng)
 
-        # get list of required field names
-        required = []
-        for fld in self.schema:
-            if fld.required:
-                required.append(fld.field_name)
+    def get_base_dataset(self, method_name, overrides=None):
+        '''
+        gets the valid dataset that negative test data is derived from.  Only
+        the base dataset is cached, the invalid variants are re-created from it
+        as they are required.
 
+        :param method_name: the name of the method requesting the dataset, used
+            for the cache
+        :return: a valid dataset
+        '''
+        self.cache = self.get_cache(method_name, overrides)
+        cached = None
         if self.cache.cache_exists() and not self.disable_cache:
-            data_iterable = self.cache.load_cache_data()
-        else:
-            data_iterable = DataSetIterator(core_data)
-            data_iterable.flds_to_remove(required)
-            self.cache.write_cache_data(data_iterable)
-        return data_iterable
+            cached = self.cache.load_cache_data()
+        if cached is not None:
+            return next(cached)
+        base = self.pop_resource.populate_all(overrides=overrides)
+        self.cache.write_cache_data(DataSetIterator(base))
+        return base
 
     def populate_bcdc_types(self, overrides=None):
         '''
@@ -166,26 +250,229 @@ class DataPopulation():
         data_iterable = DataSetIterator(dataset_list)
         return data_iterable
 
+    def populate_many(self, count, overrides=None):
+        '''
+        Bulk version of populate_randomized, generates count datasets in one
+        go.  Data is generated a column (field) at a time rather than a
+        dataset at a time, which is considerably faster when large numbers of
+        datasets are required, for example when seeding an instance or for load
+        testing.
+
+        Generated data is not cached.
+
+        :param count: the number of datasets to generate
+        :param overrides: static values to use for fields, see
+            populate_randomized
+        :return: the generated datasets, iterate over it or index into it to get
+            the datasets as dictionaries
+        :rtype: DataBatch
+        '''
+        return self.pop_resource.populate_many(count, overrides)
+
+    def populate_parallel(self, count, overrides=None, workers=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE, chunk_func=None,
+                          max_pending=None):
+        '''
+        Generates count datasets using a pool of processes.  The datasets are
+        split up into chunks of chunk_size, each chunk is generated by
+        populate_many using its own random number generator, seeded from the
+        seed of this object and the position of the chunk.  Results are
+        returned in order, so for a given seed and chunk size the output is the
+        same no matter how many workers are used.
+
+        Only max_pending chunks are submitted to the workers at a time, the
+        next one is submitted as each result is consumed.  A slow consumer
+        slows the workers down rather than having the finished chunks pile up
+        in memory.
+
+        If this object was not created with a seed then one is generated and
+        logged, so the output can be reproduced.
+
+        :param count: the number of datasets to generate
+        :param overrides: static values to use for fields
+        :param workers: the number of processes, defaults to the number of cpus.
+            When set to 1 the data is generated in the current process.
+        :param chunk_size: the number of datasets generated in a single call
+        :param chunk_func: optional function that is called in the worker
+            with the DataBatch for each chunk, its return value is yielded
+            instead of the datasets.  Use it to move work like serialization
+            into the workers, needs to be a module level function so it can be
+            pickled.
+        :param max_pending: the max number of chunks that are being generated,
+            or waiting to be consumed, at a time.  Defaults to
+            PENDING_CHUNKS_PER_WORKER chunks for each worker.
+        :return: generator of datasets, or of the chunk_func return values
+        '''
+        seed = self.seed
+        if seed is None:
+            seed = random.randrange(sys.maxsize)
+        LOGGER.info(f"generating {count} {self.data_type} with the seed: {seed}")
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if max_pending is None:
+            max_pending = workers * PENDING_CHUNKS_PER_WORKER
+        chunks = ((size, get_chunk_seed(seed, cnt), overrides, chunk_func)
+                  for cnt, size in enumerate(get_chunk_sizes(count, chunk_size)))
+
+        if workers > 1:
+            with multiprocessing.Pool(workers, initializer=init_parallel_worker,
+                                      initargs=(self.fields_schema, self.data_type)) as pool:
+                results = imap_bounded(pool, populate_parallel_chunk, chunks,
+                                       max_pending)
+                yield from self.__unpack_chunks(results, chunk_func)
+        else:
+            results = (populate_chunk(self.fields_schema, self.data_type, chunk)
+                       for chunk in chunks)
+            yield from self.__unpack_chunks(results, chunk_func)
+
+    @staticmethod
+    def __unpack_chunks(results, chunk_func):
+        '''
+        :return: generator of datasets for the chunk results, or the results
+            themselves when a chunk_func was used
+        '''
+        for result in results:
+            if chunk_func is None:
+                yield from result
+            else:
+                yield result
+
+
+def imap_bounded(pool, func, iterable, max_pending):
+    '''
+    Like pool.imap, returns func(item) for each item in order, but only submits
+    max_pending items at a time.  pool.imap submits everything up front and
+    holds on to the results until they are consumed.
+
+    :param pool: the process pool
+    :type pool: multiprocessing.pool.Pool
+    :param max_pending: the max number of items that are submitted but
+        haven't been consumed yet
+    :return: generator of the results
+    '''
+    max_pending = max(1, max_pending)
+    pending = collections.deque()
+    for item in iterable:
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (item,)))
+    while pending:
+        yield pending.popleft().get()
+
+
+def get_chunk_seed(seed, chunk_index):
+    '''
+    :param seed: the seed for the whole run
+    :param chunk_index: the position of the chunk in the output
+    :return: the seed used to generate the chunk
+    '''
+    return f'{seed}-{chunk_index}'
+
+
+def get_chunk_sizes(count, chunk_size):
+    '''
+    :return: a generator of chunk sizes that add up to count
+    '''
+    while count > 0:
+        size = min(count, chunk_size)
+        yield size
+        count -= size
+
+
+# schema used to generate chunks, set by init_parallel_worker
+_WORKER_SCHEMA = None
+
+
+def init_parallel_worker(fields_schema, data_type):
+    '''
+    initializer for the populate_parallel worker processes, the schema is sent
+    once per worker instead of once per chunk.
+    '''
+    global _WORKER_SCHEMA  # pylint: disable=global-statement
+    _WORKER_SCHEMA = (fields_schema, data_type)
+
+
+def populate_parallel_chunk(chunk):
+    '''
+    generates a single chunk in a populate_parallel worker process
+    '''
+    return populate_chunk(*_WORKER_SCHEMA, chunk)
+
+
+def populate_chunk(fields_schema, data_type, chunk):
+    '''
+    generates a single chunk for populate_parallel
+
+    :param chunk: tuple of the chunk size, seed, overrides and chunk_func
+    :return: list of datasets, or the return value of chunk_func
+    '''
+    size, seed, overrides, chunk_func = chunk
+    populator = DataPopulation(fields_schema, data_type, seed=seed)
+    batch = populator.populate_many(size, overrides)
+    if chunk_func is None:
+        return list(batch)
+    return chunk_func(batch)
+
 
 class DataCache():
     '''
     used to create and load from cached data files.  Dynamic data gets generated
     and cached so that it can be re-used for different tests.  This class
     contains the logic to easily write and read from caches
+
+    Cache files are content addressed, when a cache_key is provided it is added
+    to the file name.  Use get_cache_key() to calculate a key from the inputs
+    that were used to generate the data.
+
+    Files are written to a temp file and then renamed, so a reader, including
+    one in another process, will never see a partially written file.  After
+    each write the least recently used files are evicted once the cache exceeds
+    the limits defined by the env vars BCDC_CACHE_MAX_BYTES and
+    BCDC_CACHE_MAX_FILES.
+
+    By default the cache is removed at the start and end of a test session.
+    If the env var BCDC_CACHE_PERSIST is set to true, or the --bcdc-persist-cache
+    option is used, the cache is kept so it can be re-used by later test runs.
+
+    :cvar persistent: when True delete_cache and delete_all_caches leave the
+        cache files in place.
     '''
+    persistent = os.environ.get(testConfig.BCDC_CACHE_PERSIST, '').lower() in \
+        ['1', 'true', 'yes']
+    max_bytes = int(os.environ.get(testConfig.BCDC_CACHE_MAX_BYTES,
+                                   testConfig.BCDC_CACHE_MAX_BYTES_DEFAULT))
+    max_files = int(os.environ.get(testConfig.BCDC_CACHE_MAX_FILES,
+                                   testConfig.BCDC_CACHE_MAX_FILES_DEFAULT))
 
-    def __init__(self, cache_file):
+    def __init__(self, cache_file, cache_key=None):
         '''
         :param cache_file: just the file name to use to cache the data in a json
             file, any directory info will be ignored
+        :param cache_key: the hash of the inputs used to generate the data, see
+            get_cache_key()
         '''
         cache_file = os.path.basename(cache_file)
+        if cache_key:
+            root, ext = os.path.splitext(cache_file)
+            cache_file = f'{root}_{cache_key}{ext}'
 
         self.cache_dir_name = 'bcdc_apitest_cache'
         self.set_cache_paths()
         self.cache_file = os.path.join(self.cache_dir, cache_file)
         LOGGER.debug(f"cache file: {self.cache_file}")
 
+    @staticmethod
+    def get_cache_key(**key_data):
+        '''
+        :param key_data: the inputs used to generate the data, for example the
+            schema fingerprint, the method, the overrides and the seed.  Values
+            need to be json serializable.
+        :return: a hash that uniquely identifies the inputs
+        '''
+        # always the stdlib so the keys don't change with the json codec
+        key_str = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(key_str.encode('utf8')).hexdigest()[:24]
+
     def set_cache_paths(self):
         '''
         The path to be used for temp files works through this order:
@@ -224,62 +511,119 @@ class DataCache():
         # writes
         if not os.path.exists(self.cache_dir):
             LOGGER.info(f"creating the cache dir: {self.cache_dir}")
-            os.makedirs(self.cache_dir)
+            os.makedirs(self.cache_dir, exist_ok=True)
 
         LOGGER.debug(f"iter type: {type(iter_obj)}")
-        bcdc_dataets = []
-        for dataset in iter_obj:
-            LOGGER.debug(f'dataset in iterable: {dataset}')
-            bcdc_dataets.append(dataset)
+        # payloads that have already been encoded are written as is
+        codec = json_codec.get_codec()
+        bcdc_dataets = [dataset.body if isinstance(dataset, json_codec.Payload)
+                        else codec.dumpb(dataset) for dataset in iter_obj]
 
         try:
-            with open(self.cache_file, 'w', encoding='utf8') as file_hand:
-                json.dump(bcdc_dataets, file_hand, ensure_ascii=False)
+            tmp_hand, tmp_file = tempfile.mkstemp(
+                dir=self.cache_dir, suffix='.tmp',
+                prefix=f'.{os.path.basename(self.cache_file)}.')
+            try:
+                with os.fdopen(tmp_hand, 'wb') as file_hand:
+                    file_hand.write(b'[' + b','.join(bcdc_dataets) + b']')
+                os.replace(tmp_file, self.cache_file)
+            except BaseException:
+                os.remove(tmp_file)
+                raise
             LOGGER.debug(f"cache has been written to: {self.cache_file}")
         except PermissionError:
             msg = f'cannot write to the location: {self.cache_file}, going to try tmp'
             LOGGER.warning(msg)
             raise
+        self.evict()
 
     def load_cache_data(self, overrides=None):
         '''
         loads data from cached file and returns as a DataPopulation
         object
 
-        :return: a data population object of the data loaded from the cache
+        :return: a data population object of the data loaded from the cache,
+            None if the cache does not exist
         :rtype: DataPopulation
         '''
         LOGGER.debug(f"Cache file is being read from: {self.cache_file}")
         bcdc_dataset = None
-        if self.cache_exists():
-            LOGGER.debug(f"Cache file exists")
-            with open(self.cache_file, 'r') as file_hand:
-                data_struct_list = json.load(file_hand)
+        try:
+            with open(self.cache_file, 'rb') as file_hand:
+                data_struct_list = json_codec.get_codec().load(file_hand)
+        except FileNotFoundError:
+            # can be evicted by another process in between checking for its
+            # existence and reading it
+            LOGGER.debug("cache file does not exist")
+        else:
             LOGGER.debug("loading from cache file")
+            # mark the file as recently used for eviction
+            os.utime(self.cache_file)
             if overrides:
-                updated = []
                 for struct in data_struct_list:
                     struct.update(overrides)
-                    updated.append(struct)
-                bcdc_dataset = updated
             bcdc_dataset = DataSetIterator(data_struct_list)
         return bcdc_dataset
 
+    def evict(self, max_bytes=None, max_files=None):
+        '''
+        Removes the least recently used cache files until the cache is within
+        the size limits.
+
+        :param max_bytes: the maximum total size of the cache files, defaults to
+            the max_bytes class property
+        :param max_files: the maximum number of cache files, defaults to the
+            max_files class property
+        :return: the number of files that were removed
+        '''
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_files = self.max_files if max_files is None else max_files
+        cache_files = []
+        for cache_file in glob.glob(os.path.join(self.cache_dir, '*.json')):
+            try:
+                stat = os.stat(cache_file)
+            except FileNotFoundError:
+                continue
+            cache_files.append((stat.st_mtime, stat.st_size, cache_file))
+        # oldest first
+        cache_files.sort()
+        total_bytes = sum(cache_file[1] for cache_file in cache_files)
+
+        removed = 0
+        while cache_files and (total_bytes > max_bytes or
+                               len(cache_files) > max_files):
+            _, size, cache_file = cache_files.pop(0)
+            LOGGER.debug(f"evicting the cache file: {cache_file}")
+            try:
+                os.remove(cache_file)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+        return removed
+
     def delete_cache(self):
         '''
         Delete the cache file if it exists.
         '''
-        if self.cache_exists():
+        if self.persistent:
+            LOGGER.debug(f"cache is persistent, not removing: {self.cache_file}")
+        elif self.cache_exists():
             LOGGER.info(f"removing the data cache file: {self.cache_file}")
-            os.remove(self.cache_file)
+            try:
+                os.remove(self.cache_file)
+            except FileNotFoundError:
+                pass
 
     def delete_all_caches(self):
         '''
         removes the cache directory
         '''
-        if os.path.exists(self.cache_dir):
+        if self.persistent:
+            LOGGER.info(f"cache is persistent, not removing: {self.cache_dir}")
+        elif os.path.exists(self.cache_dir):
             LOGGER.info(f"removing the existing cache dir: {self.cache_dir}")
-            shutil.rmtree(self.cache_dir)
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
 
 
 class DataSetIterator():
@@ -289,77 +633,179 @@ class DataSetIterator():
 
     A generic /configurable iteration class that is going to get re-used.
 
-    :ivar core_data: the base dataset that each iteration will be built off of
+    The datasets are stored as they were provided, either dictionaries or
+    views like data_mutation.DatasetVariant that only record how they differ
+    from a shared base dataset.  Views are only materialized into a new
+    json_codec.Payload when they are handed out, so the memory used by the
+    iterator doesn't grow with the number of variants.
+
+    Every call to iter() starts a new pass over the data, so the object can be
+    looped over any number of times, and by more than one loop at once.
+    Calling next() on the object directly uses its own position, which can be
+    set back to the start with reset().
 
+    :ivar core_data: a sequence of the datasets, or views of datasets, that each
+        iteration will be built off of
     '''
 
     def __init__(self, coredata):
         # if core data is a dict then stuff it in a list
-        LOGGER.debug(f"coredata: {coredata}")
         self.core_data = coredata
-        if isinstance(coredata, dict):
+        if isinstance(coredata, collections.abc.Mapping):
             self.core_data = [coredata]
-        LOGGER.debug(f"coredata: {coredata}")
         self.remove_flds = []
-        self.ds_cnt = 0  # dataset count
-        self.fld_cnt = 0  # field count
+        self.ds_cnt = 0  # position used by next()
 
     def add_dataset(self, dataset_dict):
+        if not isinstance(self.core_data, list):
+            self.core_data = list(self.core_data)
         self.core_data.append(dataset_dict)
 
     def flds_to_remove(self, fldname_list):
         '''
         :param fldname_list: a list of fields for each iteration one of these
                              fields will be removed from the resulting data
-                             set
+                             set, the total number of iterations ends up being
+                             datasets * remove fields
         '''
         self.remove_flds = fldname_list
 
+    def __len__(self):
+        if self.remove_flds:
+            return len(self.core_data) * len(self.remove_flds)
+        return len(self.core_data)
+
+    def get_view(self, indx):
+        '''
+        :param indx: the position of the dataset in the iteration
+        :return: a read only view of the dataset, the view shares its data with
+            the core data so it should not be modified.
+        '''
+        if indx < 0:
+            indx += len(self)
+        if not 0 <= indx < len(self):
+            raise IndexError(f'dataset {indx} is out of range, the iterator ' +
+                             f'has {len(self)} datasets')
+        if not self.remove_flds:
+            return self.core_data[indx]
+        ds_indx, fld_indx = divmod(indx, len(self.remove_flds))
+        dataset = self.core_data[ds_indx]
+        fld_to_drop = self.remove_flds[fld_indx]
+        if fld_to_drop not in dataset:
+            LOGGER.warning(f'The required field {fld_to_drop} does not ' +
+                           'exist in the current dataset')
+        mutation = data_mutation.Mutation(data_mutation.DROP_REQUIRED,
+                                          fld_to_drop, remove=[fld_to_drop])
+        return data_mutation.DatasetVariant(dataset, [mutation])
+
+    def views(self):
+        '''
+        :return: generator of read only views of the datasets, for consumers
+            that only need to read the data and want to avoid copying it.
+        '''
+        for indx in range(len(self)):
+            yield self.get_view(indx)
+
+    def __getitem__(self, indx):
+        '''
+        :return: a new Payload with the dataset at the position indx, it can
+            be modified without affecting the other datasets.
+        :rtype: json_codec.Payload
+        '''
+        return json_codec.Payload(self.get_view(indx))
+
     def __iter__(self):
-        return self
+        for view in self.views():
+            yield json_codec.Payload(view)
 
     def reset(self):
         '''
-        resets the iterator back to the start.
+        resets the position used by next() back to the start.
         '''
         self.ds_cnt = 0
-        self.fld_cnt = 0
 
     def __next__(self):
+        if self.ds_cnt >= len(self):
+            raise StopIteration
+        return_dataset = self[self.ds_cnt]
+        self.ds_cnt += 1
+        return return_dataset
+
+
+class DataBatch():
+    '''
+    Columnar container for datasets generated by populate_many.  The data is
+    held as one sequence per field, the dataset dictionaries are only assembled
+    when a row is requested.
+
+    Conditional fields have a mask, which is a list of booleans indicating
+    which rows satisfy the condition.  Fields are left out of the rows where
+    the condition is not met.
+
+    :ivar columns: dictionary of field name to the sequence of values for the
+        field
+    :ivar masks: dictionary of field name to the mask for conditional fields,
+        fields that are not conditional are not included.
+    '''
+
+    def __init__(self, count, columns, masks=None):
+        self.count = count
+        self.columns = columns
+        self.masks = masks if masks is not None else {}
+        self.__row_spec = [(fld_name, column, self.masks.get(fld_name))
+                           for fld_name, column in columns.items()]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError(f'row {row} is out of range for a batch of {self.count}')
+        return {fld_name: column[row] for fld_name, column, mask in self.__row_spec
+                if mask is None or mask[row]}
+
+    def __iter__(self):
+        for row in range(self.count):
+            yield self[row]
+
+    def column(self, field_name):
         '''
-        Iterator set up to look for:
-         - fields to remove, returns new dataset with one of the remove fields
-           removed with each iteration.
-         - more later!
+        :param field_name: the name of the field
+        :return: the values for the field, rows where a conditional field is not
+            populated are returned as None
         '''
-        if self.ds_cnt >= len(self.core_data):
-            LOGGER.debug(f"core data: {self.core_data}")
-            LOGGER.debug(f"cnt: {self.ds_cnt}")
-            raise StopIteration
+        column = self.columns[field_name]
+        mask = self.masks.get(field_name)
+        if mask is None:
+            return list(column)
+        return [val if include else None for val, include in zip(column, mask)]
 
-        # dataset = self.core_data.copy()
-        return_dataset = self.core_data[self.ds_cnt].copy()
-        LOGGER.debug(f"return_dataset: {return_dataset}")
-        # if remvoe_flds have been defined then iterate over each
-        # dataset, and for each dataset remove the core fields thus
-        # the total number of iterations ends up being datasets * remove fields
-        if self.remove_flds:
-            if self.fld_cnt >= len(self.remove_flds):
-                # iterate to next dataset
-                self.ds_cnt += 1
-                self.fld_cnt = 0
-            else:
+    def to_iterator(self):
+        '''
+        :return: the datasets in the batch as a DataSetIterator
+        :rtype: DataSetIterator
+        '''
+        return DataSetIterator(self)
 
-                fld_to_drop = self.remove_flds[self.fld_cnt]
-                if fld_to_drop in return_dataset:
-                    del return_dataset[fld_to_drop]
-                else:
-                    LOGGER.warning(f'The required field {fld_to_drop} does not ' +
-                                   'exist in the current dataset')
-                self.fld_cnt += 1
 
-        self.ds_cnt += 1
-        return return_dataset
+class DateColumn():
+    '''
+    A column of dates stored as integer day offsets back from a start date.
+    The offsets are converted to date strings when they are read.
+    '''
+
+    def __init__(self, start_date, offsets):
+        self.start_ordinal = start_date.toordinal()
+        self.offsets = array.array('l', offsets)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, row):
+        return datetime.date.fromordinal(
+            self.start_ordinal - self.offsets[row]).strftime('%Y-%m-%d')
 
 
 class DataPopulationResource():
@@ -372,63 +818,24 @@ class DataPopulationResource():
     to accomplish what they need to do.
     '''
 
-    def __init__(self, fields):
+    def __init__(self, fields, rng=None):
+        '''
+        :param fields: the schema to generate data for
+        :param rng: the random number generator to use, any object with the
+            same interface as the random module, for example a seeded
+            random.Random instance.  Defaults to the random module.
+        '''
         # TODO: may want to pass in the organization to put the data under
         self.fields = fields
+        self.rng = rng if rng is not None else random
         LOGGER.debug(f"type of fields: {type(fields)}")
         # TODO: use isinstance to enforce type here maybe... should be Fields or
         # subclass of.
         self.datastruct = {}
         self.rand = RandomWords()
-        self.deferred = []
-
-    def has_conditional(self, fld):  # pylint: disable=no-self-use
-        '''
-        :return: true if the field has a conditional property
-        '''
-        has_cond = False
-        if fld.conditional_field:
-            has_cond = True
-        return has_cond
-
-    def conditional_field_exists(self, fld):
-        '''
-        :return: true if the field has a conditional field and the conditional
-                 field exists in the fields that have already been processed.
-        '''
-        cond_exists = False
-        if (self.has_conditional) and fld.conditional_field in self.datastruct:
-            cond_exists = True
-        return cond_exists
-
-    def conditional_satisfied(self, fld):
-        '''
-        :param fld: a Field object.
-
-        * does the fld have a condition, if not then return True, proceed.
-
-        * otherwise...
-
-        * if conditional_field exists, then determine the value and populate_random
-          field of value matches conditional value.
-            * if condition is met then True
-            * otherwise False
-
-        * if the conditional_field does not exist, then add to the deferred
-          processing.
-            * return False
-        '''
-        proceed = False
-        # field exists in the populated dataset, and the value of the field
-        # in the populated dataset matches the condition
-        if (self.conditional_field_exists(fld)) and \
-           self.datastruct[fld.conditional_field] in fld.conditional_values:
-            LOGGER.debug(f"conditional satisfied: {fld.conditional_field}, " +
-                         f"{self.datastruct[fld.conditional_field]}, " +
-                         f"{fld.conditional_values}")
-            proceed = True
-        LOGGER.debug(f"conditional_satisfied return: {proceed}")
-        return proceed
+        # the order to generate the fields in and the method to call for each
+        # one is worked out once per schema
+        self.plan = GenerationPlan.get_plan(fields)
 
     def select(self, fld, override=None):
         '''
@@ -440,9 +847,10 @@ class DataPopulationResource():
         '''
         LOGGER.debug(f"Calling Select on fld: {fld}")
 
-        if fld.choices:
-            LOGGER.debug(f" number of choices: {len(fld.choices)}")
-            values = fld.choices.values
+        choices = fld.choices
+        if choices:
+            LOGGER.debug(f" number of choices: {len(choices)}")
+            values = choices.values
             if (override) and override not in values:
                 msg = f'A static/override value of {override[fld.field_name]}' + \
                       f'was specified for the field {fld.field_name} ' + \
@@ -456,7 +864,7 @@ class DataPopulationResource():
                 value = override
             else:
                 LOGGER.debug(f" values: {values}")
-                value = values[random.randint(0, len(values) - 1)]
+                value = values[self.rng.randint(0, len(values) - 1)]
         elif (fld.choices_helper) and fld.choices_helper == 'edc_orgs_form':
             # TODO, example of this is the subfield for contacts...
             #   field_name = org
@@ -496,12 +904,12 @@ class DataPopulationResource():
         '''
         :return: a random string for the field
         '''
-        word = self.rand.getword()
+        word = self.rand.getword(self.rng)
         # does the field name end with _email?
         if override:
             word = override
         elif re.match(r'^\w+_+email$', fld.field_name):
-            domain = self.rand.getword()
+            domain = self.rand.getword(self.rng)
             email = f'{word}@{domain}.com'
             word = email
         # type
@@ -525,7 +933,7 @@ class DataPopulationResource():
         '''
         subfields_values = []
         if flds2gen is None:
-            flds2gen = random.randint(1, 3)
+            flds2gen = self.rng.randint(1, 3)
 
         if override:
             LOGGER.warning(f'override values supplied for the field: {fld.field_name} ' +
@@ -536,11 +944,11 @@ class DataPopulationResource():
         # range is never actually, just an easy way to create a loop
         for iterval in range(0, flds2gen):  # pylint: unused-variable
             LOGGER.debug(f"flds2gen type: {type(fld.subfields)}")
-            population = DataPopulationResource(fld.subfields)
+            population = DataPopulationResource(fld.subfields, self.rng)
             subfield_data = population.populate_all()
             subfields_values.append(subfield_data)
         LOGGER.debug(f"subfields_values: {subfields_values}")
-        subfield_json_str = json.dumps(subfields_values)
+        subfield_json_str = json_codec.dumps(subfields_values)
         LOGGER.debug(f"subfields_values as stringify json: {subfield_json_str}")
         return subfield_json_str
 
@@ -552,11 +960,11 @@ class DataPopulationResource():
 
     def date(self, fld, override=None):  # pylint: disable=unused-argument
         '''
-        :return: a random date.  will be some time between now and 10 years
-                 ago.
+        :return: a random date.  will be some time in the 10 years before
+                 DATE_EPOCH.
         '''
-        date_1 = datetime.datetime.now()
-        delta = datetime.timedelta(days=365 * 10)
+        date_1 = datetime.datetime.combine(DATE_EPOCH, datetime.time())
+        delta = datetime.timedelta(days=DATE_RANGE_DAYS)
         date_2 = date_1 - delta
         rand_date = self.random_date(date_2, date_1)
         return override if override else rand_date.strftime('%Y-%m-%d')
@@ -572,7 +980,7 @@ class DataPopulationResource():
         LOGGER.debug(f"delta: {delta}")
         int_delta = (delta.days * 24 * 60 * 60) + delta.seconds
         LOGGER.debug(f"int_delta: {int_delta}")
-        random_second = random.randrange(int_delta)
+        random_second = self.rng.randrange(int_delta)
         LOGGER.debug(f"random_second: {random_second}")
         return start + datetime.timedelta(seconds=random_second)
 
@@ -630,8 +1038,8 @@ class DataPopulationResource():
                         don't populate_random.  verfied with John.
 
         Method will see if bcdc_type has already been populated, if it has then it
-        will process otherwise the processing of this record gets deferred, and is
-        tried again after all other records have been processed.
+        will process otherwise the field is skipped.  The GenerationPlan ensures
+        that bcdc_type is always generated before this field.
 
         :return:
         '''
@@ -645,20 +1053,12 @@ class DataPopulationResource():
          - populate the overrides first, to address any possible conditional
            validators that are dependent on these hard coded values.
         '''
-
-        def undefined_prefix(fld):
-            msg = f'prefix is set to: {fld.preset}.  There is no code to ' + \
-                  'to accomodate this type.  Need to add a method definition for ' + \
-                  'that type to this class'
-            raise UndefinedPreset(msg)
-
         for override_field_name in overrides:
             # validate field def
             LOGGER.debug(f"override_field_name: {override_field_name}")
-            override_fld_def = self.fields.get_field(override_field_name)
-            LOGGER.debug(f"override_fld_def: {override_fld_def}")
-            if override_fld_def is None:
-                fld_names = self.fields.get_field_names()
+            step = self.plan.get_step(override_field_name)
+            if step is None:
+                fld_names = self.plan.get_field_names()
                 msg = f'an override property: "{override_field_name}" was specified ' + \
                       'that does not exist in the schema definitions.  Possible ' + \
                       f'values include: {fld_names}'
@@ -666,16 +1066,16 @@ class DataPopulationResource():
 
             # now test that the value complies with the field def.
             LOGGER.debug(f"preset for override field {override_field_name} " +
-                         f"is {override_fld_def.preset}")
-            func = getattr(self, override_fld_def.preset, undefined_prefix)
-            field_value = func(override_fld_def, override=overrides[override_field_name])
+                         f"is {step.field.preset}")
+            field_value = step.func(self, step.field,
+                                    override=overrides[override_field_name])
             LOGGER.debug(f'override value: {overrides[override_field_name]}, {field_value}')
             if field_value != overrides[override_field_name]:
                 msg = f'override value was not correctly set for {override_field_name} '
                 msg = msg + f' and the corresponding value: {overrides[override_field_name]}'
                 LOGGER.error(msg)
                 raise ValueError(msg)
-            self.datastruct[override_fld_def.field_name] = field_value
+            self.datastruct[step.field_name] = field_value
 
     def populate_all(self, overrides=None):
         '''
@@ -698,152 +1098,371 @@ class DataPopulationResource():
             * tag_string_autocomplete - might come from tags?
             * title - just text
 
-        This method will populate_random all the fields defined in the schema, except
-        types noted above
+        The fields are processed in the order defined by the GenerationPlan for
+        the schema, which guarantees that any field a conditional depends on has
+        already been populated, so the dataset is built in a single pass.
         '''
-        # datastruct = {}
-        # set the scope for this variable for this method
-        fld = None
         if overrides is None:
             overrides = {}
 
         # reset the dataset for a new dataset in case was previously
         # populated.
         self.datastruct = {}
-        self.deferred = []
 
         # populate the overrides first, that way if there are dependencies on the
         # overrides they will be processed second.
         LOGGER.debug(f"overrides are set to: {overrides}")
         self.populate_overrides(overrides)
 
-        def undefined_prefix(fld):
-            msg = f'prefix is set to: {fld.preset}.  There is no code to ' + \
-                  'to accomodate this type.  Need to add a method definition for ' + \
-                  'that type to this class'
-            raise UndefinedPreset(msg)
-
-        LOGGER.debug('populate_random all called')
-        for fld in self.fields:
-            # population is based on the preset, if no preset available then
-            # assume str
-            LOGGER.debug(f'Fld is: {fld}')
-            LOGGER.debug(f'Fld preset is: {fld.preset}')
-
-            # has field already been populated?
-            if fld.field_name in self.datastruct:
-                LOGGER.info("field: {fld.field_name} populated by override")
-            # Does the field have a conditional property AND the conditional resolves as False...
-            elif self.has_conditional(fld) and not self.conditional_satisfied(fld):
-                # condition is not met, add to deferred
-                LOGGER.debug(f"adding to the deferred list: {fld}")
-                self.deferred.append(fld)
-            else:
-                field_override = overrides[fld.field_name] if fld.field_name in overrides else None
-
-                if fld.preset is None:
-                    field_value = self.string(fld, override=field_override)
-                else:
-                    # the name of the method to call is contained in the property: preset,
-                    # turning the value of preset into a method call
-                    func = getattr(self, fld.preset, undefined_prefix)
-                    field_value = func(fld, override=field_override)
-                self.datastruct[fld.field_name] = field_value
-        if self.deferred:
-            self.process_deferred_fields(overrides=overrides)
-            # shortcut for now... should really continuously iterate through deferred
-            # fields until they are all removed
-        return self.datastruct
-
-    def process_deferred_fields(self, overrides=None):
-        '''
-        Some fields like
-        '''
-        LOGGER.debug(f"deferred: {len(self.deferred)} {self.deferred}")
-        if self.deferred:
-            to_remove = []
-            for defer_cnt in range(0, len(self.deferred)):
-                defer_fld = self.deferred[defer_cnt]
-                LOGGER.debug(f"processing deferred field: {defer_fld}")
-                # conditional exists, therefore can retrieve its value
-                if self.conditional_field_exists(defer_fld):
-                    LOGGER.debug(f"conditional field exists: {defer_fld}")
-                    # is the condition satisfied
-                    if self.conditional_satisfied(defer_fld):
-                        field_override = overrides[defer_fld.field_name] if \
-                            defer_fld.field_name in overrides else None
-                        if defer_fld.preset is None:
-                            field_value = self.string(defer_fld,
-                                                      override=field_override)
-                        else:
-                            # the name of the method to call is contained in the
-                            # property: preset, turning the value of preset into
-                            # a method call
-                            func = getattr(self, defer_fld.preset)
-                            field_value = func(defer_fld, override=field_override)
-                        self.datastruct[defer_fld.field_name] = field_value
-                        to_remove.append(defer_fld)
-                    else:
-                        # conditional field exists, but the condition is not
-                        # satisfied, don't populate_random, and remove from deferred list
-                        if defer_fld.field_name in self.datastruct:
-                            del self.datastruct[defer_fld.field_name]
-                        to_remove.append(defer_fld)
-            # after iteration remove the deferred fields, then try again
-            for remove_rec in to_remove:
-                self.deferred.remove(remove_rec)
-            self.process_deferred_fields()
+        datastruct = self.datastruct
+        for step in self.plan.steps:
+            # has field already been populated by an override, or is it a
+            # conditional field whose condition is not met
+            if step.field_name in datastruct or not step.is_satisfied(datastruct):
+                continue
+            datastruct[step.field_name] = step.func(self, step.field)
+        return datastruct
 
+    def populate_many(self, count, overrides=None):
+        '''
+        Generates count datasets column wise.  For each step in the generation
+        plan the column method for the preset is called once to generate all
+        the values for that field, ie: one call to draw all the choices, one
+        call to draw all the words.
 
-class RandomWords():
+        Presets that do not have a column method fall back to calling the single
+        value method once per row.
+
+        :param count: number of datasets to generate
+        :param overrides: static values for fields, they are validated the same
+            way as populate_all
+        :return: the generated data
+        :rtype: DataBatch
+        '''
+        if overrides is None:
+            overrides = {}
+        self.datastruct = {}
+        self.populate_overrides(overrides)
+
+        columns = {}
+        masks = {}
+        for step in self.plan.steps:
+            if step.field_name in self.datastruct:
+                columns[step.field_name] = [self.datastruct[step.field_name]] * count
+                continue
+            if step.conditional_field is not None:
+                if step.never or step.conditional_field not in columns:
+                    continue
+                cond_values = step.conditional_values
+                mask = [val in cond_values for val in columns[step.conditional_field]]
+                cond_mask = masks.get(step.conditional_field)
+                if cond_mask is not None:
+                    mask = [inc and cond_inc for inc, cond_inc in zip(mask, cond_mask)]
+                if not any(mask):
+                    continue
+                masks[step.field_name] = mask
+            columns[step.field_name] = step.column_func(self, step.field, count)
+        return DataBatch(count, columns, masks)
+
+    def select_column(self, fld, count):
+        '''
+        :return: count random values drawn from the choices for the field
+        '''
+        choices = fld.choices
+        if choices:
+            return self.rng.choices(choices.values, k=count)
+        return [self.select(fld)] * count
+
+    def multiple_checkbox_column(self, fld, count):
+        '''
+        column version of multiple_checkbox
+        '''
+        return self.select_column(fld, count)
+
+    def autocomplete_column(self, fld, count):
+        '''
+        column version of autocomplete
+        '''
+        return self.select_column(fld, count)
+
+    def title_column(self, fld, count):
+        '''
+        column version of title, static value
+        '''
+        return [self.title(fld)] * count
+
+    def dataset_slug_column(self, fld, count):
+        '''
+        column version of dataset_slug, static value
+        '''
+        return [self.dataset_slug(fld)] * count
+
+    def dataset_organization_column(self, fld, count):
+        '''
+        column version of dataset_organization, static value
+        '''
+        return [self.dataset_organization(fld)] * count
+
+    def json_object_column(self, fld, count):
+        '''
+        column version of json_object, static value
+        '''
+        return [self.json_object(fld)] * count
+
+    def string_column(self, fld, count):
+        '''
+        :return: count random strings for the field, the words for all the rows
+            are drawn from the word source in one call.
+        '''
+        if fld.field_name == 'type':
+            return [self.string(fld)] * count
+        words = self.rand.getwords(count, self.rng)
+        if re.match(r'^\w+_+email$', fld.field_name):
+            domains = self.rand.getwords(count, self.rng)
+            words = [f'{word}@{domain}.com' for word, domain in zip(words, domains)]
+        return words
+
+    def tag_string_autocomplete_column(self, fld, count):
+        '''
+        column version of tag_string_autocomplete
+        '''
+        return self.string_column(fld, count)
+
+    def resource_url_upload_column(self, fld, count):
+        '''
+        column version of resource_url_upload
+        '''
+        return [f'https://{word}.com' for word in self.rand.getwords(count, self.rng)]
+
+    def date_column(self, fld, count):  # pylint: disable=unused-argument
+        '''
+        :return: count random dates in the 10 years before DATE_EPOCH, drawn as
+            a single list of day offsets that are converted to strings when
+            read.
+        '''
+        days = range(DATE_RANGE_DAYS)
+        return DateColumn(DATE_EPOCH, self.rng.choices(days, k=count))
+
+    def composite_repeating_column(self, fld, count, flds2gen=None):
+        '''
+        column version of composite_repeating.  The subfields for all the rows
+        are generated in a single batch which is then sliced up into the rows.
+        '''
+        if flds2gen is None:
+            row_sizes = self.rng.choices((1, 2, 3), k=count)
+        else:
+            row_sizes = [flds2gen] * count
+        population = DataPopulationResource(fld.subfields, self.rng)
+        subfield_rows = list(population.populate_many(sum(row_sizes)))
+        values = []
+        start = 0
+        for row_size in row_sizes:
+            values.append(json_codec.dumps(subfield_rows[start:start + row_size]))
+            start += row_size
+        return values
+
+    def composite_column(self, fld, count):
+        '''
+        column version of composite
+        '''
+        return self.composite_repeating_column(fld, count, flds2gen=1)
+
+
+class PlanStep():
     '''
-    The module I was using for random words makes a network call, which is slow
-    so wrapping it with this module so that it makes one network call and caches
-    100 random words, once the 100 are used up it will grab another 100, hopeuflly
-    speeding things up.
+    A single field in a GenerationPlan.
+
+    :ivar field: the field definition
+    :ivar field_name: the name of the field
+    :ivar func: the DataPopulationResource method that the preset for the field
+        resolves to.  It is unbound, call it with the populator as the first arg
+    :ivar column_func: the DataPopulationResource method used to generate a
+        column of values for the field, see populate_many
+    :ivar conditional_field: the name of the field this field depends on, None
+        if the field is not conditional
+    :ivar conditional_values: the values of the conditional_field that will
+        result in this field getting populated
+    :ivar never: True if the field is conditional on a field that does not
+        exist in the schema, so it can never be populated
     '''
+    __slots__ = ('field', 'field_name', 'func', 'column_func',
+                 'conditional_field', 'conditional_values', 'never')
 
-    def __init__(self, cache_size=500):
-        self.cache_size = cache_size
-        # self.words = []
+    def __init__(self, field, func, column_func, field_names):
+        self.field = field
+        self.field_name = field.field_name
+        self.func = func
+        self.column_func = column_func
+        self.conditional_field = field.conditional_field or None
+        self.conditional_values = tuple(field.conditional_values or ())
+        self.never = self.conditional_field is not None and \
+            self.conditional_field not in field_names
 
-    def getword(self):
+    def is_satisfied(self, datastruct):
         '''
-        :return: a random word that can be used for various fields.
+        :param datastruct: the dataset that is being populated
+        :return: True if the field should be populated for this dataset
         '''
-        global WORDS  # pylint: disable=global-statement
-        if not WORDS:
-            LOGGER.debug("getting words from network")
-            self.get_words_from_network()
+        if self.conditional_field is None:
+            return True
+        if self.never or self.conditional_field not in datastruct:
+            return False
+        return datastruct[self.conditional_field] in self.conditional_values
+
 
-        word = WORDS.pop()
+class GenerationPlan():
+    '''
+    A schema compiled into an ordered list of PlanSteps.
+
+    * fields are topologically sorted on the conditional_field property, so a
+      field is always generated after the field its condition depends on.
+      Apart from that the order defined in the schema is maintained.
+    * presets are resolved to the DataPopulationResource method once, instead
+      of for each field of each dataset.
+    * fields conditional on a field that does not exist are flagged up front.
+
+    Plans are cached per schema object, use get_plan() to retrieve them.
+    '''
+    _plans = weakref.WeakKeyDictionary()
 
-        # loop and check words for non alphanumerics
-        while not word.isalnum():
-            # get new word by calling getword again
-            word = self.getword()
-            # check if string contains non alphanumeric characters
-            if word.isalnum():
-                LOGGER.debug('word is alphanumeric: ' + word)
+    def __init__(self, fields):
+        self.filtered_list = getattr(fields, 'filtered_list', None)
+        self.steps = []
+        self.step_lookup = {}
+        self.__compile(list(fields))
+
+    @classmethod
+    def get_plan(cls, fields):
+        '''
+        :param fields: the schema to get the plan for
+        :type fields: bcdc_apitests.helpers.bcdc_dataset_schema.Fields
+        :return: the compiled plan for the schema, compiles it if it doesn't
+            already exist, or if the schema filter has changed since it was
+            compiled.
+        '''
+        plan = cls._plans.get(fields)
+        if plan is None or plan.filtered_list is not getattr(fields, 'filtered_list', None):
+            plan = cls(fields)
+            cls._plans[fields] = plan
+        return plan
+
+    def __compile(self, flds):
+        '''
+        Kahn's algorithm, using the position in the schema as the tie breaker
+        so the output order is stable.
+        '''
+        field_names = set(fld.field_name for fld in flds)
+        position = {}
+        for cnt, fld in enumerate(flds):
+            position[fld.field_name] = cnt
+
+        dependents = {}
+        waiting_on = {}
+        ready = []
+        for fld in flds:
+            cond = fld.conditional_field
+            if cond and cond in field_names and cond != fld.field_name:
+                dependents.setdefault(cond, []).append(fld)
+                waiting_on[fld.field_name] = 1
             else:
-                LOGGER.debug('word is NOT alphanumeric: ' + word)
+                heapq.heappush(ready, (position[fld.field_name], fld.field_name))
+
+        by_name = dict((fld.field_name, fld) for fld in flds)
+        while ready:
+            _, fld_name = heapq.heappop(ready)
+            fld = by_name[fld_name]
+            func = self.__bind_preset(fld.preset)
+            step = PlanStep(fld, func, self.__bind_column(fld.preset, func),
+                            field_names)
+            self.steps.append(step)
+            self.step_lookup[fld_name] = step
+            for dependent in dependents.get(fld_name, []):
+                waiting_on[dependent.field_name] -= 1
+                if not waiting_on[dependent.field_name]:
+                    heapq.heappush(ready, (position[dependent.field_name],
+                                           dependent.field_name))
+
+        if len(self.steps) != len(flds):
+            circular = sorted(field_names - set(self.step_lookup))
+            msg = 'the conditional_field properties for the following ' + \
+                  f'fields are circular: {circular}'
+            raise ValueError(msg)
+        LOGGER.debug(f"generation plan: {[step.field_name for step in self.steps]}")
 
-        LOGGER.debug('getword will return: ' + word)
-        return word
+    @staticmethod
+    def __bind_preset(preset):
+        '''
+        :param preset: the name of the preset
+        :return: the DataPopulationResource method that corresponds with the
+            preset.  If one doesn't exist the function that is returned will
+            raise UndefinedPreset when it is called.
+        '''
+        func = getattr(DataPopulationResource, preset, None)
+        if func is None:
+            def func(populator, fld, override=None):  # pylint: disable=unused-argument
+                undefined_prefix(fld)
+        return func
+
+    @staticmethod
+    def __bind_column(preset, func):
+        '''
+        :param preset: the name of the preset
+        :param func: the single value function for the preset
+        :return: the DataPopulationResource method used to generate a column of
+            values for the preset.  If one doesn't exist returns a function that
+            calls func once for each row.
+        '''
+        column_func = getattr(DataPopulationResource, f'{preset}_column', None)
+        if column_func is None:
+            def column_func(populator, fld, count):
+                return [func(populator, fld) for _ in range(count)]
+        return column_func
+
+    def get_step(self, field_name):
+        '''
+        :param field_name: name of a field in the schema
+        :return: the PlanStep for the field, None if it is not in the schema
+        '''
+        return self.step_lookup.get(field_name)
+
+    def get_field_names(self):
+        '''
+        :return: the names of the fields in the plan, in generation order
+        '''
+        return [step.field_name for step in self.steps]
+
+
+
+class RandomWords():
+    '''
+    Wrapper around a word source, by default the bundled word list is used which
+    is loaded once per process and doesn't make any network calls.  See the
+    word_source module for the available sources.
+    '''
+
+    def __init__(self, source=None):
+        '''
+        :param source: the word source to draw words from, if not provided uses
+            the default source.
+        :type source: bcdc_apitests.helpers.word_source.WordSource
+        '''
+        self.source = source if source is not None else word_source.get_default_source()
+
+    def getword(self, rng=None):
+        '''
+        :param rng: random number generator to draw with, defaults to the random
+            module
+        :return: a random word that can be used for various fields.
+        '''
+        return self.source.getword(rng)
 
-    def get_words_from_network(self):
+    def getwords(self, count, rng=None):
         '''
-        Goes to the network, and reloads the cache with the number of words
-        defined in the cache_size.
+        :param count: the number of words to draw
+        :param rng: random number generator to draw with
+        :return: a list of random words
         '''
-        LOGGER.info(f"getting another {self.cache_size} random words" +  # pylint: disable=logging-not-lazy
-                    "from generator..")
-        # can't think of a way around this, want to make the WORDS available to
-        # all instances of the module
-        global WORDS  # pylint: disable=global-statement
-        WORDS = randomwordgenerator.randomwordgenerator.generate_random_words(
-            self.cache_size)
-        LOGGER.debug(f"WORDS: {WORDS}")
+        return self.source.getwords(count, rng)
 
 
 class UndefinedPreset(AttributeError):
@@ -0,0 +1,196 @@
+'''
+Created on Oct. 18, 2026
+
+Runs a set of setup steps that depend on each other as a DAG, steps whose
+dependencies have completed are run concurrently in a thread pool.  Used to
+create the test group, users and org at the start of the session, where most
+of the time is spent waiting on ckan.
+
+example:
+
+    bootstrap = Bootstrap()
+    bootstrap.add('user_a', create_user, args=['user_a'])
+    bootstrap.add('user_b', create_user, args=['user_b'])
+    bootstrap.add('org', create_org, deps=['user_a', 'user_b'])
+    results = bootstrap.run()
+
+Each step is called with its args followed by the results of the steps it
+depends on, in the order the dependencies were listed.  When a step fails the
+steps that have completed are undone, each step with a teardown has it called
+with its result, in the reverse of the order the steps completed.
+'''
+import concurrent.futures
+import logging
+import os
+import time
+
+import bcdc_apitests.config.testConfig as testConfig
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+
+class BootstrapStep():
+    '''
+    a single step in the bootstrap
+
+    :ivar name: unique name for the step
+    :ivar func: the function that is called to run the step
+    :ivar args: list of args passed to func before the dependency results
+    :ivar deps: the names of the steps that have to complete before this step
+    :ivar teardown: the function that undoes the step, called with the result
+        of the step, None if there is nothing to undo
+    '''
+    __slots__ = ('name', 'func', 'args', 'deps', 'teardown')
+
+    def __init__(self, name, func, args=None, deps=None, teardown=None):
+        self.name = name
+        self.func = func
+        self.args = list(args or [])
+        self.deps = list(deps or [])
+        self.teardown = teardown
+
+
+class Bootstrap():
+    '''
+    :param max_workers: the number of steps that can run at the same time,
+        defaults to the BCDC_BOOTSTRAP_WORKERS env var
+    '''
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = int(os.environ.get(testConfig.BCDC_BOOTSTRAP_WORKERS,
+                                             testConfig.BCDC_BOOTSTRAP_WORKERS_DEFAULT))
+        self.max_workers = max_workers
+        self.steps = {}
+
+    def add(self, name, func, args=None, deps=None, teardown=None):
+        '''
+        adds a step to the bootstrap
+
+        :param name: unique name for the step, its result is stored under this
+            name
+        :param func: the function to call
+        :param args: args to call the function with
+        :param deps: the names of the steps this step depends on, their results
+            are added to the args
+        :param teardown: function called with the result of the step to undo
+            it when another step fails
+        '''
+        if name in self.steps:
+            raise ValueError(f'the bootstrap already has a step called: {name}')
+        self.steps[name] = BootstrapStep(name, func, args, deps, teardown)
+
+    def get_order(self):
+        '''
+        :return: the names of the steps in an order where every step comes
+            after its dependencies
+        :raises ValueError: if a dependency doesn't exist or there is a cycle
+        '''
+        waiting_on = {}
+        dependents = {name: [] for name in self.steps}
+        for step in self.steps.values():
+            for dep in step.deps:
+                if dep not in self.steps:
+                    msg = f'the step {step.name} depends on {dep} which does ' + \
+                          'not exist'
+                    raise ValueError(msg)
+                dependents[dep].append(step.name)
+            waiting_on[step.name] = len(step.deps)
+
+        ready = [name for name, cnt in waiting_on.items() if not cnt]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in dependents[name]:
+                waiting_on[dependent] -= 1
+                if not waiting_on[dependent]:
+                    ready.append(dependent)
+        if len(order) != len(self.steps):
+            cycle = sorted(set(self.steps) - set(order))
+            raise ValueError(f'the bootstrap steps have a cycle: {cycle}')
+        return order
+
+    def run(self):
+        '''
+        runs all the steps, a step is started as soon as the steps it depends
+        on have completed.
+
+        :return: dictionary of step name to the value returned by the step
+        :raises BootstrapError: if a step fails, steps that haven't started are
+            cancelled, the steps that are running are allowed to finish, and
+            the steps that completed are torn down.
+        '''
+        order = self.get_order()
+        results = {}
+        start_time = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='bootstrap') as executor:
+            running = {}
+            remaining = list(order)
+            while remaining or running:
+                # start the steps that have everything they need
+                for name in list(remaining):
+                    step = self.steps[name]
+                    if all(dep in results for dep in step.deps):
+                        args = step.args + [results[dep] for dep in step.deps]
+                        running[executor.submit(self.__run_step, step, args)] = name
+                        remaining.remove(name)
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as err:
+                        for other in running:
+                            other.cancel()
+                        concurrent.futures.wait(running)
+                        for other, other_name in running.items():
+                            if not other.cancelled() and other.exception() is None:
+                                results[other_name] = other.result()
+                        self.teardown(results)
+                        raise BootstrapError(f'the bootstrap step {name} failed: {err}') \
+                            from err
+        LOGGER.info(f"bootstrap of {len(order)} steps completed in " +
+                    f"{time.monotonic() - start_time:.2f} seconds")
+        return results
+
+    def teardown(self, results):
+        '''
+        undoes the steps that completed, in the reverse of the order they
+        completed.  A teardown that fails is logged and the others are still
+        run.
+
+        :param results: dictionary of step name to the value returned by the
+            step, for the steps that completed
+        '''
+        for name in reversed(list(results)):
+            step = self.steps[name]
+            if step.teardown is None:
+                continue
+            try:
+                step.teardown(results[name])
+                LOGGER.debug(f"bootstrap step {name} torn down")
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception(f"teardown of the bootstrap step {name} failed")
+
+    @staticmethod
+    def __run_step(step, args):
+        '''
+        calls the function for a step and logs how long it took
+        '''
+        start_time = time.monotonic()
+        result = step.func(*args)
+        LOGGER.debug(f"bootstrap step {step.name} completed in " +
+                     f"{time.monotonic() - start_time:.2f} seconds")
+        return result
+
+
+class BootstrapError(Exception):
+    '''
+    raised when one of the bootstrap steps fails
+    '''
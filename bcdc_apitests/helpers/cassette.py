@@ -0,0 +1,274 @@
+'''
+Created on Oct. 18, 2026
+
+Records the http calls made to ckan during a test run into a cassette file,
+and plays them back so the suite can be re-run without a ckan instance.
+
+Every call the tests make goes through ckan_session.CKANSession, including
+the calls made by RemoteCKAN objects, so the session hands each request to
+the cassette when one is set:
+
+ * record - the request is sent and the response is stored under the match
+   key for the request
+ * replay - the next stored response for the match key is returned, nothing
+   is sent over the network
+
+The match key is a hash of the method, the path, the query and the body of
+the request.  Headers are not part of the key (so api keys don't matter), and
+the parts of the body that change between runs are normalized out of it:
+uuids, dates, passwords / api keys and the user specific part of the test
+object names (TEST_PREFIX_TEST_NAMESPACE_).  Responses for the same key are
+replayed in the order they were recorded.  The values of the SECRET_KEYS in
+the recorded json responses, ie the api keys returned by user_show, are
+redacted before they are stored, the replay doesn't need them as the headers
+are not matched.
+
+The cassette file is gzipped json with a header (the data seed, the ckan url
+and the test namespace of the recording) and an index of match key to
+responses.  When replaying the data seed from the recording is used, and the
+test namespace in the recorded responses is replaced with the current one.
+'''
+import datetime
+import gzip
+import hashlib
+import http.client
+import logging
+import re
+import threading
+import urllib.parse
+
+import requests
+import requests.structures
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.json_codec as json_codec
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+CASSETTE_VERSION = 2
+
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+
+# keys in request bodies whose values are replaced before matching, and in
+# response bodies whose values are replaced before they are recorded
+SECRET_KEYS = frozenset(['password', 'apikey', 'api_key', 'token'])
+SECRET_VALUE = '<secret>'
+
+UUID_REGEX = re.compile(
+    '[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+DATE_REGEX = re.compile(r'\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}:\d{2}(\.\d+)?)?')
+
+
+def redact(value):
+    '''
+    :param value: a decoded json body
+    :return: the value with the values of the SECRET_KEYS replaced
+    '''
+    if isinstance(value, dict):
+        return {key: SECRET_VALUE if key in SECRET_KEYS and val else redact(val)
+                for key, val in value.items()}
+    if isinstance(value, list):
+        return [redact(val) for val in value]
+    return value
+
+
+def get_namespace_regex(namespace):
+    '''
+    :param namespace: the TEST_NAMESPACE the names were generated with
+    :return: regex that matches the start of the test object names for the
+        namespace, ie zzztest_abc_ and 'zzztest abc ' for the package title
+    '''
+    return re.compile(f'{re.escape(testConfig.TEST_PREFIX)}([_ ]){re.escape(namespace)}([_ ])')
+
+
+class Cassette():
+    '''
+    :param path: the cassette file
+    :param mode: MODE_RECORD or MODE_REPLAY
+    :param seed: the data seed for the run, only used when recording
+    :param ckan_url: the url of the ckan instance, only used when recording
+    '''
+
+    def __init__(self, path, mode, seed=None, ckan_url=None):
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f'unknown cassette mode: {mode}')
+        self.path = path
+        self.mode = mode
+        self.seed = seed
+        self.ckan_url = ckan_url
+        self.namespace = testConfig.TEST_NAMESPACE
+        self.interactions = {}
+        self.positions = {}
+        self.misses = 0
+        self.replayed = 0
+        self.lock = threading.Lock()
+        # the match keys always use the names for the current namespace
+        self.namespace_regex = get_namespace_regex(testConfig.TEST_NAMESPACE)
+        if mode == MODE_REPLAY:
+            self.load()
+
+    @property
+    def replaying(self):
+        '''
+        :return: True when responses come from the cassette
+        '''
+        return self.mode == MODE_REPLAY
+
+    def load(self):
+        '''
+        reads the cassette file
+        '''
+        with gzip.open(self.path, 'rb') as cassette_file:
+            struct = json_codec.loads(cassette_file.read())
+        if struct.get('version') != CASSETTE_VERSION:
+            msg = f'the cassette {self.path} has version {struct.get("version")}, ' + \
+                  f'expected version {CASSETTE_VERSION}'
+            raise CassetteError(msg)
+        self.seed = struct['seed']
+        self.ckan_url = struct['ckan_url']
+        self.namespace = struct['namespace']
+        self.interactions = struct['interactions']
+        LOGGER.info(f"loaded {sum(len(resps) for resps in self.interactions.values())} " +
+                    f"responses from the cassette {self.path}")
+
+    def save(self):
+        '''
+        writes the recorded calls to the cassette file
+        '''
+        struct = {'version': CASSETTE_VERSION,
+                  'seed': self.seed,
+                  'ckan_url': self.ckan_url,
+                  'namespace': self.namespace,
+                  'interactions': self.interactions}
+        with self.lock:
+            body = json_codec.get_codec().dumpb(struct)
+        with gzip.open(self.path, 'wb') as cassette_file:
+            cassette_file.write(body)
+        LOGGER.info(f"saved {len(self.interactions)} request keys to the cassette " +
+                    f"{self.path}")
+
+    def normalize(self, value):
+        '''
+        :param value: a decoded request body or query value
+        :return: the value with the parts that change between runs replaced
+        '''
+        if isinstance(value, dict):
+            return {key: SECRET_VALUE if key in SECRET_KEYS else self.normalize(val)
+                    for key, val in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.normalize(val) for val in value]
+        if isinstance(value, str):
+            value = UUID_REGEX.sub('<uuid>', value)
+            value = DATE_REGEX.sub('<date>', value)
+            return self.namespace_regex.sub(
+                f'{testConfig.TEST_PREFIX}\\1<namespace>\\2', value)
+        return value
+
+    def get_key(self, method, url, params=None, data=None, *args, json=None,  # pylint: disable=keyword-arg-before-vararg
+                **kwargs):  # pylint: disable=unused-argument
+        '''
+        :return: the match key for a request, the args are the same as the
+            args for requests.Session.request
+        '''
+        prepared = requests.Request(method, url, params=params, data=data,
+                                    json=json).prepare()
+        url_parts = urllib.parse.urlsplit(prepared.url)
+        query = sorted(urllib.parse.parse_qsl(url_parts.query, keep_blank_values=True))
+        body = prepared.body
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', errors='replace')
+        if body:
+            try:
+                body = json_codec.loads(body)
+            except ValueError:
+                body = dict(urllib.parse.parse_qsl(body, keep_blank_values=True)) or body
+        struct = [prepared.method, url_parts.path.rstrip('/'),
+                  self.normalize([list(param) for param in query]),
+                  self.normalize(body)]
+        key_str = json_codec.get_codec().dumps(struct, sort_keys=True)
+        return hashlib.sha1(key_str.encode('utf-8')).hexdigest()
+
+    def record(self, response, method, url, *args, **kwargs):
+        '''
+        stores the response for a request that was sent to ckan
+
+        :param response: the response that was received
+        :type response: requests.Response
+        '''
+        key = self.get_key(method, url, *args, **kwargs)
+        body = response.content.decode('utf-8', errors='replace')
+        try:
+            body = json_codec.dumps(redact(json_codec.loads(body)))
+        except ValueError:
+            pass
+        interaction = {'status': response.status_code,
+                       'content_type': response.headers.get('Content-Type'),
+                       'body': body}
+        with self.lock:
+            self.interactions.setdefault(key, []).append(interaction)
+
+    def play(self, method, url, *args, **kwargs):
+        '''
+        :return: the next recorded response for the request
+        :rtype: requests.Response
+        :raises CassetteMissError: if the request isn't in the cassette
+        '''
+        key = self.get_key(method, url, *args, **kwargs)
+        with self.lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                self.misses += 1
+                msg = f'no response in the cassette {self.path} for: {method} {url}'
+                raise CassetteMissError(msg)
+            # once the recorded responses are used up the last one is repeated
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            self.replayed += 1
+            interaction = recorded[min(position, len(recorded) - 1)]
+
+        body = interaction['body']
+        if self.namespace != testConfig.TEST_NAMESPACE:
+            body = get_namespace_regex(self.namespace).sub(
+                f'{testConfig.TEST_PREFIX}\\1{testConfig.TEST_NAMESPACE}\\2', body)
+        response = requests.Response()
+        response.status_code = interaction['status']
+        response.headers = requests.structures.CaseInsensitiveDict()
+        if interaction['content_type']:
+            response.headers['Content-Type'] = interaction['content_type']
+        response._content = body.encode('utf-8')  # pylint: disable=protected-access
+        response.encoding = 'utf-8'
+        response.url = url
+        response.reason = http.client.responses.get(response.status_code, '')
+        response.elapsed = datetime.timedelta(0)
+        response.request = requests.Request(
+            method, url, params=kwargs.get('params'), data=kwargs.get('data'),
+            json=kwargs.get('json')).prepare()
+        return response
+
+    def get_stats(self):
+        '''
+        :return: dictionary with the cassette file, the mode, the number of
+            request keys, and for replays the number of responses replayed and
+            the number of requests that were not in the cassette
+        '''
+        with self.lock:
+            return {'path': self.path,
+                    'mode': self.mode,
+                    'keys': len(self.interactions),
+                    'replayed': self.replayed,
+                    'misses': self.misses}
+
+
+class CassetteError(Exception):
+    '''
+    raised when a cassette file can't be used
+    '''
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    '''
+    raised on replay when a request isn't in the cassette
+    '''
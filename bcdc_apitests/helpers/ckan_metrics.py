@@ -0,0 +1,266 @@
+'''
+Created on Oct. 18, 2026
+
+Latency metrics for the calls made to ckan.  Every call that goes through the
+shared ckan session (see ckan_session.CKANSession) is timed, including the
+retries, and recorded with the ckan action, the role of the user that made
+the call, the http status, the bytes sent and received and the number of
+retries.
+
+The calls are aggregated per action / role / status into:
+
+ * a histogram with the LATENCY_BUCKETS, written to a prometheus textfile in
+   the OpenMetrics format so the k8s job can leave it for the node exporter
+ * the p50 / p95 / p99 latencies, added to the json report and shown in the
+   terminal summary
+
+The api keys are mapped to roles with set_role(), calls without an api key
+use the role 'anonymous', keys that were not registered use 'unknown'.
+'''
+import logging
+import math
+import os
+import re
+import threading
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+# upper bounds in seconds of the histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+ROLE_ANONYMOUS = 'anonymous'
+ROLE_UNKNOWN = 'unknown'
+ROLE_SYSADMIN = 'sysadmin'
+
+# status recorded for calls that failed without a response
+STATUS_ERROR = 'error'
+
+METRIC_PREFIX = 'bcdc_ckan_action'
+
+ACTION_REGEX = re.compile(r'/action/(\w+)/?$')
+APIKEY_HEADERS = ('x-ckan-api-key', 'authorization')
+
+# process wide metrics, see get_metrics()
+_METRICS = None
+_METRICS_LOCK = threading.Lock()
+
+
+def get_action_name(url):
+    '''
+    :param url: the url that was called
+    :return: the name of the ckan action, or 'other' for calls that don't
+        go to the action api
+    '''
+    match = ACTION_REGEX.search(url.split('?', 1)[0])
+    return match.group(1) if match else 'other'
+
+
+def get_percentile(sorted_values, quantile):
+    '''
+    :param sorted_values: the values in ascending order
+    :param quantile: the quantile, between 0 and 1
+    :return: the nearest rank percentile of the values
+    '''
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(quantile * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def escape_label(value):
+    '''
+    :return: the value escaped for use as an OpenMetrics label value
+    '''
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class ActionStats():
+    '''
+    the calls for one action / role / status
+    '''
+    __slots__ = ('durations', 'bytes_out', 'bytes_in', 'retries')
+
+    def __init__(self):
+        self.durations = []
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.retries = 0
+
+    def get_summary(self):
+        '''
+        :return: dictionary with the number of calls, the latency percentiles,
+            the mean and max latency, the bytes and the retries
+        '''
+        durations = sorted(self.durations)
+        summary = {'count': len(durations),
+                   'mean': sum(durations) / len(durations) if durations else None,
+                   'max': durations[-1] if durations else None}
+        for quantile in QUANTILES:
+            summary[f'p{int(quantile * 100)}'] = get_percentile(durations, quantile)
+        summary.update({'bytes_out': self.bytes_out,
+                        'bytes_in': self.bytes_in,
+                        'retries': self.retries})
+        return summary
+
+
+class CKANMetrics():
+    '''
+    collects the timing of the ckan calls, thread safe.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.roles = {}
+        self.stats = {}
+
+    def set_role(self, apikey, role):
+        '''
+        :param apikey: an api key used by the tests
+        :param role: the role recorded for calls made with the key
+        '''
+        if apikey:
+            with self.lock:
+                self.roles[apikey] = role
+
+    def get_role(self, headers):
+        '''
+        :param headers: the headers sent with the call
+        :return: the role for the api key in the headers
+        '''
+        apikey = None
+        for header, value in (headers or {}).items():
+            if header.lower() in APIKEY_HEADERS and value:
+                apikey = value
+                break
+        if apikey is None:
+            return ROLE_ANONYMOUS
+        return self.roles.get(apikey, ROLE_UNKNOWN)
+
+    def record(self, url, headers, status, duration, bytes_out=0, bytes_in=0,
+               retries=0):
+        '''
+        records a call
+
+        :param url: the url that was called
+        :param headers: the headers sent with the call, used to find the role
+        :param status: the http status, STATUS_ERROR if there was no response
+        :param duration: seconds the call took, including the retries
+        :param bytes_out: the size of the request body
+        :param bytes_in: the size of the response body
+        :param retries: the number of times the call was retried
+        '''
+        key = (get_action_name(url), self.get_role(headers), str(status))
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = ActionStats()
+            stats.durations.append(duration)
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+            stats.retries += retries
+
+    def get_report(self):
+        '''
+        :return: dictionary with 'calls', a list with the summary for each
+            action / role / status, and 'actions', the summary for each action
+            across all the roles and statuses.  See ActionStats.get_summary()
+        '''
+        actions = {}
+        calls = []
+        with self.lock:
+            for (action, role, status), stats in sorted(self.stats.items()):
+                summary = stats.get_summary()
+                summary.update({'action': action, 'role': role, 'status': status})
+                calls.append(summary)
+                total = actions.setdefault(action, ActionStats())
+                total.durations.extend(stats.durations)
+                total.bytes_out += stats.bytes_out
+                total.bytes_in += stats.bytes_in
+                total.retries += stats.retries
+        return {'calls': calls,
+                'actions': {action: total.get_summary()
+                            for action, total in actions.items()}}
+
+    def to_openmetrics(self, worker=None):
+        '''
+        :param worker: the pytest-xdist worker id, added to the labels so the
+            files written by the workers don't have the same series
+        :return: the metrics in the OpenMetrics text format
+        '''
+        lines = [f'# TYPE {METRIC_PREFIX}_duration_seconds histogram',
+                 f'# UNIT {METRIC_PREFIX}_duration_seconds seconds',
+                 f'# HELP {METRIC_PREFIX}_duration_seconds time taken by the ' +
+                 'ckan action calls, including retries']
+        counters = {'bytes_out': [], 'bytes_in': [], 'retries': []}
+        quantiles = []
+        with self.lock:
+            items = sorted(self.stats.items())
+            for (action, role, status), stats in items:
+                labels = f'action="{escape_label(action)}",role="{escape_label(role)}",' + \
+                         f'status="{escape_label(status)}"'
+                if worker:
+                    labels = f'{labels},worker="{escape_label(worker)}"'
+                durations = sorted(stats.durations)
+                cnt = 0
+                for bucket in LATENCY_BUCKETS:
+                    while cnt < len(durations) and durations[cnt] <= bucket:
+                        cnt += 1
+                    lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket' +
+                                 f'{{{labels},le="{bucket}"}} {cnt}')
+                lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket' +
+                             f'{{{labels},le="+Inf"}} {len(durations)}')
+                lines.append(f'{METRIC_PREFIX}_duration_seconds_count{{{labels}}} ' +
+                             f'{len(durations)}')
+                lines.append(f'{METRIC_PREFIX}_duration_seconds_sum{{{labels}}} ' +
+                             f'{sum(durations)}')
+                for quantile in QUANTILES:
+                    quantiles.append(
+                        f'{METRIC_PREFIX}_latency_seconds{{{labels},' +
+                        f'quantile="{quantile}"}} {get_percentile(durations, quantile)}')
+                for name in counters:
+                    counters[name].append(
+                        f'{METRIC_PREFIX}_{name}_total{{{labels}}} {getattr(stats, name)}')
+
+        lines.extend([f'# TYPE {METRIC_PREFIX}_latency_seconds gauge',
+                      f'# UNIT {METRIC_PREFIX}_latency_seconds seconds',
+                      f'# HELP {METRIC_PREFIX}_latency_seconds latency percentiles ' +
+                      'of the ckan action calls for the run'])
+        lines.extend(quantiles)
+        descriptions = {'bytes_out': 'bytes sent in the request bodies',
+                        'bytes_in': 'bytes received in the response bodies',
+                        'retries': 'number of retries'}
+        for name, metric_lines in counters.items():
+            lines.extend([f'# TYPE {METRIC_PREFIX}_{name} counter',
+                          f'# HELP {METRIC_PREFIX}_{name} {descriptions[name]}'])
+            lines.extend(metric_lines)
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path, worker=None):
+        '''
+        writes the metrics to a textfile, the file is replaced in one step so
+        a collector never reads a partial file.
+
+        :param path: the file to write
+        :param worker: the pytest-xdist worker id, see to_openmetrics()
+        '''
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as metrics_file:
+            metrics_file.write(self.to_openmetrics(worker))
+        os.replace(tmp_path, path)
+        LOGGER.info(f"wrote the ckan action metrics to {path}")
+
+
+def get_metrics():
+    '''
+    :return: the process wide metrics used by the ckan sessions
+    :rtype: CKANMetrics
+    '''
+    global _METRICS  # pylint: disable=global-statement
+    with _METRICS_LOCK:
+        if _METRICS is None:
+            _METRICS = CKANMetrics()
+        return _METRICS
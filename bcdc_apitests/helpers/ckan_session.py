@@ -0,0 +1,284 @@
+'''
+Created on Oct. 18, 2026
+
+A single pooled, keep alive http session per ckan url that is shared by every
+call the tests make, both the calls made directly with requests and the calls
+made through ckanapi.RemoteCKAN objects.
+
+CKANSession is a requests.Session, so it can be used anywhere requests is
+used.  Auth headers are not stored on the session, they are passed with each
+request (or by the RemoteCKAN object for the user), so the same connections
+are used by all the test users.  Cookies are never stored, a session or auth
+cookie set by ckan or the route in front of it would otherwise be sent with
+the calls of every other user, including the anonymous ones.
+
+example:
+
+    session = ckan_session.get_session('https://cadi.data.gov.bc.ca')
+    resp = session.post(api_call, headers=ckan_auth_header, data=payload.body)
+    remote_api = session.get_remote_api(apitoken)
+
+The size of the connection pool and the default timeout are set with the env
+vars BCDC_HTTP_POOL_SIZE and BCDC_HTTP_TIMEOUT.  Failed calls are retried
+according to a retry_policy.RetryPolicy.  When a cassette.Cassette is set
+with set_cassette() the calls are recorded to it, or played back from it.
+The calls made by the sessions from get_session() are timed by the process
+wide ckan_metrics.CKANMetrics, and the changes they make to the test objects
+are kept in a state_index.StateIndex and an object_cache.ObjectCache for the
+session.
+'''
+import functools
+import http.cookiejar
+import logging
+import os
+import threading
+import time
+
+import ckanapi
+import requests
+import requests.adapters
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.ckan_metrics as ckan_metrics
+import bcdc_apitests.helpers.object_cache as object_cache
+import bcdc_apitests.helpers.retry_policy as retry_policy
+import bcdc_apitests.helpers.state_index as state_index
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+# process wide sessions, one per ckan url, see get_session()
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+# cassette used by the sessions, see set_cassette()
+_CASSETTE = None
+
+
+class CKANSession(requests.Session):
+    '''
+    requests session with a connection pool sized for the ckan host, a default
+    timeout, and counters that show how often connections were re-used.
+
+    :param ckan_url: the url for the ckan instance
+    :param pool_size: the maximum number of connections to keep open, defaults
+        to the BCDC_HTTP_POOL_SIZE env var
+    :param timeout: default timeout in seconds for requests that don't
+        provide one, defaults to the BCDC_HTTP_TIMEOUT env var
+    :param policy: the retry policy for the session, defaults to a policy
+        configured by the BCDC_RETRY_* env vars
+    :type policy: bcdc_apitests.helpers.retry_policy.RetryPolicy
+    :param cassette: cassette to record the calls to or play them back from
+    :type cassette: bcdc_apitests.helpers.cassette.Cassette
+    :param metrics: records the timing of the calls, None to not time them
+    :type metrics: bcdc_apitests.helpers.ckan_metrics.CKANMetrics
+    :param index: the index of the test objects, updated with the changes made
+        by the calls, None to not keep one
+    :type index: bcdc_apitests.helpers.state_index.StateIndex
+    :param cache: the cache for the setup reads, the objects changed by the
+        calls are dropped from it, None to not keep one
+    :type cache: bcdc_apitests.helpers.object_cache.ObjectCache
+    '''
+
+    def __init__(self, ckan_url, pool_size=None, timeout=None, policy=None,
+                 cassette=None, metrics=None, index=None, cache=None):
+        super().__init__()
+        if pool_size is None:
+            pool_size = int(os.environ.get(testConfig.BCDC_HTTP_POOL_SIZE,
+                                           testConfig.BCDC_HTTP_POOL_SIZE_DEFAULT))
+        if timeout is None:
+            timeout = float(os.environ.get(testConfig.BCDC_HTTP_TIMEOUT,
+                                           testConfig.BCDC_HTTP_TIMEOUT_DEFAULT))
+        self.ckan_url = ckan_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.policy = policy if policy is not None else retry_policy.RetryPolicy()
+        self.cassette = cassette
+        self.metrics = metrics
+        self.state_index = index
+        self.object_cache = cache
+        self.request_cnt = 0
+        self.remote_apis = {}
+        # the session is used from the bootstrap, loadtest and sweeper threads
+        self.lock = threading.Lock()
+        # the calls for all the users share the session, so no cookies
+        self.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        self.adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        self.mount('https://', self.adapter)
+        self.mount('http://', self.adapter)
+        LOGGER.debug(f"created a session for {ckan_url}, pool size: {pool_size}")
+
+    def request(self, method, url, *args, **kwargs):  # pylint: disable=arguments-differ
+        '''
+        all requests, including the ones made by RemoteCKAN objects, go through
+        this method.  Adds the default timeout if one isn't provided,
+        retries failed calls according to the retry policy, records the
+        time taken by the call, including the retries, and updates the state
+        index and the object cache with the changes made by the call.
+
+        :param policy: the retry policy for this call, defaults to the policy
+            of the session
+        '''
+        policy = kwargs.pop('policy', None) or self.policy
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        send = functools.partial(self.__send, method, url, *args, **kwargs)
+        if self.metrics is None:
+            resp = policy.call(send, method, url)
+        else:
+            resp = self.__timed_call(policy, send, method, url, kwargs)
+        if not kwargs.get('stream'):
+            body = resp.request.body if resp.request is not None else None
+            for observer in (self.state_index, self.object_cache):
+                if observer is not None:
+                    observer.observe(url, body, resp)
+        return resp
+
+    def __timed_call(self, policy, send, method, url, kwargs):
+        '''
+        makes the call according to the retry policy and records it with the
+        metrics
+        '''
+        attempts = []
+
+        def send_attempt():
+            attempts.append(send)
+            return send()
+
+        start_time = time.monotonic()
+        resp = None
+        try:
+            resp = policy.call(send_attempt, method, url)
+            return resp
+        finally:
+            self.__record_metrics(resp, url, kwargs, time.monotonic() - start_time,
+                                  max(len(attempts) - 1, 0))
+
+    def __record_metrics(self, resp, url, kwargs, duration, retries):
+        '''
+        records a call with the metrics
+
+        :param resp: the response, None if the call failed without one
+        '''
+        if resp is None:
+            self.metrics.record(url, kwargs.get('headers'), ckan_metrics.STATUS_ERROR,
+                                duration, retries=retries)
+            return
+        body = resp.request.body if resp.request is not None else None
+        if kwargs.get('stream'):
+            bytes_in = int(resp.headers.get('Content-Length') or 0)
+        else:
+            bytes_in = len(resp.content or b'')
+        self.metrics.record(url, kwargs.get('headers'), resp.status_code, duration,
+                            bytes_out=len(body) if isinstance(body, (bytes, str)) else 0,
+                            bytes_in=bytes_in,
+                            retries=retries)
+
+    def __send(self, method, url, *args, **kwargs):
+        '''
+        makes a single attempt at a request, or gets the response from the
+        cassette when one is being replayed
+        '''
+        with self.lock:
+            self.request_cnt += 1
+        if self.cassette is not None and self.cassette.replaying:
+            return self.cassette.play(method, url, *args, **kwargs)
+        response = super().request(method, url, *args, **kwargs)
+        if self.cassette is not None:
+            self.cassette.record(response, method, url, *args, **kwargs)
+        return response
+
+    def get_remote_api(self, apikey=None):
+        '''
+        :param apikey: the api key for the user, None for anonymous access
+        :return: a RemoteCKAN object that uses this session, the objects are
+            cached so there is only one per api key.
+        :rtype: ckanapi.RemoteCKAN
+        '''
+        with self.lock:
+            if apikey not in self.remote_apis:
+                self.remote_apis[apikey] = ckanapi.RemoteCKAN(
+                    self.ckan_url, apikey, session=self)
+            return self.remote_apis[apikey]
+
+    def get_stats(self):
+        '''
+        :return: dictionary with the number of requests that were made, the
+            number of connections that were opened, the number of requests
+            that re-used an open connection, the retry stats, see
+            RetryPolicy.get_stats(), and the object cache stats prefixed with
+            cache_, see ObjectCache.get_stats()
+        '''
+        connections = 0
+        pool_requests = 0
+        pools = self.adapter.poolmanager.pools
+        for pool_key in pools.keys():
+            pool = pools[pool_key]
+            connections += pool.num_connections
+            pool_requests += pool.num_requests
+        stats = {'url': self.ckan_url,
+                 'requests': self.request_cnt,
+                 'connections': connections,
+                 'reused': max(pool_requests - connections, 0),
+                 'pool_size': self.pool_size}
+        stats.update(self.policy.get_stats())
+        if self.object_cache is not None:
+            stats.update({f'cache_{name}': value
+                          for name, value in self.object_cache.get_stats().items()})
+        return stats
+
+
+def get_session(ckan_url):
+    '''
+    :param ckan_url: the url for the ckan instance
+    :return: the process wide session for the ckan url
+    :rtype: CKANSession
+    '''
+    with _SESSIONS_LOCK:
+        if ckan_url not in _SESSIONS:
+            _SESSIONS[ckan_url] = CKANSession(ckan_url, cassette=_CASSETTE,
+                                              metrics=ckan_metrics.get_metrics(),
+                                              index=state_index.StateIndex(),
+                                              cache=object_cache.ObjectCache())
+            if _CASSETTE is not None and _CASSETTE.ckan_url is None:
+                _CASSETTE.ckan_url = ckan_url
+        return _SESSIONS[ckan_url]
+
+
+def set_cassette(cassette):
+    '''
+    :param cassette: the cassette the sessions record to or play back from,
+        None to stop using a cassette
+    :type cassette: bcdc_apitests.helpers.cassette.Cassette
+    '''
+    global _CASSETTE  # pylint: disable=global-statement
+    with _SESSIONS_LOCK:
+        _CASSETTE = cassette
+        for session in _SESSIONS.values():
+            session.cassette = cassette
+
+
+def get_cassette():
+    '''
+    :return: the cassette set with set_cassette(), or None
+    '''
+    return _CASSETTE
+
+
+def get_all_stats():
+    '''
+    :return: a list with the stats for each of the sessions, see
+        CKANSession.get_stats()
+    '''
+    with _SESSIONS_LOCK:
+        return [session.get_stats() for session in _SESSIONS.values()]
+
+
+def close_sessions():
+    '''
+    closes all the sessions and their connections
+    '''
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
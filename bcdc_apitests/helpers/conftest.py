@@ -0,0 +1,31 @@
+'''
+Created on Oct. 18, 2026
+
+The tests in the helpers directory (unit tests and benchmarks for the helper
+modules) run offline against the schemas in the test_data directory.  The
+session fixtures that create the test users and orgs in CKAN are replaced with
+fixtures that do nothing so these tests can run without a CKAN instance.
+'''
+import logging
+
+import pytest
+
+LOGGER = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def session_setup_teardown_mod():
+    '''
+    overrides the session start up in the root conftest, the helper tests don't
+    need the test users or the data cache clean up.
+    '''
+    LOGGER.debug("helper tests, skipping the session start up")
+    yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def org_setup_fixture():
+    '''
+    overrides the test org set up, the helper tests don't talk to CKAN.
+    '''
+    yield
@@ -0,0 +1,368 @@
+'''
+Created on Oct. 18, 2026
+
+Generates invalid variations of a valid dataset for negative testing.
+
+A MutationEngine looks at the schema and a valid base dataset and works out
+the ways each field can be made invalid:
+
+ * drop_required - a required field is removed
+ * wrong_type - a string field is given a value that isn't a string
+ * out_of_domain - a field with choices is given a value that isn't one of
+   the choices
+ * violated_conditional - the field a conditional field depends on is set so
+   that the condition is met, and the conditional field is removed
+
+Variants only record the mutations that were applied to them, the base dataset
+is shared between all the variants and the dictionary that is sent to the api
+is only assembled when the variant is copied / materialized.
+
+Two strategies are available for combining the mutations into variants:
+
+ * each - one variant per mutation, the number of variants grows linearly with
+   the number of fields
+ * pairwise - builds a covering array where every field is a parameter and the
+   values are "valid" plus the mutations for that field.  Every combination of
+   mutations for any two fields is included in at least one variant, the
+   number of variants grows with the log of the number of fields.  Mutations
+   that write the same keys, ie a violated conditional that sets bcdc_type
+   and an out of domain bcdc_type, are values of the same parameter so they
+   are never applied to the same variant.
+'''
+import collections
+import collections.abc
+import logging
+
+import bcdc_apitests.config.testConfig as testConfig
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+DROP_REQUIRED = 'drop_required'
+WRONG_TYPE = 'wrong_type'
+OUT_OF_DOMAIN = 'out_of_domain'
+VIOLATED_CONDITIONAL = 'violated_conditional'
+MUTATION_KINDS = [DROP_REQUIRED, WRONG_TYPE, OUT_OF_DOMAIN, VIOLATED_CONDITIONAL]
+
+STRATEGY_EACH = 'each'
+STRATEGY_PAIRWISE = 'pairwise'
+
+# values used for the mutations
+WRONG_TYPE_VALUE = {'wrong_type': True}
+OUT_OF_DOMAIN_VALUE = f'{testConfig.TEST_PREFIX} not in domain'
+
+# fields with these validators get filled in or skipped by ckan when they are
+# missing, so removing them does not make the dataset invalid.
+MISSING_OK_VALIDATORS = ['ignore_missing', 'if_empty_same_as']
+
+# number of candidate rows evaluated for each row in the pairwise covering array
+PAIRWISE_CANDIDATES = 20
+
+
+class Mutation():
+    '''
+    A single change that makes a dataset invalid.
+
+    :ivar kind: one of MUTATION_KINDS
+    :ivar field_name: the field that is made invalid
+    :ivar remove: field names that are removed from the dataset
+    :ivar overrides: dictionary of field names and the values they are set to
+    '''
+    __slots__ = ('kind', 'field_name', 'remove', 'overrides')
+
+    def __init__(self, kind, field_name, remove=None, overrides=None):
+        self.kind = kind
+        self.field_name = field_name
+        self.remove = tuple(remove or ())
+        self.overrides = overrides or {}
+
+    def __repr__(self):
+        return f'{self.kind}:{self.field_name}'
+
+    @property
+    def keys(self):
+        '''
+        :return: the field names the mutation removes or sets
+        '''
+        return (self.field_name,) + self.remove + tuple(self.overrides)
+
+
+class DatasetVariant(collections.abc.Mapping):
+    '''
+    read only view of a base dataset with a set of mutations applied.  The
+    base dataset is not copied, only the removed keys and overridden values
+    for the mutations are stored.
+
+    Use copy() to get a dictionary that can be serialized or modified.
+    '''
+
+    def __init__(self, base, mutations):
+        self.base = base
+        self.mutations = tuple(mutations)
+        self.removed = set()
+        self.overrides = {}
+        for mutation in self.mutations:
+            for fld_name in mutation.remove:
+                self.removed.add(fld_name)
+                self.overrides.pop(fld_name, None)
+            for fld_name, value in mutation.overrides.items():
+                self.removed.discard(fld_name)
+                self.overrides[fld_name] = value
+
+    def __getitem__(self, key):
+        if key in self.overrides:
+            return self.overrides[key]
+        if key in self.removed:
+            raise KeyError(key)
+        return self.base[key]
+
+    def __iter__(self):
+        for key in self.base:
+            if key not in self.removed:
+                yield key
+        for key in self.overrides:
+            if key not in self.base:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'DatasetVariant({list(self.mutations)})'
+
+    def copy(self):
+        '''
+        :return: the variant materialized as a new dictionary
+        '''
+        dataset = {key: val for key, val in self.base.items()
+                   if key not in self.removed}
+        dataset.update(self.overrides)
+        return dataset
+
+
+class VariantSequence(collections.abc.Sequence):
+    '''
+    sequence of DatasetVariants, the variants are created when they are
+    accessed.  The rows, ie the mutations that make up each variant, are
+    generated the first time the sequence is used.
+    '''
+
+    def __init__(self, base, rows):
+        self.base = base
+        self.rows_iter = rows
+        self.rows = None
+
+    def get_rows(self):
+        '''
+        :return: a list of the tuples of mutations that make up each variant
+        '''
+        if self.rows is None:
+            self.rows = [tuple(row) for row in self.rows_iter]
+            self.rows_iter = None
+        return self.rows
+
+    def __getitem__(self, indx):
+        return DatasetVariant(self.base, self.get_rows()[indx])
+
+    def __len__(self):
+        return len(self.get_rows())
+
+    def __repr__(self):
+        return f'VariantSequence({len(self)} variants)'
+
+
+class MutationEngine():
+    '''
+    Calculates the mutations that can be applied to a base dataset and
+    combines them into variants.
+
+    :param fields: the schema that the base dataset was generated from
+    :type fields: bcdc_apitests.helpers.bcdc_dataset_schema.Fields
+    :param base: a valid dataset
+    :param rng: random number generator used by the pairwise strategy, a
+        seeded random.Random so the variants can be replayed
+    :type rng: random.Random
+    '''
+
+    def __init__(self, fields, base, rng):
+        self.fields = fields
+        self.base = base
+        self.rng = rng
+
+    def get_mutations(self, kinds=None):
+        '''
+        :param kinds: the types of mutations to generate, defaults to all of
+            MUTATION_KINDS
+        :return: a generator of the Mutations that apply to the base dataset
+        '''
+        kinds = MUTATION_KINDS if kinds is None else kinds
+        invalid = set(kinds) - set(MUTATION_KINDS)
+        if invalid:
+            msg = f'invalid mutation kinds: {sorted(invalid)}, valid kinds ' + \
+                  f'include: {MUTATION_KINDS}'
+            raise ValueError(msg)
+
+        for fld in self.fields:
+            fld_name = fld.field_name
+            validators = (fld.get_value('validators') or '').split()
+            missing_ok = any(validator.startswith(prefix) for validator in validators
+                             for prefix in MISSING_OK_VALIDATORS)
+            in_base = fld_name in self.base
+            if DROP_REQUIRED in kinds and in_base and fld.required and \
+                    not fld.conditional_field and not missing_ok:
+                yield Mutation(DROP_REQUIRED, fld_name, remove=[fld_name])
+            if WRONG_TYPE in kinds and in_base and \
+                    isinstance(self.base[fld_name], str) and \
+                    (fld.required or fld.has_choices):
+                yield Mutation(WRONG_TYPE, fld_name,
+                               overrides={fld_name: WRONG_TYPE_VALUE})
+            if OUT_OF_DOMAIN in kinds and fld.has_choices and \
+                    (in_base or not fld.conditional_field):
+                yield Mutation(OUT_OF_DOMAIN, fld_name,
+                               overrides={fld_name: OUT_OF_DOMAIN_VALUE})
+            if VIOLATED_CONDITIONAL in kinds and fld.conditional_field and \
+                    fld.conditional_values and \
+                    (fld.required or 'conditional_required' in validators):
+                yield Mutation(
+                    VIOLATED_CONDITIONAL, fld_name, remove=[fld_name],
+                    overrides={fld.conditional_field: fld.conditional_values[0]})
+
+    def get_variants(self, kinds=None, strategy=STRATEGY_EACH):
+        '''
+        :param kinds: the types of mutations to use, see get_mutations()
+        :param strategy: how the mutations are combined into variants, either
+            STRATEGY_EACH or STRATEGY_PAIRWISE
+        :return: the invalid variants of the base dataset
+        :rtype: VariantSequence
+        '''
+        mutations = self.get_mutations(kinds)
+        if strategy == STRATEGY_EACH:
+            rows = ((mutation,) for mutation in mutations)
+        elif strategy == STRATEGY_PAIRWISE:
+            rows = self.get_pairwise_rows(mutations)
+        else:
+            msg = f'invalid strategy: {strategy}, valid strategies are: ' + \
+                  f'{[STRATEGY_EACH, STRATEGY_PAIRWISE]}'
+            raise ValueError(msg)
+        return VariantSequence(self.base, rows)
+
+    def get_pairwise_rows(self, mutations):
+        '''
+        Greedy (AETG style) pairwise covering array.  Each field with at least
+        one mutation is a parameter, its values are None (the field is left
+        valid) and each of the mutations for the field.  Fields whose
+        mutations write the same keys are combined into one parameter, so
+        the mutations in a row never overwrite each other.  Rows are added until
+        every pair of values for every pair of parameters has been used,
+        for each row a number of random candidates are built and the one that
+        covers the most new pairs is kept.
+
+        :param mutations: iterable of Mutations
+        :return: generator of rows, each row is a list of the mutations that
+            make up a variant.  Rows where every field is valid are skipped.
+        '''
+        params = [[None] + group for group in self.group_mutations(mutations)]
+
+        uncovered = set()
+        for param_1 in range(len(params)):
+            for param_2 in range(param_1 + 1, len(params)):
+                for val_1 in range(len(params[param_1])):
+                    for val_2 in range(len(params[param_2])):
+                        uncovered.add((param_1, val_1, param_2, val_2))
+        # with a single parameter there aren't any pairs, each value gets a row
+        if len(params) == 1:
+            for mutation in params[0][1:]:
+                yield [mutation]
+            return
+
+        while uncovered:
+            best_row, best_pairs = None, None
+            # the start pairs for the candidates, in a repeatable order
+            start_pairs = sorted(uncovered)
+            for _ in range(PAIRWISE_CANDIDATES):
+                row, pairs = self.__get_candidate_row(params, uncovered,
+                                                      start_pairs)
+                if best_pairs is None or len(pairs) > len(best_pairs):
+                    best_row, best_pairs = row, pairs
+            uncovered -= best_pairs
+            row_mutations = [params[param][val] for param, val in enumerate(best_row)
+                             if val]
+            if row_mutations:
+                yield row_mutations
+
+    @staticmethod
+    def group_mutations(mutations):
+        '''
+        :param mutations: iterable of Mutations
+        :return: list of lists of mutations, mutations that write (remove or
+            set) any of the same keys, directly or through other mutations,
+            are in the same list.  Lists are in the order of their first
+            mutation.
+        '''
+        mutations = list(mutations)
+        parents = {}
+
+        def find(key):
+            parents.setdefault(key, key)
+            while parents[key] != key:
+                parents[key] = parents[parents[key]]
+                key = parents[key]
+            return key
+
+        for mutation in mutations:
+            keys = mutation.keys
+            for key in keys[1:]:
+                parents[find(key)] = find(keys[0])
+
+        groups = collections.OrderedDict()
+        for mutation in mutations:
+            groups.setdefault(find(mutation.field_name), []).append(mutation)
+        return list(groups.values())
+
+    def __get_candidate_row(self, params, uncovered, start_pairs):
+        '''
+        builds a single candidate row, starting from a random uncovered pair and
+        then assigning the remaining parameters in random order, picking the
+        value that covers the most uncovered pairs with the parameters that
+        have already been assigned.
+
+        :param start_pairs: the uncovered pairs as a sorted list
+        :return: the row as a list of value indexes, and the set of uncovered
+            pairs it covers
+        '''
+        param_1, val_1, param_2, val_2 = self.rng.choice(start_pairs)
+        row = [None] * len(params)
+        row[param_1] = val_1
+        row[param_2] = val_2
+        order = [param for param in range(len(params))
+                 if param not in (param_1, param_2)]
+        self.rng.shuffle(order)
+        assigned = [param_1, param_2]
+        for param in order:
+            best_val, best_cnt = 0, -1
+            for val in range(len(params[param])):
+                cnt = sum(1 for other in assigned
+                          if self.__pair(other, row[other], param, val) in uncovered)
+                if cnt > best_cnt:
+                    best_val, best_cnt = val, cnt
+            row[param] = best_val
+            assigned.append(param)
+
+        pairs = set()
+        for indx, param in enumerate(assigned):
+            for other in assigned[indx + 1:]:
+                pair = self.__pair(param, row[param], other, row[other])
+                if pair in uncovered:
+                    pairs.add(pair)
+        return row, pairs
+
+    @staticmethod
+    def __pair(param_1, val_1, param_2, val_2):
+        '''
+        :return: the pair as it is stored in the uncovered set, with the lower
+            parameter first
+        '''
+        if param_1 < param_2:
+            return (param_1, val_1, param_2, val_2)
+        return (param_2, val_2, param_1, val_1)
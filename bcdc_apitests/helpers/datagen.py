@@ -0,0 +1,180 @@
+'''
+Created on Oct. 18, 2026
+
+Command line tool that generates randomized dataset_fields or resource_fields
+records from a scheming definition and streams them out as JSONL, one record
+per line.
+
+Records are generated in chunks using DataPopulation.populate_parallel and
+each chunk is written out as it is generated.  Only a few chunks per worker
+are in flight at a time, so memory use stays flat no matter how many records
+are requested or how slowly they are written.  Each chunk has its own seed
+derived from the run seed, so the output for a given seed and chunk size is
+the same regardless of the number of workers.
+
+example:
+
+    bcdc-datagen --data-type dataset_fields --count 1000000 --seed 42 \
+        -o datasets.jsonl
+'''
+import argparse
+import json
+import logging
+import os.path
+import random
+import sys
+
+import requests
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.bcdc_dataset_schema as bcdc_dataset_schema
+import bcdc_apitests.helpers.bcdc_dynamic_data_population as bcdc_dynamic_data_population
+import bcdc_apitests.helpers.json_codec as json_codec
+from bcdc_apitests.helpers.file_utils import FileUtils
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+DATA_TYPES = ['dataset_fields', 'resource_fields']
+DEFAULT_CHUNK_SIZE = bcdc_dynamic_data_population.DEFAULT_CHUNK_SIZE
+
+
+def load_schema_file(schema_file=None):
+    '''
+    :param schema_file: path to a json file containing the output of the
+        scheming_dataset_schema_show end point, defaults to the schema that is
+        bundled in the test_data directory.
+    :return: the scheming struct
+    '''
+    if schema_file is None:
+        schema_file = os.path.join(FileUtils().get_test_data_dir(),
+                                   'data_schema.json')
+    LOGGER.info(f"reading the schema from: {schema_file}")
+    with open(schema_file, 'r', encoding='utf8') as file_hand:
+        struct = json.load(file_hand)
+    # files saved from the api have the schema wrapped in the response
+    if 'result' in struct:
+        struct = struct['result']
+    return struct
+
+
+def load_schema_url(ckan_url, dataset_type='bcdc_dataset', timeout=None):
+    '''
+    :param ckan_url: the url to the ckan instance, example:
+        https://cadi.data.gov.bc.ca
+    :param timeout: the number of seconds to wait for the end point, defaults
+        to the BCDC_SCHEMING_TIMEOUT env var
+    :return: the scheming struct retrieved from the ckan instance
+    '''
+    if timeout is None:
+        timeout = float(os.environ.get(testConfig.BCDC_SCHEMING_TIMEOUT,
+                                       testConfig.BCDC_SCHEMING_TIMEOUT_DEFAULT))
+    api_call = f'{ckan_url}{testConfig.BCDC_REST_DIR}/scheming_dataset_schema_show'
+    LOGGER.info(f"retrieving the schema from: {api_call}")
+    resp = requests.get(api_call, params={'type': dataset_type},
+                        timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()['result']
+
+
+def batch_to_jsonl(batch):
+    '''
+    :param batch: a chunk of generated records
+    :type batch: bcdc_apitests.helpers.bcdc_dynamic_data_population.DataBatch
+    :return: the records serialized as JSONL text
+    '''
+    return ''.join([json_codec.dumps(record) + '\n' for record in batch])
+
+
+def generate(struct, data_type, count, out_hand, seed=None, overrides=None,
+             workers=1, chunk_size=DEFAULT_CHUNK_SIZE, max_pending=None):
+    '''
+    Writes count records to out_hand as JSONL.
+
+    :param struct: the scheming struct
+    :param data_type: dataset_fields or resource_fields
+    :param count: number of records to generate
+    :param out_hand: file like object to write the records to
+    :param seed: seed for the run, if not provided one is generated and logged
+        so the output can be reproduced
+    :param overrides: static values for fields
+    :param workers: number of processes to use to generate the data
+    :param max_pending: max number of chunks that are generated ahead of the
+        writes, see DataPopulation.populate_parallel
+    :return: the seed that was used
+    '''
+    if seed is None:
+        seed = random.randrange(sys.maxsize)
+    schema = bcdc_dataset_schema.BCDCDataset(dataset_type=data_type,
+                                             struct=struct)
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        schema, data_type, seed=seed)
+    # serialization happens in the workers, only text comes back
+    for text in populator.populate_parallel(count, overrides, workers,
+                                            chunk_size, batch_to_jsonl,
+                                            max_pending):
+        out_hand.write(text)
+    return seed
+
+
+def get_parser():
+    '''
+    :return: the argument parser for the command line
+    '''
+    parser = argparse.ArgumentParser(
+        description='Generate random records that comply with the BCDC ' +
+                    'scheming definitions and write them as JSONL.')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--schema', help='scheming json file to generate ' +
+                        'data for, defaults to the schema in test_data')
+    source.add_argument('--url', help='url of a ckan instance to retrieve ' +
+                        'the scheming definition from')
+    parser.add_argument('--data-type', choices=DATA_TYPES,
+                        default='dataset_fields',
+                        help='the type of record to generate')
+    parser.add_argument('--count', type=int, default=1,
+                        help='number of records to generate')
+    parser.add_argument('--seed', type=int,
+                        help='seed used to generate the data, use the same ' +
+                             'seed to get the same output')
+    parser.add_argument('--overrides', type=json.loads, default=None,
+                        help='json object with static values for fields, ' +
+                             'example: \'{"owner_org": "my_org"}\'')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of processes used to generate the data')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='number of records generated at a time')
+    parser.add_argument('--max-pending', type=int,
+                        help='max number of chunks generated ahead of the ' +
+                             'writes, defaults to two per worker')
+    parser.add_argument('-o', '--output',
+                        help='file to write the records to, defaults to stdout')
+    return parser
+
+
+def main(argv=None):
+    '''
+    entry point for the bcdc-datagen command
+    '''
+    args = get_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    if args.url:
+        struct = load_schema_url(args.url)
+    else:
+        struct = load_schema_file(args.schema)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as out_hand:
+            generate(struct, args.data_type, args.count, out_hand, args.seed,
+                     args.overrides, args.workers, args.chunk_size,
+                     args.max_pending)
+    else:
+        generate(struct, args.data_type, args.count, sys.stdout, args.seed,
+                 args.overrides, args.workers, args.chunk_size,
+                 args.max_pending)
+
+
+if __name__ == '__main__':
+    main()
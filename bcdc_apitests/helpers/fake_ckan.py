@@ -0,0 +1,1081 @@
+'''
+Created on Oct. 18, 2026
+
+An in memory stand in for the ckan action api, used to run the suite without
+a ckan instance (see the --bcdc-fake-ckan option).  Implements the actions the
+fixtures and tests use:
+
+ * package_*, dataset_purge, bulk_update_delete, resource_*
+ * organization_*, group_*, member_create, organization_member_create
+ * user_*, dashboard_activity_list
+ * tag_list, license_list, vocabulary_list, config_option_*
+ * scheming_dataset_schema_show, backed by test_data/data_schema.json
+
+Packages and resources are validated against the scheming definitions
+(required fields and select choices) and the permissions follow ckan's
+defaults: sysadmins can do anything, org admins and editors can create and
+change the packages in their org, members can only read.  GET responses have
+an ETag, a request with a matching If-None-Match header gets a 304.
+
+example:
+
+    server = FakeCKANServer()
+    server.start()
+    remote_api = ckanapi.RemoteCKAN(server.url, server.ckan.sysadmin_apikey)
+    ...
+    server.stop()
+'''
+import copy
+import datetime
+import hashlib
+import http.server
+import json
+import logging
+import os.path
+import re
+import socketserver
+import threading
+import urllib.parse
+import uuid
+
+from bcdc_apitests.helpers.file_utils import FileUtils
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+# the process wide server, see get_server()
+_SERVER = None
+_SERVER_LOCK = threading.Lock()
+
+SYSADMIN_USER = 'fake_ckan_sysadmin'
+
+# roles that can create and change the packages that belong to an org
+PACKAGE_EDIT_CAPACITIES = ['admin', 'editor']
+
+NAME_REGEX = re.compile(r'^[a-z0-9_\-]{2,100}$')
+FQ_NAME_REGEX = re.compile(r'^name:([a-z0-9_\-]*)\*$')
+
+# the licenses and vocabularies that the fake instance starts with
+DEFAULT_LICENSES = [
+    {'id': 'notspecified', 'title': 'License not specified'},
+    {'id': 'odc-pddl', 'title': 'Open Data Commons Public Domain Dedication and License (PDDL)'},
+    {'id': 'odc-odbl', 'title': 'Open Data Commons Open Database License (ODbL)'},
+    {'id': 'cc-by', 'title': 'Creative Commons Attribution'},
+    {'id': 'cc-zero', 'title': 'Creative Commons CCZero'},
+    {'id': 'other-closed', 'title': 'Other (Not Open)'}]
+DEFAULT_CONFIG_OPTIONS = {'ckan.site_title': 'BC Data Catalogue',
+                          'ckan.site_description': '',
+                          'ckan.site_about': '',
+                          'ckan.site_intro_text': '',
+                          'ckan.site_custom_css': '',
+                          'ckan.main_css': '/base/css/main.css',
+                          'ckan.homepage_style': '1'}
+ISO_TOPIC_VOCABULARY = 'iso_topic_category'
+
+
+class ActionError(Exception):
+    '''
+    base class for the errors returned by the actions, the status and type
+    are the http status and the __type that ckan returns.
+    '''
+    status = 500
+    error_type = 'Internal Server Error'
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or {}
+
+    def get_error(self):
+        '''
+        :return: the error struct that goes in the response
+        '''
+        error = {'__type': self.error_type, 'message': self.message}
+        error.update(self.errors)
+        return error
+
+
+class BadRequest(ActionError):
+    '''
+    the action doesn't exist
+    '''
+    status = 400
+    error_type = 'Bad Request'
+
+
+class NotAuthorized(ActionError):
+    '''
+    the user isn't allowed to call the action
+    '''
+    status = 403
+    error_type = 'Authorization Error'
+
+
+class NotFound(ActionError):
+    '''
+    the object the action refers to doesn't exist
+    '''
+    status = 404
+    error_type = 'Not Found Error'
+
+
+class ValidationError(ActionError):
+    '''
+    the data sent to the action isn't valid, errors is a dictionary of field
+    name to a list of messages
+    '''
+    status = 409
+    error_type = 'Validation Error'
+
+    def __init__(self, errors):
+        super().__init__('Validation Error', errors)
+
+
+def now():
+    '''
+    :return: the current time formatted like ckan timestamps
+    '''
+    return datetime.datetime.utcnow().isoformat()
+
+
+def as_bool(value):
+    '''
+    :return: the value as a boolean, handles the strings sent in query strings
+    '''
+    if isinstance(value, str):
+        return value.lower() in ['true', '1', 'yes', 'on']
+    return bool(value)
+
+
+def get_required(data_dict, key):
+    '''
+    :return: the value for key in the data_dict
+    :raises ValidationError: if the key is missing
+    '''
+    value = data_dict.get(key)
+    if value in [None, '']:
+        raise ValidationError({key: ['Missing value']})
+    return value
+
+
+class FakeCKAN():
+    '''
+    the in memory state of the fake ckan instance and its actions.  Each
+    action is a method called action_<action name> that receives the user
+    making the call (None for anonymous calls) and the data sent with the call.
+
+    :param scheming_struct: the result of scheming_dataset_schema_show, defaults
+        to the struct in test_data/data_schema.json
+    :param sysadmin_apikey: the api key for the sysadmin user, defaults to a
+        random key
+    :param url: the url the instance is served from, used in the help links
+    '''
+
+    def __init__(self, scheming_struct=None, sysadmin_apikey=None, url=''):
+        if scheming_struct is None:
+            data_schema_file = os.path.join(FileUtils().get_test_data_dir(),
+                                            'data_schema.json')
+            with open(data_schema_file, 'r', encoding='utf8') as file_hand:
+                scheming_struct = json.load(file_hand)['result']
+        self.scheming_struct = scheming_struct
+        self.url = url
+        self.lock = threading.RLock()
+
+        self.users = {}
+        self.groups = {}  # both groups and orgs, like ckan
+        self.packages = {}
+        self.activities = []
+        self.config_options = dict(DEFAULT_CONFIG_OPTIONS)
+        self.licenses = copy.deepcopy(DEFAULT_LICENSES)
+        self.vocabularies = {}
+        self.action_cnt = 0
+
+        self.sysadmin_apikey = sysadmin_apikey or str(uuid.uuid4())
+        self.__add_user({'name': SYSADMIN_USER, 'email': 'sysadmin@localhost',
+                         'sysadmin': True, 'apikey': self.sysadmin_apikey})
+        self.__add_vocabulary(ISO_TOPIC_VOCABULARY, self.__get_choices(
+            'resource_fields', 'iso_topic_string'))
+
+    # --------------------- dispatch ----------------------
+
+    def call(self, action, data_dict, apikey=None):
+        '''
+        calls an action
+
+        :param action: the name of the action
+        :param data_dict: the data sent with the call
+        :param apikey: the api key sent with the call
+        :return: the result of the action
+        :raises ActionError: if the call fails
+        '''
+        func = getattr(self, f'action_{action}', None)
+        if func is None:
+            raise BadRequest(f'Bad request - Action name not known: {action}')
+        with self.lock:
+            self.action_cnt += 1
+            user = self.__get_user_by_apikey(apikey)
+            return func(user, data_dict)
+
+    def get_response(self, action, data_dict, apikey=None):
+        '''
+        calls an action and formats the result like the ckan action api
+
+        :return: a tuple with the http status and the response struct
+        '''
+        resp = {'help': f'{self.url}/api/3/action/help_show?name={action}'}
+        try:
+            resp['result'] = self.call(action, data_dict, apikey)
+            resp['success'] = True
+            status = 200
+        except ActionError as err:
+            LOGGER.debug(f"fake ckan {action} failed: {err.get_error()}")
+            resp['error'] = err.get_error()
+            resp['success'] = False
+            status = err.status
+        return status, resp
+
+    # --------------------- auth ----------------------
+
+    def __get_user_by_apikey(self, apikey):
+        if not apikey:
+            return None
+        for user in self.users.values():
+            if user['apikey'] == apikey and user['state'] == 'active':
+                return user
+        return None
+
+    @staticmethod
+    def __require_user(user):
+        if user is None:
+            raise NotAuthorized('You must be logged in to perform this action')
+
+    def __require_sysadmin(self, user, action):
+        self.__require_user(user)
+        if not user['sysadmin']:
+            raise NotAuthorized(f'User {user["name"]} not authorized to {action}')
+
+    def __get_capacity(self, user, group):
+        '''
+        :return: the capacity of the user in the group or org, None if they
+            aren't a member
+        '''
+        if user is None:
+            return None
+        return group['members'].get(user['id'])
+
+    def __require_group_admin(self, user, group, action):
+        self.__require_user(user)
+        if not user['sysadmin'] and self.__get_capacity(user, group) != 'admin':
+            raise NotAuthorized(f'User {user["name"]} not authorized to {action}')
+
+    def __require_package_edit(self, user, org_id, action):
+        self.__require_user(user)
+        if user['sysadmin']:
+            return
+        org = self.groups.get(org_id)
+        if org is None or \
+                self.__get_capacity(user, org) not in PACKAGE_EDIT_CAPACITIES:
+            msg = f'User {user["name"]} not authorized to {action}'
+            raise NotAuthorized(msg)
+
+    def __add_activity(self, user, activity_type, object_id):
+        self.activities.append({'id': str(uuid.uuid4()),
+                                'timestamp': now(),
+                                'user_id': user['id'],
+                                'object_id': object_id,
+                                'activity_type': activity_type})
+
+    # --------------------- scheming ----------------------
+
+    def __get_fields(self, fields_type):
+        return self.scheming_struct.get(fields_type, [])
+
+    def __get_choices(self, fields_type, field_name):
+        for field in self.__get_fields(fields_type):
+            if field['field_name'] == field_name:
+                return [choice['value'] for choice in field.get('choices', [])]
+        return []
+
+    def __validate(self, fields_type, data_dict):
+        '''
+        checks the required fields and the select choices defined in the
+        scheming struct.  Fields with a conditional_field are only required
+        when the conditional field has one of the conditional_values.
+
+        :raises ValidationError: if the data isn't valid
+        '''
+        errors = {}
+        for field in self.__get_fields(fields_type):
+            field_name = field['field_name']
+            validators = field.get('validators', '')
+            value = data_dict.get(field_name)
+            required = field.get('required') and \
+                ('scheming_required' in validators or 'not_empty' in validators)
+            required = required or 'conditional_required' in validators
+            if 'conditional_field' in field:
+                required = required and data_dict.get(field['conditional_field']) in \
+                    field.get('conditional_values', [])
+            if required and value in [None, '', []]:
+                errors[field_name] = ['Missing value']
+            elif value not in [None, ''] and 'scheming_choices' in validators:
+                choices = [choice['value'] for choice in field.get('choices', [])]
+                if value not in choices:
+                    errors[field_name] = ['Value must be one of: ' +
+                                          '; '.join(choices)]
+        if errors:
+            raise ValidationError(errors)
+
+    def action_scheming_dataset_schema_show(self, user, data_dict):  # pylint: disable=unused-argument
+        '''
+        the schema that generated data is based on
+        '''
+        return copy.deepcopy(self.scheming_struct)
+
+    def action_status_show(self, user, data_dict):  # pylint: disable=unused-argument
+        return {'site_title': self.config_options['ckan.site_title'],
+                'site_url': self.url,
+                'ckan_version': '2.8.2',
+                'extensions': ['scheming_datasets', 'bcgov']}
+
+    # --------------------- users ----------------------
+
+    def __add_user(self, data_dict):
+        user = {'id': str(uuid.uuid4()),
+                'name': data_dict['name'],
+                'email': data_dict.get('email'),
+                'fullname': data_dict.get('fullname'),
+                'display_name': data_dict.get('fullname') or data_dict['name'],
+                'state': 'active',
+                'sysadmin': data_dict.get('sysadmin', False),
+                'apikey': data_dict.get('apikey') or str(uuid.uuid4()),
+                'created': now()}
+        self.users[user['id']] = user
+        return user
+
+    def __get_user(self, user_id, include_deleted=True):
+        for user in self.users.values():
+            if user_id in [user['id'], user['name']] and \
+                    (include_deleted or user['state'] == 'active'):
+                return user
+        raise NotFound('User not found')
+
+    def __user_dict(self, user, calling_user, include_datasets=False):
+        user_dict = copy.deepcopy(user)
+        if calling_user is None or \
+                (not calling_user['sysadmin'] and calling_user['id'] != user['id']):
+            del user_dict['apikey']
+            del user_dict['email']
+        user_dict['number_created_packages'] = len(
+            [pkg for pkg in self.packages.values()
+             if pkg['creator_user_id'] == user['id']])
+        if include_datasets:
+            user_dict['datasets'] = [
+                self.__package_dict(pkg) for pkg in self.packages.values()
+                if pkg['creator_user_id'] == user['id'] and pkg['state'] == 'active']
+        return user_dict
+
+    def action_user_show(self, user, data_dict):
+        user_id = get_required(data_dict, 'id')
+        if isinstance(user_id, list):
+            user_id = user_id[0]
+        return self.__user_dict(self.__get_user(user_id), user,
+                                as_bool(data_dict.get('include_datasets', False)))
+
+    def action_user_list(self, user, data_dict):  # pylint: disable=unused-argument
+        query = (data_dict.get('q') or '').lower()
+        return [self.__user_dict(usr, user) for usr in self.users.values()
+                if usr['state'] == 'active' and
+                query in ' '.join([usr['name'], usr.get('fullname') or '']).lower()]
+
+    def action_user_create(self, user, data_dict):
+        self.__require_sysadmin(user, 'create users')
+        name = get_required(data_dict, 'name')
+        get_required(data_dict, 'email')
+        get_required(data_dict, 'password')
+        if any(usr['name'] == name for usr in self.users.values()):
+            raise ValidationError({'name': ['The username is already associated ' +
+                                            'with another account.']})
+        if not NAME_REGEX.match(name):
+            raise ValidationError({'name': ['Must be purely lowercase alphanumeric ' +
+                                            '(ascii) characters and these symbols: -_']})
+        new_user = self.__add_user(data_dict)
+        return self.__user_dict(new_user, user)
+
+    def action_user_update(self, user, data_dict):
+        self.__require_user(user)
+        usr = self.__get_user(get_required(data_dict, 'id'))
+        if not user['sysadmin'] and user['id'] != usr['id']:
+            raise NotAuthorized(f'User {user["name"]} not authorized to edit ' +
+                                f'user {usr["name"]}')
+        get_required(data_dict, 'email')
+        for key in ['email', 'fullname', 'state']:
+            if key in data_dict:
+                usr[key] = data_dict[key]
+        return self.__user_dict(usr, user)
+
+    def action_user_patch(self, user, data_dict):
+        usr = self.__get_user(get_required(data_dict, 'id'))
+        patched = {'email': usr['email']}
+        patched.update(data_dict)
+        return self.action_user_update(user, patched)
+
+    def action_user_delete(self, user, data_dict):
+        self.__require_sysadmin(user, 'delete users')
+        usr = self.__get_user(get_required(data_dict, 'id'))
+        usr['state'] = 'deleted'
+        for group in self.groups.values():
+            group['members'].pop(usr['id'], None)
+
+    def action_dashboard_activity_list(self, user, data_dict):  # pylint: disable=unused-argument
+        self.__require_user(user)
+        return [activity for activity in reversed(self.activities)
+                if activity['user_id'] == user['id']]
+
+    # --------------------- groups and orgs ----------------------
+
+    def __get_group(self, group_id, is_org):
+        for group in self.groups.values():
+            if group_id in [group['id'], group['name']] and \
+                    group['is_organization'] == is_org:
+                return group
+        raise NotFound(('Organization' if is_org else 'Group') + ' was not found.')
+
+    def __group_dict(self, group, all_fields=True):
+        if not all_fields:
+            return group['name']
+        group_dict = {key: copy.deepcopy(value) for key, value in group.items()
+                      if key != 'members'}
+        group_dict['users'] = []
+        for user_id, capacity in group['members'].items():
+            usr = self.users[user_id]
+            group_dict['users'].append({'id': usr['id'], 'name': usr['name'],
+                                        'capacity': capacity})
+        if group['is_organization']:
+            group_dict['package_count'] = len(
+                [pkg for pkg in self.packages.values()
+                 if pkg['owner_org'] == group['id'] and pkg['state'] == 'active'])
+        else:
+            group_dict['package_count'] = len(
+                [pkg for pkg in self.packages.values()
+                 if group['id'] in pkg['groups'] and pkg['state'] == 'active'])
+        return group_dict
+
+    def __set_members(self, group, users):
+        group['members'] = {}
+        for member in users or []:
+            usr = self.__get_user(member['name'], include_deleted=False)
+            group['members'][usr['id']] = member.get('capacity', 'member')
+
+    def __group_create(self, user, data_dict, is_org):
+        self.__require_sysadmin(user, 'create groups')
+        name = get_required(data_dict, 'name')
+        if any(group['name'] == name for group in self.groups.values()):
+            raise ValidationError({'name': ['Group name already exists in database']})
+        if not NAME_REGEX.match(name):
+            raise ValidationError({'name': ['Must be purely lowercase alphanumeric ' +
+                                            '(ascii) characters and these symbols: -_']})
+        group = {key: copy.deepcopy(value) for key, value in data_dict.items()
+                 if key not in ['users', 'groups']}
+        group.update({'id': str(uuid.uuid4()),
+                      'name': name,
+                      'title': data_dict.get('title') or name,
+                      'state': data_dict.get('state', 'active'),
+                      'is_organization': is_org,
+                      'type': 'organization' if is_org else 'group',
+                      'created': now()})
+        self.__set_members(group, data_dict.get('users'))
+        # the creator becomes an admin like ckan
+        group['members'].setdefault(user['id'], 'admin')
+        self.groups[group['id']] = group
+        return self.__group_dict(group)
+
+    def __group_update(self, user, data_dict, is_org, patch):
+        group = self.__get_group(get_required(data_dict, 'id'), is_org)
+        self.__require_group_admin(user, group, 'edit groups')
+        if 'name' in data_dict and data_dict['name'] != group['name'] and \
+                any(grp['name'] == data_dict['name'] for grp in self.groups.values()):
+            raise ValidationError({'name': ['Group name already exists in database']})
+        if not patch:
+            for key in list(group):
+                if key not in ['id', 'name', 'is_organization', 'type', 'created',
+                               'members', 'state']:
+                    del group[key]
+        for key, value in data_dict.items():
+            if key not in ['id', 'users', 'groups', 'is_organization', 'type']:
+                group[key] = copy.deepcopy(value)
+        if 'users' in data_dict:
+            self.__set_members(group, data_dict['users'])
+        return self.__group_dict(group)
+
+    def __group_delete(self, user, data_dict, is_org):
+        group = self.__get_group(get_required(data_dict, 'id'), is_org)
+        self.__require_group_admin(user, group, 'delete groups')
+        group['state'] = 'deleted'
+
+    def __group_purge(self, user, data_dict, is_org):
+        self.__require_sysadmin(user, 'purge groups')
+        group = self.__get_group(get_required(data_dict, 'id'), is_org)
+        del self.groups[group['id']]
+        for pkg in self.packages.values():
+            if pkg['owner_org'] == group['id']:
+                pkg['owner_org'] = None
+            if group['id'] in pkg['groups']:
+                pkg['groups'].remove(group['id'])
+
+    def __group_list(self, data_dict, is_org):
+        all_fields = as_bool(data_dict.get('all_fields', False))
+        groups = [group for group in self.groups.values()
+                  if group['is_organization'] == is_org and group['state'] == 'active']
+        groups.sort(key=lambda group: group['name'])
+        offset = int(data_dict.get('offset', 0))
+        if data_dict.get('limit') is not None:
+            groups = groups[offset:offset + int(data_dict['limit'])]
+        else:
+            groups = groups[offset:]
+        return [self.__group_dict(group, all_fields) for group in groups]
+
+    def __member_create(self, user, group, object_id, object_type, capacity):
+        self.__require_group_admin(user, group, 'add members')
+        if object_type == 'user':
+            usr = self.__get_user(object_id, include_deleted=False)
+            group['members'][usr['id']] = capacity
+        elif object_type == 'package':
+            pkg = self.__get_package(object_id)
+            if group['id'] not in pkg['groups']:
+                pkg['groups'].append(group['id'])
+        else:
+            raise ValidationError({'object_type': ['Invalid object type']})
+        return {'table_id': object_id, 'table_name': object_type,
+                'group_id': group['id'], 'capacity': capacity, 'state': 'active'}
+
+    def action_organization_show(self, user, data_dict):  # pylint: disable=unused-argument
+        return self.__group_dict(self.__get_group(get_required(data_dict, 'id'), True))
+
+    def action_organization_list(self, user, data_dict):  # pylint: disable=unused-argument
+        return self.__group_list(data_dict, True)
+
+    def action_organization_list_related(self, user, data_dict):  # pylint: disable=unused-argument
+        '''
+        bcdc extension that returns the orgs with all their fields
+        '''
+        return self.__group_list({'all_fields': True}, True)
+
+    def action_organization_list_for_user(self, user, data_dict):  # pylint: disable=unused-argument
+        self.__require_user(user)
+        return [self.__group_dict(group) for group in self.groups.values()
+                if group['is_organization'] and group['state'] == 'active' and
+                (user['sysadmin'] or user['id'] in group['members'])]
+
+    def action_organization_create(self, user, data_dict):
+        return self.__group_create(user, data_dict, True)
+
+    def action_organization_update(self, user, data_dict):
+        return self.__group_update(user, data_dict, True, False)
+
+    def action_organization_patch(self, user, data_dict):
+        return self.__group_update(user, data_dict, True, True)
+
+    def action_organization_delete(self, user, data_dict):
+        self.__group_delete(user, data_dict, True)
+
+    def action_organization_purge(self, user, data_dict):
+        self.__group_purge(user, data_dict, True)
+
+    def action_organization_member_create(self, user, data_dict):
+        group = self.__get_group(get_required(data_dict, 'id'), True)
+        return self.__member_create(user, group, get_required(data_dict, 'username'),
+                                    'user', get_required(data_dict, 'role'))
+
+    def action_group_show(self, user, data_dict):  # pylint: disable=unused-argument
+        return self.__group_dict(self.__get_group(get_required(data_dict, 'id'), False))
+
+    def action_group_list(self, user, data_dict):  # pylint: disable=unused-argument
+        return self.__group_list(data_dict, False)
+
+    def action_group_create(self, user, data_dict):
+        return self.__group_create(user, data_dict, False)
+
+    def action_group_update(self, user, data_dict):
+        return self.__group_update(user, data_dict, False, False)
+
+    def action_group_patch(self, user, data_dict):
+        return self.__group_update(user, data_dict, False, True)
+
+    def action_group_delete(self, user, data_dict):
+        self.__group_delete(user, data_dict, False)
+
+    def action_group_purge(self, user, data_dict):
+        self.__group_purge(user, data_dict, False)
+
+    def action_member_create(self, user, data_dict):
+        group_id = get_required(data_dict, 'id')
+        group = None
+        for grp in self.groups.values():
+            if group_id in [grp['id'], grp['name']]:
+                group = grp
+        if group is None:
+            raise NotFound('Group was not found.')
+        return self.__member_create(user, group, get_required(data_dict, 'object'),
+                                    get_required(data_dict, 'object_type'),
+                                    get_required(data_dict, 'capacity'))
+
+    # --------------------- packages ----------------------
+
+    def __get_package(self, package_id):
+        for pkg in self.packages.values():
+            if package_id in [pkg['id'], pkg['name']]:
+                return pkg
+        raise NotFound('Dataset not found')
+
+    def __get_resource(self, resource_id):
+        for pkg in self.packages.values():
+            for rsrc in pkg['resources']:
+                if rsrc['id'] == resource_id:
+                    return pkg, rsrc
+        raise NotFound('Resource was not found.')
+
+    def __package_dict(self, pkg):
+        pkg_dict = copy.deepcopy(pkg)
+        org = self.groups.get(pkg['owner_org'])
+        pkg_dict['organization'] = None
+        if org is not None:
+            pkg_dict['organization'] = {key: org[key] for key in
+                                        ['id', 'name', 'title', 'state', 'type']}
+        pkg_dict['groups'] = [{'id': grp_id, 'name': self.groups[grp_id]['name']}
+                              for grp_id in pkg['groups'] if grp_id in self.groups]
+        pkg_dict['num_resources'] = len(pkg['resources'])
+        pkg_dict['num_tags'] = len(pkg['tags'])
+        return pkg_dict
+
+    def __check_package_visible(self, user, pkg):
+        '''
+        deleted packages can only be seen by users that can edit them
+        '''
+        if pkg['state'] != 'active':
+            self.__require_package_edit(user, pkg['owner_org'], 'read package')
+
+    def __get_org_id(self, org_id):
+        if org_id in [None, '']:
+            raise ValidationError({'owner_org': ['Missing value']})
+        try:
+            return self.__get_group(org_id, True)['id']
+        except NotFound:
+            raise ValidationError({'owner_org': ['Organization does not exist']})
+
+    @staticmethod
+    def __get_tags(data_dict):
+        if 'tags' in data_dict:
+            return [{'name': tag['name'], 'vocabulary_id': tag.get('vocabulary_id')}
+                    for tag in data_dict['tags']]
+        tag_string = data_dict.get('tag_string') or ''
+        return [{'name': tag.strip(), 'vocabulary_id': None}
+                for tag in tag_string.split(',') if tag.strip()]
+
+    def __new_resource(self, pkg_id, data_dict, position):
+        self.__validate('resource_fields', data_dict)
+        rsrc = copy.deepcopy(data_dict)
+        rsrc.update({'id': data_dict.get('id') or str(uuid.uuid4()),
+                     'package_id': pkg_id,
+                     'position': position,
+                     'state': 'active',
+                     'created': rsrc.get('created', now()),
+                     'last_modified': now()})
+        return rsrc
+
+    def __build_package(self, data_dict, pkg=None):
+        '''
+        validates the data and builds the stored package, pkg is the existing
+        package when updating
+        '''
+        self.__validate('dataset_fields', data_dict)
+        name = get_required(data_dict, 'name')
+        if not NAME_REGEX.match(name):
+            raise ValidationError({'name': ['Must be purely lowercase alphanumeric ' +
+                                            '(ascii) characters and these symbols: -_']})
+        # like ckan the names of deleted packages can be re-used
+        for existing in list(self.packages.values()):
+            if existing['name'] == name and (pkg is None or existing['id'] != pkg['id']):
+                if existing['state'] != 'deleted':
+                    raise ValidationError({'name': ['That URL is already in use.']})
+                del self.packages[existing['id']]
+        new_pkg = {key: copy.deepcopy(value) for key, value in data_dict.items()
+                   if key not in ['resources', 'tags', 'groups', 'organization']}
+        pkg_id = pkg['id'] if pkg is not None else str(uuid.uuid4())
+        new_pkg.update({'id': pkg_id,
+                        'name': name,
+                        'title': data_dict.get('title') or name,
+                        'owner_org': self.__get_org_id(data_dict.get('owner_org')),
+                        'state': data_dict.get('state') or 'active',
+                        'type': 'bcdc_dataset',
+                        'tags': self.__get_tags(data_dict),
+                        'metadata_modified': now()})
+        if pkg is None:
+            new_pkg['metadata_created'] = new_pkg['metadata_modified']
+            new_pkg['groups'] = []
+        else:
+            new_pkg['metadata_created'] = pkg['metadata_created']
+            new_pkg['creator_user_id'] = pkg['creator_user_id']
+            new_pkg['groups'] = pkg['groups']
+        if 'resources' in data_dict:
+            new_pkg['resources'] = [
+                self.__new_resource(pkg_id, rsrc, position)
+                for position, rsrc in enumerate(data_dict['resources'])]
+        else:
+            new_pkg['resources'] = pkg['resources'] if pkg is not None else []
+        return new_pkg
+
+    def action_package_show(self, user, data_dict):
+        pkg = self.__get_package(get_required(data_dict, 'id'))
+        self.__check_package_visible(user, pkg)
+        return self.__package_dict(pkg)
+
+    def action_package_create(self, user, data_dict):
+        self.__require_package_edit(user, self.__get_org_id(data_dict.get('owner_org')),
+                                    'create package')
+        pkg = self.__build_package(data_dict)
+        pkg['creator_user_id'] = user['id']
+        self.packages[pkg['id']] = pkg
+        self.__add_activity(user, 'new package', pkg['id'])
+        return self.__package_dict(pkg)
+
+    def action_package_update(self, user, data_dict):
+        pkg = self.__get_package(data_dict.get('id') or get_required(data_dict, 'name'))
+        self.__require_package_edit(user, pkg['owner_org'], 'edit package')
+        self.__require_package_edit(user, self.__get_org_id(data_dict.get('owner_org')),
+                                    'edit package')
+        new_pkg = self.__build_package(data_dict, pkg)
+        self.packages[pkg['id']] = new_pkg
+        self.__add_activity(user, 'changed package', pkg['id'])
+        return self.__package_dict(new_pkg)
+
+    def action_package_patch(self, user, data_dict):
+        pkg = self.__get_package(get_required(data_dict, 'id'))
+        patched = self.__package_dict(pkg)
+        patched.update(data_dict)
+        patched['id'] = pkg['id']
+        return self.action_package_update(user, patched)
+
+    def action_package_delete(self, user, data_dict):
+        pkg = self.__get_package(get_required(data_dict, 'id'))
+        self.__require_package_edit(user, pkg['owner_org'], 'delete package')
+        pkg['state'] = 'deleted'
+        self.__add_activity(user, 'deleted package', pkg['id'])
+
+    def action_dataset_purge(self, user, data_dict):
+        self.__require_sysadmin(user, 'purge datasets')
+        pkg = self.__get_package(get_required(data_dict, 'id'))
+        del self.packages[pkg['id']]
+
+    def action_bulk_update_delete(self, user, data_dict):
+        org_id = self.__get_group(get_required(data_dict, 'org_id'), True)['id']
+        self.__require_package_edit(user, org_id, 'delete packages')
+        datasets = get_required(data_dict, 'datasets')
+        for pkg in self.packages.values():
+            if pkg['owner_org'] == org_id and pkg['id'] in datasets:
+                pkg['state'] = 'deleted'
+
+    def __active_packages(self):
+        pkgs = [pkg for pkg in self.packages.values() if pkg['state'] == 'active']
+        pkgs.sort(key=lambda pkg: pkg['metadata_modified'], reverse=True)
+        return pkgs
+
+    def action_package_list(self, user, data_dict):  # pylint: disable=unused-argument
+        names = sorted(pkg['name'] for pkg in self.__active_packages())
+        offset = int(data_dict.get('offset', 0))
+        if data_dict.get('limit') is not None:
+            return names[offset:offset + int(data_dict['limit'])]
+        return names[offset:]
+
+    def action_package_search(self, user, data_dict):  # pylint: disable=unused-argument
+        query = (data_dict.get('q') or '').lower()
+        if query in ['*:*', '*']:
+            query = ''
+        pkgs = self.__active_packages()
+        if as_bool(data_dict.get('include_deleted', False)):
+            pkgs = sorted(self.packages.values(),
+                          key=lambda pkg: pkg['metadata_modified'], reverse=True)
+        # only the name:<prefix>* filter query is supported
+        name_prefix = None
+        fq_match = FQ_NAME_REGEX.match(data_dict.get('fq') or '')
+        if fq_match:
+            name_prefix = fq_match.group(1)
+        pkgs = [pkg for pkg in pkgs
+                if query in ' '.join([pkg['name'], pkg['title'],
+                                      pkg.get('notes') or '']).lower() and
+                (name_prefix is None or pkg['name'].startswith(name_prefix))]
+        start = int(data_dict.get('start', 0))
+        rows = int(data_dict.get('rows', 10))
+        return {'count': len(pkgs),
+                'results': [self.__package_dict(pkg) for pkg in pkgs[start:start + rows]],
+                'sort': 'metadata_modified desc',
+                'facets': {},
+                'search_facets': {}}
+
+    def action_package_autocomplete(self, user, data_dict):  # pylint: disable=unused-argument
+        query = (data_dict.get('q') or '').lower()
+        limit = int(data_dict.get('limit', 10))
+        matches = []
+        for pkg in self.__active_packages():
+            for field in ['name', 'title']:
+                if query in pkg[field].lower():
+                    matches.append({'name': pkg['name'], 'title': pkg['title'],
+                                    'match_field': field,
+                                    'match_displayed': pkg[field]})
+                    break
+        return matches[:limit]
+
+    def action_resource_show(self, user, data_dict):
+        pkg, rsrc = self.__get_resource(get_required(data_dict, 'id'))
+        self.__check_package_visible(user, pkg)
+        return copy.deepcopy(rsrc)
+
+    def action_resource_create(self, user, data_dict):
+        pkg = self.__get_package(get_required(data_dict, 'package_id'))
+        self.__require_package_edit(user, pkg['owner_org'], 'create resources')
+        rsrc = self.__new_resource(pkg['id'], data_dict, len(pkg['resources']))
+        pkg['resources'].append(rsrc)
+        pkg['metadata_modified'] = now()
+        self.__add_activity(user, 'changed package', pkg['id'])
+        return copy.deepcopy(rsrc)
+
+    def action_resource_update(self, user, data_dict):
+        pkg, rsrc = self.__get_resource(get_required(data_dict, 'id'))
+        self.__require_package_edit(user, pkg['owner_org'], 'edit resources')
+        new_rsrc = self.__new_resource(pkg['id'], data_dict, rsrc['position'])
+        new_rsrc['created'] = rsrc['created']
+        pkg['resources'][rsrc['position']] = new_rsrc
+        pkg['metadata_modified'] = now()
+        self.__add_activity(user, 'changed package', pkg['id'])
+        return copy.deepcopy(new_rsrc)
+
+    def action_resource_patch(self, user, data_dict):
+        _, rsrc = self.__get_resource(get_required(data_dict, 'id'))
+        patched = copy.deepcopy(rsrc)
+        patched.update(data_dict)
+        return self.action_resource_update(user, patched)
+
+    def action_resource_delete(self, user, data_dict):
+        pkg, rsrc = self.__get_resource(get_required(data_dict, 'id'))
+        self.__require_package_edit(user, pkg['owner_org'], 'delete resources')
+        pkg['resources'].remove(rsrc)
+        for position, remaining in enumerate(pkg['resources']):
+            remaining['position'] = position
+        pkg['metadata_modified'] = now()
+
+    def action_resource_search(self, user, data_dict):  # pylint: disable=unused-argument
+        '''
+        supports queries in the form field:term, a resource matches if the
+        field contains the term
+        '''
+        queries = data_dict.get('query') or []
+        if isinstance(queries, str):
+            queries = [queries]
+        terms = []
+        for query in queries:
+            if ':' not in query:
+                raise ValidationError({'query': ['Search Query is invalid: ' + query]})
+            field, term = query.split(':', 1)
+            terms.append((field, term.lower()))
+        results = []
+        for pkg in self.__active_packages():
+            for rsrc in pkg['resources']:
+                if all(term in str(rsrc.get(field) or '').lower()
+                       for field, term in terms):
+                    results.append(copy.deepcopy(rsrc))
+        return {'count': len(results), 'results': results}
+
+    # --------------------- tags, licenses, vocabularies, config ----------------------
+
+    def action_tag_list(self, user, data_dict):  # pylint: disable=unused-argument
+        vocabulary_id = data_dict.get('vocabulary_id')
+        if vocabulary_id:
+            vocab = self.__get_vocabulary(vocabulary_id)
+            return [tag['name'] for tag in vocab['tags']]
+        tags = set()
+        for pkg in self.__active_packages():
+            tags.update(tag['name'] for tag in pkg['tags'] if not tag['vocabulary_id'])
+        return sorted(tags)
+
+    def action_license_list(self, user, data_dict):  # pylint: disable=unused-argument
+        return copy.deepcopy(self.licenses)
+
+    def __add_vocabulary(self, name, tags):
+        vocab = {'id': str(uuid.uuid4()), 'name': name}
+        vocab['tags'] = [{'id': str(uuid.uuid4()), 'name': tag,
+                          'vocabulary_id': vocab['id']} for tag in tags]
+        self.vocabularies[vocab['id']] = vocab
+        return vocab
+
+    def __get_vocabulary(self, vocab_id):
+        for vocab in self.vocabularies.values():
+            if vocab_id in [vocab['id'], vocab['name']]:
+                return vocab
+        raise NotFound('Could not find vocabulary')
+
+    def action_vocabulary_list(self, user, data_dict):  # pylint: disable=unused-argument
+        return copy.deepcopy(list(self.vocabularies.values()))
+
+    def action_vocabulary_show(self, user, data_dict):  # pylint: disable=unused-argument
+        return copy.deepcopy(self.__get_vocabulary(get_required(data_dict, 'id')))
+
+    def action_vocabulary_create(self, user, data_dict):
+        self.__require_sysadmin(user, 'create vocabularies')
+        name = get_required(data_dict, 'name')
+        if any(vocab['name'] == name for vocab in self.vocabularies.values()):
+            raise ValidationError({'name': ['That vocabulary name is already in use.']})
+        tags = [tag['name'] for tag in data_dict.get('tags', [])]
+        return copy.deepcopy(self.__add_vocabulary(name, tags))
+
+    def action_config_option_list(self, user, data_dict):  # pylint: disable=unused-argument
+        self.__require_sysadmin(user, 'list config options')
+        return sorted(self.config_options)
+
+    def action_config_option_show(self, user, data_dict):
+        self.__require_sysadmin(user, 'show config options')
+        key = get_required(data_dict, 'key')
+        if key not in self.config_options:
+            raise ValidationError({'key': [f'Configuration option \'{key}\' can not ' +
+                                           'be shown']})
+        return self.config_options[key]
+
+    def action_config_option_update(self, user, data_dict):
+        self.__require_sysadmin(user, 'update config options')
+        for key, value in data_dict.items():
+            if key not in self.config_options:
+                raise ValidationError({key: ['Configuration option can not be updated']})
+            self.config_options[key] = value
+        return dict(self.config_options)
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    '''
+    http server that handles each connection in a thread
+    '''
+    daemon_threads = True
+
+
+class FakeCKANHandler(http.server.BaseHTTPRequestHandler):
+    '''
+    translates http requests to the ckan action api into calls to the
+    FakeCKAN object attached to the server
+    '''
+    protocol_version = 'HTTP/1.1'
+    # the headers and body are written separately, without this the client
+    # waits on a delayed ack for every keep alive request
+    disable_nagle_algorithm = True
+    action_regex = re.compile(r'^/api(?:/3)?/action/(\w+)/?$')
+
+    def handle_action(self):
+        url = urllib.parse.urlsplit(self.path)
+        match = self.action_regex.match(url.path)
+        data_dict = {}
+        for key, values in urllib.parse.parse_qs(url.query).items():
+            data_dict[key] = values[0] if len(values) == 1 else values
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        if body:
+            content_type = self.headers.get('Content-Type', '')
+            if 'x-www-form-urlencoded' in content_type:
+                for key, values in urllib.parse.parse_qs(body.decode('utf8')).items():
+                    data_dict[key] = values[0] if len(values) == 1 else values
+            else:
+                try:
+                    data_dict.update(json.loads(body))
+                except ValueError:
+                    self.respond(400, {'success': False, 'error': {
+                        'message': 'Bad request - JSON Error: could not decode body'}})
+                    return
+
+        if match is None:
+            self.respond(404, {'success': False,
+                               'error': {'message': f'Not found: {url.path}'}})
+            return
+        apikey = self.headers.get('X-CKAN-API-Key') or self.headers.get('Authorization')
+        status, resp = self.server.ckan.get_response(match.group(1), data_dict, apikey)
+        self.respond(status, resp)
+
+    def respond(self, status, resp):
+        body = json.dumps(resp).encode('utf8')
+        etag = None
+        if self.command == 'GET' and status == 200:
+            # lets the clients revalidate the responses they keep
+            etag = '"{0}"'.format(hashlib.sha256(body).hexdigest()[:32])
+            if self.headers.get('If-None-Match') == etag:
+                status, body = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = handle_action
+    do_POST = handle_action
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        LOGGER.debug(format, *args)
+
+
+class FakeCKANServer():
+    '''
+    serves a FakeCKAN instance over http on a local port, in a background
+    thread.
+
+    :param ckan: the fake ckan instance to serve, defaults to a new instance
+    :param host: the interface to listen on
+    :param port: the port to listen on, 0 picks a free port
+    '''
+
+    def __init__(self, ckan=None, host='127.0.0.1', port=0):
+        self.ckan = ckan if ckan is not None else FakeCKAN()
+        self.server = ThreadingHTTPServer((host, port), FakeCKANHandler)
+        self.server.ckan = self.ckan
+        self.url = f'http://{host}:{self.server.server_address[1]}'
+        self.ckan.url = self.url
+        self.thread = None
+
+    def start(self):
+        '''
+        starts serving requests
+        '''
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       name='fake_ckan', daemon=True)
+        self.thread.start()
+        LOGGER.info(f"fake ckan is running at {self.url}")
+
+    def stop(self):
+        '''
+        stops the server
+        '''
+        self.server.shutdown()
+        self.server.server_close()
+        LOGGER.info(f"fake ckan stopped, {self.ckan.action_cnt} actions called")
+
+
+def get_server():
+    '''
+    :return: the process wide fake ckan server, started the first time this is
+        called.  The fixtures are imported by several conftest files so they
+        can be set up more than once, they all get the same server.
+    :rtype: FakeCKANServer
+    '''
+    global _SERVER  # pylint: disable=global-statement
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            _SERVER = FakeCKANServer()
+            _SERVER.start()
+        return _SERVER
+
+
+def stop_server():
+    '''
+    stops the process wide fake ckan server if it was started
+    '''
+    global _SERVER  # pylint: disable=global-statement
+    with _SERVER_LOCK:
+        if _SERVER is not None:
+            _SERVER.stop()
+            _SERVER = None
@@ -0,0 +1,252 @@
+'''
+Created on Oct. 18, 2026
+
+Pluggable JSON encoding used for the generated test data, the data cache, the
+http calls made by the tests and the report handling in pytest-run.py.
+
+Two codecs are available:
+
+ * json - the standard library json module
+ * orjson - the orjson module, much faster, only available when it has been
+   installed.
+
+By default orjson is used if it can be imported, otherwise the standard
+library.  The codec can be chosen with the BCDC_JSON_CODEC env var (json,
+orjson or auto), or by calling set_codec().
+
+Payload is a dictionary that remembers its encoded body and the hash of the
+body until it is modified, so a dataset can be sent in a request, written to
+the cache and referenced in the logs while only being encoded once.
+'''
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+
+import bcdc_apitests.config.testConfig as testConfig
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+CODEC_AUTO = 'auto'
+CODEC_JSON = 'json'
+CODEC_ORJSON = 'orjson'
+
+# process wide codec, see get_codec()
+_CODEC = None
+
+
+class JsonCodec():
+    '''
+    codec that uses the standard library json module, other codecs implement
+    the same methods.
+    '''
+    name = CODEC_JSON
+
+    def dumps(self, obj, sort_keys=False, pretty=False):
+        '''
+        :param obj: the object to encode
+        :param sort_keys: sort the keys of dictionaries
+        :param pretty: indent the output
+        :return: the object encoded as a json string
+        '''
+        return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False,
+                          indent=4 if pretty else None)
+
+    def dumpb(self, obj, sort_keys=False, pretty=False):
+        '''
+        :param obj: the object to encode
+        :return: the object encoded as utf8 json bytes
+        '''
+        return self.dumps(obj, sort_keys, pretty).encode('utf8')
+
+    def loads(self, data):
+        '''
+        :param data: a json string or bytes
+        :return: the decoded object
+        '''
+        return json.loads(data)
+
+    def load(self, file_hand):
+        '''
+        :param file_hand: a file opened in binary mode
+        :return: the decoded contents of the file
+        '''
+        return self.loads(file_hand.read())
+
+
+class OrjsonCodec(JsonCodec):
+    '''
+    codec that uses the orjson module, which has to be installed.  orjson
+    only supports indenting by two spaces, so pretty output is indented by two
+    rather than four.
+    '''
+    name = CODEC_ORJSON
+
+    def __init__(self):
+        if not importlib.util.find_spec('orjson'):
+            raise ImportError('OrjsonCodec requires the orjson module')
+        import orjson  # pylint: disable=import-outside-toplevel
+        self.orjson = orjson
+
+    def dumps(self, obj, sort_keys=False, pretty=False):
+        return self.dumpb(obj, sort_keys, pretty).decode('utf8')
+
+    def dumpb(self, obj, sort_keys=False, pretty=False):
+        option = 0
+        if sort_keys:
+            option |= self.orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= self.orjson.OPT_INDENT_2
+        return self.orjson.dumps(obj, option=option)
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+
+def get_codec():
+    '''
+    :return: the process wide codec, the first time this is called the codec is
+        created using the BCDC_JSON_CODEC env var.
+    :rtype: JsonCodec
+    '''
+    global _CODEC  # pylint: disable=global-statement
+    if _CODEC is None:
+        _CODEC = create_codec(os.environ.get(testConfig.BCDC_JSON_CODEC,
+                                             CODEC_AUTO))
+        LOGGER.debug(f"json codec: {_CODEC.name}")
+    return _CODEC
+
+
+def set_codec(codec):
+    '''
+    :param codec: the codec to use, either a JsonCodec or the name of one,
+        set to None to go back to the codec defined by the env.
+    '''
+    global _CODEC  # pylint: disable=global-statement
+    if isinstance(codec, str):
+        codec = create_codec(codec)
+    _CODEC = codec
+
+
+def create_codec(name):
+    '''
+    :param name: json, orjson or auto.  auto uses orjson when it is installed.
+    :return: a new codec
+    :rtype: JsonCodec
+    '''
+    name = name.lower()
+    if name == CODEC_AUTO:
+        name = CODEC_ORJSON if importlib.util.find_spec('orjson') else CODEC_JSON
+    if name == CODEC_ORJSON:
+        return OrjsonCodec()
+    if name == CODEC_JSON:
+        return JsonCodec()
+    msg = f'invalid json codec: {name}, valid codecs are: ' + \
+          f'{[CODEC_AUTO, CODEC_JSON, CODEC_ORJSON]}'
+    raise ValueError(msg)
+
+
+def dumps(obj, sort_keys=False, pretty=False):
+    '''
+    :return: obj encoded as a json string using the process wide codec
+    '''
+    return get_codec().dumps(obj, sort_keys=sort_keys, pretty=pretty)
+
+
+def loads(data):
+    '''
+    :return: data decoded using the process wide codec
+    '''
+    return get_codec().loads(data)
+
+
+class Payload(dict):
+    '''
+    A dictionary that caches its encoded json body and the sha256 of the body.
+    The cache is cleared whenever the dictionary is modified.
+
+    Values are expected to be json types, the cache isn't cleared if a nested
+    list or dictionary is changed in place, in that case call reset().
+
+    example:
+
+        payload = Payload(dataset)
+        LOGGER.debug(f'creating package: {payload.ref}')
+        requests.post(api_call, headers=headers, data=payload.body)
+    '''
+    __slots__ = ('__body', '__digest')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__body = None
+        self.__digest = None
+
+    def reset(self):
+        '''
+        clears the cached body and digest
+        '''
+        self.__body = None
+        self.__digest = None
+
+    @property
+    def body(self):
+        '''
+        :return: the dictionary encoded as utf8 json bytes
+        '''
+        if self.__body is None:
+            self.__body = get_codec().dumpb(self)
+        return self.__body
+
+    @property
+    def digest(self):
+        '''
+        :return: the sha256 hex digest of the body
+        '''
+        if self.__digest is None:
+            self.__digest = hashlib.sha256(self.body).hexdigest()
+        return self.__digest
+
+    @property
+    def ref(self):
+        '''
+        :return: a short reference to the payload for log messages, made up of
+            the name (if there is one) and the start of the digest
+        '''
+        return f"{self.get('name', 'payload')}@{self.digest[:12]}"
+
+    def copy(self):
+        return Payload(self)
+
+    def __setitem__(self, key, value):
+        self.reset()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.reset()
+        super().__delitem__(key)
+
+    def clear(self):
+        self.reset()
+        super().clear()
+
+    def pop(self, *args):  # pylint: disable=arguments-differ
+        self.reset()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.reset()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self.reset()
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        self.reset()
+        super().update(*args, **kwargs)
+
+    def __reduce__(self):
+        return (Payload, (dict(self),))
@@ -0,0 +1,818 @@
+'''
+Created on Oct. 18, 2026
+
+Command line tool that drives concurrent, rate controlled traffic against a
+ckan instance for a fixed duration, used to size the ckan pods.
+
+The traffic is described by the same testParams.json entries the tests use:
+each entry (flattened to a single user and data label) is mapped to the ckan
+action its test calls, and is run as the USER_CONFIG user for the role with
+payloads from DataPopulation.  Entries are picked at random, with the same
+weight, by each of the workers.  An entry whose call fails when the entry
+expects success (or succeeds when it expects a failure) counts as an error.
+
+The test users, group and org are set up with the same bootstrap steps as the
+test session, the packages created during the run are deleted at the end.
+
+The calls are made with their own session (see get_load_session()): each call
+is made once, without the retries or the circuit breaker the tests use, so
+the report shows the failures and latency of ckan itself, and the connection
+pool is sized to the number of workers.
+
+The report has the number of calls, the throughput, the error rate and the
+latency percentiles for each action / role.
+
+example:
+
+    bcdc-loadtest --url https://cadi.data.gov.bc.ca --duration 300 \
+        --concurrency 20 --rate 50 -o load-report.json
+'''
+import argparse
+import collections
+import concurrent.futures
+import json
+import logging
+import os
+import random
+import secrets
+import string
+import sys
+import threading
+import time
+
+import ckanapi
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.bcdc_dynamic_data_population as bcdc_dynamic_data_population
+import bcdc_apitests.helpers.ckan_metrics as ckan_metrics
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.object_cache as object_cache
+import bcdc_apitests.helpers.read_test_config as read_test_config
+import bcdc_apitests.helpers.retry_policy as retry_policy
+import bcdc_apitests.helpers.scheming_cache as scheming_cache
+import bcdc_apitests.helpers.state_index as state_index
+from bcdc_apitests.fixtures.groups import group_setup
+from bcdc_apitests.fixtures.orgs import org_lookup, org_setup
+from bcdc_apitests.fixtures.users import user_setup
+from bcdc_apitests.helpers.bootstrap import Bootstrap
+from bcdc_apitests.helpers.file_utils import FileUtils
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+# the ckan action called by each of the tests in testParams.json, tests that
+# aren't listed here are not part of the load
+FUNCTION_ACTIONS = {
+    'test_package_create': 'package_create',
+    'test_create_package_coredataonly': 'package_create',
+    'test_package_show': 'package_show',
+    'test_package_update': 'package_update',
+    'test_package_search': 'package_search',
+    'test_package_list_vs_package_show': 'package_list',
+    'test_package_delete': 'package_delete',
+    'test_package_autocomplete': 'package_autocomplete',
+    'test_resource_create': 'resource_create',
+    'test_resource_update': 'resource_update',
+    'test_resource_update2': 'resource_update',
+    'test_resource_search': 'resource_search',
+    'test_resource_delete': 'resource_delete',
+    'test_organization_show': 'organization_show',
+    'test_organization_list': 'organization_list',
+    'test_organization_list_related': 'organization_list_related',
+    'test_group_list': 'group_list',
+    'test_group_show': 'group_show',
+    'test_user_show': 'user_show',
+    'test_dashboard_activity_list': 'dashboard_activity_list',
+    'test_config_option_show': 'config_option_show',
+    'test_license_list': 'license_list',
+    'test_vocabulary_list': 'vocabulary_list',
+    'test_tag_list': 'tag_list'}
+
+# tests that make their calls as the sysadmin whatever the user in the entry
+SYSADMIN_FUNCTIONS = ('test_config_option_show', 'test_vocabulary_list')
+
+# number of populate_randomized payloads generated before the run, the calls
+# pick from them at random
+PAYLOAD_POOL_SIZE = 50
+
+# the type of payload used by the actions that send one
+PAYLOAD_ACTIONS = {'package_create': 'dataset_fields',
+                   'package_update': 'dataset_fields',
+                   'resource_create': 'resource_fields',
+                   'resource_update': 'resource_fields'}
+
+
+class LoadEntry():
+    '''
+    a single flattened testParams.json entry
+
+    :ivar function: the test function the entry is for
+    :ivar action: the ckan action that is called
+    :ivar role: the ckan role of the user, ie admin, editor or member
+    :ivar user: the USER_CONFIG user with the role, or ROLE_SYSADMIN for
+        the calls made as the sysadmin
+    :ivar data_label: the DataPopulation method used for the payload
+    :ivar expected: True if the call is expected to succeed
+    '''
+    __slots__ = ('function', 'action', 'role', 'user', 'data_label', 'expected')
+
+    def __init__(self, function, action, role, user, data_label, expected):
+        self.function = function
+        self.action = action
+        self.role = role
+        self.user = user
+        self.data_label = data_label
+        self.expected = expected
+
+
+def get_role_user(user_label):
+    '''
+    :param user_label: a user label from testParams.json, ie admin, editor or
+        viewer
+    :return: tuple with the ckan role and the name of the USER_CONFIG user
+        with the role
+    :raises ValueError: if there is no user for the role
+    '''
+    role = user_label
+    for auth_role, labels in testConfig.BCDC_ROLE_LOOKUP.items():
+        if user_label in labels:
+            role = auth_role
+    for user, user_config in testConfig.USER_CONFIG.items():
+        if user_config['role'] == role:
+            return role, user
+    raise ValueError(f'there is no user in USER_CONFIG with the role: {role}')
+
+
+def get_load_entries(test_params_file=None, functions=None):
+    '''
+    :param test_params_file: the test parameters file, defaults to
+        test_data/testParams.json
+    :param functions: only use the entries for these test functions, all the
+        functions in FUNCTION_ACTIONS are used by default
+    :return: list of LoadEntry for the entries in the file
+    '''
+    reader = read_test_config.TestConfigReader(test_params_file)
+    test_config = read_test_config.TestConfig(
+        [read_test_config.TestParameters(params) for params in reader.config_struct])
+    entries = []
+    for params in test_config.get_flattened():
+        if params.test_function not in FUNCTION_ACTIONS:
+            LOGGER.debug(f"no load action for the test: {params.test_function}")
+            continue
+        if functions and params.test_function not in functions:
+            continue
+        if params.test_function in SYSADMIN_FUNCTIONS:
+            role = user = ckan_metrics.ROLE_SYSADMIN
+        else:
+            role, user = get_role_user(params.test_users[0])
+        entries.append(LoadEntry(params.test_function,
+                                 FUNCTION_ACTIONS[params.test_function], role,
+                                 user, params.test_data[0], params.test_result))
+    return entries
+
+
+class RateLimiter():
+    '''
+    hands out evenly spaced start times to the workers so the total rate of
+    calls is the same regardless of the number of workers.
+
+    :param rate: calls per second across all the workers, 0 for no limit
+    :param clock: function that returns the current time in seconds
+    :param sleep: function used to wait for a start time
+    '''
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.next_start = None
+
+    def wait(self, end_time):
+        '''
+        waits for the next start time
+
+        :param end_time: the time the run ends
+        :return: False if the next start time is after the end of the run
+        '''
+        with self.lock:
+            now = self.clock()
+            if self.next_start is None or self.next_start < now:
+                self.next_start = now
+            start = self.next_start
+            self.next_start += self.interval
+        if start >= end_time:
+            return False
+        if start > now:
+            self.sleep(start - now)
+        return True
+
+
+class LoadState():
+    '''
+    the payloads and the packages / resources used by the calls, shared by the
+    workers.
+
+    :param org_id: the id of the test org
+    :param dataset_populator: generates the package payloads
+    :param resource_populator: generates the resource payloads
+    :param seed_package: the package used by the show, update and resource
+        calls, it isn't deleted during the run
+    :param seed_resource: the resource used by the update calls
+    '''
+
+    def __init__(self, org_id, dataset_populator, resource_populator,
+                 seed_package, seed_resource):
+        self.org_id = org_id
+        self.populators = {'dataset_fields': dataset_populator,
+                           'resource_fields': resource_populator}
+        # (data type, data label) to the payloads, see get_payload_key()
+        self.payloads = {}
+        self.seed_package = seed_package
+        self.seed_resource = seed_resource
+        self.packages = collections.deque()
+        self.resources = collections.deque()
+        self.created = []
+        self.name_cnt = 0
+        self.rng = random.Random(dataset_populator.seed)
+        self.lock = threading.Lock()
+
+    def get_payload_key(self, data_type, data_label):
+        '''
+        :return: the key for the payloads for the data type and label, the
+            labels that aren't a DataPopulation method use populate_randomized
+        '''
+        if data_label == 'dummy' or \
+                not hasattr(self.populators[data_type], data_label):
+            data_label = 'populate_randomized'
+        return data_type, data_label
+
+    def generate_payloads(self, data_type, data_label):
+        '''
+        generates the payloads for the data type and label, if they haven't
+        been already.  The generation is not done while holding the lock.
+        '''
+        key = self.get_payload_key(data_type, data_label)
+        with self.lock:
+            if key in self.payloads:
+                return
+        populator = self.populators[data_type]
+        if key[1] == 'populate_randomized':
+            payloads = list(populator.populate_many(PAYLOAD_POOL_SIZE))
+        else:
+            payloads = list(getattr(populator, key[1])())
+        with self.lock:
+            self.payloads.setdefault(key, payloads)
+
+    def prepare(self, entries):
+        '''
+        generates the payloads for the entries, so none are generated during
+        the timed run
+
+        :param entries: the LoadEntry objects that are going to be run
+        '''
+        for entry in entries:
+            if entry.action in PAYLOAD_ACTIONS:
+                self.generate_payloads(PAYLOAD_ACTIONS[entry.action],
+                                       entry.data_label)
+
+    def get_payload(self, data_type, data_label, overrides):
+        '''
+        :param data_type: dataset_fields or resource_fields
+        :param data_label: the DataPopulation method from the test entry
+        :param overrides: values to set in the payload
+        :return: a payload for a create or update call, picked at random from
+            the payloads generated for the data label
+        '''
+        self.generate_payloads(data_type, data_label)
+        key = self.get_payload_key(data_type, data_label)
+        with self.lock:
+            payload = self.rng.choice(self.payloads[key])
+        payload = dict(payload)
+        payload.update(overrides)
+        return payload
+
+    def get_package_name(self):
+        '''
+        :return: a unique name for a package created by the load test
+        '''
+        with self.lock:
+            self.name_cnt += 1
+            name = f'{testConfig.TEST_PACKAGE}_load_{self.name_cnt}'
+            self.created.append(name)
+        return name
+
+    def take(self, objects):
+        '''
+        :param objects: the packages or resources deque
+        :return: a package / resource created by the load test, removed so no
+            other worker deletes it, None if there aren't any
+        '''
+        with self.lock:
+            return objects.popleft() if objects else None
+
+
+def create_package(state, remote_api, data_label):
+    '''
+    :return: the name of a new package
+    '''
+    overrides = {'name': state.get_package_name(), 'owner_org': state.org_id}
+    pkg = remote_api.action.package_create(
+        **state.get_payload('dataset_fields', data_label, overrides))
+    return pkg['name']
+
+
+def create_resource(state, remote_api, data_label):
+    '''
+    :return: the id of a new resource in the seed package
+    '''
+    overrides = {'package_id': state.seed_package['id']}
+    resource = remote_api.action.resource_create(
+        **state.get_payload('resource_fields', data_label, overrides))
+    return resource['id']
+
+
+def call_package_create(state, remote_api, entry):
+    '''
+    creates a new package
+    '''
+    state.packages.append(create_package(state, remote_api, entry.data_label))
+
+
+def call_package_show(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    shows the seed package
+    '''
+    remote_api.action.package_show(id=state.seed_package['name'])
+
+
+def call_package_update(state, remote_api, entry):
+    '''
+    updates the seed package
+    '''
+    overrides = {'name': state.seed_package['name'], 'id': state.seed_package['id'],
+                 'owner_org': state.org_id, 'state': 'active'}
+    remote_api.action.package_update(
+        **state.get_payload('dataset_fields', entry.data_label, overrides))
+
+
+def call_package_search(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    searches for the test packages
+    '''
+    remote_api.action.package_search(
+        q=f'name:{testConfig.TEST_PREFIX}_{testConfig.TEST_NAMESPACE}_*', rows=10)
+
+
+def call_package_list(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    lists the packages
+    '''
+    remote_api.action.package_list(limit=100)
+
+
+def get_package_target(state, sysadmin):
+    '''
+    :return: the name of a package created by the load test for a delete
+        call, when there aren't any left one is created by the sysadmin
+    '''
+    name = state.take(state.packages)
+    if name is None:
+        name = create_package(state, sysadmin, 'populate_randomized')
+    return name
+
+
+def call_package_delete(state, remote_api, entry, name):  # pylint: disable=unused-argument
+    '''
+    deletes a package created by the load test
+    '''
+    try:
+        remote_api.action.package_delete(id=name)
+    except Exception:
+        state.packages.append(name)
+        raise
+
+
+def call_package_autocomplete(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    autocompletes the test prefix
+    '''
+    remote_api.action.package_autocomplete(q=testConfig.TEST_PREFIX)
+
+
+def call_resource_create(state, remote_api, entry):
+    '''
+    adds a resource to the seed package
+    '''
+    state.resources.append(create_resource(state, remote_api, entry.data_label))
+
+
+def call_resource_update(state, remote_api, entry):
+    '''
+    updates the seed resource
+    '''
+    overrides = {'id': state.seed_resource['id'],
+                 'package_id': state.seed_package['id']}
+    remote_api.action.resource_update(
+        **state.get_payload('resource_fields', entry.data_label, overrides))
+
+
+def call_resource_search(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    searches for the test resources
+    '''
+    remote_api.action.resource_search(query=f'name:{testConfig.TEST_RESOURCE}')
+
+
+def get_resource_target(state, sysadmin):
+    '''
+    :return: the id of a resource created by the load test for a delete
+        call, when there aren't any left one is created by the sysadmin
+    '''
+    resource_id = state.take(state.resources)
+    if resource_id is None:
+        resource_id = create_resource(state, sysadmin, 'populate_randomized')
+    return resource_id
+
+
+def call_resource_delete(state, remote_api, entry, resource_id):  # pylint: disable=unused-argument
+    '''
+    deletes a resource created by the load test
+    '''
+    try:
+        remote_api.action.resource_delete(id=resource_id)
+    except Exception:
+        state.resources.append(resource_id)
+        raise
+
+
+def call_organization_show(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    shows the test org
+    '''
+    remote_api.action.organization_show(id=testConfig.TEST_ORGANIZATION)
+
+
+def call_group_show(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    shows the test group
+    '''
+    remote_api.action.group_show(id=testConfig.TEST_GROUP)
+
+
+def call_user_show(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    shows the user for the entry
+    '''
+    remote_api.action.user_show(id=entry.user)
+
+
+def call_config_option_show(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    shows a config option
+    '''
+    remote_api.action.config_option_show(key='ckan.site_title')
+
+
+def call_action(state, remote_api, entry):  # pylint: disable=unused-argument
+    '''
+    calls an action that doesn't need any parameters
+    '''
+    remote_api.call_action(entry.action, {})
+
+
+# function that makes the call for each action
+ACTION_CALLS = {
+    'package_create': call_package_create,
+    'package_show': call_package_show,
+    'package_update': call_package_update,
+    'package_search': call_package_search,
+    'package_list': call_package_list,
+    'package_delete': call_package_delete,
+    'package_autocomplete': call_package_autocomplete,
+    'resource_create': call_resource_create,
+    'resource_update': call_resource_update,
+    'resource_search': call_resource_search,
+    'resource_delete': call_resource_delete,
+    'organization_show': call_organization_show,
+    'group_show': call_group_show,
+    'user_show': call_user_show,
+    'config_option_show': call_config_option_show}
+
+# function that gets the object a call acts on, made as the sysadmin before
+# the call is timed, the object is passed to the call as its last argument
+TARGET_CALLS = {
+    'package_delete': get_package_target,
+    'resource_delete': get_resource_target}
+
+
+class LoadResults():
+    '''
+    the outcome of the calls for each action / role, thread safe
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.errors = collections.Counter()
+
+    def record(self, entry, duration, error):
+        '''
+        :param entry: the entry that was run
+        :param duration: seconds the call took
+        :param error: True if the outcome wasn't the expected outcome
+        '''
+        key = (entry.action, entry.role)
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = ckan_metrics.ActionStats()
+            stats.durations.append(duration)
+            if error:
+                self.errors[key] += 1
+
+    def get_report(self, duration):
+        '''
+        :param duration: the length of the run in seconds
+        :return: list of dictionaries with the action, role, number of calls,
+            throughput (calls / second), error rate, and the latency summary,
+            see ActionStats.get_summary()
+        '''
+        report = []
+        with self.lock:
+            for (action, role), stats in sorted(self.stats.items()):
+                summary = stats.get_summary()
+                calls = summary.pop('count')
+                for unused in ('bytes_out', 'bytes_in', 'retries'):
+                    summary.pop(unused)
+                row = {'action': action, 'role': role, 'calls': calls,
+                       'throughput': calls / duration if duration else None,
+                       'errors': self.errors[(action, role)],
+                       'error_rate': self.errors[(action, role)] / calls}
+                row.update(summary)
+                report.append(row)
+        return report
+
+
+class LoadTest():
+    '''
+    :param remote_apis: dictionary of USER_CONFIG user name to a RemoteCKAN
+        object for the user, and ROLE_SYSADMIN to the sysadmin
+    :param entries: the LoadEntry objects to pick the calls from
+    :param state: the shared payloads, packages and resources
+    :type state: LoadState
+    :param concurrency: the number of workers making calls
+    :param rate: calls per second across all the workers, 0 for no limit
+    :param seed: seed used to pick the entries
+    '''
+
+    def __init__(self, remote_apis, entries, state, concurrency=10, rate=0,
+                 seed=None):
+        if not entries:
+            raise ValueError('there are no testParams entries to run')
+        self.remote_apis = remote_apis
+        self.entries = entries
+        self.state = state
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate)
+        self.seed = seed if seed is not None else random.randrange(sys.maxsize)
+        self.results = LoadResults()
+
+    def run_entry(self, entry):
+        '''
+        makes the call for an entry and records the outcome, the objects the
+        delete calls remove are created beforehand and aren't part of the
+        time recorded for the call
+        '''
+        call = ACTION_CALLS.get(entry.action, call_action)
+        remote_api = self.remote_apis[entry.user]
+        target = ()
+        if entry.action in TARGET_CALLS:
+            try:
+                target = (TARGET_CALLS[entry.action](
+                    self.state, self.remote_apis[ckan_metrics.ROLE_SYSADMIN]),)
+            except Exception as err:  # pylint: disable=broad-except
+                # not counted, the call for the entry wasn't made
+                LOGGER.warning(f"unable to create the object for {entry.action}: {err}")
+                return
+        start_time = time.monotonic()
+        try:
+            call(self.state, remote_api, entry, *target)
+            success = True
+        except ckanapi.CKANAPIError as err:
+            LOGGER.debug(f"{entry.action} as {entry.role} failed: {err}")
+            success = False
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.warning(f"{entry.action} as {entry.role} failed: {err}")
+            success = False
+        self.results.record(entry, time.monotonic() - start_time,
+                            success != entry.expected)
+
+    def __worker(self, worker_num, end_time):
+        '''
+        makes calls until the end of the run
+        '''
+        rng = random.Random(f'{self.seed}-{worker_num}')
+        while self.limiter.wait(end_time):
+            self.run_entry(rng.choice(self.entries))
+
+    def run(self, duration):
+        '''
+        :param duration: seconds to run for
+        :return: the report, see LoadResults.get_report()
+        '''
+        LOGGER.info(f"running {len(self.entries)} load entries for {duration} " +
+                    f"seconds with {self.concurrency} workers, seed: {self.seed}")
+        start_time = time.monotonic()
+        end_time = start_time + duration
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.concurrency,
+                thread_name_prefix='loadtest') as executor:
+            futures = [executor.submit(self.__worker, worker_num, end_time)
+                       for worker_num in range(self.concurrency)]
+            for future in futures:
+                future.result()
+        return self.results.get_report(time.monotonic() - start_time)
+
+
+def load_org_data(name):
+    '''
+    :param name: the name for the org or group
+    :return: the data used to create the test org / group, same as the session
+        fixtures
+    '''
+    json_file = os.path.join(FileUtils().get_test_data_dir(), 'ownerOrg.json')
+    with open(json_file, 'r', encoding='utf8') as json_file_hand:
+        org_data = json.load(json_file_hand)
+    org_data['name'] = name
+    return org_data
+
+
+def get_load_session(ckan_url, concurrency):
+    '''
+    :param ckan_url: the url for the ckan instance
+    :param concurrency: the number of workers making calls
+    :return: session for the load, calls are only attempted once and there is
+        a connection in the pool for each worker
+    :rtype: bcdc_apitests.helpers.ckan_session.CKANSession
+    '''
+    policy = retry_policy.RetryPolicy(max_attempts=1, breaker_threshold=0)
+    return ckan_session.CKANSession(ckan_url, pool_size=max(concurrency, 1),
+                                    policy=policy,
+                                    metrics=ckan_metrics.get_metrics(),
+                                    index=state_index.StateIndex(),
+                                    cache=object_cache.ObjectCache())
+
+
+def setup(session, apikey, password, seed):
+    '''
+    creates the test users, group and org, and the package and resource used
+    by the show and update calls.
+
+    :param session: the session for the ckan instance
+    :type session: bcdc_apitests.helpers.ckan_session.CKANSession
+    :param apikey: a sysadmin api key
+    :param password: the password for the users that get created
+    :param seed: the data seed
+    :return: tuple with the dictionary of user name (ROLE_SYSADMIN for the
+        sysadmin) to RemoteCKAN object and the LoadState
+    '''
+    sysadmin = session.get_remote_api(apikey)
+    ckan_metrics.get_metrics().set_role(apikey, ckan_metrics.ROLE_SYSADMIN)
+    bootstrap = Bootstrap()
+    bootstrap.add('group', group_setup,
+                  args=[sysadmin, load_org_data(testConfig.TEST_GROUP)])
+    user_steps = []
+    for user, user_config in testConfig.USER_CONFIG.items():
+        bootstrap.add(f'user:{user}', user_setup,
+                      args=[sysadmin, user, user_config, password])
+        user_steps.append(f'user:{user}')
+    bootstrap.add('org_lookup', org_lookup, args=[sysadmin, testConfig.TEST_ORGANIZATION])
+    bootstrap.add('org', org_setup,
+                  args=[sysadmin, load_org_data(testConfig.TEST_ORGANIZATION)],
+                  deps=['org_lookup'] + user_steps)
+    org = bootstrap.run()['org']
+
+    remote_apis = {ckan_metrics.ROLE_SYSADMIN: sysadmin}
+    for user, user_config in testConfig.USER_CONFIG.items():
+        user_apikey = sysadmin.action.user_show(id=user)['apikey']
+        ckan_metrics.get_metrics().set_role(user_apikey, user_config['role'])
+        remote_apis[user] = session.get_remote_api(user_apikey)
+
+    struct = scheming_cache.get_scheming(session, session.ckan_url)
+    populators = [bcdc_dynamic_data_population.DataPopulation(
+        scheming_cache.get_dataset(struct, data_type),
+        data_type, seed=seed) for data_type in ('dataset_fields', 'resource_fields')]
+    state = LoadState(org['id'], populators[0], populators[1], None, None)
+    name = state.get_package_name()
+    state.seed_package = sysadmin.action.package_create(**state.get_payload(
+        'dataset_fields', 'populate_randomized',
+        {'name': name, 'owner_org': org['id'], 'state': 'active'}))
+    state.seed_resource = sysadmin.action.resource_create(**state.get_payload(
+        'resource_fields', 'populate_randomized',
+        {'package_id': state.seed_package['id']}))
+    return remote_apis, state
+
+
+def cleanup(session, apikey, state):
+    '''
+    purges the packages created by the load test
+    '''
+    sysadmin = session.get_remote_api(apikey)
+    for name in state.created:
+        try:
+            sysadmin.action.dataset_purge(id=name)
+        except ckanapi.NotFound:
+            pass
+        except ckanapi.CKANAPIError as err:
+            LOGGER.warning(f"unable to purge the package {name}: {err}")
+
+
+def format_report(report):
+    '''
+    :param report: the report from LoadTest.run()
+    :return: the report as a text table
+    '''
+    header = f"{'action':<28} {'role':<10} {'calls':>7} {'calls/s':>8} " + \
+             f"{'error %':>7} {'p50':>7} {'p95':>7} {'p99':>7}"
+    lines = [header, '-' * len(header)]
+    for row in report:
+        lines.append(
+            f"{row['action']:<28} {row['role']:<10} {row['calls']:>7} " +
+            f"{row['throughput']:>8.2f} {row['error_rate']:>7.1%} " +
+            f"{row['p50']:>7.3f} {row['p95']:>7.3f} {row['p99']:>7.3f}")
+    return '\n'.join(lines)
+
+
+def get_parser():
+    '''
+    :return: the argument parser for the command line
+    '''
+    parser = argparse.ArgumentParser(
+        description='Run the calls described by testParams.json against a ' +
+                    'ckan instance at a fixed rate and report the throughput, ' +
+                    'error rate and latency for each action / role.')
+    parser.add_argument('--url', default=os.environ.get(testConfig.BCDC_URL),
+                        help='url of the ckan instance, defaults to the env var ' +
+                             testConfig.BCDC_URL)
+    parser.add_argument('--apikey', default=os.environ.get(testConfig.BCDC_API_KEY),
+                        help='sysadmin api key, defaults to the env var ' +
+                             testConfig.BCDC_API_KEY)
+    parser.add_argument('--duration', type=float, default=60,
+                        help='seconds to run for')
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help='number of workers making calls at the same time')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='calls per second across all the workers, 0 for ' +
+                             'as fast as the workers can go')
+    parser.add_argument('--seed', type=int,
+                        help='seed used to generate the data and pick the calls')
+    parser.add_argument('--params', help='test parameters file, defaults to ' +
+                        'test_data/testParams.json')
+    parser.add_argument('--functions', nargs='+',
+                        help='only run the entries for these test functions')
+    parser.add_argument('-o', '--output', help='file to write the json report to')
+    parser.add_argument('--metrics-file', help='file to write the prometheus ' +
+                        'textfile with the latency of the ckan calls to')
+    return parser
+
+
+def main(argv=None):
+    '''
+    entry point for the bcdc-loadtest command
+    '''
+    args = get_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    if not args.url or not args.apikey:
+        get_parser().error(f'--url and --apikey (or {testConfig.BCDC_URL} and ' +
+                           f'{testConfig.BCDC_API_KEY}) are required')
+    seed = args.seed if args.seed is not None else random.randrange(sys.maxsize)
+    password = os.environ.get(testConfig.BCDC_TMP_USER_PASSWORD) or ''.join(
+        secrets.choice(string.ascii_letters + string.digits) for _ in range(10))
+
+    session = get_load_session(args.url, args.concurrency)
+    remote_apis, state = setup(session, args.apikey, password, seed)
+    try:
+        entries = get_load_entries(args.params, args.functions)
+        state.prepare(entries)
+        load_test = LoadTest(remote_apis, entries, state, args.concurrency,
+                             args.rate, seed)
+        report = load_test.run(args.duration)
+    finally:
+        cleanup(session, args.apikey, state)
+        if args.metrics_file:
+            ckan_metrics.get_metrics().write_textfile(args.metrics_file)
+        session.close()
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as out_hand:
+            json.dump({'seed': seed, 'duration': args.duration,
+                       'concurrency': args.concurrency, 'rate': args.rate,
+                       'actions': report}, out_hand, indent=4)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+'''
+Created on Oct. 18, 2026
+
+A read cache for the *_show calls the fixtures make to set up the tests, ie
+the package_show / organization_show calls that are repeated for every role
+and data label the tests are parametrized with.
+
+The cached objects are keyed by the action, the id or name of the object and
+the api key the call was made with, so a user never gets an object as it was
+shown to another user.  The cache is kept for the session (see
+ckan_session.CKANSession) and every call made through the session is passed
+to observe(): any call that changes an object (ie *_create, *_update,
+*_patch, *_delete, *_purge, member_create) drops the cached copies of that
+object, so a read never returns an object the suite has since changed.
+
+The fixtures read through the cache with show().  The reads the tests make to
+check the results of a call, under the role that is being tested, should not
+come from the cache, they call the action directly or use show() with
+bypass=True.
+
+example:
+
+    pkg_data = object_cache.show(remote_api, 'package_show', pkg_name)
+'''
+import copy
+import logging
+import threading
+
+import bcdc_apitests.helpers.ckan_metrics as ckan_metrics
+import bcdc_apitests.helpers.state_index as state_index
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+# the actions that don't change anything
+READ_SUFFIXES = ('_show', '_list', '_search', '_autocomplete')
+
+# writes that change the packages a resource is a part of, or the members of
+# an org or group, the cached objects of these kinds are all dropped
+RELATED_KINDS = {'resource': ('resource', state_index.KIND_PACKAGE),
+                 'member': (state_index.KIND_ORGANIZATION, state_index.KIND_GROUP)}
+
+
+def get_kind(action):
+    '''
+    :param action: the name of a ckan action
+    :return: the kind of object the action is for, ie package for
+        package_show and dataset_purge, None if the action isn't for one of
+        the kinds of objects
+    '''
+    if action.startswith('member_'):
+        return 'member'
+    for action_prefix, kind in state_index.ACTION_KINDS:
+        if action.startswith(action_prefix):
+            return kind
+    return None
+
+
+class ObjectCache():
+    '''
+    the objects returned by the *_show calls, thread safe.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (action, id or name, apikey) -> object
+        self.entries = {}
+        # incremented when objects are dropped, a read that was in flight
+        # while an object was changed isn't cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, remote_api, action, obj_id):
+        '''
+        :param remote_api: the ckanapi remote object to make the call with
+        :param action: the show action, ie package_show
+        :param obj_id: the id or name of the object
+        :return: a copy of the object
+        '''
+        key = (action, obj_id, remote_api.apikey)
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                return copy.deepcopy(self.entries[key])
+            self.misses += 1
+            generation = self.generation
+        obj = getattr(remote_api.action, action)(id=obj_id)
+        with self.lock:
+            if generation == self.generation:
+                cached = copy.deepcopy(obj)
+                self.entries[key] = cached
+                if isinstance(obj, dict):
+                    for obj_key in (obj.get('id'), obj.get('name')):
+                        if obj_key:
+                            self.entries[(action, obj_key, remote_api.apikey)] = cached
+        return obj
+
+    def clear(self):
+        '''
+        drops all the cached objects
+        '''
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+    def invalidate(self, kinds, obj_ids=None):
+        '''
+        drops the cached objects
+
+        :param kinds: the kinds of objects to drop, ie package, organization
+        :param obj_ids: the ids and names of the objects to drop, None to drop
+            all the objects of the kinds
+        '''
+        with self.lock:
+            self.generation += 1
+            for key in list(self.entries):
+                action, obj_key, _ = key
+                if get_kind(action) not in kinds:
+                    continue
+                obj = self.entries[key]
+                if obj_ids is None or obj_key in obj_ids or \
+                        (isinstance(obj, dict) and
+                         (obj.get('id') in obj_ids or obj.get('name') in obj_ids)):
+                    del self.entries[key]
+                    self.invalidations += 1
+
+    def observe(self, url, body, response):
+        '''
+        drops the objects changed by a call made to ckan
+
+        :param url: the url that was called
+        :param body: the body of the request
+        :param response: the response to the call
+        :type response: requests.Response
+        '''
+        action = ckan_metrics.get_action_name(url)
+        if action == 'other' or action.endswith(READ_SUFFIXES):
+            return
+        kind = get_kind(action)
+        if kind is None:
+            # a write that isn't for a known kind of object, ie a bulk update
+            LOGGER.debug(f"{action} may change any object, clearing the cache")
+            self.clear()
+            return
+        if kind in RELATED_KINDS:
+            self.invalidate(RELATED_KINDS[kind])
+            return
+        obj_ids = set()
+        data = state_index.get_request_data(body)
+        try:
+            result = response.json().get('result')
+        except ValueError:
+            result = None
+        for obj in (data, result):
+            if isinstance(obj, dict):
+                obj_ids.update(obj.get(key) for key in ('id', 'name') if obj.get(key))
+        self.invalidate((kind,), obj_ids or None)
+        if kind == state_index.KIND_PACKAGE:
+            # package updates can change the resources
+            self.invalidate(('resource',))
+
+    def get_stats(self):
+        '''
+        :return: dictionary with the number of reads from the cache (hits),
+            the number of reads that called ckan (misses) and the number of
+            cached objects that were dropped because they changed
+        '''
+        with self.lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'invalidations': self.invalidations}
+
+
+def get_cache(remote_api):
+    '''
+    :param remote_api: a ckanapi remote object
+    :return: the object cache for the session the remote object uses, None if
+        the session doesn't keep one
+    :rtype: ObjectCache
+    '''
+    return getattr(getattr(remote_api, 'session', None), 'object_cache', None)
+
+
+def show(remote_api, action, obj_id, bypass=False):
+    '''
+    :param remote_api: the ckanapi remote object to make the call with
+    :param action: the show action, ie package_show
+    :param obj_id: the id or name of the object
+    :param bypass: True to call ckan even if the object is cached
+    :return: the object, from the cache for the session when there is one
+    '''
+    cache = get_cache(remote_api)
+    if cache is None or bypass:
+        return getattr(remote_api.action, action)(id=obj_id)
+    return cache.get(remote_api, action, obj_id)
@@ -168,13 +168,16 @@ class TestConfig(object):
                     flatter.add_test_params([flat_param])
         return flatter
 
-    def get_test_config_as_list(self, regenerate=True):
+    def get_test_config_as_list(self, regenerate=True, seed=None):
         '''
         Works in combination with get_test_config_ids method. this will return a
         list of test configurations, while get_test_config_ids will return a
         list with the test ids.
 
         The order for both these lists will align.
+
+        :param seed: the seed used to generate the dynamic data, if provided it
+                     is included in the test ids
         '''
         if regenerate:
             self.return_list = None
@@ -184,22 +187,24 @@ class TestConfig(object):
             self.id_list = []
             for params in self:
                 self.return_list.append(params)
-                test_id = params.get_as_id()
+                test_id = params.get_as_id(seed)
                 self.id_list.append(test_id)
         return self.return_list
 
-    def get_test_config_ids(self, regenerate=False):
+    def get_test_config_ids(self, regenerate=False, seed=None):
         '''
         Generates if it doesn't already exist a list of ids for the test
         parameterizations described in this object.
         :param regenerate: if you want to force regeneration of the id list and
                            the test list make this parameter true
+        :param seed: the seed used to generate the dynamic data, if provided it
+                     is included in the test ids
         '''
         if regenerate:
             self.id_list = None
         if self.id_list is None:
             self.id_list = []
-            self.get_test_config_as_list(regenerate=True)
+            self.get_test_config_as_list(regenerate=True, seed=seed)
         return self.id_list
 
 
@@ -230,8 +235,11 @@ class TestParameters(object):
     def __str__(self):
         return str(self.test_param_struct)
 
-    def get_as_id(self):
+    def get_as_id(self, seed=None):
         '''
+        :param seed: the seed used to generate the dynamic data for the test,
+                     when provided it is added to the end of the id so the data
+                     can be replayed using the --bcdc-seed option
         :returns: the autogenerated id for this test parameterization
         '''
         # pylint: disable=no-member
@@ -239,6 +247,8 @@ class TestParameters(object):
         data = '/'.join(self.test_data)
 
         ret_str = '{0}-{1}-{2}'.format(usr, data, str(self.test_result))
+        if seed is not None:
+            ret_str = '{0}-seed{1}'.format(ret_str, seed)
         return ret_str
 
 
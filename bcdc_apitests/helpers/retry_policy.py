@@ -0,0 +1,284 @@
+'''
+Created on Oct. 18, 2026
+
+Retry policy used by the shared ckan session (see ckan_session.CKANSession),
+so every call made by the fixtures and tests gets the same handling of a
+flaky ckan instance:
+
+ * idempotent calls (GET requests and the ckan read actions like
+   package_show, *_list and *_search) are retried on connection errors and
+   on 500, 502, 503 and 504 responses.
+ * calls that change data (package_create, resource_update...) are only
+   retried when the request can't have been processed: connection errors
+   that happen before the request is sent, and 502 / 503 responses from the
+   router in front of ckan.
+ * retries wait using exponential backoff with full jitter.
+ * the total number of retries for the session is limited by a budget, once
+   it is used up calls fail on the first error.
+ * a circuit breaker opens after a number of consecutive failures, while it
+   is open calls fail straight away with a CircuitOpenError instead of
+   waiting on timeouts.  After a cool down a single trial call is let
+   through, the other calls keep failing straight away until the trial
+   call is done, if it works the breaker closes again.
+
+The defaults can be changed with the BCDC_RETRY_* env vars defined in
+testConfig.
+'''
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+import requests
+import urllib3.exceptions
+
+import bcdc_apitests.config.testConfig as testConfig
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+IDEMPOTENT_METHODS = ['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']
+
+# ckan actions that only read data, they are sent as POSTs by ckanapi
+READ_ACTION_REGEX = re.compile(
+    r'/action/(\w+_(show|list|search|autocomplete)|status_show|help_show)/?$')
+
+# retried for every call, the router returns these when it can't reach ckan
+RETRY_STATUSES = [502, 503]
+# only retried for idempotent calls, the request may have been processed
+RETRY_STATUSES_IDEMPOTENT = [500, 504]
+# responses that count as a failure for the circuit breaker
+BREAKER_STATUSES = [502, 503, 504]
+
+MAX_BACKOFF = 30.0
+
+# breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def get_env_number(env_var, default):
+    '''
+    :return: the value of the env var as a number, or the default if it isn't
+        set
+    '''
+    return type(default)(os.environ.get(env_var, default))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    '''
+    raised instead of making a call while the circuit breaker is open
+    '''
+
+
+class RetryPolicy():
+    '''
+    :param max_attempts: the maximum number of times a call is attempted
+    :param backoff: the base delay in seconds, the delay before retry n is a
+        random number between 0 and backoff * 2 ** n
+    :param max_backoff: the maximum delay in seconds
+    :param budget: the total number of retries allowed
+    :param breaker_threshold: the number of consecutive failures that opens
+        the circuit breaker, 0 for no breaker
+    :param breaker_reset: seconds the breaker stays open before a trial call
+        is allowed
+    :param rng: random number generator used for the jitter
+    :param sleep: function used to wait between retries
+    :param clock: function that returns the current time in seconds
+    '''
+
+    def __init__(self, max_attempts=None, backoff=None, max_backoff=None,
+                 budget=None, breaker_threshold=None, breaker_reset=None,
+                 rng=None, sleep=time.sleep, clock=time.monotonic):
+        def env(value, env_var, default):
+            return get_env_number(env_var, default) if value is None else value
+        self.max_attempts = env(max_attempts, testConfig.BCDC_RETRY_MAX_ATTEMPTS,
+                                testConfig.BCDC_RETRY_MAX_ATTEMPTS_DEFAULT)
+        self.backoff = env(backoff, testConfig.BCDC_RETRY_BACKOFF,
+                           testConfig.BCDC_RETRY_BACKOFF_DEFAULT)
+        self.max_backoff = MAX_BACKOFF if max_backoff is None else max_backoff
+        self.budget = env(budget, testConfig.BCDC_RETRY_BUDGET,
+                          testConfig.BCDC_RETRY_BUDGET_DEFAULT)
+        self.breaker_threshold = env(breaker_threshold,
+                                     testConfig.BCDC_RETRY_BREAKER_THRESHOLD,
+                                     testConfig.BCDC_RETRY_BREAKER_THRESHOLD_DEFAULT)
+        self.breaker_reset = env(breaker_reset, testConfig.BCDC_RETRY_BREAKER_RESET,
+                                 testConfig.BCDC_RETRY_BREAKER_RESET_DEFAULT)
+        self.rng = rng if rng is not None else random
+        self.sleep = sleep
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.retries = 0
+        self.failures = 0  # consecutive failures
+        self.breaker_state = CLOSED
+        self.breaker_opened = None
+        self.breaker_trips = 0
+
+    @staticmethod
+    def is_idempotent(method, url):
+        '''
+        :param method: the http method
+        :param url: the url for the call
+        :return: boolean indicating if the call can safely be repeated
+        '''
+        method = method.upper()
+        if method in IDEMPOTENT_METHODS:
+            return True
+        path = url.split('?', 1)[0]
+        return method == 'POST' and READ_ACTION_REGEX.search(path) is not None
+
+    @staticmethod
+    def is_retryable_error(err, idempotent):
+        '''
+        :param err: the exception raised by requests
+        :param idempotent: if the call is idempotent
+        :return: boolean indicating if the call should be retried
+        '''
+        if isinstance(err, CircuitOpenError):
+            return False
+        if idempotent:
+            return isinstance(err, (requests.exceptions.ConnectionError,
+                                    requests.exceptions.Timeout))
+        # only retry if the request was never sent
+        if isinstance(err, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(err.args[0], 'reason', None) if err.args else None
+        return isinstance(err, requests.exceptions.ConnectionError) and \
+            isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+    @staticmethod
+    def is_retryable_status(status_code, idempotent):
+        '''
+        :param status_code: the http status code in the response
+        :param idempotent: if the call is idempotent
+        :return: boolean indicating if the call should be retried
+        '''
+        if status_code in RETRY_STATUSES:
+            return True
+        return idempotent and status_code in RETRY_STATUSES_IDEMPOTENT
+
+    def get_delay(self, attempt):
+        '''
+        :param attempt: the number of the attempt that failed, starting at 0
+        :return: seconds to wait before the next attempt
+        '''
+        return self.rng.uniform(0, min(self.max_backoff,
+                                       self.backoff * 2 ** attempt))
+
+    def before_call(self):
+        '''
+        raises a CircuitOpenError if the breaker is open, or if it is half
+        open and the trial call is being made.  Moves the breaker to half open
+        once the cool down has passed, the caller makes the trial call.
+        '''
+        with self.lock:
+            if self.breaker_state == HALF_OPEN:
+                raise CircuitOpenError('circuit breaker is half open and the trial ' +
+                                       'call is being made, not calling ckan')
+            if self.breaker_state == OPEN:
+                if self.clock() - self.breaker_opened < self.breaker_reset:
+                    msg = f'circuit breaker is open after {self.failures} ' + \
+                          'consecutive failures, not calling ckan'
+                    raise CircuitOpenError(msg)
+                LOGGER.info("circuit breaker is half open, allowing a trial call")
+                self.breaker_state = HALF_OPEN
+
+    def record(self, failed):
+        '''
+        updates the breaker with the outcome of a call
+
+        :param failed: boolean indicating if the call failed
+        '''
+        with self.lock:
+            if not failed:
+                if self.breaker_state != CLOSED:
+                    LOGGER.info("circuit breaker closed")
+                self.failures = 0
+                self.breaker_state = CLOSED
+                return
+            self.failures += 1
+            if not self.breaker_threshold:
+                return
+            if self.breaker_state == HALF_OPEN or \
+                    (self.breaker_state == CLOSED and
+                     self.failures >= self.breaker_threshold):
+                LOGGER.warning(f"circuit breaker opened after {self.failures} " +
+                               "consecutive failures")
+                self.breaker_state = OPEN
+                self.breaker_opened = self.clock()
+                self.breaker_trips += 1
+
+    def use_retry(self):
+        '''
+        :return: boolean indicating if there is budget left for a retry, uses
+            one retry from the budget if there is.
+        '''
+        with self.lock:
+            if self.retries >= self.budget:
+                return False
+            self.retries += 1
+            return True
+
+    def call(self, send, method, url):
+        '''
+        makes a call, retrying it according to the policy
+
+        :param send: function that makes the call and returns a
+            requests.Response
+        :param method: the http method, used to determine if the call is
+            idempotent
+        :param url: the url for the call
+        :return: the response from the last attempt
+        '''
+        idempotent = self.is_idempotent(method, url)
+        attempt = 0
+        while True:
+            self.before_call()
+            try:
+                resp = send()
+            except requests.exceptions.RequestException as err:
+                self.record(isinstance(err, (requests.exceptions.ConnectionError,
+                                             requests.exceptions.Timeout)))
+                if not self.is_retryable_error(err, idempotent) or \
+                        not self.__can_retry(attempt):
+                    raise
+                reason = type(err).__name__
+            except Exception:
+                # the outcome of a trial call has to be recorded, or the
+                # breaker would stay half open
+                self.record(True)
+                raise
+            else:
+                retry_status = self.is_retryable_status(resp.status_code, idempotent)
+                self.record(resp.status_code in BREAKER_STATUSES)
+                if not retry_status or not self.__can_retry(attempt):
+                    return resp
+                reason = resp.status_code
+                resp.close()
+            delay = self.get_delay(attempt)
+            LOGGER.warning(f"{method} {url} failed ({reason}), retrying in " +
+                           f"{delay:.2f} seconds")
+            self.sleep(delay)
+            attempt += 1
+
+    def __can_retry(self, attempt):
+        '''
+        :return: boolean indicating if another attempt is allowed
+        '''
+        return attempt + 1 < self.max_attempts and \
+            self.breaker_state == CLOSED and self.use_retry()
+
+    def get_stats(self):
+        '''
+        :return: dictionary with the number of retries, the remaining budget
+            and the state of the circuit breaker
+        '''
+        return {'retries': self.retries,
+                'retry_budget_left': self.budget - self.retries,
+                'breaker_state': self.breaker_state,
+                'breaker_trips': self.breaker_trips}
@@ -0,0 +1,264 @@
+'''
+Created on Oct. 18, 2026
+
+The scheming definitions (scheming_dataset_schema_show) that the dynamic data
+is generated from, fetched once per process and shared by all the tests.
+
+The response is also saved to disk, keyed by the ckan url, so the next
+session only has to revalidate it:
+
+ * the saved copy is revalidated, the ETag / Last-Modified of the saved
+   response are sent with the request and a 304 keeps the saved copy.  The
+   url doesn't change when the schema is deployed, so by default the copy is
+   always revalidated, with BCDC_SCHEMING_TTL set a copy younger than that
+   many seconds is used without asking ckan
+ * when the end point can't be reached or takes longer than
+   BCDC_SCHEMING_TIMEOUT seconds, the saved copy is used however old it is,
+   and without one the definitions bundled in test_data/data_schema.json are
+   used.  The call is made once, it isn't retried and doesn't count towards
+   the circuit breaker of the session.  An error response or a response that
+   isn't json is raised, the data would otherwise be generated from the
+   wrong definitions.
+
+The copies are kept in the bcdc_apitest_scheming directory in the temp
+directory, which is not removed with the data caches.  Sessions that record
+or replay a cassette always make the call so it is in the cassette.
+
+The BCDCDataset objects for the definitions are created once per data type
+with get_dataset() and frozen, so they can be shared by the tests.
+
+example:
+
+    struct = scheming_cache.get_scheming(session, ckan_url)
+    dataset_schema = scheming_cache.get_dataset(struct, 'dataset_fields')
+'''
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.bcdc_dataset_schema as bcdc_dataset_schema
+import bcdc_apitests.helpers.retry_policy as retry_policy
+from bcdc_apitests.helpers.file_utils import FileUtils
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+SCHEMING_ACTION = 'scheming_dataset_schema_show'
+SCHEMING_TYPE = 'bcdc_dataset'
+CACHE_DIR_NAME = 'bcdc_apitest_scheming'
+# saved copies that haven't been used for this many seconds are removed, ie
+# the ones for the fake ckan servers
+PRUNE_AGE = 24 * 60 * 60
+
+# where the definitions came from, see SchemingCache.source
+SOURCE_DISK = 'disk'
+SOURCE_REMOTE = 'remote'
+SOURCE_REVALIDATED = 'revalidated'
+SOURCE_STALE = 'stale'
+SOURCE_BUNDLED = 'bundled'
+
+# process wide definitions and schema objects, see get_scheming() and
+# get_dataset()
+_SCHEMINGS = {}
+_DATASETS = {}
+_LOCK = threading.Lock()
+
+
+def load_bundled_scheming():
+    '''
+    :return: the scheming definitions bundled in the test_data directory
+    '''
+    schema_file = os.path.join(FileUtils().get_test_data_dir(),
+                               testConfig.TEST_SCHEMING_DEF)
+    with open(schema_file, 'r', encoding='utf8') as file_hand:
+        return json.load(file_hand)['result']
+
+
+class SchemingCache():
+    '''
+    fetches the scheming definitions and keeps them on disk
+
+    :param cache_dir: the directory for the saved copies, defaults to
+        bcdc_apitest_scheming in the temp directory
+    :param ttl: the number of seconds a saved copy is used without asking
+        ckan, defaults to the BCDC_SCHEMING_TTL env var
+    :param timeout: the number of seconds to wait for the end point, defaults
+        to the BCDC_SCHEMING_TIMEOUT env var
+    :ivar source: where the last definitions came from, one of the SOURCE_*
+        values
+    '''
+
+    def __init__(self, cache_dir=None, ttl=None, timeout=None):
+        if cache_dir is None:
+            cache_dir = os.path.join(tempfile.gettempdir(), CACHE_DIR_NAME)
+        if ttl is None:
+            ttl = float(os.environ.get(testConfig.BCDC_SCHEMING_TTL,
+                                       testConfig.BCDC_SCHEMING_TTL_DEFAULT))
+        if timeout is None:
+            timeout = float(os.environ.get(testConfig.BCDC_SCHEMING_TIMEOUT,
+                                           testConfig.BCDC_SCHEMING_TIMEOUT_DEFAULT))
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self.source = None
+
+    def get_cache_file(self, ckan_url, scheming_type):
+        '''
+        :return: the path to the saved copy for the ckan url and scheming type
+        '''
+        key = hashlib.sha256(f'{ckan_url}|{scheming_type}'.encode('utf8')).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f'scheming_{key}.json')
+
+    def read(self, cache_file):
+        '''
+        :return: the saved response, a dictionary with the result, the etag,
+            the last_modified header and the time it was fetched, None if
+            there isn't one
+        '''
+        try:
+            with open(cache_file, 'r', encoding='utf8') as file_hand:
+                entry = json.load(file_hand)
+        except (OSError, ValueError):
+            return None
+        return entry if 'result' in entry and 'fetched' in entry else None
+
+    def write(self, cache_file, entry):
+        '''
+        saves the response, through a temp file so other processes never read
+        a partial copy, and removes the copies that haven't been used for
+        PRUNE_AGE seconds
+        '''
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f'{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_file, 'w', encoding='utf8') as file_hand:
+                json.dump(entry, file_hand)
+            os.replace(tmp_file, cache_file)
+            now = time.time()
+            for file_name in os.listdir(self.cache_dir):
+                file_path = os.path.join(self.cache_dir, file_name)
+                if now - os.path.getmtime(file_path) > PRUNE_AGE:
+                    os.remove(file_path)
+        except OSError as err:
+            # the definitions are still used, they just aren't kept
+            LOGGER.warning(f"unable to save the scheming definitions: {err}")
+
+    def fetch(self, session, ckan_url, scheming_type=SCHEMING_TYPE):
+        '''
+        :param session: the session to make the call with
+        :type session: bcdc_apitests.helpers.ckan_session.CKANSession
+        :param ckan_url: the url for the ckan instance
+        :param scheming_type: the type of scheming definitions to get
+        :return: the scheming definitions, the result of the
+            scheming_dataset_schema_show call
+        :raises requests.exceptions.HTTPError: if ckan returns an error
+        :raises ValueError: if the response isn't json
+        '''
+        use_disk = getattr(session, 'cassette', None) is None
+        cache_file = self.get_cache_file(ckan_url, scheming_type)
+        entry = self.read(cache_file) if use_disk else None
+        if entry is not None and time.time() - entry['fetched'] < self.ttl:
+            LOGGER.debug(f"using the saved scheming definitions: {cache_file}")
+            self.source = SOURCE_DISK
+            return entry['result']
+
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        api_call = f'{ckan_url}{testConfig.BCDC_REST_DIR}/{SCHEMING_ACTION}'
+        try:
+            resp = session.get(api_call, params={'type': scheming_type},
+                               headers=headers, timeout=self.timeout,
+                               policy=get_single_attempt_policy())
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+            if entry is not None:
+                LOGGER.warning(f"{SCHEMING_ACTION} failed, using the saved " +
+                               f"definitions from {cache_file}: {err}")
+                self.source = SOURCE_STALE
+                return entry['result']
+            LOGGER.warning(f"{SCHEMING_ACTION} failed, using the definitions " +
+                           f"in {testConfig.TEST_SCHEMING_DEF}: {err}")
+            self.source = SOURCE_BUNDLED
+            return load_bundled_scheming()
+
+        if resp.status_code == 304 and entry is not None:
+            entry['fetched'] = time.time()
+            self.write(cache_file, entry)
+            self.source = SOURCE_REVALIDATED
+            return entry['result']
+        resp.raise_for_status()
+        result = resp.json()['result']
+        if use_disk:
+            self.write(cache_file, {'url': ckan_url,
+                                    'type': scheming_type,
+                                    'etag': resp.headers.get('ETag'),
+                                    'last_modified': resp.headers.get('Last-Modified'),
+                                    'fetched': time.time(),
+                                    'result': result})
+        self.source = SOURCE_REMOTE
+        return result
+
+
+def get_single_attempt_policy():
+    '''
+    :return: a retry policy that makes a call once and has no circuit breaker
+    :rtype: bcdc_apitests.helpers.retry_policy.RetryPolicy
+    '''
+    return retry_policy.RetryPolicy(max_attempts=1, breaker_threshold=0)
+
+
+def get_scheming(session, ckan_url, scheming_type=SCHEMING_TYPE):
+    '''
+    :param session: the session to make the call with
+    :type session: bcdc_apitests.helpers.ckan_session.CKANSession
+    :param ckan_url: the url for the ckan instance
+    :param scheming_type: the type of scheming definitions to get
+    :return: the scheming definitions, only fetched (or read from disk) the
+        first time they are asked for in the process.  The same struct is
+        returned to all callers so it should not be modified.
+    '''
+    key = (ckan_url, scheming_type)
+    with _LOCK:
+        if key not in _SCHEMINGS:
+            cache = SchemingCache()
+            _SCHEMINGS[key] = cache.fetch(session, ckan_url, scheming_type)
+            LOGGER.info(f"scheming definitions for {ckan_url} from: {cache.source}")
+        return _SCHEMINGS[key]
+
+
+def get_dataset(struct, dataset_type):
+    '''
+    :param struct: the scheming definitions
+    :param dataset_type: dataset_fields or resource_fields
+    :return: the frozen schema object for the definitions, created the first
+        time it is asked for
+    :rtype: bcdc_apitests.helpers.bcdc_dataset_schema.BCDCDataset
+    '''
+    # the struct is kept with the schema so the id isn't re-used
+    key = (id(struct), dataset_type)
+    with _LOCK:
+        if key not in _DATASETS:
+            dataset = bcdc_dataset_schema.BCDCDataset(struct, dataset_type=dataset_type)
+            _DATASETS[key] = (struct, dataset.freeze())
+        return _DATASETS[key][1]
+
+
+def clear():
+    '''
+    forgets the definitions and schema objects for the process, the saved
+    copies are left on disk
+    '''
+    with _LOCK:
+        _SCHEMINGS.clear()
+        _DATASETS.clear()
@@ -0,0 +1,339 @@
+'''
+Created on Oct. 18, 2026
+
+An index of the test objects (packages, orgs, groups and users) that exist in
+ckan, so the existence checks the fixtures make (package_exists, org_exists,
+group_exists, check_if_user_exist ...) are dictionary lookups instead of a
+*_show call each time a parametrized test asks.
+
+The index is filled in a few bulk calls, one per kind of object, the first
+time an object of that kind is looked up:
+
+ * package_search with fq=name:<prefix>*, including private, draft and
+   deleted packages
+ * organization_list / group_list with all_fields
+ * user_list filtered by the prefix
+
+where the prefix is TEST_PREFIX_TEST_NAMESPACE_, the start of the name of
+every object the tests create.  The lists only show objects that are active, so a
+name that isn't in the index is looked up once with a probe (the *_show call
+the fixtures used to make) and the answer, including "not found", is kept.
+
+The index is kept current by the suite's own writes: every call made through
+the ckan session (see ckan_session.CKANSession) is passed to observe(), and
+the create / update / patch / delete / purge calls update the index.  Changes
+made outside the test run are not seen, clear() forgets everything.
+'''
+import logging
+import threading
+import urllib.parse
+
+import ckanapi
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.ckan_metrics as ckan_metrics
+import bcdc_apitests.helpers.json_codec as json_codec
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+KIND_PACKAGE = 'package'
+KIND_ORGANIZATION = 'organization'
+KIND_GROUP = 'group'
+KIND_USER = 'user'
+KINDS = (KIND_PACKAGE, KIND_ORGANIZATION, KIND_GROUP, KIND_USER)
+
+# the kind of object changed by the actions, by the start of the action name
+ACTION_KINDS = (('package_', KIND_PACKAGE), ('dataset_', KIND_PACKAGE),
+                ('resource_', 'resource'), ('organization_', KIND_ORGANIZATION),
+                ('group_', KIND_GROUP), ('user_', KIND_USER))
+
+# the actions that change the objects, ie package_create, dataset_purge
+CHANGES = ('create', 'update', 'patch', 'delete', 'purge')
+
+# the number of objects to ask for with each bulk call
+PAGE_SIZE = 100
+
+
+def get_prefix():
+    '''
+    :return: the start of the names of the objects created by the tests
+    '''
+    return f'{testConfig.TEST_PREFIX}_{testConfig.TEST_NAMESPACE}_'
+
+
+def get_entry(data, kind):
+    '''
+    :param data: an object returned by ckan
+    :param kind: the kind of the object, one of KINDS
+    :return: the part of the object that is kept in the index
+    '''
+    entry = {'id': data.get('id'), 'name': data.get('name'),
+             'state': data.get('state', 'active')}
+    if kind == KIND_PACKAGE:
+        entry['resources'] = [{'id': rsrc.get('id'), 'name': rsrc.get('name')}
+                              for rsrc in data.get('resources') or []]
+    return entry
+
+
+def get_request_data(body):
+    '''
+    :param body: the body of a request, json or form encoded
+    :return: the decoded body, an empty dict for bodies that aren't either
+        (ie file uploads)
+    '''
+    if isinstance(body, bytes):
+        try:
+            body = body.decode('utf-8')
+        except UnicodeDecodeError:
+            return {}
+    if not body or not isinstance(body, str):
+        return {}
+    try:
+        data = json_codec.loads(body)
+    except ValueError:
+        data = dict(urllib.parse.parse_qsl(body, keep_blank_values=True))
+    return data if isinstance(data, dict) else {}
+
+
+def list_objects(remote_api, kind, prefix):
+    '''
+    gets the objects of a kind with the bulk calls
+
+    :param remote_api: a ckanapi remote object with sysadmin credentials
+    :param kind: the kind of objects, one of KINDS
+    :param prefix: the start of the names of the objects
+    :return: the objects whose names start with the prefix, the orgs, groups
+        and users are only the active ones
+    '''
+    objects = []
+    if kind == KIND_PACKAGE:
+        while True:
+            results = remote_api.action.package_search(
+                fq=f'name:{prefix}*', rows=PAGE_SIZE, start=len(objects),
+                include_private=True, include_drafts=True, include_deleted=True)
+            objects.extend(results['results'])
+            if not results['results'] or len(objects) >= results['count']:
+                break
+    elif kind == KIND_USER:
+        objects = remote_api.action.user_list(q=prefix)
+    else:
+        list_action = getattr(remote_api.action, f'{kind}_list')
+        while True:
+            page = list_action(all_fields=True, limit=PAGE_SIZE, offset=len(objects))
+            objects.extend(page)
+            if len(page) < PAGE_SIZE:
+                break
+    return [obj for obj in objects if obj.get('name', '').startswith(prefix)]
+
+
+class StateIndex():
+    '''
+    the test objects that exist in ckan, by kind and by name and id. thread
+    safe.
+
+    :param prefix: the start of the names of the objects to load in bulk,
+        defaults to get_prefix()
+    '''
+
+    def __init__(self, prefix=None):
+        self.prefix = prefix if prefix is not None else get_prefix()
+        self.lock = threading.Lock()
+        self.load_locks = {kind: threading.Lock() for kind in KINDS}
+        self.loaded = set()
+        # kind -> name or id -> entry, None when the object doesn't exist
+        self.entries = {kind: {} for kind in KINDS}
+        self.hits = 0
+        self.probes = 0
+
+    def clear(self):
+        '''
+        forgets all the objects, the next lookups load them again
+        '''
+        with self.lock:
+            self.loaded.clear()
+            for kind in KINDS:
+                self.entries[kind].clear()
+
+    def load(self, remote_api, kind):
+        '''
+        loads the objects of a kind with the bulk calls, the objects that are
+        already in the index are kept as they are more recent.
+
+        :param remote_api: a ckanapi remote object with sysadmin credentials
+        :param kind: the kind of objects to load, one of KINDS
+        '''
+        with self.load_locks[kind]:
+            if kind in self.loaded:
+                return
+            try:
+                objects = list_objects(remote_api, kind, self.prefix)
+            except ckanapi.errors.CKANAPIError as err:
+                # the lookups fall back to the probes
+                LOGGER.warning(f"unable to load the {kind}s for the state index: {err}")
+                objects = []
+            with self.lock:
+                entries = self.entries[kind]
+                for obj in objects:
+                    if obj['name'] not in entries and obj.get('id') not in entries:
+                        entry = get_entry(obj, kind)
+                        entries[entry['name']] = entries[entry['id']] = entry
+                self.loaded.add(kind)
+            LOGGER.debug(f"loaded {len(objects)} {kind}s into the state index")
+
+    def get(self, remote_api, kind, name, probe):
+        '''
+        :param remote_api: a ckanapi remote object with sysadmin credentials,
+            used for the bulk load
+        :param kind: the kind of object, one of KINDS
+        :param name: the name or id of the object
+        :param probe: function that is called with no arguments when the
+            object isn't in the index, returns the object, or None if it
+            doesn't exist
+        :return: the index entry for the object, see get_entry(), None if it
+            doesn't exist
+        '''
+        if kind not in self.loaded:
+            self.load(remote_api, kind)
+        with self.lock:
+            if name in self.entries[kind]:
+                self.hits += 1
+                return self.entries[kind][name]
+            self.probes += 1
+        obj = probe()
+        entry = get_entry(obj, kind) if obj is not None else None
+        if entry is not None and obj.get('invalid'):
+            entry['invalid'] = True
+        with self.lock:
+            # a write made while probing is more recent than the probe
+            entries = self.entries[kind]
+            if name not in entries:
+                entries[name] = entry
+                if entry is not None:
+                    for key in (entry['name'], entry['id']):
+                        if key:
+                            entries.setdefault(key, entry)
+            return entries[name]
+
+    def set(self, kind, data):
+        '''
+        :param kind: the kind of object, one of KINDS
+        :param data: the object as returned by ckan
+        '''
+        entry = get_entry(data, kind)
+        with self.lock:
+            entries = self.entries[kind]
+            previous = entries.get(entry['id'])
+            if previous is not None and previous['name'] != entry['name']:
+                # renamed
+                entries[previous['name']] = None
+            entries[entry['name']] = entries[entry['id']] = entry
+
+    def set_state(self, kind, name, state):
+        '''
+        :param kind: the kind of object, one of KINDS
+        :param name: the name or id of the object
+        :param state: the new state of the object, None if the object was
+            purged
+        '''
+        with self.lock:
+            entries = self.entries[kind]
+            entry = entries.get(name)
+            if entry is None:
+                # not known, the next lookup probes for it
+                entries.pop(name, None)
+            elif state is None:
+                for key in (entry['name'], entry['id'], name):
+                    entries[key] = None
+            else:
+                entry['state'] = state
+
+    def set_resource(self, data, deleted=False):
+        '''
+        :param data: the resource as returned by ckan, or the data for the
+            resource_delete call
+        :param deleted: True if the resource was deleted
+        '''
+        with self.lock:
+            # each package is in the index by name and by id
+            packages = {pkg['id']: pkg for pkg in self.entries[KIND_PACKAGE].values()
+                        if pkg is not None}
+            for pkg in packages.values():
+                pkg['resources'] = [rsrc for rsrc in pkg['resources']
+                                    if rsrc['id'] != data.get('id')]
+                if not deleted and pkg['id'] == data.get('package_id'):
+                    pkg['resources'].append({'id': data.get('id'),
+                                             'name': data.get('name')})
+
+    def observe(self, url, body, response):
+        '''
+        updates the index from a call made to ckan
+
+        :param url: the url that was called
+        :param body: the body of the request
+        :param response: the response to the call
+        :type response: requests.Response
+        '''
+        action = ckan_metrics.get_action_name(url)
+        kind = change = None
+        for action_prefix, action_kind in ACTION_KINDS:
+            if action.startswith(action_prefix):
+                kind = action_kind
+                change = action[len(action_prefix):]
+                break
+        if action == 'bulk_update_delete' and response.status_code == 200:
+            for pkg_id in get_request_data(body).get('datasets') or []:
+                self.set_state(KIND_PACKAGE, pkg_id, 'deleted')
+            return
+        if kind is None or change not in CHANGES or response.status_code != 200:
+            return
+        try:
+            result = response.json().get('result')
+        except ValueError:
+            return
+        data = get_request_data(body)
+        if kind == 'resource':
+            if change == 'delete':
+                self.set_resource(data, deleted=True)
+            elif isinstance(result, dict):
+                self.set_resource(result)
+        elif change in ('delete', 'purge'):
+            if data.get('id'):
+                self.set_state(kind, data['id'], 'deleted' if change == 'delete' else None)
+        elif isinstance(result, dict) and result.get('id'):
+            self.set(kind, result)
+
+    def get_stats(self):
+        '''
+        :return: dictionary with the number of lookups answered by the index
+            and the number that needed a probe
+        '''
+        with self.lock:
+            return {'hits': self.hits, 'probes': self.probes}
+
+
+def get_index(remote_api):
+    '''
+    :param remote_api: a ckanapi remote object
+    :return: the state index for the session the remote object uses, None if
+        the session doesn't keep one
+    :rtype: StateIndex
+    '''
+    return getattr(getattr(remote_api, 'session', None), 'state_index', None)
+
+
+def lookup(remote_api, kind, name, probe):
+    '''
+    :param remote_api: a ckanapi remote object with sysadmin credentials
+    :param kind: the kind of object, one of KINDS
+    :param name: the name or id of the object
+    :param probe: function that is called with no arguments to get the object
+        when it isn't in the index, returns None if it doesn't exist
+    :return: the object, or the index entry for it, None if it doesn't exist.
+        see StateIndex.get()
+    '''
+    index = get_index(remote_api)
+    if index is None:
+        return probe()
+    return index.get(remote_api, kind, name, probe)
@@ -0,0 +1,229 @@
+'''
+Created on Oct. 18, 2026
+
+Removes the objects left behind by the tests, ie by runs that crashed before
+their teardown, which later runs trip over as ghost packages.  The objects
+are found in bulk by the start of their names (see state_index.list_objects)
+and removed in three phases, the calls within a phase are made concurrently:
+
+ 1. packages - the packages of each org are deleted with one
+    bulk_update_delete call, then each package is purged with dataset_purge
+ 2. orgs and groups - purged, orgs can only be purged once their packages
+    are gone
+ 3. users - deleted, ckan has no api call to purge a user
+
+Used by the bcdc-sweep command, and by the tests with the --bcdc-sweep
+option (see fixtures/bootstrap.py).
+
+example:
+
+    bcdc-sweep --dry-run
+    bcdc-sweep --all-users --dry-run
+'''
+import argparse
+import collections
+import concurrent.futures
+import json
+import logging
+import os
+import sys
+import time
+
+import ckanapi
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.state_index as state_index
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+DEFAULT_CONCURRENCY = 4
+
+# the phases of the sweep and the kinds of objects removed in each
+PHASES = (('packages', (state_index.KIND_PACKAGE,)),
+          ('groups', (state_index.KIND_ORGANIZATION, state_index.KIND_GROUP)),
+          ('users', (state_index.KIND_USER,)))
+
+
+class Sweeper():
+    '''
+    :param remote_api: a ckanapi remote object with sysadmin credentials
+    :param prefix: the start of the names of the objects to remove, must start
+        with TEST_PREFIX, defaults to the objects for the TEST_NAMESPACE
+    :param concurrency: the number of calls to make at the same time
+    '''
+
+    def __init__(self, remote_api, prefix=None, concurrency=DEFAULT_CONCURRENCY):
+        if prefix is None:
+            prefix = state_index.get_prefix()
+        if not prefix.startswith(testConfig.TEST_PREFIX):
+            msg = f'the prefix {prefix} does not start with {testConfig.TEST_PREFIX}, ' + \
+                  'only test objects can be swept'
+            raise ValueError(msg)
+        self.remote_api = remote_api
+        self.prefix = prefix
+        self.concurrency = max(concurrency, 1)
+
+    def discover(self):
+        '''
+        :return: dictionary of kind (see state_index.KINDS) to the objects of
+            the kind whose names start with the prefix
+        '''
+        return {kind: state_index.list_objects(self.remote_api, kind, self.prefix)
+                for kind in state_index.KINDS}
+
+    def sweep(self, dry_run=False):
+        '''
+        :param dry_run: True to only find the objects
+        :return: the report, a dictionary with the prefix, the number of
+            objects found and removed for each kind, the errors, and the
+            seconds each phase and the whole sweep took
+        '''
+        start_time = time.monotonic()
+        objects = self.discover()
+        report = {'prefix': self.prefix,
+                  'found': {kind: len(objs) for kind, objs in objects.items()},
+                  'removed': {kind: 0 for kind in state_index.KINDS},
+                  'errors': [],
+                  'durations': {'discover': time.monotonic() - start_time}}
+        LOGGER.info(f"found objects starting with {self.prefix}: {report['found']}")
+        if not dry_run:
+            for phase, kinds in PHASES:
+                phase_start = time.monotonic()
+                if phase == 'packages':
+                    self.__bulk_delete(objects[state_index.KIND_PACKAGE], report)
+                calls = [(kind, obj) for kind in kinds for obj in objects[kind]]
+                self.__remove(calls, report)
+                report['durations'][phase] = time.monotonic() - phase_start
+        report['duration'] = time.monotonic() - start_time
+        return report
+
+    def __bulk_delete(self, packages, report):
+        '''
+        deletes the packages of each org with one call, so they are gone from
+        the searches even if purging them fails
+        '''
+        by_org = collections.defaultdict(list)
+        for pkg in packages:
+            if pkg.get('owner_org') and pkg.get('state') != 'deleted':
+                by_org[pkg['owner_org']].append(pkg['id'])
+        for org_id, pkg_ids in by_org.items():
+            try:
+                self.remote_api.action.bulk_update_delete(org_id=org_id, datasets=pkg_ids)
+            except ckanapi.errors.CKANAPIError as err:
+                # the packages get purged anyway
+                LOGGER.warning(f"bulk delete of {len(pkg_ids)} packages in the org " +
+                               f"{org_id} failed: {err}")
+                report['errors'].append({'kind': 'bulk_update_delete', 'name': org_id,
+                                         'error': str(err)})
+
+    def __remove_object(self, kind, obj):
+        actions = {state_index.KIND_PACKAGE: 'dataset_purge',
+                   state_index.KIND_ORGANIZATION: 'organization_purge',
+                   state_index.KIND_GROUP: 'group_purge',
+                   state_index.KIND_USER: 'user_delete'}
+        try:
+            getattr(self.remote_api.action, actions[kind])(id=obj['id'])
+        except ckanapi.errors.NotFound:
+            LOGGER.debug(f"the {kind} {obj['name']} was already removed")
+
+    def __remove(self, calls, report):
+        '''
+        :param calls: list of (kind, object) to remove
+        '''
+        if not calls:
+            return
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix='sweep') as executor:
+            futures = {executor.submit(self.__remove_object, kind, obj): (kind, obj)
+                       for kind, obj in calls}
+            for future in concurrent.futures.as_completed(futures):
+                kind, obj = futures[future]
+                try:
+                    future.result()
+                    report['removed'][kind] += 1
+                except ckanapi.errors.CKANAPIError as err:
+                    LOGGER.warning(f"unable to remove the {kind} {obj['name']}: {err}")
+                    report['errors'].append({'kind': kind, 'name': obj['name'],
+                                             'error': str(err)})
+
+
+def format_report(report):
+    '''
+    :param report: the report from Sweeper.sweep()
+    :return: the report as text for the terminal
+    '''
+    lines = [f"swept objects starting with {report['prefix']} in " +
+             f"{report['duration']:.2f}s"]
+    for kind in state_index.KINDS:
+        lines.append(f"{kind}: found: {report['found'][kind]}, " +
+                     f"removed: {report['removed'][kind]}")
+    lines.append(', '.join(f'{phase}: {duration:.2f}s'
+                           for phase, duration in report['durations'].items()))
+    for error in report['errors']:
+        lines.append(f"error: {error['kind']} {error['name']}: {error['error']}")
+    return '\n'.join(lines)
+
+
+def get_parser():
+    '''
+    :return: the argument parser for the command line
+    '''
+    parser = argparse.ArgumentParser(
+        description='Remove the packages, orgs, groups and users left behind ' +
+                    'by the tests from a ckan instance.')
+    parser.add_argument('--url', default=os.environ.get(testConfig.BCDC_URL),
+                        help='url of the ckan instance, defaults to the env var ' +
+                             testConfig.BCDC_URL)
+    parser.add_argument('--apikey', default=os.environ.get(testConfig.BCDC_API_KEY),
+                        help='sysadmin api key, defaults to the env var ' +
+                             testConfig.BCDC_API_KEY)
+    prefix_group = parser.add_mutually_exclusive_group()
+    prefix_group.add_argument('--prefix',
+                              help='remove the objects whose names start with ' +
+                                   'the prefix, defaults to the objects of the ' +
+                                   f'current namespace: {state_index.get_prefix()}')
+    prefix_group.add_argument('--all-users', action='store_true',
+                              help='remove the objects of all the test users and ' +
+                                   'runs, ie the prefix ' +
+                                   f'{testConfig.TEST_PREFIX}_')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='number of calls to make at the same time')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='only report the objects that would be removed')
+    parser.add_argument('-o', '--output', help='file to write the json report to')
+    return parser
+
+
+def main(argv=None):
+    '''
+    entry point for the bcdc-sweep command
+    '''
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    if not args.url or not args.apikey:
+        parser.error(f'--url and --apikey (or {testConfig.BCDC_URL} and ' +
+                     f'{testConfig.BCDC_API_KEY}) are required')
+    prefix = f'{testConfig.TEST_PREFIX}_' if args.all_users else args.prefix
+    try:
+        sweeper = Sweeper(ckan_session.get_session(args.url).get_remote_api(args.apikey),
+                          prefix, args.concurrency)
+    except ValueError as err:
+        parser.error(str(err))
+    try:
+        report = sweeper.sweep(args.dry_run)
+    finally:
+        ckan_session.close_sessions()
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as out_hand:
+            json.dump(report, out_hand, indent=4)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -9,15 +9,22 @@ bcdc_dynamic_data_population
 '''
 # TODO: configure the tests to omit running these tests as they are used for the
 #       development of the dynamic datasets
+import datetime
+import glob
 import json
 import logging
 import os.path
 import pprint
+import random
 
 import pytest
 
 import bcdc_apitests.helpers.bcdc_dataset_schema as bcdc_dataset_schema
 import bcdc_apitests.helpers.bcdc_dynamic_data_population as bcdc_dynamic_data_population
+import bcdc_apitests.helpers.data_mutation as data_mutation
+import bcdc_apitests.helpers.json_codec as json_codec
+import bcdc_apitests.helpers.read_test_config as read_test_config
+import bcdc_apitests.helpers.word_source as word_source
 
 # pylint: disable=logging-fstring-interpolation, redefined-outer-name
 # disableing: redefined-outer-name because pylint doesn't properly recognize that
@@ -195,3 +202,356 @@ def test_get_resource_types(scheming_bcdc_resource):
         assert dataset['bcdc_type'] in vals
         cnt += 1
     assert cnt == len(vals)
+
+
+def test_bundled_word_source():
+    '''
+    verifies that the bundled word list only returns alphanumeric words and
+    that the draws are repeatable when a seeded random number generator is
+    provided.
+    '''
+    source = word_source.BundledWordSource()
+    assert len(source) > 1000
+
+    words = source.getwords(500, rng=random.Random(10))
+    assert all(word.isalnum() for word in words)
+    assert words == source.getwords(500, rng=random.Random(10))
+    assert source.getword(random.Random(3)) == source.getword(random.Random(3))
+
+
+def test_string_uses_word_source(scheming_bcdc_dataset):
+    '''
+    string fields should be populated from the word source that the populator
+    is configured with, rather than making a network call.
+    '''
+    populator = bcdc_dynamic_data_population.DataPopulationResource(
+        scheming_bcdc_dataset)
+    populator.rand = bcdc_dynamic_data_population.RandomWords(
+        word_source.ListWordSource(['onlyword']))
+    notes_fld = scheming_bcdc_dataset.get_field('notes')
+    assert populator.string(notes_fld) == 'onlyword'
+
+
+def test_generation_plan(scheming_bcdc_resource):
+    '''
+    the generation plan should be compiled once per schema, generate
+    conditional fields after the field they depend on, and only populate them
+    when the condition is met.
+    '''
+    plan = bcdc_dynamic_data_population.GenerationPlan.get_plan(
+        scheming_bcdc_resource)
+    assert plan is bcdc_dynamic_data_population.GenerationPlan.get_plan(
+        scheming_bcdc_resource)
+    fld_names = plan.get_field_names()
+    for step in plan.steps:
+        if step.conditional_field:
+            assert fld_names.index(step.conditional_field) < \
+                fld_names.index(step.field_name)
+
+    populator = bcdc_dynamic_data_population.DataPopulationResource(
+        scheming_bcdc_resource)
+    geographic = populator.populate_all({'bcdc_type': 'geographic'})
+    assert 'projection_name' in geographic
+    document = populator.populate_all({'bcdc_type': 'document'})
+    assert 'projection_name' not in document
+    assert document['bcdc_type'] == 'document'
+
+
+def test_populate_many(scheming_bcdc_resource):
+    '''
+    bulk generation should respect overrides and conditional fields, and be
+    repeatable when a seeded random number generator is used.
+    '''
+    populator = bcdc_dynamic_data_population.DataPopulationResource(
+        scheming_bcdc_resource, random.Random(5))
+    batch = populator.populate_many(200)
+    assert len(batch) == 200
+    for dataset in batch:
+        assert ('projection_name' in dataset) == \
+            (dataset['bcdc_type'] == 'geographic')
+
+    populator = bcdc_dynamic_data_population.DataPopulationResource(
+        scheming_bcdc_resource, random.Random(5))
+    assert list(populator.populate_many(200)) == list(batch)
+
+    batch = populator.populate_many(50, {'bcdc_type': 'document'})
+    assert batch.column('bcdc_type') == ['document'] * 50
+    assert 'projection_name' not in batch[-1]
+
+
+def test_data_cache(scheming_bcdc_resource, tmp_path, monkeypatch):
+    '''
+    cached data should be keyed on the overrides, seed and namespace, and the
+    least recently used files should be evicted when the cache is over its
+    limits.
+    '''
+    monkeypatch.setenv('TEMP', str(tmp_path))
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        scheming_bcdc_resource, "resource_fields", seed=1)
+    first = populator.populate_randomized({'bcdc_type': 'document'})
+    first_cache = populator.cache
+    assert first_cache.cache_exists()
+    assert list(populator.populate_randomized({'bcdc_type': 'document'})) == \
+        list(first)
+
+    populator.populate_randomized({'bcdc_type': 'geographic'})
+    assert populator.cache.cache_file != first_cache.cache_file
+    assert not glob.glob(os.path.join(first_cache.cache_dir, '*.tmp'))
+
+    # another xdist worker, the names in the data are different
+    monkeypatch.setattr(bcdc_dynamic_data_population.testConfig,
+                        'TEST_NAMESPACE', 'abc_local_gw1')
+    worker_cache = populator.get_cache('populate_randomized',
+                                       {'bcdc_type': 'document'})
+    assert worker_cache.cache_file != first_cache.cache_file
+
+    # the first cache file is the least recently used
+    os.utime(first_cache.cache_file, (1, 1))
+    assert first_cache.evict(max_files=1) == 1
+    assert not first_cache.cache_exists()
+    assert populator.cache.cache_exists()
+
+
+def test_schema_field_index(scheming_bcdc_dataset):
+    '''
+    bcdc fields should replace core fields with the same name, lookups should
+    go through the index and nested iteration over the schema should work.
+    '''
+    fld_names = scheming_bcdc_dataset.get_field_names()
+    assert len(fld_names) == len(set(fld_names)) == len(scheming_bcdc_dataset)
+    assert scheming_bcdc_dataset.get_field('resource_status').conditional_field is None
+    assert scheming_bcdc_dataset.get_field('does_not_exist') is None
+
+    pairs = [(outer.field_name, inner.field_name)
+             for outer in scheming_bcdc_dataset for inner in scheming_bcdc_dataset]
+    assert len(pairs) == len(fld_names) ** 2
+
+    scheming_bcdc_dataset.set_field_type_filter('required', True)
+    required = scheming_bcdc_dataset.get_field_names()
+    assert required and all(fld.required for fld in scheming_bcdc_dataset)
+    assert not scheming_bcdc_dataset.field_name_exists(
+        (set(fld_names) - set(required)).pop())
+    scheming_bcdc_dataset.set_field_type_filter()
+    assert scheming_bcdc_dataset.get_field_names() == fld_names
+
+
+def test_field_memoization(scheming_bcdc_dataset):
+    '''
+    subfields and choices should only be built once per field, and the core
+    schema should only be read once per process.
+    '''
+    contacts = scheming_bcdc_dataset.get_field('contacts')
+    assert contacts.subfields is contacts.subfields
+    role = contacts.subfields.get_field('role')
+    assert role.choices is role.choices
+    assert role.choices.values is role.choices.values
+
+    bcdc_dataset_schema.load_ckan_core_schema.cache_clear()
+    bcdc_dataset_schema.BCDCDataset(
+        dataset_type='resource_fields', struct=scheming_bcdc_dataset.struct)
+    bcdc_dataset_schema.BCDCDataset(
+        dataset_type='dataset_fields', struct=scheming_bcdc_dataset.struct)
+    assert bcdc_dataset_schema.load_ckan_core_schema.cache_info().misses == 1
+
+
+def test_invalid_variants(scheming_bcdc_resource):
+    '''
+    each variant returned by populate_required_fields_failure should be missing
+    one required field, and the pairwise variants should cover every pair of
+    mutations while sharing the base dataset.
+    '''
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        scheming_bcdc_resource, "resource_fields", seed=2)
+    populator.disable_cache = True
+    overrides = {'bcdc_type': 'document'}
+    base = populator.pop_resource.populate_all(overrides)
+
+    missing = []
+    for dataset in populator.populate_required_fields_failure(overrides):
+        assert len(set(base) - set(dataset)) == 1
+        missing.extend(set(base) - set(dataset))
+    assert 'bcdc_type' in missing
+    assert len(missing) == len(set(missing))
+
+    engine = data_mutation.MutationEngine(scheming_bcdc_resource, base,
+                                          random.Random(1))
+    groups = engine.group_mutations(engine.get_mutations())
+    # the conditional fields that set bcdc_type share a parameter with it
+    bcdc_type_group = [group for group in groups
+                       if 'bcdc_type' in group[0].keys][0]
+    assert {mutation.kind for mutation in bcdc_type_group} >= \
+        {data_mutation.OUT_OF_DOMAIN, data_mutation.VIOLATED_CONDITIONAL}
+    group_of = {repr(mutation): indx for indx, group in enumerate(groups)
+                for mutation in group}
+    variants = engine.get_variants(strategy=data_mutation.STRATEGY_PAIRWISE)
+    assert all(variant.base is base for variant in variants)
+    covered = set()
+    for variant in variants:
+        # the mutations in a variant never write the same key
+        keys = [key for mutation in variant.mutations for key in set(mutation.keys)]
+        assert len(keys) == len(set(keys))
+        row = [repr(mutation) for mutation in variant.mutations]
+        covered.update((mutation, other) for mutation in row for other in row)
+    for mutation in group_of:
+        for other in group_of:
+            if group_of[mutation] != group_of[other]:
+                assert (mutation, other) in covered
+
+
+def test_populate_invalid_pairwise(scheming_bcdc_resource):
+    '''
+    the pairwise variants are invalid versions of the base dataset, and the
+    same seed gives the same variants
+    '''
+    overrides = {'bcdc_type': 'document'}
+    variants = []
+    for _ in range(2):
+        populator = bcdc_dynamic_data_population.DataPopulation(
+            scheming_bcdc_resource, "resource_fields", seed=4)
+        populator.disable_cache = True
+        datasets = populator.populate_invalid_pairwise(overrides)
+        views = [datasets.get_view(indx) for indx in range(len(datasets))]
+        assert len(views) > 1
+        for view in views:
+            assert view.mutations
+            assert dict(view) != dict(view.base)
+        variants.append([dict(dataset) for dataset in datasets])
+    assert variants[0] == variants[1]
+
+
+def test_populate_parallel(scheming_bcdc_dataset):
+    '''
+    parallel generation should return the same datasets, in the same order, for
+    a given seed no matter how many workers are used.
+    '''
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        scheming_bcdc_dataset, "dataset_fields", seed=8)
+    in_process = list(populator.populate_parallel(45, workers=1, chunk_size=10))
+    assert len(in_process) == 45
+    assert list(populator.populate_parallel(45, workers=3, chunk_size=10)) == \
+        in_process
+
+
+def test_populate_parallel_backpressure():
+    '''
+    only max_pending chunks should be outstanding, no matter how slowly the
+    results are consumed.
+    '''
+    class FakeResult():
+        def __init__(self, pool, value):
+            self.pool = pool
+            self.value = value
+
+        def get(self):
+            self.pool.outstanding -= 1
+            return self.value
+
+    class FakePool():
+        def __init__(self):
+            self.outstanding = 0
+            self.max_outstanding = 0
+
+        def apply_async(self, func, args):
+            self.outstanding += 1
+            self.max_outstanding = max(self.max_outstanding, self.outstanding)
+            return FakeResult(self, func(*args))
+
+    pool = FakePool()
+    results = []
+    for result in bcdc_dynamic_data_population.imap_bounded(
+            pool, str, range(200), 4):
+        assert pool.outstanding <= 4
+        results.append(result)
+    assert results == [str(cnt) for cnt in range(200)]
+    assert pool.max_outstanding == 4
+
+
+def test_seeded_replay(scheming_bcdc_dataset, tmp_path, monkeypatch):
+    '''
+    the seed is included in the test ids, and populating with the seed from
+    an id should return exactly the same data.
+    '''
+    params = read_test_config.TestParameters(
+        {'test_users': ['admin_user'], 'test_data': ['populate_randomized'],
+         'test_result': True})
+    assert params.get_as_id() == 'admin_user-populate_randomized-True'
+    assert params.get_as_id(1234) == 'admin_user-populate_randomized-True-seed1234'
+
+    monkeypatch.setenv('TEMP', str(tmp_path))
+    datasets = []
+    for _ in range(2):
+        populator = bcdc_dynamic_data_population.DataPopulation(
+            scheming_bcdc_dataset, "dataset_fields", seed=1234)
+        populator.disable_cache = True
+        datasets.append(next(populator.populate_randomized()))
+    assert datasets[0] == datasets[1]
+
+
+def test_dates_fixed_epoch(scheming_bcdc_resource):
+    '''
+    random dates are relative to DATE_EPOCH, not today, so replaying a seed on
+    a later day returns the same dates.
+    '''
+    epoch = bcdc_dynamic_data_population.DATE_EPOCH
+    earliest = epoch - datetime.timedelta(days=bcdc_dynamic_data_population.DATE_RANGE_DAYS)
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        scheming_bcdc_resource, "resource_fields", seed=5)
+    populator.disable_cache = True
+    resources = [next(populator.populate_randomized())]
+    resources.extend(populator.populate_many(50))
+    for resource in resources:
+        for field in ['created', 'last_modified']:
+            date = datetime.date.fromisoformat(resource[field])
+            assert earliest <= date <= epoch
+
+
+def test_dataset_iterator_sharing():
+    '''
+    the iterator can be looped over more than once, and the datasets it hands
+    out are copies so changing them doesn't change the shared base dataset.
+    '''
+    base = {'name': 'base', 'title': 'title', 'notes': 'notes'}
+    data_iterable = bcdc_dynamic_data_population.DataSetIterator(base)
+    data_iterable.flds_to_remove(['title', 'notes'])
+    assert len(data_iterable) == 2
+    assert list(data_iterable) == [{'name': 'base', 'notes': 'notes'},
+                                   {'name': 'base', 'title': 'title'}]
+    assert list(data_iterable) == list(data_iterable)
+    assert all(view.base is base for view in data_iterable.views())
+
+    dataset = next(data_iterable)
+    dataset['name'] = 'changed'
+    assert base['name'] == 'base'
+    assert data_iterable[0]['name'] == 'base'
+    assert next(data_iterable) == data_iterable[1]
+    with pytest.raises(StopIteration):
+        next(data_iterable)
+
+
+@pytest.mark.parametrize('codec_name', [json_codec.CODEC_JSON,
+                                        json_codec.CODEC_ORJSON])
+def test_payload_encode_once(codec_name, tmp_path, monkeypatch):
+    '''
+    payloads should only be encoded once, until they are modified, and the
+    cache should be written from the encoded payloads.
+    '''
+    if codec_name == json_codec.CODEC_ORJSON:
+        pytest.importorskip('orjson')
+    monkeypatch.setenv('TEMP', str(tmp_path))
+    json_codec.set_codec(codec_name)
+    try:
+        payload = json_codec.Payload({'name': 'pkg', 'title': 'títle'})
+        body = payload.body
+        assert json.loads(body.decode('utf8')) == payload
+        assert payload.body is body
+        assert payload.ref == f'pkg@{payload.digest[:12]}'
+
+        payload['title'] = 'changed'
+        assert payload.body is not body
+        assert json.loads(payload.body.decode('utf8'))['title'] == 'changed'
+
+        cache = bcdc_dynamic_data_population.DataCache(f'payload_{codec_name}.json')
+        cache.write_cache_data([payload, {'name': 'dict'}])
+        assert list(cache.load_cache_data()) == [payload, {'name': 'dict'}]
+    finally:
+        json_codec.set_codec(None)
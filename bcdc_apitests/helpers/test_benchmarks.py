@@ -0,0 +1,153 @@
+'''
+Created on Oct. 18, 2026
+
+Micro benchmarks for the schema parsing and data generation helpers.  They run
+offline using the schemas in the test_data directory and require the
+pytest-benchmark plugin, if it isn't installed the benchmarks are skipped.
+
+To record a baseline and then compare against it after making changes to the
+helpers:
+
+    pytest helpers/test_benchmarks.py --benchmark-autosave
+    pytest helpers/test_benchmarks.py --benchmark-compare \
+        --benchmark-compare-fail=mean:20%
+
+Results are saved in the .benchmarks directory.
+'''
+import json
+import logging
+import os.path
+
+import pytest
+
+import bcdc_apitests.helpers.bcdc_dataset_schema as bcdc_dataset_schema
+import bcdc_apitests.helpers.bcdc_dynamic_data_population as bcdc_dynamic_data_population
+from bcdc_apitests.helpers.file_utils import FileUtils
+
+pytest.importorskip('pytest_benchmark')
+
+# pylint: disable=redefined-outer-name
+LOGGER = logging.getLogger(__name__)
+
+SEED = 1
+
+
+@pytest.fixture(scope='module')
+def scheming_struct():
+    '''
+    :return: the scheming struct from test_data/data_schema.json
+    '''
+    data_schema_file = os.path.join(FileUtils().get_test_data_dir(),
+                                    'data_schema.json')
+    with open(data_schema_file, 'r', encoding='utf8') as file_hand:
+        yield json.load(file_hand)['result']
+
+
+@pytest.fixture(scope='module')
+def dataset_schema(scheming_struct):
+    '''
+    :return: BCDCDataset for the dataset fields
+    '''
+    yield bcdc_dataset_schema.BCDCDataset(dataset_type='dataset_fields',
+                                          struct=scheming_struct)
+
+
+@pytest.fixture(scope='module')
+def resource_schema(scheming_struct):
+    '''
+    :return: BCDCDataset for the resource fields
+    '''
+    yield bcdc_dataset_schema.BCDCDataset(dataset_type='resource_fields',
+                                          struct=scheming_struct)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    '''
+    points the data cache at a temporary directory
+    '''
+    monkeypatch.setenv('TEMP', str(tmp_path))
+    yield tmp_path
+
+
+@pytest.mark.parametrize('data_type', ['dataset_fields', 'resource_fields'])
+def test_bench_schema_parse(benchmark, scheming_struct, data_type):
+    '''
+    BCDCDataset construction, includes merging the ckan core schema
+    '''
+    schema = benchmark(bcdc_dataset_schema.BCDCDataset, dataset_type=data_type,
+                       struct=scheming_struct)
+    assert len(schema)
+
+
+def test_bench_core_schema_parse(benchmark):
+    '''
+    CKANCorePackage construction from test_data/ckan_core_schema.json
+    '''
+    schema = benchmark(bcdc_dataset_schema.CKANCorePackage, 'dataset_fields')
+    assert len(schema)
+
+
+def test_bench_get_field(benchmark, dataset_schema):
+    '''
+    looks up every field in the dataset schema by name
+    '''
+    field_names = [fld.field_name for fld in dataset_schema]
+
+    def get_fields():
+        return [dataset_schema.get_field(fld_name) for fld_name in field_names]
+    assert all(benchmark(get_fields))
+
+
+@pytest.mark.parametrize('data_type', ['dataset_fields', 'resource_fields'])
+def test_bench_populate_all(benchmark, dataset_schema, resource_schema,
+                            data_type):
+    '''
+    generates a single randomized dataset
+    '''
+    schema = dataset_schema if data_type == 'dataset_fields' else resource_schema
+    populator = bcdc_dynamic_data_population.DataPopulationResource(schema)
+    dataset = benchmark(populator.populate_all)
+    assert dataset
+
+
+def test_bench_composite_repeating(benchmark, dataset_schema):
+    '''
+    populates each of the composite repeating fields in the dataset schema
+    '''
+    populator = bcdc_dynamic_data_population.DataPopulationResource(dataset_schema)
+    flds = [fld for fld in dataset_schema if fld.preset == 'composite_repeating']
+    assert flds
+
+    def populate():
+        return [populator.composite_repeating(fld) for fld in flds]
+    assert all(benchmark(populate))
+
+
+def test_bench_cache_write_load(benchmark, dataset_schema, cache_dir):
+    '''
+    writes 100 datasets to the data cache and loads them back
+    '''
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        dataset_schema, 'dataset_fields', seed=SEED)
+    datasets = populator.populate_many(100).to_iterator()
+    cache = bcdc_dynamic_data_population.DataCache('benchmark.json')
+
+    def write_load():
+        cache.write_cache_data(datasets)
+        return cache.load_cache_data()
+    assert len(benchmark(write_load)) == 100
+
+
+def test_bench_dataset_iterator(benchmark, dataset_schema):
+    '''
+    iterates over the variants of a dataset with each of the fields removed
+    '''
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        dataset_schema, 'dataset_fields', seed=SEED)
+    base = populator.pop_resource.populate_all()
+    data_iterable = bcdc_dynamic_data_population.DataSetIterator(base)
+    data_iterable.flds_to_remove(list(base))
+
+    datasets = benchmark(list, data_iterable)
+    assert len(datasets) == len(base)
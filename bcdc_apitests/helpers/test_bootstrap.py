@@ -0,0 +1,104 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the session bootstrap DAG executor
+'''
+import logging
+import threading
+
+import pytest
+
+import bcdc_apitests.helpers.bootstrap as bootstrap
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_bootstrap_runs_independent_steps_concurrently():
+    '''
+    the user steps can only get past the barrier if they run at the same
+    time, the org step gets the results of the steps it depends on.
+    '''
+    users = ['admin', 'editor', 'viewer']
+    barrier = threading.Barrier(len(users), timeout=10)
+
+    def user_setup(user):
+        barrier.wait()
+        return {'name': user}
+
+    def org_setup(org_name, *org_users):
+        return {'name': org_name, 'users': list(org_users)}
+
+    dag = bootstrap.Bootstrap(max_workers=4)
+    for user in users:
+        dag.add(f'user:{user}', user_setup, args=[user])
+    dag.add('org', org_setup, args=['test_org'],
+            deps=[f'user:{user}' for user in users])
+    assert dag.get_order()[-1] == 'org'
+
+    results = dag.run()
+    assert results['org'] == {'name': 'test_org',
+                              'users': [{'name': user} for user in users]}
+
+
+def test_bootstrap_errors():
+    '''
+    missing dependencies and cycles are caught before anything runs, a step
+    that fails stops the steps that depend on it.
+    '''
+    dag = bootstrap.Bootstrap(max_workers=2)
+    dag.add('org', dict, deps=['user'])
+    with pytest.raises(ValueError):
+        dag.run()
+    dag.add('user', dict, deps=['org'])
+    with pytest.raises(ValueError):
+        dag.run()
+    with pytest.raises(ValueError):
+        dag.add('user', dict)
+
+    ran = []
+
+    def fail():
+        raise RuntimeError('ckan is down')
+
+    dag = bootstrap.Bootstrap(max_workers=2)
+    dag.add('user', fail)
+    dag.add('org', ran.append, args=['org'], deps=['user'])
+    with pytest.raises(bootstrap.BootstrapError) as err:
+        dag.run()
+    assert isinstance(err.value.__cause__, RuntimeError)
+    assert not ran
+
+
+def test_bootstrap_teardown_on_failure():
+    '''
+    when a step fails the steps that completed are torn down in reverse,
+    including the ones that were still running, and a failed teardown
+    doesn't stop the others
+    '''
+    torn_down = []
+    user_started = threading.Event()
+    failed = threading.Event()
+
+    def slow_user(user, _group):
+        user_started.set()
+        failed.wait(10)
+        return {'name': user}
+
+    def fail(_group):
+        user_started.wait(10)
+        failed.set()
+        raise RuntimeError('ckan is down')
+
+    def broken_teardown(data):
+        raise RuntimeError(f'can not remove {data}')
+
+    dag = bootstrap.Bootstrap(max_workers=4)
+    dag.add('group', dict, args=[{'name': 'grp'}], teardown=torn_down.append)
+    dag.add('user', slow_user, args=['usr'], deps=['group'],
+            teardown=torn_down.append)
+    dag.add('lookup', dict, deps=['group'], teardown=broken_teardown)
+    dag.add('org', fail, deps=['group'])
+    dag.add('members', dict, deps=['user', 'org'], teardown=torn_down.append)
+    with pytest.raises(bootstrap.BootstrapError):
+        dag.run()
+    assert torn_down == [{'name': 'usr'}, {'name': 'grp'}]
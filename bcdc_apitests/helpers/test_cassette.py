@@ -0,0 +1,77 @@
+'''
+Created on Oct. 18, 2026
+
+tests for recording the calls made to ckan to a cassette and playing them
+back, the calls are recorded from the fake ckan.
+'''
+import gzip
+import logging
+import uuid
+
+import ckanapi
+import pytest
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.cassette as cassette
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.fake_ckan as fake_ckan
+
+LOGGER = logging.getLogger(__name__)
+
+
+def make_calls(remote_api, password):
+    '''
+    makes the same calls the fixtures do, the user name, the password and the
+    uuid in the extras change from run to run.
+
+    :return: the results of the calls
+    '''
+    user_name = f'{testConfig.TEST_PREFIX}_{testConfig.TEST_NAMESPACE}_editor'
+    user = remote_api.action.user_create(
+        name=user_name, email='editor@localhost', password=password,
+        about=f'created {uuid.uuid4()}')
+    results = [user['name'], remote_api.action.user_show(id=user_name)['name']]
+    with pytest.raises(ckanapi.ValidationError):
+        remote_api.action.user_create(name=user_name, email='editor@localhost',
+                                      password=password)
+    results.append(remote_api.action.status_show()['ckan_version'])
+    return results
+
+
+def test_cassette_record_replay(tmp_path, monkeypatch):
+    '''
+    the replay gets the recorded responses without a ckan instance, with a
+    different api key, password and test namespace.
+    '''
+    cassette_path = str(tmp_path / 'run.cassette')
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    recorder = cassette.Cassette(cassette_path, cassette.MODE_RECORD, seed=5,
+                                 ckan_url=server.url)
+    session = ckan_session.CKANSession(server.url, timeout=5, cassette=recorder)
+    try:
+        recorded = make_calls(session.get_remote_api(server.ckan.sysadmin_apikey),
+                              'password1')
+    finally:
+        session.close()
+        server.stop()
+    recorder.save()
+    # the api key returned by user_show is not kept in the cassette
+    with gzip.open(cassette_path, 'rb') as cassette_file:
+        saved = cassette_file.read().decode('utf-8')
+    assert '"apikey"' in saved.replace('\\"', '"')
+    for user in server.ckan.users.values():
+        assert user['apikey'] not in saved
+
+    monkeypatch.setattr(testConfig, 'TEST_NAMESPACE', 'zyx_gw1')
+    player = cassette.Cassette(cassette_path, cassette.MODE_REPLAY)
+    assert player.seed == 5
+    assert player.ckan_url == server.url
+    session = ckan_session.CKANSession(server.url, timeout=5, cassette=player)
+    replayed = make_calls(session.get_remote_api('another_key'), 'password2')
+    assert replayed == [name.replace(f'_{recorder.namespace}_', '_zyx_gw1_')
+                        for name in recorded[:2]] + recorded[2:]
+    assert player.get_stats()['misses'] == 0
+
+    with pytest.raises(cassette.CassetteMissError):
+        session.get_remote_api().action.package_show(id='not_recorded')
@@ -0,0 +1,88 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the latency metrics of the ckan action calls
+'''
+import logging
+
+import ckanapi
+import pytest
+
+import bcdc_apitests.helpers.ckan_metrics as ckan_metrics
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.fake_ckan as fake_ckan
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_ckan_metrics_report():
+    '''
+    the percentiles, roles and the OpenMetrics output
+    '''
+    metrics = ckan_metrics.CKANMetrics()
+    metrics.set_role('admin_key', 'admin')
+    url = 'https://ckan/api/3/action/package_show'
+    for cnt in range(1, 101):
+        metrics.record(url, {'X-CKAN-API-Key': 'admin_key'}, 200, cnt / 100,
+                       bytes_out=10, bytes_in=100)
+    metrics.record(url, {}, 404, 0.02, retries=1)
+    metrics.record(url, {'Authorization': 'other_key'}, ckan_metrics.STATUS_ERROR, 1)
+    metrics.record('https://ckan/api/3/status', None, 200, 0.01)
+
+    report = metrics.get_report()
+    admin = [call for call in report['calls'] if call['role'] == 'admin'][0]
+    assert (admin['count'], admin['p50'], admin['p95'], admin['p99']) == \
+        (100, 0.5, 0.95, 0.99)
+    assert admin['bytes_in'] == 10000
+    assert {(call['role'], call['status']) for call in report['calls']} == {
+        ('admin', '200'), ('anonymous', '404'), ('unknown', 'error'),
+        ('anonymous', '200')}
+    assert report['actions']['package_show']['count'] == 102
+    assert report['actions']['package_show']['retries'] == 1
+    assert report['actions']['other']['count'] == 1
+
+    text = metrics.to_openmetrics()
+    labels = 'action="package_show",role="admin",status="200"'
+    assert f'bcdc_ckan_action_duration_seconds_bucket{{{labels},le="0.25"}} 25\n' in text
+    assert f'bcdc_ckan_action_duration_seconds_bucket{{{labels},le="+Inf"}} 100\n' in text
+    assert f'bcdc_ckan_action_latency_seconds{{{labels},quantile="0.95"}} 0.95\n' in text
+    assert f'bcdc_ckan_action_bytes_out_total{{{labels}}} 1000\n' in text
+    assert text.endswith('# EOF\n')
+
+
+def test_ckan_session_metrics(tmp_path):
+    '''
+    the calls made through a session are recorded with the role and status
+    '''
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    metrics = ckan_metrics.CKANMetrics()
+    metrics.set_role(server.ckan.sysadmin_apikey, ckan_metrics.ROLE_SYSADMIN)
+    session = ckan_session.CKANSession(server.url, timeout=5, metrics=metrics)
+    try:
+        session.get_remote_api(server.ckan.sysadmin_apikey).action.status_show()
+        with pytest.raises(ckanapi.NotFound):
+            session.get_remote_api().action.package_show(id='missing_pkg')
+    finally:
+        session.close()
+        server.stop()
+
+    calls = {(call['action'], call['role'], call['status']): call
+             for call in metrics.get_report()['calls']}
+    assert set(calls) == {('status_show', 'sysadmin', '200'),
+                          ('package_show', 'anonymous', '404')}
+    assert calls[('status_show', 'sysadmin', '200')]['bytes_in'] > 0
+
+    metrics_file = tmp_path / 'metrics.prom'
+    metrics.write_textfile(str(metrics_file))
+    assert metrics_file.read_text() == metrics.to_openmetrics()
+
+    # the files of the xdist workers don't have any series in common
+    series = []
+    for worker in ['gw0', 'gw1']:
+        metrics.write_textfile(str(metrics_file), worker)
+        samples = [line.rsplit(' ', 1)[0] for line in
+                   metrics_file.read_text().splitlines() if not line.startswith('#')]
+        assert all(f'worker="{worker}"' in sample for sample in samples)
+        series.append(set(samples))
+    assert series[0] and not series[0] & series[1]
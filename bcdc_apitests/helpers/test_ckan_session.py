@@ -0,0 +1,296 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the shared ckan http session, run against a small local http server
+that answers every call like a ckan action, and for the retry policy it uses.
+'''
+import http.server
+import json
+import logging
+import socketserver
+import threading
+
+import pytest
+import requests
+
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.retry_policy as retry_policy
+
+# pylint: disable=redefined-outer-name
+LOGGER = logging.getLogger(__name__)
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    '''
+    http server that handles each connection in a thread
+    '''
+    daemon_threads = True
+
+
+class ActionHandler(http.server.BaseHTTPRequestHandler):
+    '''
+    keep alive handler that returns a successful ckan response with the api
+    key header it received as the result.  Sets a session cookie on every
+    response, the cookies that are sent back are kept in the server's
+    cookies_received list.
+    '''
+    protocol_version = 'HTTP/1.1'
+
+    def respond(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            self.rfile.read(length)
+        if self.headers.get('Cookie'):
+            self.server.cookies_received.append(self.headers.get('Cookie'))
+        body = json.dumps({'success': True,
+                           'result': self.headers.get('X-CKAN-API-Key')}).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', 'ckan=session-for-this-user; Path=/')
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = respond
+    do_POST = respond
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        LOGGER.debug(format, *args)
+
+
+@pytest.fixture
+def ckan_server():
+    '''
+    :return: the url of a local http server that responds like ckan, and the
+        server
+    '''
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ActionHandler)
+    server.cookies_received = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}', server
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuses_connections(ckan_server):
+    '''
+    raw requests and RemoteCKAN calls for different users should share the
+    same connection.
+    '''
+    ckan_url, _ = ckan_server
+    session = ckan_session.CKANSession(ckan_url, pool_size=2, timeout=5)
+    api_call = f'{ckan_url}/api/3/action/status_show'
+    for user in ['admin', 'editor']:
+        resp = session.post(api_call, headers={'X-CKAN-API-Key': user}, data=b'{}')
+        assert resp.json()['result'] == user
+        remote_api = session.get_remote_api(user)
+        assert remote_api.action.status_show() == user
+        assert session.get_remote_api(user) is remote_api
+
+    stats = session.get_stats()
+    assert stats['requests'] == 4
+    assert stats['connections'] == 1
+    assert stats['reused'] == 3
+    session.close()
+
+
+def test_session_ignores_cookies(ckan_server):
+    '''
+    a cookie set by the server for one user must not be sent with the calls
+    of the other users, or the anonymous calls.
+    '''
+    ckan_url, server = ckan_server
+    plain_session = requests.Session()
+    for _ in range(2):
+        plain_session.get(f'{ckan_url}/api/3/action/status_show')
+    # the server's cookie is kept by a default session
+    assert server.cookies_received
+    plain_session.close()
+    del server.cookies_received[:]
+
+    session = ckan_session.CKANSession(ckan_url, timeout=5)
+    session.post(f'{ckan_url}/api/3/action/status_show',
+                 headers={'X-CKAN-API-Key': 'admin'}, data=b'{}')
+    assert session.get_remote_api('admin').action.status_show() == 'admin'
+    assert session.get_remote_api().action.status_show() is None
+    assert not session.cookies
+    assert not server.cookies_received
+    session.close()
+
+
+class FakeResponse():
+    '''
+    stands in for a requests.Response in the retry policy tests
+    '''
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def close(self):
+        pass
+
+
+class FakeClock():
+    '''
+    clock that only moves when sleep is called
+    '''
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+def get_policy(clock, **kwargs):
+    '''
+    :return: a retry policy that uses the fake clock
+    '''
+    params = {'max_attempts': 4, 'backoff': 1.0, 'budget': 100,
+              'breaker_threshold': 5, 'breaker_reset': 30.0}
+    params.update(kwargs)
+    return retry_policy.RetryPolicy(sleep=clock.sleep, clock=clock, **params)
+
+
+def get_send(statuses):
+    '''
+    :return: a send function that returns responses with the statuses in
+        order, and the list of statuses that were returned
+    '''
+    sent = []
+
+    def send():
+        status = statuses[len(sent)]
+        sent.append(status)
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(status)
+    return send, sent
+
+
+def test_retry_idempotency():
+    '''
+    read actions are retried on 500s with jittered backoff, actions that
+    change data are only retried when ckan can't have processed them.
+    '''
+    read_call = 'https://ckan/api/3/action/package_show'
+    create_call = 'https://ckan/api/3/action/package_create'
+    clock = FakeClock()
+    policy = get_policy(clock)
+
+    send, sent = get_send([500, 504, 200])
+    assert policy.call(send, 'POST', read_call).status_code == 200
+    assert sent == [500, 504, 200]
+    assert 0 <= clock.sleeps[0] <= 1.0 and 0 <= clock.sleeps[1] <= 2.0
+
+    for status in [500, 504]:
+        send, sent = get_send([status, 200])
+        assert policy.call(send, 'POST', create_call).status_code == status
+    send, sent = get_send([503, 502, 200])
+    assert policy.call(send, 'POST', create_call).status_code == 200
+
+    send, sent = get_send([requests.exceptions.ReadTimeout(), 200])
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        policy.call(send, 'POST', create_call)
+    send, sent = get_send([requests.exceptions.ReadTimeout(), 200])
+    assert policy.call(send, 'POST', read_call).status_code == 200
+
+    # gives up after max_attempts
+    send, sent = get_send([503] * 5)
+    assert policy.call(send, 'GET', read_call).status_code == 503
+    assert len(sent) == 4
+
+
+def test_retry_budget_and_breaker():
+    '''
+    retries stop once the budget is used, the breaker opens after consecutive
+    failures and closes again after a successful trial call.
+    '''
+    read_call = 'https://ckan/api/3/action/status_show'
+    clock = FakeClock()
+    policy = get_policy(clock, budget=2, breaker_threshold=100)
+    send, sent = get_send([502] * 5)
+    assert policy.call(send, 'GET', read_call).status_code == 502
+    assert len(sent) == 3
+    assert policy.get_stats()['retry_budget_left'] == 0
+
+    clock = FakeClock()
+    policy = get_policy(clock, breaker_threshold=3)
+    send, sent = get_send([503] * 10)
+    assert policy.call(send, 'GET', read_call).status_code == 503
+    assert len(sent) == 3
+    assert policy.get_stats()['breaker_state'] == retry_policy.OPEN
+    with pytest.raises(retry_policy.CircuitOpenError):
+        policy.call(send, 'GET', read_call)
+    assert len(sent) == 3
+
+    # past the cool down, the float addition can land just short of 30
+    clock.now += 30.5
+    send, sent = get_send([200])
+    assert policy.call(send, 'GET', read_call).status_code == 200
+    assert policy.get_stats()['breaker_state'] == retry_policy.CLOSED
+    assert policy.get_stats()['breaker_trips'] == 1
+
+
+def test_breaker_half_open_single_trial():
+    '''
+    once the cool down has passed only one of the concurrent callers makes the
+    trial call, the others fail straight away until the trial is done.
+    '''
+    read_call = 'https://ckan/api/3/action/status_show'
+    clock = FakeClock()
+    policy = get_policy(clock, max_attempts=1, breaker_threshold=1)
+    send, _ = get_send([503])
+    policy.call(send, 'GET', read_call)
+    assert policy.get_stats()['breaker_state'] == retry_policy.OPEN
+    clock.now += 30.5
+
+    trial_started = threading.Event()
+    finish_trial = threading.Event()
+    trials = []
+
+    def trial_send():
+        trials.append(threading.current_thread().name)
+        trial_started.set()
+        finish_trial.wait(10)
+        return FakeResponse(200)
+
+    outcomes = []
+
+    def caller():
+        try:
+            outcomes.append(policy.call(trial_send, 'GET', read_call).status_code)
+        except retry_policy.CircuitOpenError:
+            outcomes.append('open')
+
+    first = threading.Thread(target=caller)
+    first.start()
+    assert trial_started.wait(10)
+    assert policy.get_stats()['breaker_state'] == retry_policy.HALF_OPEN
+    others = [threading.Thread(target=caller) for _ in range(8)]
+    for thread in others:
+        thread.start()
+    for thread in others:
+        thread.join(10)
+    assert outcomes == ['open'] * 8
+    finish_trial.set()
+    first.join(10)
+    assert len(trials) == 1
+    assert outcomes[-1] == 200
+    assert policy.get_stats()['breaker_state'] == retry_policy.CLOSED
+
+    # a failed trial opens the breaker again
+    send, sent = get_send([503, 503])
+    policy.call(send, 'GET', read_call)
+    clock.now += 30.5
+    assert policy.call(send, 'GET', read_call).status_code == 503
+    assert policy.get_stats()['breaker_state'] == retry_policy.OPEN
+    with pytest.raises(retry_policy.CircuitOpenError):
+        policy.call(send, 'GET', read_call)
+    assert len(sent) == 2
@@ -0,0 +1,52 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the bcdc-datagen command line tool
+'''
+import io
+import json
+
+import bcdc_apitests.helpers.datagen as datagen
+
+
+def test_generate_jsonl():
+    '''
+    records should be written one per line, and the same seed should produce
+    the same output whether or not workers are used.
+    '''
+    struct = datagen.load_schema_file()
+    out_hand = io.StringIO()
+    seed = datagen.generate(struct, 'resource_fields', 25, out_hand, seed=3,
+                            overrides={'bcdc_type': 'document'}, chunk_size=10)
+    assert seed == 3
+    lines = out_hand.getvalue().splitlines()
+    assert len(lines) == 25
+    assert all(json.loads(line)['bcdc_type'] == 'document' for line in lines)
+
+    worker_hand = io.StringIO()
+    datagen.generate(struct, 'resource_fields', 25, worker_hand, seed=3,
+                     overrides={'bcdc_type': 'document'}, workers=2,
+                     chunk_size=10)
+    assert worker_hand.getvalue() == out_hand.getvalue()
+
+
+def test_generate_bounded(monkeypatch):
+    '''
+    the workers should only be given max_pending chunks at a time, so a slow
+    writer holds them back rather than the chunks piling up in memory.
+    '''
+    submitted = []
+    imap_bounded = datagen.bcdc_dynamic_data_population.imap_bounded
+
+    def record_bounded(pool, func, iterable, max_pending):
+        submitted.append(max_pending)
+        return imap_bounded(pool, func, iterable, max_pending)
+    monkeypatch.setattr(datagen.bcdc_dynamic_data_population, 'imap_bounded',
+                        record_bounded)
+
+    struct = datagen.load_schema_file()
+    out_hand = io.StringIO()
+    datagen.generate(struct, 'resource_fields', 30, out_hand, seed=3,
+                     workers=2, chunk_size=5, max_pending=3)
+    assert submitted == [3]
+    assert len(out_hand.getvalue().splitlines()) == 30
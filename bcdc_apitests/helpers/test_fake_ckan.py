@@ -0,0 +1,114 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the in memory fake ckan used by the --bcdc-fake-ckan option, the
+calls are made over http with ckanapi like the fixtures do.
+'''
+import logging
+
+import ckanapi
+import pytest
+
+import bcdc_apitests.helpers.bcdc_dataset_schema as bcdc_dataset_schema
+import bcdc_apitests.helpers.bcdc_dynamic_data_population as bcdc_dynamic_data_population
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.fake_ckan as fake_ckan
+
+# pylint: disable=redefined-outer-name
+LOGGER = logging.getLogger(__name__)
+
+USERS = {'fake_admin': 'admin', 'fake_editor': 'editor', 'fake_viewer': 'member'}
+
+
+@pytest.fixture
+def fake_ckan_server():
+    '''
+    :return: a running fake ckan server
+    '''
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def remote_apis(fake_ckan_server):
+    '''
+    creates the test org with an admin, editor and member
+
+    :return: dictionary of role to a RemoteCKAN object for the user with
+        that role, 'sysadmin' for the sysadmin and None for anonymous calls
+    '''
+    session = ckan_session.CKANSession(fake_ckan_server.url, timeout=5)
+    sysadmin = session.get_remote_api(fake_ckan_server.ckan.sysadmin_apikey)
+    apis = {'sysadmin': sysadmin, None: session.get_remote_api()}
+    for user, role in USERS.items():
+        sysadmin.action.user_create(name=user, email=f'{user}@localhost',
+                                    password='password')
+        apikey = sysadmin.action.user_show(id=user)['apikey']
+        apis[role] = session.get_remote_api(apikey)
+    sysadmin.action.organization_create(
+        name='fake_org', users=[{'name': user, 'capacity': role}
+                                for user, role in USERS.items()])
+    yield apis
+    session.close()
+
+
+def test_fake_ckan_permissions(remote_apis):
+    '''
+    generated datasets can be created by editors but not members, only the
+    sysadmin can see the config and api keys of other users.
+    '''
+    scheming = remote_apis[None].action.scheming_dataset_schema_show(
+        type='bcdc_dataset')
+    schema = bcdc_dataset_schema.BCDCDataset(dataset_type='dataset_fields',
+                                             struct=scheming)
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        schema, 'dataset_fields', seed=1)
+    org = remote_apis['member'].action.organization_show(id='fake_org')
+    dataset = populator.populate_randomized(
+        {'owner_org': org['id'], 'name': 'fake_pkg', 'state': 'active'})[0]
+
+    with pytest.raises(ckanapi.NotAuthorized):
+        remote_apis['member'].action.package_create(**dataset)
+    pkg = remote_apis['editor'].action.package_create(**dataset)
+    assert remote_apis['member'].action.package_show(id='fake_pkg')['id'] == pkg['id']
+    assert remote_apis[None].action.package_search()['count'] == 1
+
+    with pytest.raises(ckanapi.ValidationError):
+        remote_apis['editor'].action.package_create(**dataset)
+    with pytest.raises(ckanapi.NotAuthorized):
+        remote_apis['member'].action.package_delete(id='fake_pkg')
+    remote_apis['admin'].action.package_delete(id='fake_pkg')
+    with pytest.raises(ckanapi.NotFound):
+        remote_apis[None].action.package_show(id='missing_pkg')
+
+    with pytest.raises(ckanapi.NotAuthorized):
+        remote_apis['admin'].action.config_option_list()
+    assert remote_apis['sysadmin'].action.config_option_list()
+    assert 'apikey' not in remote_apis['editor'].action.user_show(id='fake_admin')
+    assert 'apikey' in remote_apis['sysadmin'].action.user_show(id='fake_admin')
+
+
+def test_fake_ckan_validation(remote_apis):
+    '''
+    required fields, conditional fields and select choices from the scheming
+    definitions are enforced for resources.
+    '''
+    fake = remote_apis['sysadmin']
+    scheming = fake.action.scheming_dataset_schema_show(type='bcdc_dataset')
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        bcdc_dataset_schema.BCDCDataset(dataset_type='dataset_fields',
+                                        struct=scheming),
+        'dataset_fields', seed=2)
+    org = fake.action.organization_show(id='fake_org')
+    pkg = fake.action.package_create(**populator.populate_randomized(
+        {'owner_org': org['id'], 'name': 'fake_pkg'})[0])
+
+    with pytest.raises(ckanapi.ValidationError) as err:
+        fake.action.resource_create(package_id=pkg['id'], name='fake_rsrc',
+                                    bcdc_type='geographic')
+    assert err.value.error_dict['projection_name'] == ['Missing value']
+    with pytest.raises(ckanapi.ValidationError) as err:
+        fake.action.resource_create(package_id=pkg['id'], bcdc_type='not_a_type')
+    assert 'bcdc_type' in err.value.error_dict
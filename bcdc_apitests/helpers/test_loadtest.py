@@ -0,0 +1,190 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the bcdc-loadtest command line tool, the load is run against the
+fake ckan.
+'''
+import json
+import logging
+
+import ckanapi
+
+import bcdc_apitests.helpers.ckan_metrics as ckan_metrics
+import bcdc_apitests.helpers.fake_ckan as fake_ckan
+import bcdc_apitests.helpers.loadtest as loadtest
+import bcdc_apitests.helpers.retry_policy as retry_policy
+from bcdc_apitests.helpers.test_ckan_session import FakeResponse
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_load_entries():
+    '''
+    the testParams entries are flattened to one role each, tests without a
+    load action are left out
+    '''
+    entries = loadtest.get_load_entries()
+    keys = {(entry.action, entry.role, entry.expected) for entry in entries}
+    assert ('package_create', 'member', False) in keys
+    assert ('package_create', 'editor', True) in keys
+    assert all(entry.function in loadtest.FUNCTION_ACTIONS for entry in entries)
+    assert {entry.function for entry in loadtest.get_load_entries(
+        functions=['test_package_show'])} == {'test_package_show'}
+
+
+def test_rate_limiter():
+    '''
+    start times are spaced out by the rate and stop at the end of the run
+    '''
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+
+    limiter = loadtest.RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+    starts = 0
+    while limiter.wait(1.0):
+        starts += 1
+    assert starts == 4
+    assert waits == [0.25, 0.5, 0.75]
+
+
+class FakePopulator():
+    '''
+    stands in for DataPopulation, records the payloads that are generated
+    '''
+    seed = 1
+
+    def __init__(self):
+        self.calls = []
+
+    def populate_many(self, count):
+        self.calls.append('populate_many')
+        return [{'cnt': cnt} for cnt in range(count)]
+
+    def populate_required_fields_failure(self):
+        self.calls.append('populate_required_fields_failure')
+        return [{'missing': 'title'}]
+
+
+def test_payloads_prepared():
+    '''
+    the payloads for the entries are generated before the run, getting a
+    payload during the run doesn't generate any
+    '''
+    datasets = FakePopulator()
+    resources = FakePopulator()
+    state = loadtest.LoadState('org', datasets, resources, None, None)
+    entries = [
+        loadtest.LoadEntry('test_package_create', 'package_create', 'editor',
+                           'editor', 'populate_randomized', True),
+        loadtest.LoadEntry('test_package_create', 'package_create', 'editor',
+                           'editor', 'populate_required_fields_failure', False),
+        loadtest.LoadEntry('test_package_show', 'package_show', 'editor',
+                           'editor', 'dummy', True)]
+    state.prepare(entries)
+    assert datasets.calls == ['populate_many', 'populate_required_fields_failure']
+    assert not resources.calls
+
+    payload = state.get_payload('dataset_fields', 'dummy', {'name': 'pkg'})
+    assert payload['name'] == 'pkg' and 'cnt' in payload
+    assert state.get_payload('dataset_fields', 'populate_required_fields_failure',
+                             {}) == {'missing': 'title'}
+    assert len(datasets.calls) == 2
+
+
+class FakeRemoteCKAN():
+    '''
+    stands in for a ckanapi.RemoteCKAN, records the actions that are called
+    '''
+
+    def __init__(self, user, calls, denied=()):
+        self.action = self
+        self.user = user
+        self.calls = calls
+        self.denied = denied
+
+    def __getattr__(self, action):
+        def call(**kwargs):
+            self.calls.append((self.user, action))
+            if action in self.denied:
+                raise ckanapi.NotAuthorized(f'{self.user} can not {action}')
+            return {'id': f'{action}_id', 'name': kwargs.get('name')}
+        return call
+
+
+def test_delete_targets():
+    '''
+    the object a delete removes is created by the sysadmin before the call,
+    only the delete is recorded for the entry
+    '''
+    calls = []
+    state = loadtest.LoadState('org', FakePopulator(), FakePopulator(),
+                               {'id': 'seed_id', 'name': 'seed'}, None)
+    remote_apis = {ckan_metrics.ROLE_SYSADMIN: FakeRemoteCKAN('sysadmin', calls),
+                   'viewer': FakeRemoteCKAN('viewer', calls, ['package_delete'])}
+    entries = [loadtest.LoadEntry('test_package_delete', 'package_delete', 'member',
+                                  'viewer', 'populate_randomized', False),
+               loadtest.LoadEntry('test_resource_delete', 'resource_delete',
+                                  ckan_metrics.ROLE_SYSADMIN, ckan_metrics.ROLE_SYSADMIN,
+                                  'populate_randomized', True)]
+    load_test = loadtest.LoadTest(remote_apis, entries, state)
+    for entry in entries:
+        load_test.run_entry(entry)
+    assert calls == [('sysadmin', 'package_create'), ('viewer', 'package_delete'),
+                     ('sysadmin', 'resource_create'), ('sysadmin', 'resource_delete')]
+    report = load_test.results.get_report(1)
+    assert [(row['action'], row['calls'], row['errors']) for row in report] == \
+        [('package_delete', 1, 0), ('resource_delete', 1, 0)]
+    # the package the viewer couldn't delete is used by the next delete
+    assert list(state.packages) == [state.created[0]]
+
+
+def test_load_session():
+    '''
+    the load calls are made once, failures don't open a breaker, and there is
+    a connection for each worker
+    '''
+    session = loadtest.get_load_session('http://127.0.0.1:1', 20)
+    assert session.pool_size == 20
+    sent = []
+
+    def send():
+        sent.append(503)
+        return FakeResponse(503)
+    for _ in range(10):
+        assert session.policy.call(
+            send, 'POST', 'http://127.0.0.1:1/api/3/action/package_show').status_code == 503
+    assert len(sent) == 10
+    assert session.policy.get_stats()['retries'] == 0
+    assert session.policy.get_stats()['breaker_state'] == retry_policy.CLOSED
+    session.close()
+
+
+def test_loadtest_fake_ckan(tmp_path):
+    '''
+    a short run against the fake ckan, the calls that are expected to fail
+    for the member don't count as errors
+    '''
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    report_file = tmp_path / 'report.json'
+    try:
+        report = loadtest.main(['--url', server.url, '--apikey',
+                                server.ckan.sysadmin_apikey, '--duration', '1',
+                                '--concurrency', '4', '--rate', '150',
+                                '--seed', '1', '-o', str(report_file)])
+    finally:
+        server.stop()
+
+    rows = {(row['action'], row['role']): row for row in report}
+    assert sum(row['calls'] for row in report) > 50
+    assert ('package_create', 'member') in rows
+    for row in report:
+        assert row['errors'] == 0, row
+        assert row['p50'] <= row['p95'] <= row['p99']
+    assert json.loads(report_file.read_text())['actions'] == report
+    # the packages created by the load test are purged
+    assert not [pkg for pkg in server.ckan.packages.values()
+                if '_load_' in pkg['name']]
@@ -0,0 +1,53 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the cache of the setup reads, run against the fake ckan.
+'''
+import logging
+
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.fake_ckan as fake_ckan
+import bcdc_apitests.helpers.object_cache as object_cache
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_object_cache():
+    '''
+    reads come from the cache until the suite changes the object
+    '''
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    cache = object_cache.ObjectCache()
+    session = ckan_session.CKANSession(server.url, timeout=5, cache=cache)
+    try:
+        sysadmin = session.get_remote_api(server.ckan.sysadmin_apikey)
+        org = sysadmin.action.organization_create(name='cache_org', title='before')
+        sysadmin.action.organization_create(name='other_org')
+        for org_id in ['cache_org', org['id'], 'other_org']:
+            object_cache.show(sysadmin, 'organization_show', org_id)
+        requests_before = session.request_cnt
+        cached = object_cache.show(sysadmin, 'organization_show', 'cache_org')
+        cached['title'] = 'changed by a fixture'
+        assert object_cache.show(sysadmin, 'organization_show', org['id'])['title'] == \
+            'before'
+        assert session.request_cnt == requests_before
+        # the cache is per api key
+        object_cache.show(session.get_remote_api(), 'organization_show', 'cache_org')
+        assert cache.get_stats() == {'hits': 3, 'misses': 3, 'invalidations': 0}
+
+        sysadmin.action.organization_patch(id=org['id'], title='after')
+        assert object_cache.show(sysadmin, 'organization_show', 'cache_org')['title'] == \
+            'after'
+        # other orgs are still cached, unless bypassed
+        requests_before = session.request_cnt
+        object_cache.show(sysadmin, 'organization_show', 'other_org')
+        assert session.request_cnt == requests_before
+        object_cache.show(sysadmin, 'organization_show', 'other_org', bypass=True)
+        assert session.request_cnt == requests_before + 1
+        # an action that isn't for a known kind of object clears the cache
+        sysadmin.action.config_option_update(**{'ckan.site_title': 'cache'})
+        assert not cache.entries
+    finally:
+        session.close()
+        server.stop()
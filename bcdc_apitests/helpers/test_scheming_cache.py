@@ -0,0 +1,148 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the scheming definitions kept on disk, run against the fake ckan.
+'''
+import logging
+import os
+import socket
+import time
+
+import pytest
+import requests
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.fake_ckan as fake_ckan
+import bcdc_apitests.helpers.scheming_cache as scheming_cache
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_scheming_cache(tmp_path):
+    '''
+    the definitions are saved, used while they are fresh, revalidated when
+    they aren't, and used when the end point fails
+    '''
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    session = ckan_session.CKANSession(server.url, timeout=5)
+    cache = scheming_cache.SchemingCache(cache_dir=str(tmp_path), ttl=60, timeout=5)
+    try:
+        struct = cache.fetch(session, server.url)
+        assert cache.source == scheming_cache.SOURCE_REMOTE
+        assert struct == server.ckan.scheming_struct
+        cache_file = cache.get_cache_file(server.url, scheming_cache.SCHEMING_TYPE)
+        assert cache.read(cache_file)['etag']
+
+        requests_before = session.request_cnt
+        assert cache.fetch(session, server.url) == struct
+        assert (cache.source, session.request_cnt) == \
+            (scheming_cache.SOURCE_DISK, requests_before)
+
+        cache.ttl = 0
+        assert cache.fetch(session, server.url) == struct
+        assert cache.source == scheming_cache.SOURCE_REVALIDATED
+        assert session.request_cnt == requests_before + 1
+    finally:
+        session.close()
+        server.stop()
+
+    # the server is gone, the call is made once and the breaker of the session
+    # isn't touched
+    session = ckan_session.CKANSession(server.url, timeout=1)
+    try:
+        assert cache.fetch(session, server.url) == struct
+        assert cache.source == scheming_cache.SOURCE_STALE
+        os.remove(cache_file)
+        assert cache.fetch(session, server.url) == scheming_cache.load_bundled_scheming()
+        assert cache.source == scheming_cache.SOURCE_BUNDLED
+        assert session.request_cnt == 2
+        assert session.policy.failures == 0
+        assert session.policy.get_stats()['retries'] == 0
+    finally:
+        session.close()
+
+
+def test_scheming_cache_timeout(tmp_path):
+    '''
+    an end point that never answers is given up on after a single timeout
+    '''
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(8)
+    url = f'http://127.0.0.1:{listener.getsockname()[1]}'
+    session = ckan_session.CKANSession(url)
+    cache = scheming_cache.SchemingCache(cache_dir=str(tmp_path), timeout=0.5)
+    try:
+        start_time = time.monotonic()
+        assert cache.fetch(session, url) == scheming_cache.load_bundled_scheming()
+        assert time.monotonic() - start_time < 2
+        assert cache.source == scheming_cache.SOURCE_BUNDLED
+        assert session.request_cnt == 1
+        assert session.policy.failures == 0
+    finally:
+        session.close()
+        listener.close()
+
+
+def test_scheming_cache_http_error(tmp_path):
+    '''
+    an error response isn't hidden by the saved copy, the data would be
+    generated from definitions that may no longer be deployed
+    '''
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    session = ckan_session.CKANSession(server.url, timeout=5)
+    cache = scheming_cache.SchemingCache(cache_dir=str(tmp_path), ttl=0, timeout=5)
+    try:
+        cache.fetch(session, server.url)
+
+        def broken_deploy(user, data_dict):  # pylint: disable=unused-argument
+            raise fake_ckan.NotAuthorized('not authorized')
+        server.ckan.action_scheming_dataset_schema_show = broken_deploy
+        with pytest.raises(requests.exceptions.HTTPError):
+            cache.fetch(session, server.url)
+    finally:
+        session.close()
+        server.stop()
+
+
+def test_scheming_cache_default_ttl(tmp_path, monkeypatch):
+    '''
+    by default the saved copy is revalidated every time, so a schema that was
+    deployed since it was saved is picked up
+    '''
+    monkeypatch.delenv(testConfig.BCDC_SCHEMING_TTL, raising=False)
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    session = ckan_session.CKANSession(server.url, timeout=5)
+    cache = scheming_cache.SchemingCache(cache_dir=str(tmp_path), timeout=5)
+    try:
+        assert cache.ttl == 0
+        cache.fetch(session, server.url)
+        requests_before = session.request_cnt
+        cache.fetch(session, server.url)
+        assert cache.source == scheming_cache.SOURCE_REVALIDATED
+        assert session.request_cnt == requests_before + 1
+    finally:
+        session.close()
+        server.stop()
+
+
+def test_get_dataset():
+    '''
+    one frozen schema object per struct and data type
+    '''
+    struct = scheming_cache.load_bundled_scheming()
+    try:
+        dataset = scheming_cache.get_dataset(struct, 'dataset_fields')
+        assert scheming_cache.get_dataset(struct, 'dataset_fields') is dataset
+        assert scheming_cache.get_dataset(struct, 'resource_fields') is not dataset
+        with pytest.raises(TypeError):
+            dataset.set_field_type_filter('required', True)
+        with pytest.raises(TypeError):
+            dataset.remove_field(dataset.get_field('title'))
+        assert dataset.get_field('title') is not None
+    finally:
+        scheming_cache.clear()
@@ -0,0 +1,96 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the index of the test objects, run against the fake ckan.
+'''
+import logging
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.bcdc_dataset_schema as bcdc_dataset_schema
+import bcdc_apitests.helpers.bcdc_dynamic_data_population as bcdc_dynamic_data_population
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.fake_ckan as fake_ckan
+import bcdc_apitests.helpers.state_index as state_index
+
+LOGGER = logging.getLogger(__name__)
+
+
+def no_probe():
+    '''
+    probe for lookups that should be answered by the index
+    '''
+    raise AssertionError('the lookup should not need a probe')
+
+
+def get_payload(remote_api, data_type, overrides):
+    '''
+    :param data_type: dataset_fields or resource_fields
+    :param overrides: values to set in the payload
+    :return: a valid package or resource payload
+    '''
+    scheming = remote_api.action.scheming_dataset_schema_show(type='bcdc_dataset')
+    populator = bcdc_dynamic_data_population.DataPopulation(
+        bcdc_dataset_schema.BCDCDataset(dataset_type=data_type, struct=scheming),
+        data_type, seed=3)
+    return populator.populate_randomized(overrides)[0]
+
+
+def test_state_index():
+    '''
+    the objects are loaded in bulk, and the writes made through the session
+    keep the index current
+    '''
+    prefix = state_index.get_prefix()
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    session = ckan_session.CKANSession(server.url, timeout=5)
+    try:
+        remote_api = session.get_remote_api(server.ckan.sysadmin_apikey)
+        org = remote_api.action.organization_create(name=f'{prefix}org')
+        remote_api.action.organization_create(name='other_org')
+        remote_api.action.user_create(name=f'{prefix}user', email='user@localhost',
+                                      password='password1')
+        pkg_name = f'{prefix}pkg'
+        remote_api.action.package_create(**get_payload(
+            remote_api, 'dataset_fields',
+            {'name': pkg_name, 'owner_org': org['id'], 'state': 'active'}))
+
+        index = state_index.StateIndex()
+        session.state_index = index
+        assert index.get(remote_api, 'organization', f'{prefix}org', no_probe)['id'] == org['id']
+        assert index.get(remote_api, 'user', f'{prefix}user', no_probe)['state'] == 'active'
+        assert index.get(remote_api, 'package', pkg_name, no_probe)['resources'] == []
+        # not a test object, so not loaded
+        assert index.get(remote_api, 'organization', 'other_org',
+                         lambda: {'id': 'x', 'name': 'other_org'})['id'] == 'x'
+        assert index.get(remote_api, 'group', f'{prefix}grp', lambda: None) is None
+        assert index.get_stats() == {'hits': 3, 'probes': 2}
+
+        # writes through the session
+        group = remote_api.action.group_create(name=f'{prefix}grp')
+        assert index.get(remote_api, 'group', f'{prefix}grp', no_probe)['id'] == group['id']
+        rsrc = remote_api.action.resource_create(**get_payload(
+            remote_api, 'resource_fields', {'package_id': pkg_name}))
+        assert index.get(remote_api, 'package', pkg_name, no_probe)['resources'] == \
+            [{'id': rsrc['id'], 'name': rsrc['name']}]
+        remote_api.action.resource_delete(id=rsrc['id'])
+        remote_api.action.package_delete(id=pkg_name)
+        entry = index.get(remote_api, 'package', pkg_name, no_probe)
+        assert (entry['state'], entry['resources']) == ('deleted', [])
+        remote_api.action.dataset_purge(id=pkg_name)
+        assert index.get(remote_api, 'package', pkg_name, no_probe) is None
+        assert index.get(remote_api, 'package', entry['id'], no_probe) is None
+    finally:
+        session.close()
+        server.stop()
+
+
+def test_get_request_data():
+    '''
+    json and form encoded request bodies
+    '''
+    assert state_index.get_request_data(b'{"id": "pkg"}') == {'id': 'pkg'}
+    assert state_index.get_request_data('id=pkg&x=') == {'id': 'pkg', 'x': ''}
+    assert state_index.get_request_data(None) == {}
+    assert state_index.get_prefix() == \
+        f'{testConfig.TEST_PREFIX}_{testConfig.TEST_NAMESPACE}_'
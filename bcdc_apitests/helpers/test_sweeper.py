@@ -0,0 +1,117 @@
+'''
+Created on Oct. 18, 2026
+
+tests for removing the objects left behind by the tests, run against the
+fake ckan.
+'''
+import logging
+
+import ckanapi
+import pytest
+
+import bcdc_apitests.config.testConfig as testConfig
+import bcdc_apitests.helpers.ckan_session as ckan_session
+import bcdc_apitests.helpers.fake_ckan as fake_ckan
+import bcdc_apitests.helpers.state_index as state_index
+import bcdc_apitests.helpers.sweeper as sweeper
+from bcdc_apitests.helpers.test_state_index import get_payload
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_sweeper():
+    '''
+    the objects starting with the prefix are found and removed, the others
+    are left alone
+    '''
+    prefix = state_index.get_prefix()
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    session = ckan_session.CKANSession(server.url, timeout=5)
+    try:
+        remote_api = session.get_remote_api(server.ckan.sysadmin_apikey)
+        org = remote_api.action.organization_create(name=f'{prefix}org')
+        for name in [f'{prefix}pkg1', f'{prefix}pkg2', 'other_pkg']:
+            remote_api.action.package_create(**get_payload(
+                remote_api, 'dataset_fields',
+                {'name': name, 'owner_org': org['id'], 'state': 'active'}))
+        remote_api.action.package_delete(id=f'{prefix}pkg2')
+        remote_api.action.group_create(name=f'{prefix}grp')
+        remote_api.action.user_create(name=f'{prefix}user', email='user@localhost',
+                                      password='password1')
+
+        report = sweeper.Sweeper(remote_api, concurrency=2).sweep(dry_run=True)
+        assert report['found'] == {'package': 2, 'organization': 1, 'group': 1,
+                                   'user': 1}
+        assert sum(report['removed'].values()) == 0
+
+        report = sweeper.Sweeper(remote_api, concurrency=2).sweep()
+        LOGGER.debug(sweeper.format_report(report))
+        assert report['removed'] == report['found']
+        assert not report['errors']
+        assert set(report['durations']) == {'discover', 'packages', 'groups', 'users'}
+        for action, name in [('package_show', f'{prefix}pkg1'),
+                             ('package_show', f'{prefix}pkg2'),
+                             ('organization_show', f'{prefix}org'),
+                             ('group_show', f'{prefix}grp')]:
+            with pytest.raises(ckanapi.NotFound):
+                getattr(remote_api.action, action)(id=name)
+        assert remote_api.action.user_show(id=f'{prefix}user')['state'] == 'deleted'
+        assert remote_api.action.package_show(id='other_pkg')['state'] == 'active'
+    finally:
+        session.close()
+        server.stop()
+
+    with pytest.raises(ValueError):
+        sweeper.Sweeper(None, prefix='other_')
+
+
+def test_sweeper_namespaces():
+    '''
+    sweeping the namespace of a plain run leaves the objects of the runs with
+    a run id or xdist worker for the same user alone
+    '''
+    prefix = f"{testConfig.TEST_PREFIX}_{testConfig.get_namespace('abc')}_"
+    other_prefix = f"{testConfig.TEST_PREFIX}_{testConfig.get_namespace('abc', 'job-1', 'gw0')}_"
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    session = ckan_session.CKANSession(server.url, timeout=5)
+    try:
+        remote_api = session.get_remote_api(server.ckan.sysadmin_apikey)
+        for name_prefix in [prefix, other_prefix]:
+            org = remote_api.action.organization_create(name=f'{name_prefix}org')
+            remote_api.action.package_create(**get_payload(
+                remote_api, 'dataset_fields',
+                {'name': f'{name_prefix}pkg', 'owner_org': org['id'],
+                 'state': 'active'}))
+            remote_api.action.user_create(name=f'{name_prefix}user',
+                                          email=f'{name_prefix}@localhost',
+                                          password='password1')
+
+        report = sweeper.Sweeper(remote_api, prefix=prefix).sweep()
+        assert report['removed'] == {'package': 1, 'organization': 1,
+                                     'group': 0, 'user': 1}
+        assert remote_api.action.package_show(id=f'{other_prefix}pkg')['state'] == 'active'
+        assert remote_api.action.organization_show(id=f'{other_prefix}org')['state'] == 'active'
+        assert remote_api.action.user_show(id=f'{other_prefix}user')['state'] == 'active'
+    finally:
+        session.close()
+        server.stop()
+
+
+def test_sweeper_cli_prefix():
+    '''
+    the command line sweeps the current namespace unless all the test users
+    are asked for explicitly
+    '''
+    server = fake_ckan.FakeCKANServer()
+    server.start()
+    args = ['--url', server.url, '--apikey', server.ckan.sysadmin_apikey, '--dry-run']
+    try:
+        assert sweeper.main(args)['prefix'] == state_index.get_prefix()
+        assert sweeper.main(args + ['--all-users'])['prefix'] == \
+            f'{testConfig.TEST_PREFIX}_'
+        with pytest.raises(SystemExit):
+            sweeper.main(args + ['--all-users', '--prefix', f'{testConfig.TEST_PREFIX}_'])
+    finally:
+        server.stop()
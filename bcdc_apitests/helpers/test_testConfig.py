@@ -0,0 +1,38 @@
+'''
+Created on Oct. 18, 2026
+
+tests for the test object names set up in testConfig
+'''
+import logging
+
+import bcdc_apitests.config.testConfig as testConfig
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_get_namespace():
+    '''
+    the run and worker ids are added to the test user, every namespace has
+    the same number of parts so one is never the start of another
+    '''
+    assert testConfig.get_namespace('abc') == 'abc_local_main'
+    assert testConfig.get_namespace('abc', 'Job 42', 'gw1') == 'abc_job-42_gw1'
+    assert testConfig.get_namespace('abc', worker_id='gw0') == 'abc_local_gw0'
+    assert testConfig.get_namespace('a_b', 'job_1') == 'a-b_job-1_main'
+
+
+def test_get_namespace_long_parts():
+    '''
+    long parts are shortened with a hash of the whole part, so run ids that
+    only differ at the end don't share a namespace
+    '''
+    namespaces = {testConfig.get_namespace('abc', f'nightly-build-{build}')
+                  for build in range(100, 200)}
+    assert len(namespaces) == 100
+    for namespace in namespaces:
+        run_id = namespace.split('_')[1]
+        assert run_id.startswith('nightly-')
+        assert len(run_id) == testConfig.NAMESPACE_PART_LENGTH
+    assert testConfig.get_namespace('abc', 'nightly-build-101') == \
+        testConfig.get_namespace('abc', 'nightly-build-101')
+    assert testConfig.get_namespace('abcdefghijkl') == 'abcdefghijkl_local_main'
@@ -0,0 +1,201 @@
+'''
+Created on Oct. 18, 2026
+
+Sources of random words used when populating string fields with dynamic data.
+
+All sources implement the WordSource interface so the data population code
+doesn't need to know where the words come from.  The default source is the
+word list bundled in the test_data directory, it is memory mapped and indexed
+once per process and never touches the network.
+
+The source used by default can be swapped out using set_default_source(), for
+example:
+
+    word_source.set_default_source(word_source.NetworkWordSource())
+'''
+import array
+import importlib.util
+import logging
+import mmap
+import os.path
+import random
+import threading
+
+import bcdc_apitests.config.testConfig as testConfig
+from bcdc_apitests.helpers.file_utils import FileUtils
+
+LOGGER = logging.getLogger(__name__)
+
+# pylint: disable=logging-fstring-interpolation
+
+# process wide source, see get_default_source()
+_DEFAULT_SOURCE = None
+_DEFAULT_SOURCE_LOCK = threading.Lock()
+
+
+class WordSource():
+    '''
+    Interface for anything that can provide random words.  Subclasses need to
+    implement getword(), getwords() can be overridden if the source can draw
+    multiple words more efficiently than one at a time.
+
+    All the draw methods take an optional rng, which is any object that
+    implements the same interface as the random module, allowing callers to
+    provide their own seeded random.Random instance.
+    '''
+
+    def getword(self, rng=None):
+        '''
+        :param rng: random number generator to use for the draw, defaults to
+            the random module
+        :return: a single random alphanumeric word
+        '''
+        raise NotImplementedError
+
+    def getwords(self, count, rng=None):
+        '''
+        :param count: the number of words to return
+        :param rng: random number generator to use for the draw
+        :return: a list of random alphanumeric words
+        '''
+        return [self.getword(rng) for _ in range(count)]
+
+
+class BundledWordSource(WordSource):
+    '''
+    Draws words from the newline delimited word list that is shipped in the
+    test_data directory.  The file is memory mapped and an index of line
+    offsets is calculated once, after that every draw is a single random
+    integer and a slice.
+
+    Lines that are empty or contain non alphanumeric characters are dropped
+    from the index, so every draw returns a usable word.
+    '''
+
+    def __init__(self, words_file=None):
+        if words_file is None:
+            data_dir = FileUtils().get_test_data_dir()
+            words_file = os.path.join(data_dir, testConfig.TEST_WORDS_FILE)
+        self.words_file = words_file
+        self.starts = array.array('L')
+        self.ends = array.array('L')
+        self.__load()
+
+    def __load(self):
+        '''
+        memory maps the words file and builds the line index
+        '''
+        LOGGER.debug(f"loading the word list: {self.words_file}")
+        with open(self.words_file, 'rb') as file_hand:
+            self.word_map = mmap.mmap(file_hand.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+        start = 0
+        size = len(self.word_map)
+        while start < size:
+            end = self.word_map.find(b'\n', start)
+            if end == -1:
+                end = size
+            word = self.word_map[start:end].strip()
+            if word and word.isalnum():
+                self.starts.append(start)
+                self.ends.append(start + len(word))
+            start = end + 1
+        if not self.starts:
+            msg = f'the word list {self.words_file} does not contain any ' + \
+                  'alphanumeric words'
+            raise ValueError(msg)
+        LOGGER.debug(f"words loaded: {len(self)}")
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __word_at(self, indx):
+        return self.word_map[self.starts[indx]:self.ends[indx]].decode('ascii')
+
+    def getword(self, rng=None):
+        rng = random if rng is None else rng
+        return self.__word_at(rng.randrange(len(self.starts)))
+
+    def getwords(self, count, rng=None):
+        rng = random if rng is None else rng
+        indexes = rng.choices(range(len(self.starts)), k=count)
+        return [self.__word_at(indx) for indx in indexes]
+
+
+class ListWordSource(WordSource):
+    '''
+    Draws words from a list held in memory, useful when a test wants to
+    control the words that get generated.
+    '''
+
+    def __init__(self, words):
+        self.words = [word for word in words if word.isalnum()]
+        if not self.words:
+            raise ValueError('ListWordSource requires at least one alphanumeric word')
+
+    def __len__(self):
+        return len(self.words)
+
+    def getword(self, rng=None):
+        rng = random if rng is None else rng
+        return self.words[rng.randrange(len(self.words))]
+
+    def getwords(self, count, rng=None):
+        rng = random if rng is None else rng
+        return rng.choices(self.words, k=count)
+
+
+class NetworkWordSource(WordSource):
+    '''
+    The original word source, retrieves batches of words from the
+    randomwordgenerator module, which makes a network call for each batch.
+
+    randomwordgenerator is an optional dependency, it is only imported when
+    this source gets created.  Ignores any rng that is passed in as the words
+    come from the network.
+    '''
+
+    def __init__(self, cache_size=500):
+        if not importlib.util.find_spec('randomwordgenerator'):
+            msg = 'NetworkWordSource requires the randomwordgenerator module'
+            raise ImportError(msg)
+        import randomwordgenerator.randomwordgenerator  # pylint: disable=import-outside-toplevel
+        self.generator = randomwordgenerator.randomwordgenerator
+        self.cache_size = cache_size
+        self.words = []
+        self.lock = threading.Lock()
+
+    def getword(self, rng=None):
+        with self.lock:
+            while not self.words:
+                LOGGER.info(f"getting another {self.cache_size} random words " +
+                            "from generator..")
+                words = self.generator.generate_random_words(self.cache_size)
+                self.words = [word for word in words if word.isalnum()]
+            return self.words.pop()
+
+
+def get_default_source():
+    '''
+    :return: the process wide word source, if one hasn't been set then the
+        bundled word list is loaded.
+    '''
+    global _DEFAULT_SOURCE  # pylint: disable=global-statement
+    if _DEFAULT_SOURCE is None:
+        with _DEFAULT_SOURCE_LOCK:
+            if _DEFAULT_SOURCE is None:
+                _DEFAULT_SOURCE = BundledWordSource()
+    return _DEFAULT_SOURCE
+
+
+def set_default_source(source):
+    '''
+    :param source: the WordSource that should be used by default, set to None
+        to go back to the bundled word list.
+    :type source: WordSource
+    '''
+    global _DEFAULT_SOURCE  # pylint: disable=global-statement
+    if source is not None and not isinstance(source, WordSource):
+        msg = f'word sources must be a subclass of WordSource, received: {type(source)}'
+        raise TypeError(msg)
+    _DEFAULT_SOURCE = source
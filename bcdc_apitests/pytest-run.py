@@ -2,13 +2,16 @@
 import os
 import pytest
 import sys
-import json
 import requests
 
+import bcdc_apitests.helpers.json_codec as json_codec
+
 
 # output paths
 xml_report_path = "/tmp/xml-report.xml"
 json_report_path = "/tmp/json-report.json"
+# latency of the ckan action calls, in the prometheus textfile format
+metrics_path = os.getenv('BCDC_METRICS_FILE', "/tmp/bcdc-metrics.prom")
 
 # required env vars
 bcdc_url = str(os.getenv('BCDC_URL'))
@@ -35,7 +38,8 @@ try:
     # pytest with both xml and json output, only using json output at this time.
 
     pytest.main(['-o', 'log_cli=true', ('--log-cli-level={0}'.format(log_level)), '--pyargs', 'bcdc_apitests',
-                 ('--junitxml={0}'.format(xml_report_path)), ('--json={0}'.format(json_report_path))])
+                 ('--junitxml={0}'.format(xml_report_path)), ('--json={0}'.format(json_report_path)),
+                 ('--bcdc-metrics-file={0}'.format(metrics_path))])
 
     # For Development Work only , to run one module
     # pytest.main(['-o', 'log_cli=true', ('--log-cli-level={0}'.format(log_level)),
@@ -47,9 +51,10 @@ try:
 
     # get json test results
     print("Test Results as json output")
-    with open(json_report_path, 'r') as f:
-        json_report = json.load(f)
-    print(json.dumps(json_report, indent=4, sort_keys=True))
+    codec = json_codec.get_codec()
+    with open(json_report_path, 'rb') as f:
+        json_report = codec.load(f)
+    print(codec.dumps(json_report, sort_keys=True, pretty=True))
 
     tests = json_report['report']['tests']
     custom_results = []
@@ -61,6 +66,14 @@ try:
 
     print(custom_results)
 
+    # latency of the ckan actions for this run, the full histograms are in
+    # the metrics file
+    actions = json_report.get('ckan_actions', {}).get('actions', {})
+    for action in sorted(actions):
+        summary = actions[action]
+        print('{0}: calls: {1}, p50: {2:.3f}, p95: {3:.3f}, p99: {4:.3f}'.format(
+            action, summary['count'], summary['p50'], summary['p95'], summary['p99']))
+
     # ---------- Pass/Fail Logic ----------------
 
     # check summary for failed, then set if pass/fail to use later.
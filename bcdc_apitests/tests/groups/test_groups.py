@@ -7,7 +7,6 @@ Created on Sept 05, 2019
 '''
 # pylint: disable=invalid-name, unused-argument, too-many-arguments, unused-import
 import logging
-import requests
 import pytest  # @UnusedImport
 
 LOGGER = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -15,7 +14,7 @@ LOGGER = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 def test_group_list(conf_fixture, group_create_if_not_exists_fixture,
                     test_group, ckan_url, ckan_rest_dir,
-                    ckan_auth_header, user_label_fixture):
+                    ckan_auth_header, user_label_fixture, ckan_session):
     '''
     verifies can retrieve a list of groups and that there is at least
     one group defined
@@ -23,7 +22,7 @@ def test_group_list(conf_fixture, group_create_if_not_exists_fixture,
     # this should be a requests call to verify status
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'group_list')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.get(api_call, headers=ckan_auth_header, params=
+    resp = ckan_session.get(api_call, headers=ckan_auth_header, params=
                         {'id': test_group})
     resp_data = resp.json()
     LOGGER.debug("resp json: %s", resp_data)
@@ -55,7 +54,7 @@ def test_group_list(conf_fixture, group_create_if_not_exists_fixture,
 def test_group_show(conf_fixture, group_create_if_not_exists_fixture,
                            ckan_url, ckan_rest_dir,
                            ckan_auth_header, ckan_apitoken, test_group,
-                           user_label_fixture):
+                           user_label_fixture, ckan_session):
     '''
     Verifies the group used for testing can be viewed by all the parameterized
     users
@@ -63,7 +62,7 @@ def test_group_show(conf_fixture, group_create_if_not_exists_fixture,
     LOGGER.debug('test group: %s', test_group)
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'group_show')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.get(api_call, headers=ckan_auth_header, params=
+    resp = ckan_session.get(api_call, headers=ckan_auth_header, params=
                         {'id': test_group})
     group_data = resp.json()
     LOGGER.debug('test group: %s', group_data)
@@ -10,7 +10,6 @@ Can't test orgs as there is no way to create orgs without superuser
 '''
 # pylint: disable=invalid-name, unused-argument, too-many-arguments, unused-import
 import logging
-import requests
 import pytest  # @UnusedImport
 
 LOGGER = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -18,7 +17,7 @@ LOGGER = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 def test_organization_list(conf_fixture, org_create_if_not_exists_fixture,
                            test_organization, ckan_url, ckan_rest_dir,
-                           ckan_auth_header, user_label_fixture):
+                           ckan_auth_header, user_label_fixture, ckan_session):
     '''
     verifies can retrieve a list of organizations and that there is at least
     one org defined
@@ -26,7 +25,7 @@ def test_organization_list(conf_fixture, org_create_if_not_exists_fixture,
     # this should be a requests call to verify status
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'organization_list')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.get(api_call, headers=ckan_auth_header, params=
+    resp = ckan_session.get(api_call, headers=ckan_auth_header, params=
                         {'id': test_organization})
     resp_data = resp.json()
     LOGGER.debug("resp json: %s", resp_data)
@@ -58,7 +57,7 @@ def test_organization_list(conf_fixture, org_create_if_not_exists_fixture,
 def test_organization_show(conf_fixture, org_create_if_not_exists_fixture,
                            ckan_url, ckan_rest_dir,
                            ckan_auth_header, ckan_apitoken, test_organization,
-                           user_label_fixture):
+                           user_label_fixture, ckan_session):
     '''
     Verifies the org used for testing can be viewed by all the parameterized
     users
@@ -66,7 +65,7 @@ def test_organization_show(conf_fixture, org_create_if_not_exists_fixture,
     LOGGER.debug('test org: %s', test_organization)
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'organization_show')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.get(api_call, headers=ckan_auth_header, params=
+    resp = ckan_session.get(api_call, headers=ckan_auth_header, params=
                         {'id': test_organization})
     org_data = resp.json()
     LOGGER.debug('test org: %s', org_data)
@@ -84,7 +83,7 @@ def test_organization_show(conf_fixture, org_create_if_not_exists_fixture,
 
 def test_organization_list_related(conf_fixture, org_create_if_not_exists_fixture,
                            test_organization, ckan_url, ckan_rest_dir,
-                           ckan_auth_header, user_label_fixture):
+                           ckan_auth_header, user_label_fixture, ckan_session):
     '''
     verifies can retrieve all organizations and properties and check test org
     exist in results by title
@@ -92,7 +91,7 @@ def test_organization_list_related(conf_fixture, org_create_if_not_exists_fixtur
     # return all fields
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'organization_list_related')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.get(api_call, headers=ckan_auth_header, params=
+    resp = ckan_session.get(api_call, headers=ckan_auth_header, params=
                         {'all_fields': True})
     resp_data = resp.json()
 
@@ -9,7 +9,6 @@ contains test that are not related to a existing test module
 '''
 # pylint: disable=invalid-name, unused-argument, too-many-arguments, unused-import
 import logging
-import requests
 import pytest  # @UnusedImport
 
 LOGGER = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -19,7 +18,7 @@ def test_dashboard_activity_list(conf_fixture, user_label_fixture,
                                  remote_api_auth, populate_bcdc_dataset_single,
                                  test_package_name, ckan_url, ckan_rest_dir,
                                  ckan_auth_header, package_delete_if_exists,
-                                 test_pkg_teardown):
+                                 test_pkg_teardown, ckan_session):
     '''
     :param remote_api_auth: a ckan remote api object
     :param populate_bcdc_dataset: pkg data to be updated
@@ -33,8 +32,8 @@ def test_dashboard_activity_list(conf_fixture, user_label_fixture,
     # create new pkg as user
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'package_create')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.post(api_call, headers=ckan_auth_header,
-                         json=populate_bcdc_dataset_single)
+    resp = ckan_session.post(api_call, headers=ckan_auth_header,
+                         data=populate_bcdc_dataset_single.body)
     assert (resp.status_code == 200) == conf_fixture.test_result
     pkg_data = resp.json()
     new_pkg_id = pkg_data['result']['id']
@@ -44,7 +43,7 @@ def test_dashboard_activity_list(conf_fixture, user_label_fixture,
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir,
                                    'dashboard_activity_list')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.post(api_call, headers=ckan_auth_header)
+    resp = ckan_session.post(api_call, headers=ckan_auth_header)
     assert (resp.status_code == 200) == conf_fixture.test_result
     activity_data = resp.json()
 
@@ -65,7 +64,7 @@ def test_dashboard_activity_list(conf_fixture, user_label_fixture,
 
 def test_tag_list(conf_fixture, remote_api_auth, package_create_if_not_exists,
                 user_label_fixture, test_package_name, ckan_url, ckan_rest_dir, ckan_auth_header,
-                ckan_superadmin_auth_header):
+                ckan_superadmin_auth_header, ckan_session):
     '''
     :param remote_api: a ckan remote api object
 
@@ -83,7 +82,7 @@ def test_tag_list(conf_fixture, remote_api_auth, package_create_if_not_exists,
     # get pkg tags from test pkg
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'package_show')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.get(api_call, headers=ckan_superadmin_auth_header, params={'id': test_package_name})
+    resp = ckan_session.get(api_call, headers=ckan_superadmin_auth_header, params={'id': test_package_name})
     assert (resp.status_code == 200) == conf_fixture.test_result
     pkg_data = resp.json()
 
@@ -93,7 +92,7 @@ def test_tag_list(conf_fixture, remote_api_auth, package_create_if_not_exists,
     # get tag list
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'tag_list')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.post(api_call, headers=ckan_superadmin_auth_header)
+    resp = ckan_session.post(api_call, headers=ckan_superadmin_auth_header)
     assert (resp.status_code == 200) == conf_fixture.test_result
     tag_list_data = resp.json()
 
@@ -155,7 +154,7 @@ def test_license_list(conf_fixture, user_label_fixture, remote_api_auth):
 
 
 def test_config_option_show(conf_fixture, remote_api_super_admin_auth,
-                            ckan_url, ckan_rest_dir, ckan_superadmin_auth_header):
+                            ckan_url, ckan_rest_dir, ckan_superadmin_auth_header, ckan_session):
     '''
     :param remote_api: a ckan remote api object
 
@@ -171,7 +170,7 @@ def test_config_option_show(conf_fixture, remote_api_super_admin_auth,
     for config in config_option_list_data:
         api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'config_option_show')
         LOGGER.debug('api_call: %s', api_call)
-        resp = requests.post(api_call, headers=ckan_superadmin_auth_header, params=
+        resp = ckan_session.post(api_call, headers=ckan_superadmin_auth_header, params=
                         {'key': config})
         # check for 200
         fail_msg = "failed to get config data option for {0}  with status {1}"
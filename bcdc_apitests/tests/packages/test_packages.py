@@ -13,11 +13,8 @@ b) create package with org insert the org just created for this package.
 
 import inspect
 import logging
-import time
 
-import ckanapi
 import pytest  # @UnusedImport
-import requests
 
 import bcdc_apitests.config.testConfig as testConfig
 
@@ -30,7 +27,7 @@ LOGGER = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 def test_package_create(conf_fixture, ckan_auth_header, bcdc_dataset_populator,
                         test_pkg_teardown, package_delete_if_exists, ckan_url,
-                        ckan_rest_dir):
+                        ckan_rest_dir, ckan_session):
     '''
     :param conf_fixture: test configuration object, contains the various properties
         defined in the parameterization configuration.
@@ -68,18 +65,12 @@ def test_package_create(conf_fixture, ckan_auth_header, bcdc_dataset_populator,
     LOGGER.debug('ckan_auth_header: %s', ckan_auth_header)
 
     # loop to iterate over all the datasets returned by the data method.
+    # datasets are json_codec.Payload objects, the body is encoded once and
+    # re-used if ckan_session retries the call
     for dataset in populate_bcdc_dataset:
 
-        LOGGER.debug('bcdc_dataset data: %s', dataset)
-        resp = requests.post(api_call, headers=ckan_auth_header, json=dataset)
-        if resp.status_code == 502:
-            # try again
-            LOGGER.warning(f'create package call failed with 502 status code,' +
-                           'trying again in 3 seconds...')
-            time.sleep(3)
-            LOGGER.debug('api_call: %s', ckan_auth_header)
-            LOGGER.debug('api_call: %s', dataset)
-            resp = requests.post(api_call, headers=ckan_auth_header, json=dataset)
+        LOGGER.debug('bcdc_dataset data: %s', dataset.ref)
+        resp = ckan_session.post(api_call, headers=ckan_auth_header, data=dataset.body)
         LOGGER.debug("resp: %s", resp.text)
         LOGGER.info("status code: %s", resp.status_code)
         assert (resp.status_code == 200) == conf_fixture.test_result
@@ -112,7 +103,7 @@ def test_package_show(conf_fixture, remote_api_auth, test_package_name,
 
 def test_package_update(conf_fixture, remote_api_auth, populate_bcdc_dataset_single, ckan_url,
                         ckan_rest_dir, ckan_auth_header,
-                        package_create_if_not_exists, test_pkg_teardown):
+                        package_create_if_not_exists, test_pkg_teardown, ckan_session):
     '''
     package update test will use requests
     :param conf_fixture: a test parameters object that wraps the records
@@ -143,7 +134,8 @@ def test_package_update(conf_fixture, remote_api_auth, populate_bcdc_dataset_sin
     # LOGGER.debug("pkg_show_data: %s", pkg_show_data)
 
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'package_update')
-    resp = requests.post(api_call, headers=ckan_auth_header, json=populate_bcdc_dataset_single)
+    resp = ckan_session.post(api_call, headers=ckan_auth_header,
+                         data=populate_bcdc_dataset_single.body)
     LOGGER.debug("resp.status_code: %s", resp.status_code)
     LOGGER.debug("resp.text: %s", resp.text)
     assert (resp.status_code == 200) == conf_fixture.test_result
@@ -157,7 +149,8 @@ def test_package_update(conf_fixture, remote_api_auth, populate_bcdc_dataset_sin
     # only run if the data was successfully changed.
     if pkg_show_data['title'] == populate_bcdc_dataset_single['title']:
         populate_bcdc_dataset_single['title'] = original_title
-        resp = requests.post(api_call, headers=ckan_auth_header, json=populate_bcdc_dataset_single)
+        resp = ckan_session.post(api_call, headers=ckan_auth_header,
+                             data=populate_bcdc_dataset_single.body)
         assert (resp.status_code == 200) == conf_fixture.test_result
         pkg_show_data = remote_api_auth.action.package_show(id=test_package_name)
         assert (pkg_show_data['title'] == original_title) == conf_fixture.test_result
@@ -236,7 +229,10 @@ def test_package_autocomplete(conf_fixture, test_prefix, remote_api_auth, test_p
 
 
 
-
+# these used to be skipped through the scheming fixture, which pulled in the
+# user parameterization, they have no entries in testParams.json and the
+# remote_api_admin_auth fixture doesn't exist
+@pytest.mark.skip(reason='no remote_api_admin_auth fixture or test params')
 def test_package_state(remote_api_admin_auth, update_pkg_state,
                        test_package_name):
     '''
@@ -252,6 +248,7 @@ def test_package_state(remote_api_admin_auth, update_pkg_state,
     assert pkg_show_data['name'] == test_package_name
 
 
+@pytest.mark.skip(reason='no remote_api_admin_auth fixture or test params')
 def test_package_visibility(remote_api_admin_auth, update_pkg_visibility,
                             test_package_name):
     '''
@@ -275,7 +272,7 @@ def test_package_list_vs_package_show(conf_fixture,  # pylint: disable=invalid-n
                                       ckan_url,
                                       ckan_rest_dir,
                                       ckan_auth_header,
-                                      package_create_if_not_exists):
+                                      package_create_if_not_exists, ckan_session):
     '''
     verify the count reported by package_search matches packages
     returned by package_list, als seeing as a package has been
@@ -298,7 +295,7 @@ def test_package_list_vs_package_show(conf_fixture,  # pylint: disable=invalid-n
     package_list_cnt = 0
     while True:
         LOGGER.debug("offset: %s", params['offset'])
-        resp = requests.get(package_list_call, headers=ckan_auth_header,
+        resp = ckan_session.get(package_list_call, headers=ckan_auth_header,
                             params=params)
         LOGGER.debug("status: %s", resp.status_code)
         pkg_list = resp.json()
@@ -312,7 +309,7 @@ def test_package_list_vs_package_show(conf_fixture,  # pylint: disable=invalid-n
 
     LOGGER.debug("final package cnt from packagelist: %s", package_list_cnt)
 
-    remote_api = ckanapi.RemoteCKAN(ckan_url)
+    remote_api = ckan_session.get_remote_api()
     pkg_search = remote_api.action.package_search()
 
     LOGGER.debug("pkg_search cnt: %s", pkg_search['count'])
@@ -323,7 +320,7 @@ def test_package_list_vs_package_show(conf_fixture,  # pylint: disable=invalid-n
 
 def test_package_delete(conf_fixture, ckan_url,  # pylint: disable=invalid-name
                         ckan_auth_header, ckan_rest_dir, test_package_name,
-                        package_create_if_not_exists):
+                        package_create_if_not_exists, ckan_session):
     '''
     verifies that a package can actually be deleted,
 
@@ -342,7 +339,7 @@ def test_package_delete(conf_fixture, ckan_url,  # pylint: disable=invalid-name
     LOGGER.debug('api_call: %s', api_call)
     delete_data = {'id': test_package_name}
 
-    resp = requests.post(api_call, headers=ckan_auth_header, json=delete_data)
+    resp = ckan_session.post(api_call, headers=ckan_auth_header, json=delete_data)
     LOGGER.debug('status code: %s', resp.status_code)
     resp_json = resp.json()
     LOGGER.debug("resp: %s", resp.text)
@@ -358,7 +355,7 @@ def test_package_delete(conf_fixture, ckan_url,  # pylint: disable=invalid-name
 def test_create_package_coredataonly(conf_fixture, ckan_url,  # pylint: disable=invalid-name
                                      ckan_auth_header, ckan_rest_dir,
                                      test_pkg_data_core_only,
-                                     package_delete_if_exists):
+                                     package_delete_if_exists, ckan_session):
     '''
     CKAN Documentation suggests these are the core attributes required for a
     package:
@@ -392,7 +389,7 @@ def test_create_package_coredataonly(conf_fixture, ckan_url,  # pylint: disable=
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'package_create')
     LOGGER.debug('api_call: %s', api_call)
 
-    resp_create = requests.post(api_call, headers=ckan_auth_header,
+    resp_create = ckan_session.post(api_call, headers=ckan_auth_header,
                                 json=test_pkg_data_core_only)
     LOGGER.debug("resp: %s", resp_create.text)
     cant_create_msg = 'Attempt to call %s returned %s'
@@ -405,7 +402,7 @@ def test_create_package_coredataonly(conf_fixture, ckan_url,  # pylint: disable=
     # now make sure the data is viewable
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'package_show')
     LOGGER.debug('api_call: %s', api_call)
-    resp_show = requests.post(api_call, headers=ckan_auth_header,
+    resp_show = ckan_session.post(api_call, headers=ckan_auth_header,
                               json={'id': test_pkg_data_core_only['name']})
     LOGGER.debug('resp: %s', resp_show.text)
     non_200_msg = 'package_show on package {0} returned a status_code {1} when ' + \
@@ -430,7 +427,7 @@ def test_edc_package_update_bcgw(conf_fixture, ckan_url, ckan_rest_dir,
                                  package_create_if_not_exists,
                                  set_package_state_active,
                                  populate_bcdc_dataset,
-                                 remote_api_super_admin_auth):
+                                 remote_api_super_admin_auth, ckan_session):
     '''
     :param conf_fixture: parameterization fixture.
     :param ckan_url: the base url to ckan instance
@@ -471,7 +468,7 @@ def test_edc_package_update_bcgw(conf_fixture, ckan_url, ckan_rest_dir,
 
     LOGGER.debug(f"package name: {populate_bcdc_dataset['name']}")
 
-    resp = requests.post(api_call, headers=ckan_auth_header,
+    resp = ckan_session.post(api_call, headers=ckan_auth_header,
                          json=body)
     resp_json = resp.json()
     LOGGER.debug(f"resp status code: {resp.status_code}")
@@ -506,7 +503,7 @@ def test_edc_package_update(conf_fixture, ckan_url, ckan_rest_dir,
                             package_create_if_not_exists,
                             set_package_state_active,
                             populate_bcdc_dataset,
-                            remote_api_super_admin_auth):
+                            remote_api_super_admin_auth, ckan_session):
     '''
     :param conf_fixture: parameterization fixture.
     :param ckan_url: the base url to ckan instance
@@ -545,7 +542,7 @@ def test_edc_package_update(conf_fixture, ckan_url, ckan_rest_dir,
                     'data_type': 'NUMBER',
                     'short_name': 'TST_CHG2'}
                 ]}
-    resp = requests.post(api_call, headers=ckan_auth_header,
+    resp = ckan_session.post(api_call, headers=ckan_auth_header,
                          json=body)
 
     LOGGER.debug(f"resp status code: {resp.status_code}")
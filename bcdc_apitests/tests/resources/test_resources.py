@@ -6,7 +6,6 @@ Created on Jun. 11, 2019
 import json
 import logging
 
-import requests
 
 import bcdc_apitests.config.testConfig as testConfig
 
@@ -17,7 +16,7 @@ LOGGER = logging.getLogger(__name__)
 def test_resource_create(conf_fixture, ckan_url, ckan_rest_dir, ckan_auth_header,
                          package_create_if_not_exists, resource_delete_if_exists,
                          bcdc_resource_populator,
-                         remote_api_super_admin_auth):
+                         remote_api_super_admin_auth, ckan_session):
     '''
     add new resource
 
@@ -54,17 +53,17 @@ def test_resource_create(conf_fixture, ckan_url, ckan_rest_dir, ckan_auth_header
     cnt = 1
     for resource_data in populate_bcdc_resource:
         resource_data['name'] = f'{testConfig.TEST_RESOURCE}_{cnt}'
-        LOGGER.debug(f'resource data: {json.dumps(resource_data)}')
 
         # fix the json_table_schema
         if 'json_table_schema' in resource_data:
             LOGGER.debug(f"json_table_schema: {resource_data['json_table_schema']}")
             LOGGER.debug(f"json_table_schema type {type(resource_data['json_table_schema'])}")
             resource_data['json_table_schema'] = json.loads(resource_data['json_table_schema'])
+        LOGGER.debug(f'resource data: {resource_data.ref}')
 
         # create resource
         LOGGER.debug(f"api_call: {api_call}")
-        res_data = requests.post(api_call, headers=ckan_auth_header, json=resource_data)
+        res_data = ckan_session.post(api_call, headers=ckan_auth_header, data=resource_data.body)
         LOGGER.debug("resource_create: %s", res_data.text)
 
         # get resource id
@@ -82,7 +81,7 @@ def test_resource_create(conf_fixture, ckan_url, ckan_rest_dir, ckan_auth_header
             # define remote api
             api_call_status = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'resource_show')
             res_id = resp_json['result']['id']
-            res_data = requests.get(api_call_status, headers=ckan_auth_header,
+            res_data = ckan_session.get(api_call_status, headers=ckan_auth_header,
                                     params={'id':res_id})
             resp_json = res_data.json()
             assert resp_json['success'] == conf_fixture.test_result
@@ -92,7 +91,7 @@ def test_resource_create(conf_fixture, ckan_url, ckan_rest_dir, ckan_auth_header
 # update resource
 def test_resource_update(conf_fixture, ckan_url, ckan_rest_dir,
                          ckan_auth_header,
-                         resource_get_id_fixture, populate_resource_single):
+                         resource_get_id_fixture, populate_resource_single, ckan_session):
     '''
     :param conf_fixture: a test parameters object, contains all the properties
         of any parameterized tests.
@@ -123,7 +122,7 @@ def test_resource_update(conf_fixture, ckan_url, ckan_rest_dir,
     LOGGER.debug('api_call: %s', api_call)
 
     # update resource
-    resp = requests.post(api_call, headers=ckan_auth_header, json=populate_resource_single)
+    resp = ckan_session.post(api_call, headers=ckan_auth_header, data=populate_resource_single.body)
     res_data = resp.json()
     LOGGER.debug("resource_update: %s", res_data)
     assert (resp.status_code == 200) == conf_fixture.test_result
@@ -135,7 +134,7 @@ def test_resource_update(conf_fixture, ckan_url, ckan_rest_dir,
 
         api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'package_show')
         params = {'id': populate_resource_single['package_id']}
-        resp = requests.post(api_call, headers=ckan_auth_header, params=params)
+        resp = ckan_session.post(api_call, headers=ckan_auth_header, params=params)
         resp_data = resp.json()
         assert (resp.status_code == 200 and resp_data['success']) == conf_fixture.test_result
         pckg = resp_data['result']
@@ -196,7 +195,7 @@ def test_resource_search(conf_fixture, remote_api_auth, test_resource_name,
 # delete resource
 def test_resource_delete(conf_fixture, ckan_url,
                          ckan_rest_dir, ckan_auth_header, res_create_if_not_exists,
-                         resource_get_id_fixture):
+                         resource_get_id_fixture, ckan_session):
     '''
     :param remote_api_admin_auth: ckanapi remote, with auth
     :param resource_data: test resource structure
@@ -207,7 +206,7 @@ def test_resource_delete(conf_fixture, ckan_url,
     '''
     # define api
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'resource_delete')
-    resp = requests.post(api_call, headers=ckan_auth_header,
+    resp = ckan_session.post(api_call, headers=ckan_auth_header,
                          json={'id': resource_get_id_fixture})
     resp_data = resp.json()
     LOGGER.debug("resp_data: %s", resp_data)
@@ -220,7 +219,7 @@ def test_resource_delete(conf_fixture, ckan_url,
         LOGGER.debug('api_call: %s', api_call)
 
         # show resource, to later verify that the id cannot be found
-        res_data = requests.get(api_call, headers=ckan_auth_header,
+        res_data = ckan_session.get(api_call, headers=ckan_auth_header,
                                 params={'id': resource_get_id_fixture})
         LOGGER.debug("resource_show: %s", res_data.text)
 
@@ -7,7 +7,6 @@ Created on Sep 09, 2019
 '''
 # pylint: disable=invalid-name, unused-argument, too-many-arguments, unused-import, logging-format-interpolation
 import logging
-import requests
 import pytest  # @UnusedImport
 
 LOGGER = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -15,7 +14,7 @@ LOGGER = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 def test_user_show(conf_fixture, user_label_fixture, remote_api_auth,
                    ckan_url, ckan_auth_header, ckan_rest_dir,
-                   test_package_name, package_create_if_not_exists):
+                   test_package_name, package_create_if_not_exists, ckan_session):
     '''
     verify user_show can be retrieved for user that is calling including
     datasets attr and verify pkg is returned in results
@@ -29,7 +28,7 @@ def test_user_show(conf_fixture, user_label_fixture, remote_api_auth,
     # return all fields
     api_call = '{0}{1}/{2}'.format(ckan_url, ckan_rest_dir, 'user_show')
     LOGGER.debug('api_call: %s', api_call)
-    resp = requests.get(api_call, headers=ckan_auth_header, params=
+    resp = ckan_session.get(api_call, headers=ckan_auth_header, params=
                         {'id': user_label_fixture, 'include_datasets': True})
     resp_data = resp.json()
 
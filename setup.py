@@ -33,6 +33,13 @@ setuptools.setup(
     install_requires=requires,
     include_package_data=True,
     scripts=['bcdc_apitests/pytest-run.py'],
+    entry_points={
+        'console_scripts': [
+            'bcdc-datagen=bcdc_apitests.helpers.datagen:main',
+            'bcdc-loadtest=bcdc_apitests.helpers.loadtest:main',
+            'bcdc-sweep=bcdc_apitests.helpers.sweeper:main',
+        ],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Framework :: Pytest",